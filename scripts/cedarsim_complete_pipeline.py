@@ -15,7 +15,8 @@ Input Files:
    - Validation sample with pre-calculated target inventories
 
 Output Files:
-1. CedarSim_Simulation_Ready_Data_Final.xlsx - Complete simulation dataset
+1. csv_complete/ and parquet/ - Complete simulation dataset (one file per table)
+   and CedarSim_Simulation_Ready_Data_Final.xlsx (optional, streamed; demand sampled)
 2. Audit trail files for data cleaning phases
 3. Validation reports
 
@@ -23,7 +24,6 @@ Author: CedarSim Data Processing Team
 Date: September 11, 2025
 """
 
-import pandas as pd
 import numpy as np
 from datetime import datetime
 import os
@@ -31,10 +31,19 @@ import shutil
 from pathlib import Path
 import logging
 import warnings
-import zipfile
+import sys
+import argparse
 import tempfile
 warnings.filterwarnings('ignore')
 
+# Add the simulation_development directory to the path
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'simulation_development'))
+
+from data.input_data.phase_runner import Phase, PhaseError, PhaseRunner
+from data.input_data.typed_loader import PARQUET_AVAILABLE
+from data.input_data.workbook_cache import WorkbookValidationError, open_workbook
+from data.input_data.workbook_writer import verify_workbook, write_outputs
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -46,26 +55,79 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+SKU_SHEET = '01. Data (Department Rollup)'
+DEMAND_SHEET = '02. Full Data'
+SKU_REQUIRED_COLUMNS = ['Oracle Item Number', 'Item Description', 'Department Name', 'Supplier Name', 'Avg_Lead Time']
+DEMAND_REQUIRED_COLUMNS = ['Oracle Item Number']
+
+AUDIT_DIR = Path("data/audit_trails")
+PHASE1_REMOVAL_FILE = AUDIT_DIR / 'phase1_missing_lead_times_removal.csv'
+PHASE2_REMOVAL_FILE = AUDIT_DIR / 'phase2_unmapped_skus_removal.csv'
+SUMMARY_REPORT_FILE = Path('CedarSim_Pipeline_Summary_Report.md')
+
+# The workbook carries a sample of the demand sheet; CSV and Parquet carry all rows
+EXCEL_DEMAND_SAMPLE_ROWS = 10000
+
+OUTPUT_SHEETS = ['01_SKU_Inventory_Final', '02_Demand_Data_Clean', '03_Phase1_Removal_Record',
+                 '04_Phase2_Removal_Record', '05_Validation_Sample']
+
+# CSV / Parquet file stem of each sheet; the csv_complete/ files predate the workbook
+# sheet order (see data/final/csv_complete/README_Complete_CSV_Files.md)
+OUTPUT_FILE_NAMES = {
+    '01_SKU_Inventory_Final': '01_SKU_Inventory_Final',
+    '02_Demand_Data_Clean': '02_Demand_Data_Clean',
+    '03_Phase1_Removal_Record': '04_Phase1_Removal_Record',
+    '04_Phase2_Removal_Record': '05_Phase2_Removal_Record',
+    '05_Validation_Sample': '03_Validation_Sample',
+}
+CSV_SUFFIX = '_Complete'
+
+def clean_for_excel(df):
+    """Clean DataFrame for Excel - handle NaN values more carefully"""
+    df_clean = df.copy()
+    
+    # Convert object columns to string to avoid Excel issues
+    for col in df_clean.columns:
+        if df_clean[col].dtype == 'object':
+            df_clean[col] = df_clean[col].astype(str).replace('nan', '')
+        elif df_clean[col].dtype in ['float64', 'float32']:
+            df_clean[col] = df_clean[col].fillna(0)
+    return df_clean
+
 class CedarSimPipeline:
     """Complete CedarSim data processing pipeline with error handling"""
     
-    def __init__(self, input_dir="data/archive/original", output_dir="data/final"):
+    def __init__(self, input_dir="data/archive/original", output_dir="data/final", use_cache=True, export_excel=True):
         self.input_dir = Path(input_dir)
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.backup_dir = Path("pipeline_backups")
         self.backup_dir.mkdir(exist_ok=True)
         
+        # Phase results are cached under hashes of their inputs (see build_phases)
+        self.cache_dir = Path(".pipeline_cache")
+        self.use_cache = use_cache
+        self.phase_timings = []
+        
         # File paths
         self.inventory_file = self.input_dir / "2025-07-14_MDRH_Inventory_Storage_Burn_Rates_V3.xlsx"
         self.validation_file = self.input_dir / "2025-08-04_MDRH_Inventory_Safety_Stock_Sample_Items.xlsx"
+        self.final_excel_file = self.output_dir / "CedarSim_Simulation_Ready_Data_Final.xlsx"
+        
+        # Output tables are written as CSV and Parquet; the workbook is an optional export
+        self.csv_dir = self.output_dir / "csv_complete"
+        self.parquet_dir = self.output_dir / "parquet"
+        self.export_excel = export_excel
         
         # Data storage
         self.sku_data = None
         self.demand_data = None
         self.validation_data = None
+        self.workbooks = {}  # Validated workbooks (sheets cached as Parquet), by path
         self.clean_sku_data = None
         self.clean_demand_data = None
+        self.phase1_removal_record = None
+        self.phase2_removal_record = None
         
         # Processing statistics
         self.stats = {
@@ -83,8 +145,8 @@ class CedarSimPipeline:
             'corruption_detected': False
         }
     
-    def validate_excel_file(self, file_path, required_sheets=None):
-        """Validate Excel file for corruption and required structure"""
+    def validate_excel_file(self, file_path, required_sheets=None, required_columns=None):
+        """Validate Excel file for corruption and required structure (sheets are cached as Parquet)"""
         logger.info(f"Validating Excel file: {file_path}")
         
         try:
@@ -101,51 +163,22 @@ class CedarSimPipeline:
             
             logger.info(f"File size: {file_size:,} bytes")
             
-            # Try to open as ZIP (Excel files are ZIP archives)
+            # Open the archive and read every sheet in a single pass, checking the
+            # required sheets and header columns on the way
             try:
-                with zipfile.ZipFile(file_path, 'r') as zip_file:
-                    # Check if it's a valid ZIP file
-                    zip_file.testzip()
-                    logger.info("ZIP structure validation passed")
-            except zipfile.BadZipFile:
-                logger.error(f"File is not a valid ZIP archive (corrupted Excel): {file_path}")
-                return False
-            except Exception as e:
-                logger.error(f"ZIP validation error: {str(e)}")
+                workbook = open_workbook(file_path, required_sheets=required_sheets,
+                                         required_columns=required_columns)
+            except WorkbookValidationError as e:
+                logger.error(f"Excel validation failed: {str(e)}")
                 return False
             
-            # Try to read Excel file with pandas
-            try:
-                # First, try to get sheet names without loading data
-                excel_file = pd.ExcelFile(file_path)
-                available_sheets = excel_file.sheet_names
-                logger.info(f"Available sheets: {available_sheets}")
-                
-                # Check required sheets if specified
-                if required_sheets:
-                    missing_sheets = set(required_sheets) - set(available_sheets)
-                    if missing_sheets:
-                        logger.error(f"Missing required sheets: {missing_sheets}")
-                        return False
-                    logger.info("All required sheets found")
-                
-                # Try to read a small sample from each sheet
-                for sheet_name in available_sheets:
-                    try:
-                        # Read just the first few rows to test
-                        sample_df = pd.read_excel(file_path, sheet_name=sheet_name, nrows=5)
-                        logger.info(f"Sheet '{sheet_name}' validation passed: {sample_df.shape[0]} rows, {sample_df.shape[1]} columns")
-                    except Exception as e:
-                        logger.error(f"Error reading sheet '{sheet_name}': {str(e)}")
-                        return False
-                
-                excel_file.close()
-                logger.info("Excel file validation passed")
-                return True
-                
-            except Exception as e:
-                logger.error(f"Error reading Excel file: {str(e)}")
-                return False
+            logger.info(f"Available sheets: {workbook.sheet_names}")
+            for sheet in workbook.sheets:
+                logger.info(f"Sheet '{sheet['name']}' validation passed: {sheet['rows']:,} rows, {len(sheet['columns'])} columns")
+            
+            self.workbooks[file_path] = workbook
+            logger.info("Excel file validation passed")
+            return True
                 
         except Exception as e:
             logger.error(f"File validation error: {str(e)}")
@@ -207,31 +240,37 @@ class CedarSimPipeline:
             logger.error(f"Data integrity validation error for {data_type}: {str(e)}")
             return False
     
+    def check_inventory_file(self):
+        """Check the inventory workbook for corruption and its required sheets and columns"""
+        inventory_valid = self.validate_excel_file(
+            self.inventory_file, 
+            required_sheets=[SKU_SHEET, DEMAND_SHEET],
+            required_columns={SKU_SHEET: SKU_REQUIRED_COLUMNS, DEMAND_SHEET: DEMAND_REQUIRED_COLUMNS}
+        )
+        self.file_validation['inventory_file_valid'] = inventory_valid
+        
+        if not inventory_valid:
+            logger.error("INVENTORY FILE VALIDATION FAILED - File may be corrupted")
+            self.file_validation['corruption_detected'] = True
+        return inventory_valid
+    
+    def check_validation_file(self):
+        """Check the validation sample workbook for corruption"""
+        validation_valid = self.validate_excel_file(self.validation_file)
+        self.file_validation['validation_file_valid'] = validation_valid
+        
+        if not validation_valid:
+            logger.error("VALIDATION FILE VALIDATION FAILED - File may be corrupted")
+            self.file_validation['corruption_detected'] = True
+        return validation_valid
+    
     def check_file_corruption(self):
         """Check all input files for corruption before processing"""
         logger.info("Starting file corruption check...")
         logger.info("=" * 50)
         
         try:
-            # Validate inventory file
-            inventory_valid = self.validate_excel_file(
-                self.inventory_file, 
-                required_sheets=['01. Data (Department Rollup)', '02. Full Data']
-            )
-            self.file_validation['inventory_file_valid'] = inventory_valid
-            
-            if not inventory_valid:
-                logger.error("INVENTORY FILE VALIDATION FAILED - File may be corrupted")
-                self.file_validation['corruption_detected'] = True
-                return False
-            
-            # Validate validation file
-            validation_valid = self.validate_excel_file(self.validation_file)
-            self.file_validation['validation_file_valid'] = validation_valid
-            
-            if not validation_valid:
-                logger.error("VALIDATION FILE VALIDATION FAILED - File may be corrupted")
-                self.file_validation['corruption_detected'] = True
+            if not self.check_inventory_file() or not self.check_validation_file():
                 return False
             
             logger.info("=" * 50)
@@ -266,58 +305,70 @@ class CedarSimPipeline:
         """Load all input data files with error handling and validation"""
         logger.info("Loading input data files...")
         
+        if not self.load_inventory_data() or not self.load_validation_data():
+            return False
+        
+        logger.info("All data loaded and validated successfully")
+        return True
+    
+    def load_inventory_data(self):
+        """Load the SKU and demand sheets of the inventory workbook with validation"""
         try:
             # First check for file corruption
-            if not self.check_file_corruption():
+            if not self.check_inventory_file():
                 logger.error("File corruption detected - stopping data loading")
                 return False
             
             # Load main inventory data
             logger.info(f"Loading inventory data: {self.inventory_file}")
-            if not self.inventory_file.exists():
-                raise FileNotFoundError(f"Inventory file not found: {self.inventory_file}")
             
-            # Load SKU inventory data
-            self.sku_data = pd.read_excel(self.inventory_file, sheet_name='01. Data (Department Rollup)')
+            # Load SKU inventory data (from the sheets cached during validation)
+            inventory_workbook = self.workbooks[self.inventory_file]
+            self.sku_data = inventory_workbook.read(SKU_SHEET)
             logger.info(f"SKU data loaded: {self.sku_data.shape[0]:,} rows × {self.sku_data.shape[1]} columns")
             
             # Validate SKU data integrity
-            sku_required_columns = ['Oracle Item Number', 'Item Description', 'Department Name', 'Supplier Name', 'Avg_Lead Time']
-            if not self.validate_data_integrity(self.sku_data, "SKU", sku_required_columns):
+            if not self.validate_data_integrity(self.sku_data, "SKU", SKU_REQUIRED_COLUMNS):
                 logger.error("SKU data integrity validation failed")
                 return False
             
             # Load demand data
-            self.demand_data = pd.read_excel(self.inventory_file, sheet_name='02. Full Data')
+            self.demand_data = inventory_workbook.read(DEMAND_SHEET)
             logger.info(f"Demand data loaded: {self.demand_data.shape[0]:,} rows × {self.demand_data.shape[1]} columns")
             
             # Validate demand data integrity
-            demand_required_columns = ['Oracle Item Number']
-            if not self.validate_data_integrity(self.demand_data, "Demand", demand_required_columns):
+            if not self.validate_data_integrity(self.demand_data, "Demand", DEMAND_REQUIRED_COLUMNS):
                 logger.error("Demand data integrity validation failed")
                 return False
             
+            # Update statistics
+            self.stats['original_skus'] = len(self.sku_data)
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error loading inventory data: {str(e)}")
+            return False
+    
+    def load_validation_data(self):
+        """Load the validation sample with validation"""
+        try:
+            if not self.check_validation_file():
+                logger.error("File corruption detected - stopping data loading")
+                return False
+            
             # Load validation data
             logger.info(f"Loading validation data: {self.validation_file}")
-            if not self.validation_file.exists():
-                raise FileNotFoundError(f"Validation file not found: {self.validation_file}")
-            
-            self.validation_data = pd.read_excel(self.validation_file)
+            self.validation_data = self.workbooks[self.validation_file].read(0)
             logger.info(f"Validation data loaded: {self.validation_data.shape[0]:,} rows × {self.validation_data.shape[1]} columns")
             
             # Validate validation data integrity
             if not self.validate_data_integrity(self.validation_data, "Validation"):
                 logger.error("Validation data integrity validation failed")
                 return False
-            
-            # Update statistics
-            self.stats['original_skus'] = len(self.sku_data)
-            
-            logger.info("All data loaded and validated successfully")
             return True
             
         except Exception as e:
-            logger.error(f"Error loading input data: {str(e)}")
+            logger.error(f"Error loading validation data: {str(e)}")
             return False
     
     def phase1_remove_missing_lead_times(self):
@@ -352,10 +403,10 @@ class CedarSimPipeline:
             logger.info(f"  - Clean SKUs remaining: {len(self.clean_sku_data):,}")
             
             # Save removal record
-            audit_path = Path("data/audit_trails")
-            audit_path.mkdir(parents=True, exist_ok=True)
-            removal_record.to_csv(audit_path / 'phase1_missing_lead_times_removal.csv', index=False)
-            logger.info(f"Phase 1 removal record saved: {audit_path / 'phase1_missing_lead_times_removal.csv'}")
+            self.phase1_removal_record = removal_record
+            AUDIT_DIR.mkdir(parents=True, exist_ok=True)
+            removal_record.to_csv(PHASE1_REMOVAL_FILE, index=False)
+            logger.info(f"Phase 1 removal record saved: {PHASE1_REMOVAL_FILE}")
             
             return True
             
@@ -378,16 +429,6 @@ class CedarSimPipeline:
             
             logger.info(f"Found {len(unmapped_skus):,} unmapped SKUs")
             
-            # Check validation SKUs
-            validation_skus = set(self.validation_data['Oracle Item Number'].astype(str))
-            unmapped_skus_list = set(unmapped_skus['Oracle Item Number'].astype(str))
-            validation_unmapped = validation_skus.intersection(unmapped_skus_list)
-            
-            if len(validation_unmapped) > 0:
-                logger.warning(f"WARNING: {len(validation_unmapped)} validation SKUs are unmapped: {validation_unmapped}")
-            else:
-                logger.info("All validation SKUs have PAR location mapping")
-            
             # Create removal record
             removal_record = unmapped_skus[['Oracle Item Number', 'Item Description', 'Department Name', 'Supplier Name', 'Avg_Lead Time']].copy()
             removal_record['Removal_Reason'] = 'No PAR Location Mapping'
@@ -412,10 +453,10 @@ class CedarSimPipeline:
             logger.info(f"  - Final clean SKUs: {len(final_clean_skus):,}")
             
             # Save removal record
-            audit_path = Path("data/audit_trails")
-            audit_path.mkdir(parents=True, exist_ok=True)
-            removal_record.to_csv(audit_path / 'phase2_unmapped_skus_removal.csv', index=False)
-            logger.info(f"Phase 2 removal record saved: {audit_path / 'phase2_unmapped_skus_removal.csv'}")
+            self.phase2_removal_record = removal_record
+            AUDIT_DIR.mkdir(parents=True, exist_ok=True)
+            removal_record.to_csv(PHASE2_REMOVAL_FILE, index=False)
+            logger.info(f"Phase 2 removal record saved: {PHASE2_REMOVAL_FILE}")
             
             # Update clean data
             self.clean_sku_data = final_clean_skus
@@ -427,20 +468,41 @@ class CedarSimPipeline:
             logger.error(f"Error in Phase 2: {str(e)}")
             return False
     
+    def output_files(self):
+        """Files written by create_final_excel_file"""
+        stems = [OUTPUT_FILE_NAMES[name] for name in OUTPUT_SHEETS]
+        files = [self.csv_dir / f"{stem}{CSV_SUFFIX}.csv" for stem in stems]
+        if PARQUET_AVAILABLE:
+            files += [self.parquet_dir / f"{stem}.parquet" for stem in stems]
+        if self.export_excel:
+            files.append(self.final_excel_file)
+        return files
+    
     def create_final_excel_file(self):
-        """Create the final simulation-ready Excel file with proper validation"""
-        logger.info("Creating final simulation-ready Excel file...")
+        """Create the final simulation-ready CSV/Parquet tables and (optionally) Excel file with proper validation"""
+        logger.info("Creating final simulation-ready output files...")
         
         try:
-            output_file = self.output_dir / "CedarSim_Simulation_Ready_Data_Final.xlsx"
+            output_file = self.final_excel_file
             
             # Create backup if file exists
-            if output_file.exists():
+            if self.export_excel and output_file.exists():
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 backup_file = self.backup_dir / f"CedarSim_Simulation_Ready_Data_Final_backup_{timestamp}.xlsx"
                 shutil.copy2(output_file, backup_file)
                 logger.info(f"Backup created: {backup_file}")
             
+            # Check validation SKUs (done here rather than in Phase 2 so that a new
+            # validation sample does not invalidate the cleaning phases)
+            validation_skus = set(self.validation_data['Oracle Item Number'].astype(str))
+            unmapped_skus_list = set(self.phase2_removal_record['Oracle Item Number'].astype(str))
+            validation_unmapped = validation_skus.intersection(unmapped_skus_list)
+            
+            if len(validation_unmapped) > 0:
+                logger.warning(f"WARNING: {len(validation_unmapped)} validation SKUs are unmapped: {validation_unmapped}")
+            else:
+                logger.info("All validation SKUs have PAR location mapping")
+            
             # Filter validation data to only include SKUs that survived cleaning
             clean_sku_ids = set(self.clean_sku_data['Oracle Item Number'].astype(str))
             filtered_validation_data = self.validation_data[
@@ -448,54 +510,45 @@ class CedarSimPipeline:
             ].copy()
             logger.info(f"Filtered validation data: {len(filtered_validation_data):,} rows (from {len(self.validation_data):,} original)")
             
-            # Prepare data for Excel - start with core sheets first
+            # Prepare output tables - start with core sheets first
             data_dict = {
                 '01_SKU_Inventory_Final': self.clean_sku_data,
                 '02_Demand_Data_Clean': self.clean_demand_data
             }
             
-            # Add removal records if they exist (Sheets 3 and 4)
-            audit_path = Path("data/audit_trails")
-            if (audit_path / 'phase1_missing_lead_times_removal.csv').exists():
-                data_dict['03_Phase1_Removal_Record'] = pd.read_csv(audit_path / 'phase1_missing_lead_times_removal.csv')
-            if (audit_path / 'phase2_unmapped_skus_removal.csv').exists():
-                data_dict['04_Phase2_Removal_Record'] = pd.read_csv(audit_path / 'phase2_unmapped_skus_removal.csv')
+            # Add removal records (Sheets 3 and 4)
+            data_dict['03_Phase1_Removal_Record'] = self.phase1_removal_record
+            data_dict['04_Phase2_Removal_Record'] = self.phase2_removal_record
             
             # Add validation sample as Sheet 5
             data_dict['05_Validation_Sample'] = filtered_validation_data
             
-            # Write Excel file with improved error handling
-            logger.info("Writing Excel file with openpyxl engine...")
-            
-            # Use openpyxl engine for more reliable Excel creation
-            logger.info("Using openpyxl engine for Excel creation...")
-            
-            with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-                for sheet_name, df in data_dict.items():
-                    logger.info(f"  Writing sheet: {sheet_name}")
-                    
-                    # Clean DataFrame - handle NaN values more carefully
-                    df_clean = df.copy()
-                    
-                    # Convert object columns to string to avoid Excel issues
-                    for col in df_clean.columns:
-                        if df_clean[col].dtype == 'object':
-                            df_clean[col] = df_clean[col].astype(str).replace('nan', '')
-                        elif df_clean[col].dtype in ['float64', 'float32']:
-                            df_clean[col] = df_clean[col].fillna(0)
-                    
-                    # For large datasets, sample or limit rows
-                    if sheet_name == '02_Demand_Data_Clean' and len(df_clean) > 10000:
-                        logger.info(f"    Large dataset detected ({len(df_clean):,} rows), sampling 10,000 rows...")
-                        df_clean = df_clean.sample(n=10000, random_state=42)
-                        logger.info(f"    Sampled to {len(df_clean):,} rows")
-                    
-                    # Write sheet
-                    df_clean.to_excel(writer, sheet_name=sheet_name, index=False)
-                    logger.info(f"    {sheet_name}: {df_clean.shape[0]:,} rows written")
+            # The same frames feed every output; the workbook gets a sample of the
+            # demand sheet and Excel-specific NaN handling, applied while streaming
+            workbook_sheets = None
+            if self.export_excel:
+                workbook_sheets = dict(data_dict)
+                demand = data_dict['02_Demand_Data_Clean']
+                if len(demand) > EXCEL_DEMAND_SAMPLE_ROWS:
+                    logger.info(f"    Large dataset detected ({len(demand):,} rows), sampling {EXCEL_DEMAND_SAMPLE_ROWS:,} rows for Excel...")
+                    workbook_sheets['02_Demand_Data_Clean'] = demand.sample(n=EXCEL_DEMAND_SAMPLE_ROWS, random_state=42)
+            
+            logger.info("Writing CSV/Parquet outputs and streaming the Excel file...")
+            result = write_outputs(
+                data_dict,
+                xlsx_path=output_file if self.export_excel else None,
+                csv_dir=self.csv_dir, parquet_dir=self.parquet_dir, csv_suffix=CSV_SUFFIX,
+                file_names=OUTPUT_FILE_NAMES,
+                workbook_sheets=workbook_sheets, transform=clean_for_excel
+            )
+            for path in result['files']:
+                logger.info(f"    Written: {path}")
+            
+            if not self.export_excel:
+                return True
             
             # Validate the created file
-            if not self.validate_created_excel_file(output_file):
+            if not self.validate_created_excel_file(output_file, expected_sheets=list(data_dict)):
                 logger.error("Created Excel file failed validation - file may be corrupted")
                 return False
             
@@ -508,8 +561,8 @@ class CedarSimPipeline:
             logger.error(f"Error creating final Excel file: {str(e)}")
             return False
     
-    def validate_created_excel_file(self, file_path):
-        """Validate that the created Excel file can be read properly"""
+    def validate_created_excel_file(self, file_path, expected_sheets=None):
+        """Validate that the created Excel file is an intact workbook with the expected sheets"""
         logger.info(f"Validating created Excel file: {file_path}")
         
         try:
@@ -525,28 +578,16 @@ class CedarSimPipeline:
             
             logger.info(f"File size: {file_size:,} bytes")
             
-            # Try to read the file with pandas using openpyxl engine
+            # Check the archive CRCs and sheet list; the rows were counted while streaming
             try:
-                excel_file = pd.ExcelFile(file_path, engine='openpyxl')
-                available_sheets = excel_file.sheet_names
-                logger.info(f"Available sheets: {available_sheets}")
-                
-                # Test reading each sheet
-                for sheet_name in available_sheets:
-                    try:
-                        sample_df = pd.read_excel(file_path, sheet_name=sheet_name, nrows=5, engine='openpyxl')
-                        logger.info(f"Sheet '{sheet_name}' validation passed: {sample_df.shape[0]} rows, {sample_df.shape[1]} columns")
-                    except Exception as e:
-                        logger.error(f"Error reading sheet '{sheet_name}': {str(e)}")
-                        return False
-                
-                excel_file.close()
-                logger.info("Excel file validation passed - file is readable")
-                return True
-                
-            except Exception as e:
+                available_sheets = verify_workbook(file_path, expected_sheets)
+            except ValueError as e:
                 logger.error(f"Error reading created Excel file: {str(e)}")
                 return False
+            
+            logger.info(f"Available sheets: {available_sheets}")
+            logger.info("Excel file validation passed - file is readable")
+            return True
                 
         except Exception as e:
             logger.error(f"File validation error: {str(e)}")
@@ -599,41 +640,108 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 4. Compare results with client's analytical solution
 """
             
-            with open('CedarSim_Pipeline_Summary_Report.md', 'w', encoding='utf-8') as f:
+            with open(SUMMARY_REPORT_FILE, 'w', encoding='utf-8') as f:
                 f.write(report)
             
-            logger.info("Summary report saved: CedarSim_Pipeline_Summary_Report.md")
+            logger.info(f"Summary report saved: {SUMMARY_REPORT_FILE}")
             return True
             
         except Exception as e:
             logger.error(f"Error generating summary report: {str(e)}")
             return False
     
+    def _get_value(self, path):
+        """Attribute value; 'stats.final_skus' addresses a dict entry"""
+        name, _, key = path.partition('.')
+        value = getattr(self, name)
+        return value[key] if key else value
+    
+    def _set_value(self, path, value):
+        """Set an attribute value; 'stats.final_skus' addresses a dict entry"""
+        name, _, key = path.partition('.')
+        if key:
+            getattr(self, name)[key] = value
+        else:
+            setattr(self, name, value)
+    
+    def _phase(self, name, method, inputs=None, outputs=None, files=()):
+        """Wrap a phase method: artifacts are bound to the attributes it reads and writes"""
+        inputs = inputs or {}
+        outputs = outputs or {}
+        
+        def run(**values):
+            for artifact, value in values.items():
+                self._set_value(inputs[artifact], value)
+            if not method():
+                raise PhaseError(f"Phase '{name}' failed")
+            return {artifact: self._get_value(path) for artifact, path in outputs.items()}
+        
+        return Phase(name, run, inputs=list(inputs), outputs=list(outputs), files=list(files), code=method)
+    
+    def build_phases(self):
+        """Pipeline phases with their inputs (artifact -> attribute) and outputs"""
+        return [
+            self._phase('load_inventory', self.load_inventory_data,
+                        inputs={'inventory_file': 'inventory_file'},
+                        outputs={'sku_data': 'sku_data', 'demand_data': 'demand_data',
+                                 'original_skus': 'stats.original_skus',
+                                 'inventory_file_valid': 'file_validation.inventory_file_valid'}),
+            self._phase('load_validation', self.load_validation_data,
+                        inputs={'validation_file': 'validation_file'},
+                        outputs={'validation_data': 'validation_data',
+                                 'validation_file_valid': 'file_validation.validation_file_valid'}),
+            self._phase('phase1', self.phase1_remove_missing_lead_times,
+                        inputs={'sku_data': 'sku_data', 'demand_data': 'demand_data'},
+                        outputs={'phase1_sku_data': 'clean_sku_data', 'phase1_demand_data': 'clean_demand_data',
+                                 'phase1_removal_record': 'phase1_removal_record',
+                                 'phase1_removed': 'stats.phase1_removed',
+                                 'phase1_demand_records_removed': 'stats.demand_records_removed'},
+                        files=[PHASE1_REMOVAL_FILE]),
+            self._phase('phase2', self.phase2_remove_unmapped_skus,
+                        inputs={'phase1_sku_data': 'clean_sku_data', 'phase1_demand_data': 'clean_demand_data',
+                                'phase1_demand_records_removed': 'stats.demand_records_removed'},
+                        outputs={'clean_sku_data': 'clean_sku_data', 'clean_demand_data': 'clean_demand_data',
+                                 'phase2_removal_record': 'phase2_removal_record',
+                                 'phase2_removed': 'stats.phase2_removed', 'final_skus': 'stats.final_skus',
+                                 'demand_records_removed': 'stats.demand_records_removed'},
+                        files=[PHASE2_REMOVAL_FILE]),
+            self._phase('excel', self.create_final_excel_file,
+                        inputs={'clean_sku_data': 'clean_sku_data', 'clean_demand_data': 'clean_demand_data',
+                                'validation_data': 'validation_data',
+                                'phase1_removal_record': 'phase1_removal_record',
+                                'phase2_removal_record': 'phase2_removal_record'},
+                        files=self.output_files()),
+            self._phase('summary', self.generate_summary_report,
+                        inputs={'original_skus': 'stats.original_skus', 'phase1_removed': 'stats.phase1_removed',
+                                'phase2_removed': 'stats.phase2_removed', 'final_skus': 'stats.final_skus',
+                                'demand_records_removed': 'stats.demand_records_removed',
+                                'validation_data': 'validation_data',
+                                'inventory_file_valid': 'file_validation.inventory_file_valid',
+                                'validation_file_valid': 'file_validation.validation_file_valid'},
+                        files=[SUMMARY_REPORT_FILE]),
+        ]
+    
     def run_complete_pipeline(self):
-        """Run the complete data processing pipeline"""
+        """Run the complete data processing pipeline
+        
+        Phases whose inputs and code are unchanged since the last run are reused from
+        the phase cache instead of running again (use_cache=False runs every phase).
+        """
         logger.info("Starting CedarSim Complete Data Processing Pipeline")
         logger.info("=" * 70)
         
+        runner = PhaseRunner(self.build_phases(), self.cache_dir, use_cache=self.use_cache)
         try:
-            # Step 1: Load input data
-            if not self.load_input_data():
-                return False
-            
-            # Step 2: Phase 1 - Remove missing lead times
-            if not self.phase1_remove_missing_lead_times():
-                return False
+            # Load input data, Phase 1 (missing lead times), Phase 2 (unmapped SKUs),
+            # final Excel file and summary report
+            artifacts = runner.run({'inventory_file': self.inventory_file,
+                                    'validation_file': self.validation_file})
             
-            # Step 3: Phase 2 - Remove unmapped SKUs
-            if not self.phase2_remove_unmapped_skus():
-                return False
-            
-            # Step 4: Create final Excel file
-            if not self.create_final_excel_file():
-                return False
-            
-            # Step 5: Generate summary report
-            if not self.generate_summary_report():
-                return False
+            # Restore the statistics of phases that were reused from the cache
+            for name in ['original_skus', 'phase1_removed', 'phase2_removed', 'final_skus', 'demand_records_removed']:
+                self.stats[name] = artifacts[name]
+            for name in ['inventory_file_valid', 'validation_file_valid']:
+                self.file_validation[name] = artifacts[name]
             
             logger.info("PIPELINE COMPLETED SUCCESSFULLY!")
             logger.info("=" * 70)
@@ -641,20 +749,31 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             logger.info(f"  - Clean SKUs: {self.stats['final_skus']:,}")
             logger.info(f"  - Data Quality: 100% complete")
             logger.info(f"  - Simulation Ready: YES")
-            
             return True
             
+        except PhaseError as e:
+            logger.error(f"Pipeline stopped: {str(e)}")
+            return False
         except Exception as e:
             logger.error(f"Pipeline failed: {str(e)}")
             return False
+        finally:
+            self.phase_timings = runner.timings
+            if runner.timings:
+                logger.info("Phase timings:\n" + runner.format_timings())
 
 def main():
     """Main function to run the complete pipeline"""
     print("CedarSim Complete Data Processing Pipeline")
     print("=" * 50)
     
+    parser = argparse.ArgumentParser(description='Run the CedarSim data processing pipeline')
+    parser.add_argument('--no-excel', action='store_true',
+                       help='Only write the CSV/Parquet outputs, skip the Excel workbook')
+    args = parser.parse_args()
+    
     # Initialize pipeline
-    pipeline = CedarSimPipeline()
+    pipeline = CedarSimPipeline(export_excel=not args.no_excel)
     
     # Run complete pipeline
     success = pipeline.run_complete_pipeline()
@@ -662,7 +781,9 @@ def main():
     if success:
         print("\nSUCCESS: Complete pipeline executed successfully!")
         print("Check the following files:")
-        print("  - CedarSim_Simulation_Ready_Data_Final.xlsx")
+        if pipeline.export_excel:
+            print("  - CedarSim_Simulation_Ready_Data_Final.xlsx")
+        print("  - csv_complete/ and parquet/ (complete output tables)")
         print("  - CedarSim_Pipeline_Summary_Report.md")
         print("  - cedarsim_pipeline.log")
     else:
@@ -13,6 +13,14 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import os
+import sys
+
+# Add the simulation_development directory to the path
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'simulation_development'))
+
+from data.input_data.workbook_cache import open_workbook
+
+FINAL_WORKBOOK = 'data/final/CedarSim_Simulation_Ready_Data_Final.xlsx'
 
 def load_validation_data():
     """Load current validation data files"""
@@ -32,10 +40,9 @@ def load_main_datasets():
     """Load main datasets"""
     print("\nLoading main datasets...")
     
-    sku_main = pd.read_excel('data/final/CedarSim_Simulation_Ready_Data_Final.xlsx', 
-                            sheet_name='01_SKU_Inventory_Final')
-    demand_main = pd.read_excel('data/final/CedarSim_Simulation_Ready_Data_Final.xlsx', 
-                               sheet_name='02_Demand_Data_Clean')
+    workbook = open_workbook(FINAL_WORKBOOK)  # Parsed once, then read from the Parquet cache
+    sku_main = workbook.read('01_SKU_Inventory_Final')
+    demand_main = workbook.read('02_Demand_Data_Clean')
     
     print(f"Main SKU data: {len(sku_main)} rows, {sku_main['Oracle Item Number'].nunique()} unique SKUs")
     print(f"Main demand data: {len(demand_main)} rows, {demand_main['Oracle Item Number'].nunique()} unique SKUs")
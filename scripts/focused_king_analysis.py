@@ -17,9 +17,15 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
+import os
+import sys
 import warnings
 warnings.filterwarnings('ignore')
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'simulation_development'))
+
+from data.input_data.formula_variants import FormulaVariant, STANDARD_WINDOWS, pair_moments, pair_results
+
 def load_validation_data():
     """Load all validation data files"""
     print("Loading validation data...")
@@ -157,6 +163,9 @@ def analyze_specific_examples(test_data, demand_data):
     
     return results
 
+# Time windows tested for the demand standard deviation
+TIME_PERIODS = {name: STANDARD_WINDOWS[name] for name in ['all_data', '2024_only', '2023_2025', '2024_2025']}
+
 def test_formula_variations(test_data, demand_data):
     """Test different formula variations on all available data"""
     print("\nTesting formula variations on all available data...")
@@ -172,63 +181,16 @@ def test_formula_variations(test_data, demand_data):
     
     print(f"Testing {len(combinations)} combinations...")
     
-    formula_results = []
-    
-    for idx, combo in combinations.iterrows():
-        sku = combo['Oracle Item Number']
-        dept = combo['Department Name']
-        dept_num = combo['Department Number']
-        actual_ss = combo['Safety stock_units']
-        z_score = combo['Z-score']
-        avg_daily_burn = combo['Avg Daily Burn Rate']
-        
-        # Get demand data
-        dept_demand = demand_data[
-            (demand_data['Oracle Item Number'] == sku) & 
-            (demand_data['Department Number'] == dept_num)
-        ].copy()
-        
-        if len(dept_demand) < 2:
-            continue
-        
-        # Get lead time from demand data
-        lead_time = dept_demand['Avg_Lead Time'].iloc[0] if len(dept_demand) > 0 else 0
-        
-        # Test different time periods
-        time_periods = {
-            'all_data': dept_demand,
-            '2024_only': dept_demand[dept_demand['PO Week Ending Date'].dt.year == 2024],
-            '2023_2025': dept_demand[dept_demand['PO Week Ending Date'].dt.year.isin([2023, 2024, 2025])],
-            '2024_2025': dept_demand[dept_demand['PO Week Ending Date'].dt.year.isin([2024, 2025])]
-        }
-        
-        for period_name, period_data in time_periods.items():
-            if len(period_data) > 1:
-                # Calculate daily demands
-                daily_demands = [row['Total Qty Issues'] / 7 for _, row in period_data.iterrows()]
-                demand_std = np.std(daily_demands)
-                
-                if demand_std > 0:
-                    # Test basic King's formula
-                    predicted_ss = z_score * np.sqrt(lead_time) * demand_std
-                    error = abs(predicted_ss - actual_ss)
-                    error_pct = (error / actual_ss) * 100 if actual_ss > 0 else 100
-                    
-                    formula_results.append({
-                        'sku': sku,
-                        'department': dept,
-                        'formula': f"basic_kings_{period_name}",
-                        'predicted_ss': predicted_ss,
-                        'actual_ss': actual_ss,
-                        'error': error,
-                        'error_pct': error_pct,
-                        'lead_time': lead_time,
-                        'z_score': z_score,
-                        'demand_std': demand_std,
-                        'data_points': len(period_data)
-                    })
+    # Basic King's formula, Z × √(Lead Time) × σD, over every combination x period at once
+    moments = pair_moments(combinations, demand_data, keys=['Oracle Item Number', 'Department Number'],
+                           windows=TIME_PERIODS)
+    formula_results = pair_results(moments, [FormulaVariant('basic_kings', 'kings')],
+                                   pair_columns=['Oracle Item Number', 'Department Name'])
+    formula_results = formula_results.rename(columns={'Oracle Item Number': 'sku',
+                                                      'Department Name': 'department'})
     
-    return formula_results
+    return formula_results[['sku', 'department', 'formula', 'predicted_ss', 'actual_ss', 'error',
+                            'error_pct', 'lead_time', 'z_score', 'demand_std', 'data_points']].to_dict('records')
 
 def analyze_results(formula_results):
     """Analyze the results to find the best formula"""
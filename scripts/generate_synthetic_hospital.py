@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+CedarSim Synthetic Hospital Generator
+=====================================
+
+This script generates SKU inventory and weekly demand inputs for scale testing by:
+1. Fitting lead time, burn rate, analytical stock and location distributions from the
+   shipped SKU inventory CSV
+2. Fitting demand intermittency from the shipped weekly demand extract
+3. Writing a catalog of SCALE x the real SKU count, stocked at FACILITIES hospitals,
+   under the production file names
+
+The output directory can be used as DataIntegrator(data_dir=...) or, for the
+dashboard, through CEDARSIM_DATA_DIR.
+
+Usage:
+    python scripts/generate_synthetic_hospital.py --scale 10 --output-dir data/synthetic/x10
+    python scripts/generate_synthetic_hospital.py --scale 100 --facilities 4 --output-dir data/synthetic/x100_f4
+"""
+
+from pathlib import Path
+import argparse
+import logging
+import os
+import sys
+import time
+
+import pandas as pd
+
+# Add the simulation_development directory to the path
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'simulation_development'))
+
+from data.input_data.synthetic_data import fit_hospital_profile, write_synthetic_dataset
+from data.input_data.typed_loader import load_sku_inventory
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SKU_INVENTORY_FILE = REPO_ROOT / 'simulation_development' / 'data' / 'prod-input-data' / 'SIMULATION_READY_SKU_INVENTORY_DATA.csv'
+DEMAND_EXTRACT_FILE = REPO_ROOT / 'data' / 'final' / 'validation_subset' / 'validation_demand_subset.csv'
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def main():
+    """Main function for command line usage"""
+    parser = argparse.ArgumentParser(description='Generate synthetic CedarSim inputs for scale testing')
+    parser.add_argument('--output-dir', required=True, help='Directory for the generated CSV files')
+    parser.add_argument('--scale', type=float, default=1.0,
+                       help='Catalog size relative to the real hospital (e.g. 10, 100)')
+    parser.add_argument('--facilities', type=int, default=1,
+                       help='Number of facilities stocking the catalog')
+    parser.add_argument('--weeks', type=int, default=None,
+                       help='Weeks of demand (default: span of the demand extract)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    parser.add_argument('--sku-data', default=str(SKU_INVENTORY_FILE),
+                       help='SKU inventory CSV to fit the distributions from')
+    parser.add_argument('--demand-data', default=str(DEMAND_EXTRACT_FILE),
+                       help='Weekly demand extract to fit the intermittency from')
+
+    args = parser.parse_args()
+
+    # Fit the profile from the shipped data
+    sku_data = load_sku_inventory(Path(args.sku_data), use_cache=False)
+    demand_data = pd.read_csv(args.demand_data) if args.demand_data and Path(args.demand_data).exists() else None
+    profile = fit_hospital_profile(sku_data, demand_data, sku_column='Oracle Item Number',
+                                   location_column='Deliver to Location', quantity_column='Total Quantity')
+    logger.info(f"Fitted profile: {profile.num_skus:,} SKUs, {len(profile.locations)} locations, "
+                f"order probability {profile.order_probability_mean:.2f}, order size CV {profile.order_size_cv:.2f}")
+
+    # Generate and write the dataset
+    start = time.perf_counter()
+    summary = write_synthetic_dataset(Path(args.output_dir), profile, scale=args.scale,
+                                      facilities=args.facilities, weeks=args.weeks, seed=args.seed)
+
+    print(f"\n✅ Synthetic hospital data written to: {args.output_dir}")
+    print(f"   SKUs: {summary['skus']:,} | SKU-location rows: {summary['sku_rows']:,} | "
+          f"Locations: {summary['locations']} | Facilities: {summary['facilities']}")
+    print(f"   Demand rows: {summary['demand_rows']:,} | Total demand: {summary['total_demand']:,.0f} units")
+    print(f"   Generated in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -16,10 +16,18 @@ Where:
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-from datetime import datetime, timedelta
+from datetime import datetime
+import os
+import sys
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'simulation_development'))
+
+from data.input_data.formula_variants import (STANDARD_WINDOWS, evaluate_variants, kings_variants,
+                                              pair_moments, pair_results, variant_grid)
+
 def load_validation_data():
     """Load all validation data files"""
     print("Loading validation data...")
@@ -58,8 +66,12 @@ def extract_sku_department_combinations(test_data):
     
     return combinations
 
+# Time windows tested for the demand standard deviation
+TIME_PERIODS = {name: STANDARD_WINDOWS[name]
+                for name in ['all_data', '2024_only', '2023_2025', 'last_12_months']}
+
 def analyze_demand_patterns(demand_data, combinations):
-    """Analyze demand patterns for each SKU-department combination"""
+    """Compute per-combination, per-time-period demand moments in one pass"""
     print("\nAnalyzing demand patterns...")
     
     # Convert date column
@@ -70,153 +82,45 @@ def analyze_demand_patterns(demand_data, combinations):
     max_date = demand_data['PO Week Ending Date'].max()
     print(f"Demand data range: {min_date} to {max_date}")
     
-    results = []
-    
-    for _, combo in combinations.iterrows():
-        sku = combo['Oracle Item Number']
-        dept = combo['Department Name']
-        dept_num = combo['Department Number']
-        
-        # Filter demand data for this SKU-department combination
-        dept_demand = demand_data[
-            (demand_data['Oracle Item Number'] == sku) & 
-            (demand_data['Department Number'] == dept_num)
-        ].copy()
-        
-        if len(dept_demand) == 0:
-            continue
-            
-        # Calculate demand statistics
-        total_qty_issues = dept_demand['Total Qty Issues'].sum()
-        avg_daily_burn = dept_demand['Avg Daily Burn Rate'].iloc[0] if len(dept_demand) > 0 else 0
-        lead_time = dept_demand['Avg_Lead Time'].iloc[0] if len(dept_demand) > 0 else 0
-        
-        # Calculate demand variance using different methods
-        daily_demands = []
-        for _, row in dept_demand.iterrows():
-            # Convert weekly demand to daily (approximate)
-            weekly_demand = row['Total Qty Issues']
-            daily_demand = weekly_demand / 7  # Approximate daily demand
-            daily_demands.append(daily_demand)
-        
-        if len(daily_demands) > 1:
-            demand_std = np.std(daily_demands)
-            demand_var = np.var(daily_demands)
-        else:
-            demand_std = 0
-            demand_var = 0
-        
-        # Test different time periods
-        time_periods = {
-            'all_data': dept_demand,
-            '2024_only': dept_demand[dept_demand['PO Week Ending Date'].dt.year == 2024],
-            '2023_2025': dept_demand[dept_demand['PO Week Ending Date'].dt.year.isin([2023, 2024, 2025])],
-            'last_12_months': dept_demand[dept_demand['PO Week Ending Date'] >= (max_date - timedelta(days=365))]
-        }
-        
-        period_stats = {}
-        for period_name, period_data in time_periods.items():
-            if len(period_data) > 1:
-                period_demands = [row['Total Qty Issues'] / 7 for _, row in period_data.iterrows()]
-                period_stats[period_name] = {
-                    'std': np.std(period_demands),
-                    'var': np.var(period_demands),
-                    'count': len(period_data)
-                }
-            else:
-                period_stats[period_name] = {'std': 0, 'var': 0, 'count': 0}
-        
-        result = {
-            'sku': sku,
-            'department': dept,
-            'department_number': dept_num,
-            'actual_safety_stock': combo['Safety stock_units'],
-            'z_score': combo['Z-score'],
-            'avg_daily_burn': avg_daily_burn,
-            'lead_time': lead_time,
-            'total_issues': total_qty_issues,
-            'demand_std': demand_std,
-            'demand_var': demand_var,
-            'period_stats': period_stats,
-            'data_points': len(dept_demand)
-        }
-        
-        results.append(result)
-    
-    return results
+    # Daily demand (weekly issues / 7) count / mean / variance for every combination x period
+    moments = pair_moments(combinations, demand_data, keys=['Oracle Item Number', 'Department Number'],
+                           windows=TIME_PERIODS)
+    matched_count = int((moments.count[:, 0] > 0).sum())
+    print(f"\nSuccessfully analyzed {matched_count} out of {len(combinations)} combinations")
+    return moments
+
+def test_kings_formula_variations(moments):
+    """Test different variations of King's formula
 
-def test_kings_formula_variations(analysis_results):
-    """Test different variations of King's formula"""
+    Basic King's: Z × √(Lead Time) × σD
+    Modified King's: Z × √(Lead Time/T1) × σD, with T1 = 1 (daily), 7 (weekly), 30 (monthly)
+    King's with lead time variance: Z × √(Lead Time × σD² + σLT² × D²), assuming σLT = 0
+    """
     print("\nTesting King's formula variations...")
     
-    formula_results = []
-    
-    for result in analysis_results:
-        sku = result['sku']
-        dept = result['department']
-        actual_ss = result['actual_safety_stock']
-        z_score = result['z_score']
-        lead_time = result['lead_time']
-        
-        # Test different formula variations
-        formulas = {}
-        
-        # Basic King's: Z × √(Lead Time) × σD
-        for period_name, period_stats in result['period_stats'].items():
-            if period_stats['count'] > 1 and period_stats['std'] > 0:
-                basic_kings = z_score * np.sqrt(lead_time) * period_stats['std']
-                formulas[f"basic_kings_{period_name}"] = basic_kings
-        
-        # Modified King's: Z × √(Lead Time/T1) × σD (where T1 is time period)
-        for period_name, period_stats in result['period_stats'].items():
-            if period_stats['count'] > 1 and period_stats['std'] > 0:
-                # T1 could be 1 (daily), 7 (weekly), 30 (monthly)
-                for t1 in [1, 7, 30]:
-                    modified_kings = z_score * np.sqrt(lead_time / t1) * period_stats['std']
-                    formulas[f"modified_kings_{period_name}_t1_{t1}"] = modified_kings
-        
-        # King's with lead time variance: Z × √(Lead Time × σD² + σLT² × D²)
-        # Assuming σLT = 0 for now (no lead time variance data)
-        for period_name, period_stats in result['period_stats'].items():
-            if period_stats['count'] > 1 and period_stats['std'] > 0:
-                daily_demand = result['avg_daily_burn']
-                kings_with_lt_var = z_score * np.sqrt(lead_time * period_stats['var'] + 0 * daily_demand**2)
-                formulas[f"kings_with_lt_var_{period_name}"] = kings_with_lt_var
-        
-        # Calculate accuracy for each formula
-        for formula_name, predicted_ss in formulas.items():
-            if predicted_ss > 0:
-                error = abs(predicted_ss - actual_ss)
-                error_pct = (error / actual_ss) * 100 if actual_ss > 0 else 100
-                
-                formula_results.append({
-                    'sku': sku,
-                    'department': dept,
-                    'formula': formula_name,
-                    'predicted_ss': predicted_ss,
-                    'actual_ss': actual_ss,
-                    'error': error,
-                    'error_pct': error_pct,
-                    'lead_time': lead_time,
-                    'z_score': z_score
-                })
+    formula_results = pair_results(moments, kings_variants(),
+                                   pair_columns=['Oracle Item Number', 'Department Name'])
+    formula_results = formula_results.rename(columns={'Oracle Item Number': 'sku',
+                                                      'Department Name': 'department'})
+    formula_results = formula_results[['sku', 'department', 'formula', 'predicted_ss', 'actual_ss',
+                                       'error', 'error_pct', 'lead_time', 'z_score']]
     
+    print(f"\nGenerated {len(formula_results)} formula test results")
     return formula_results
 
-def analyze_formula_accuracy(formula_results):
+def analyze_formula_accuracy(moments, formula_results):
     """Analyze which formulas are most accurate"""
     print("\nAnalyzing formula accuracy...")
     
     df = pd.DataFrame(formula_results)
     
-    # Group by formula and calculate accuracy metrics
-    accuracy_metrics = df.groupby('formula').agg({
-        'error': ['mean', 'std'],
-        'error_pct': ['mean', 'std'],
-        'predicted_ss': 'count'
-    }).round(2)
+    if len(df) == 0:
+        print("No formula results to analyze!")
+        return None, df
     
-    accuracy_metrics.columns = ['MAE', 'MAE_std', 'MAPE', 'MAPE_std', 'count']
+    # Score every formula x combination x period in one broadcast
+    scores = evaluate_variants(moments, kings_variants())
+    accuracy_metrics = scores.set_index('formula')[['MAE', 'MAE_std', 'MAPE', 'MAPE_std', 'count']].round(2)
     accuracy_metrics = accuracy_metrics.sort_values('MAPE')
     
     print("\nFormula Accuracy Ranking (by Mean Absolute Percentage Error):")
@@ -231,6 +135,33 @@ def analyze_formula_accuracy(formula_results):
     
     return accuracy_metrics, df
 
+def search_formula_grid(combinations, demand_data, max_workers=None):
+    """Search a large grid of generalized King's formulas over all time windows
+
+    scale × Z × (Lead Time / T1)^exponent × σD, plus King's with lead time variance
+    for a range of σLT values. Variants are scored in broadcast blocks, spread over
+    worker processes.
+    """
+    print("\nSearching generalized King's formula grid...")
+    
+    moments = pair_moments(combinations, demand_data, keys=['Oracle Item Number', 'Department Number'])
+    variants = (variant_grid('power', t1=[1, 5, 7, 14, 30], exponent=np.round(np.arange(0.25, 1.51, 0.05), 2),
+                             scale=np.round(np.arange(0.5, 2.01, 0.05), 2))
+                + variant_grid('kings_with_lt_var', sigma_lt=np.round(np.arange(0, 2.01, 0.05), 2)))
+    
+    start = time.perf_counter()
+    scores = evaluate_variants(moments, variants, max_workers=max_workers)
+    elapsed = time.perf_counter() - start
+    print(f"Scored {len(variants):,} variants x {len(moments.windows)} windows "
+          f"in {elapsed:.2f}s")
+    
+    # Only consider formulas that produce a prediction for most combinations
+    coverage = scores['count'] >= 0.8 * scores['count'].max()
+    print("\nBest generalized formulas (by MAPE):")
+    print(scores[coverage].head(10)[['formula', 'MAPE', 'MAE', 'count', 'within_10_pct', 'within_20_pct']])
+    
+    return scores
+
 def find_exact_formula(df, accuracy_metrics):
     """Find the exact formula they used"""
     print("\nFinding exact formula...")
@@ -283,19 +214,22 @@ def main():
     combinations = extract_sku_department_combinations(test_data)
     
     # Analyze demand patterns
-    analysis_results = analyze_demand_patterns(demand_data, combinations)
-    print(f"\nAnalyzed {len(analysis_results)} SKU-department combinations")
+    moments = analyze_demand_patterns(demand_data, combinations)
+    print(f"\nAnalyzed {moments.num_pairs} SKU-department combinations")
     
     # Test King's formula variations
-    formula_results = test_kings_formula_variations(analysis_results)
+    formula_results = test_kings_formula_variations(moments)
     print(f"\nTested {len(formula_results)} formula combinations")
     
     # Analyze accuracy
-    accuracy_metrics, df = analyze_formula_accuracy(formula_results)
+    accuracy_metrics, df = analyze_formula_accuracy(moments, formula_results)
     
     # Find exact formula
     best_formula, best_results = find_exact_formula(df, accuracy_metrics)
     
+    # Broader search over generalized formulas
+    grid_scores = search_formula_grid(combinations, demand_data)
+    
     print(f"\n🎯 CONCLUSION:")
     print(f"The most likely formula they used is: {best_formula}")
     print(f"This formula achieves {accuracy_metrics.loc[best_formula, 'MAPE']:.2f}% average error")
@@ -303,10 +237,12 @@ def main():
     # Save results
     df.to_csv('scripts/king_formula_analysis_results.csv', index=False)
     accuracy_metrics.to_csv('scripts/king_formula_accuracy_metrics.csv')
+    grid_scores.to_csv('scripts/king_formula_grid_search.csv', index=False)
     
     print(f"\nResults saved to:")
     print(f"  - scripts/king_formula_analysis_results.csv")
     print(f"  - scripts/king_formula_accuracy_metrics.csv")
+    print("  - scripts/king_formula_grid_search.csv")
 
 if __name__ == "__main__":
     main()
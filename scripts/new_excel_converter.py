@@ -20,10 +20,21 @@ import numpy as np
 from pathlib import Path
 import argparse
 import logging
+import os
+import sys
+import time
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+# Add the simulation_development directory to the path
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'simulation_development'))
+
+from core.id_registry import canonicalize_sku_ids
+
+# Columns refreshed from the new data for items that already exist
+UPDATE_COLUMNS = ['Avg Daily Burn Rate', 'Avg_Lead Time', 'UOM']
+
 class CedarSimDataConverter:
     """Converts new Excel format to CedarSim format"""
     
@@ -68,6 +79,7 @@ class CedarSimDataConverter:
             exclude_new_items: Whether to exclude new items from simulation (recommended)
         """
         self.logger.info(f"Starting conversion of {new_file_path}")
+        start = time.perf_counter()
         
         # Load new data
         new_data = self._load_new_data(new_file_path)
@@ -79,10 +91,13 @@ class CedarSimDataConverter:
         converted_new_data = self._convert_columns(new_data, column_mapping)
         
         # Merge with existing data
-        merged_data = self._merge_data(converted_new_data, handle_new_items, default_department, default_supplier, exclude_new_items)
+        merge_start = time.perf_counter()
+        merged_data, item_counts = self._merge_data(converted_new_data, handle_new_items, default_department, default_supplier, exclude_new_items)
+        timings = {'merge_seconds': time.perf_counter() - merge_start,
+                   'conversion_seconds': time.perf_counter() - start}
         
         # Generate report
-        self._generate_conversion_report(new_data, converted_new_data, merged_data)
+        self._generate_conversion_report(new_data, converted_new_data, merged_data, item_counts, timings)
         
         return merged_data
     
@@ -127,18 +142,38 @@ class CedarSimDataConverter:
         if 'Avg Daily Burn Rate' in converted_data.columns:
             converted_data['Avg Daily Burn Rate'] = pd.to_numeric(converted_data['Avg Daily Burn Rate'], errors='coerce')
         
-        # Remove duplicates based on Oracle Item Number
-        converted_data = converted_data.drop_duplicates(subset=['Oracle Item Number'], keep='first')
+        # Remove duplicates based on the canonical Oracle Item Number (5 and '00005' are one item)
+        keys = canonicalize_sku_ids(converted_data['Oracle Item Number'])
+        duplicated = keys.duplicated(keep='first') & keys.notna()
+        converted_data = converted_data[~duplicated.to_numpy()]
         
         self.logger.info(f"Converted data shape: {converted_data.shape}")
         return converted_data
     
     def _merge_data(self, converted_new_data, handle_new_items=False, default_department="Unknown", default_supplier="Unknown", exclude_new_items=True):
-        """Merge new data with existing data"""
+        """
+        Merge new data with existing data (indexed update keyed on the canonical item number)
+        
+        Returns:
+            (merged data, item counts) - the overlapping / new-only / existing-only item
+            counts, from the same canonical keys the merge matched on
+        """
+        
+        # Canonical item numbers, so 5, '5' and '00005' refer to the same item
+        existing_keys = canonicalize_sku_ids(self.existing_data['Oracle Item Number'])
+        new_keys = canonicalize_sku_ids(converted_new_data['Oracle Item Number'])
+        
+        # Rows without an item number cannot be matched to (or update) anything
+        has_key = new_keys.notna().to_numpy()
+        if not has_key.all():
+            self.logger.info(f"Skipping {(~has_key).sum():,} new rows without an Oracle Item Number")
+            converted_new_data = converted_new_data[has_key]
+        existing_items = set(existing_keys.dropna())
+        existing_keys = existing_keys.to_numpy()
+        new_keys = new_keys[has_key].to_numpy()
         
         # Find overlapping items
-        existing_items = set(self.existing_data['Oracle Item Number'])
-        new_items = set(converted_new_data['Oracle Item Number'])
+        new_items = set(new_keys)
         overlapping_items = existing_items & new_items
         new_only_items = new_items - existing_items
         existing_only_items = existing_items - new_items
@@ -147,26 +182,25 @@ class CedarSimDataConverter:
         self.logger.info(f"New items only: {len(new_only_items)}")
         self.logger.info(f"Existing items only: {len(existing_only_items)}")
         
+        is_new_only = pd.Index(existing_keys).unique().get_indexer(new_keys) < 0
+        
         # Log new items that will be excluded
         if exclude_new_items and len(new_only_items) > 0:
             self.logger.info(f"EXCLUDING {len(new_only_items)} new items from simulation (no demand data)")
             self.logger.info(f"Excluded items: {sorted(list(new_only_items))}")
             
             # Create detailed log of excluded items
-            excluded_items_data = converted_new_data[converted_new_data['Oracle Item Number'].isin(new_only_items)]
-            excluded_items_list = []
-            for _, item in excluded_items_data.iterrows():
-                excluded_items_list.append({
-                    'Oracle Item Number': item['Oracle Item Number'],
-                    'Item Description': item['Item Description'],
-                    'Burn Rate': item['Avg Daily Burn Rate'],
-                    'Lead Time': item['Avg_Lead Time'],
-                    'UOM': item['UOM'],
-                    'Reason': 'No historical demand data available'
-                })
+            excluded_items_data = converted_new_data[is_new_only]
+            excluded_df = pd.DataFrame({
+                'Oracle Item Number': excluded_items_data['Oracle Item Number'].to_numpy(),
+                'Item Description': excluded_items_data['Item Description'].to_numpy(),
+                'Burn Rate': excluded_items_data['Avg Daily Burn Rate'].to_numpy(),
+                'Lead Time': excluded_items_data['Avg_Lead Time'].to_numpy(),
+                'UOM': excluded_items_data['UOM'].to_numpy(),
+                'Reason': 'No historical demand data available'
+            })
             
             # Save excluded items to CSV for reference
-            excluded_df = pd.DataFrame(excluded_items_list)
             excluded_file = self.output_dir / 'excluded_new_items.csv'
             excluded_df.to_csv(excluded_file, index=False)
             self.logger.info(f"Excluded items details saved to: {excluded_file}")
@@ -174,72 +208,72 @@ class CedarSimDataConverter:
         # Start with existing data
         merged_data = self.existing_data.copy()
         
-        # Update overlapping items with new data
-        for item in overlapping_items:
-            # Get new data for this item
-            new_item_data = converted_new_data[converted_new_data['Oracle Item Number'] == item].iloc[0]
-            
-            # Update existing data
-            mask = merged_data['Oracle Item Number'] == item
-            merged_data.loc[mask, 'Avg Daily Burn Rate'] = new_item_data['Avg Daily Burn Rate']
-            merged_data.loc[mask, 'Avg_Lead Time'] = new_item_data['Avg_Lead Time']
-            merged_data.loc[mask, 'UOM'] = new_item_data['UOM']
+        # Update overlapping items with new data: one index lookup of every existing
+        # row's item in the new data (first row per item), then one assignment per column
+        updates = converted_new_data[UPDATE_COLUMNS].set_axis(pd.Index(new_keys))
+        updates = updates[~updates.index.duplicated(keep='first')]
+        positions = updates.index.get_indexer(existing_keys)
+        matched = positions >= 0
+        for column in UPDATE_COLUMNS:
+            merged_data.loc[matched, column] = updates[column].to_numpy()[positions[matched]]
+        self.logger.info(f"Updated {matched.sum():,} existing rows for {len(overlapping_items):,} items")
         
         # Handle new items if requested and not excluding
         if handle_new_items and not exclude_new_items and len(new_only_items) > 0:
             self.logger.info(f"Handling {len(new_only_items)} new items")
-            new_items_data = self._create_new_items_data(converted_new_data, new_only_items, default_department, default_supplier)
+            new_items_data = self._create_new_items_data(converted_new_data[is_new_only], default_department, default_supplier)
             merged_data = pd.concat([merged_data, new_items_data], ignore_index=True)
         
         self.logger.info(f"Final merged data shape: {merged_data.shape}")
-        return merged_data
+        item_counts = {
+            'overlapping_items': len(overlapping_items),
+            'new_items_only': len(new_only_items),
+            'existing_items_only': len(existing_only_items),
+        }
+        return merged_data, item_counts
     
-    def _create_new_items_data(self, converted_new_data, new_only_items, default_department, default_supplier):
+    def _create_new_items_data(self, new_items_data, default_department, default_supplier):
         """Create data for new items not in existing data"""
         
-        # Get new items data
-        new_items_data = converted_new_data[converted_new_data['Oracle Item Number'].isin(new_only_items)].copy()
-        
-        # Create template row from existing data
-        template_row = self.existing_data.iloc[0].copy()
+        # Template rows: the first existing row, repeated once per new item
+        new_rows = self.existing_data.iloc[np.zeros(len(new_items_data), dtype=int)].reset_index(drop=True)
         
         # Fill with default values
-        template_row['Department Name'] = default_department
-        template_row['Department Number'] = 0
-        template_row['Supplier Name'] = default_supplier
-        template_row['On-PAR or Special Request'] = 'On-PAR'  # Default to On-PAR
-        template_row['Medline item? Y/N'] = 'N'  # Default to non-Medline
+        new_rows['Department Name'] = default_department
+        new_rows['Department Number'] = 0
+        new_rows['Supplier Name'] = default_supplier
+        new_rows['On-PAR or Special Request'] = 'On-PAR'  # Default to On-PAR
+        new_rows['Medline item? Y/N'] = 'N'  # Default to non-Medline
         
         # Clear all level mappings (set to null)
-        level_columns = [col for col in template_row.index if 'level' in col.lower()]
-        for col in level_columns:
-            template_row[col] = np.nan
-        
-        # Create rows for new items
-        new_rows = []
-        for _, new_item in new_items_data.iterrows():
-            row = template_row.copy()
-            row['Oracle Item Number'] = new_item['Oracle Item Number']
-            row['Item Description'] = new_item['Item Description']
-            row['UOM'] = new_item['UOM']
-            row['Avg Daily Burn Rate'] = new_item['Avg Daily Burn Rate']
-            row['Avg_Lead Time'] = new_item['Avg_Lead Time']
-            new_rows.append(row)
-        
-        return pd.DataFrame(new_rows)
+        level_columns = [col for col in new_rows.columns if 'level' in col.lower()]
+        new_rows[level_columns] = np.nan
+        
+        # Item fields from the new data
+        for col in ['Oracle Item Number', 'Item Description', 'UOM', 'Avg Daily Burn Rate', 'Avg_Lead Time']:
+            new_rows[col] = new_items_data[col].to_numpy()
+        
+        return new_rows
     
-    def _generate_conversion_report(self, original_new_data, converted_new_data, merged_data):
-        """Generate conversion report"""
+    def _generate_conversion_report(self, original_new_data, converted_new_data, merged_data, item_counts, timings=None):
+        """Generate conversion report (item counts as returned by _merge_data)"""
         
+        timings = timings or {}
+        rows_processed = len(original_new_data) + len(self.existing_data)
+        conversion_seconds = timings.get('conversion_seconds', 0.0)
         report = {
             'conversion_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
             'original_new_data_shape': original_new_data.shape,
             'converted_new_data_shape': converted_new_data.shape,
             'existing_data_shape': self.existing_data.shape,
             'final_merged_data_shape': merged_data.shape,
-            'overlapping_items': len(set(original_new_data['Oracle Item Number']) & set(self.existing_data['Oracle Item Number'])),
-            'new_items_only': len(set(original_new_data['Oracle Item Number']) - set(self.existing_data['Oracle Item Number'])),
-            'existing_items_only': len(set(self.existing_data['Oracle Item Number']) - set(original_new_data['Oracle Item Number']))
+            'overlapping_items': item_counts['overlapping_items'],
+            'new_items_only': item_counts['new_items_only'],
+            'existing_items_only': item_counts['existing_items_only'],
+            'rows_processed': rows_processed,
+            'conversion_seconds': round(conversion_seconds, 3),
+            'merge_seconds': round(timings.get('merge_seconds', 0.0), 3),
+            'rows_per_second': round(rows_processed / conversion_seconds) if conversion_seconds > 0 else None
         }
         
         # Save report
@@ -261,6 +295,9 @@ class CedarSimDataConverter:
         print(f"Overlapping items: {report['overlapping_items']}")
         print(f"New items only: {report['new_items_only']}")
         print(f"Existing items only: {report['existing_items_only']}")
+        if report['rows_per_second'] is not None:
+            print(f"Throughput: {rows_processed:,} rows in {conversion_seconds:.2f}s "
+                  f"({report['rows_per_second']:,} rows/s, merge {report['merge_seconds']:.3f}s)")
         print("="*60)
     
     def save_converted_data(self, merged_data, output_file):
@@ -274,14 +311,16 @@ class CedarSimDataConverter:
                 # Main data sheet
                 merged_data.to_excel(writer, sheet_name='SKU_Inventory_Data', index=False)
                 
-                # Create summary sheet
+                # Create summary sheet (canonical item numbers, as in the merge)
+                merged_items = set(canonicalize_sku_ids(merged_data['Oracle Item Number']))
+                existing_items = set(canonicalize_sku_ids(self.existing_data['Oracle Item Number']))
                 summary_data = {
                     'Metric': ['Total SKUs', 'Overlapping Items', 'New Items Only', 'Existing Items Only'],
                     'Count': [
                         len(merged_data),
-                        len(set(merged_data['Oracle Item Number']) & set(self.existing_data['Oracle Item Number'])),
-                        len(set(merged_data['Oracle Item Number']) - set(self.existing_data['Oracle Item Number'])),
-                        len(set(self.existing_data['Oracle Item Number']) - set(merged_data['Oracle Item Number']))
+                        len(merged_items & existing_items),
+                        len(merged_items - existing_items),
+                        len(existing_items - merged_items)
                     ]
                 }
                 summary_df = pd.DataFrame(summary_data)
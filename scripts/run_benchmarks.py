@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+CedarSim Performance Benchmarks
+===============================
+
+This script runs the benchmark suite (simulation_development/benchmarks/) and
+compares results against a stored baseline:
+1. run: time data loading, structure build, network steps, demand matrix, weekly
+   simulation, full-history replay, frontend data and every dashboard endpoint under
+   concurrent load, on synthetic hospitals of several sizes; results go to a JSON
+   file with machine metadata
+2. compare: flag stages / endpoints that got slower than in a baseline result file
+   (exit code 1 if any did)
+
+Usage:
+    python scripts/run_benchmarks.py run --scales 0.1 1 10 --output benchmark_results/baseline.json
+    python scripts/run_benchmarks.py run --output benchmark_results/current.json
+    python scripts/run_benchmarks.py compare benchmark_results/current.json benchmark_results/baseline.json
+"""
+
+from datetime import datetime
+from pathlib import Path
+import argparse
+import logging
+import os
+import sys
+
+# Add the simulation_development directory to the path
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'simulation_development'))
+
+from benchmarks.results import (DEFAULT_MIN_SECONDS, DEFAULT_THRESHOLD, compare_results, format_comparison,
+                                load_results, save_results)
+from benchmarks.suite import DEFAULT_REPEAT, DEFAULT_SCALES, run_suite
+
+def run(args):
+    """Run the suite and save the results"""
+    result = run_suite(scales=args.scales, facilities=args.facilities, repeat=args.repeat, seed=args.seed,
+                       api=not args.no_api,
+                       api_options={'requests_per_endpoint': args.requests, 'concurrency': args.concurrency},
+                       data_dirs=[Path(d) for d in args.data_dir])
+    output = Path(args.output or f"benchmark_results/benchmark_{datetime.now():%Y%m%d_%H%M%S}.json")
+    save_results(result, output)
+
+    for name, dataset in result['datasets'].items():
+        print(f"\n{name}: {dataset['sku_rows']:,} slots, {dataset['skus']:,} SKUs, {dataset['weeks']} weeks")
+        for stage, timing in dataset['stages'].items():
+            print(f"   {stage:<30} {timing['median'] * 1000:>10.1f} ms")
+        for endpoint, load in (dataset['api'] or {}).items():
+            print(f"   api {endpoint:<26} {load['median'] * 1000:>10.1f} ms  "
+                  f"{load['requests_per_second']:>7.0f} req/s  errors: {load['errors']}")
+    print(f"\n✅ Benchmark results saved to: {output}")
+    return 0
+
+def compare(args):
+    """Compare a result file against a baseline"""
+    comparisons = compare_results(load_results(args.current), load_results(args.baseline),
+                                  threshold=args.threshold, min_seconds=args.min_seconds)
+    print(format_comparison(comparisons))
+    regressions = [c for c in comparisons if c.regression]
+    if regressions:
+        print(f"\n❌ {len(regressions)} slowdowns beyond {args.threshold:.0%} against {args.baseline}")
+        return 1
+    print(f"\n✅ No slowdowns beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+def main():
+    """Main function for command line usage"""
+    parser = argparse.ArgumentParser(description='Run and compare CedarSim performance benchmarks')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Run the benchmark suite')
+    run_parser.add_argument('--scales', type=float, nargs='+', default=list(DEFAULT_SCALES),
+                            help='Synthetic dataset sizes relative to the real hospital')
+    run_parser.add_argument('--facilities', type=int, default=1, help='Facilities per synthetic dataset')
+    run_parser.add_argument('--data-dir', action='append', default=[],
+                            help='Also benchmark a directory with the production CSVs (repeatable)')
+    run_parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='Runs per stage')
+    run_parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic datasets')
+    run_parser.add_argument('--requests', type=int, default=50, help='Requests per API endpoint')
+    run_parser.add_argument('--concurrency', type=int, default=8, help='Concurrent API client threads')
+    run_parser.add_argument('--no-api', action='store_true', help='Skip the API load benchmark')
+    run_parser.add_argument('--output', help='Result file (default: benchmark_results/benchmark_<time>.json)')
+
+    compare_parser = subparsers.add_parser('compare', help='Flag slowdowns against a baseline')
+    compare_parser.add_argument('current', help='Result file to check')
+    compare_parser.add_argument('baseline', help='Baseline result file')
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                                help='Relative slowdown that counts as a regression (0.25 = 25%%)')
+    compare_parser.add_argument('--min-seconds', type=float, default=DEFAULT_MIN_SECONDS,
+                                help='Ignore slowdowns smaller than this many seconds')
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s', force=True)
+    return run(args) if args.command == 'run' else compare(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,12 +9,17 @@ This script calculates safety stock for all 24 SKUs using the exact formula show
 """
 
 import pandas as pd
-import numpy as np
 import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
+import os
+import sys
 import warnings
 warnings.filterwarnings('ignore')
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'simulation_development'))
+
+from data.input_data.safety_stock import compare_safety_stock
+
 def load_validation_data():
     """Load all validation data files"""
     print("Loading validation data...")
@@ -30,12 +35,13 @@ def load_validation_data():
     return test_data, demand_data
 
 def calculate_safety_stock(test_data, demand_data):
-    """Calculate safety stock using: Z-score × Historical Demand Standard Deviation"""
+    """Calculate safety stock using: Z-score × √(Lead Time) × Historical Demand Standard Deviation
+
+    All SKU-department combinations are computed at once (one groupby over the demand
+    data) by data.input_data.safety_stock.compare_safety_stock.
+    """
     print("\nCalculating safety stock for all SKU-department combinations...")
     
-    # Convert date column
-    demand_data['PO Week Ending Date'] = pd.to_datetime(demand_data['PO Week Ending Date'])
-    
     # Get all unique SKU-department combinations from test data
     combinations = test_data[['Oracle Item Number', 'Department Name', 'Department Number', 
                             'Safety stock_units', 'Z-score', 'Avg Daily Burn Rate']].copy()
@@ -44,76 +50,23 @@ def calculate_safety_stock(test_data, demand_data):
     
     print(f"Found {len(combinations)} SKU-department combinations to analyze")
     
-    results = []
-    
-    for idx, combo in combinations.iterrows():
-        sku = combo['Oracle Item Number']
-        dept = combo['Department Name']
-        dept_num = combo['Department Number']
-        actual_ss = combo['Safety stock_units']
-        z_score = combo['Z-score']
-        avg_daily_burn = combo['Avg Daily Burn Rate']
-        
-        print(f"\nProcessing SKU {sku} in {dept}...")
-        
-        # Get demand data for this combination
-        dept_demand = demand_data[
-            (demand_data['Oracle Item Number'] == sku) & 
-            (demand_data['Department Number'] == dept_num)
-        ].copy()
-        
-        if len(dept_demand) < 2:
-            print(f"  Insufficient demand data ({len(dept_demand)} records)")
-            continue
-        
-        # Calculate historical demand standard deviation
-        # Convert weekly demand to daily demand for consistency
-        daily_demands = []
-        for _, row in dept_demand.iterrows():
-            weekly_demand = row['Total Qty Issues']
-            daily_demand = weekly_demand / 7  # Convert weekly to daily
-            daily_demands.append(daily_demand)
-        
-        demand_std = np.std(daily_demands)
-        demand_mean = np.mean(daily_demands)
-        
-        # Get lead time from demand data
-        lead_time = dept_demand['Avg_Lead Time'].iloc[0] if len(dept_demand) > 0 else 0
-        
-        # Calculate safety stock using the formula: Z-score × √(Lead Time) × Historical Demand Standard Deviation
-        calculated_ss = z_score * np.sqrt(lead_time) * demand_std
-        
-        # Calculate accuracy
-        error = abs(calculated_ss - actual_ss)
-        error_pct = (error / actual_ss) * 100 if actual_ss > 0 else 100
-        
-        result = {
-            'sku': sku,
-            'department': dept,
-            'department_number': dept_num,
-            'z_score': z_score,
-            'lead_time': lead_time,
-            'demand_std': demand_std,
-            'demand_mean': demand_mean,
-            'calculated_ss': calculated_ss,
-            'actual_ss': actual_ss,
-            'error': error,
-            'error_pct': error_pct,
-            'data_points': len(dept_demand),
-            'avg_daily_burn': avg_daily_burn
-        }
-        
-        results.append(result)
-        
-        print(f"  Z-score: {z_score}")
-        print(f"  Lead Time: {lead_time}")
-        print(f"  Demand Std: {demand_std:.2f}")
-        print(f"  Calculated SS: {calculated_ss:.2f}")
-        print(f"  Actual SS: {actual_ss}")
-        print(f"  Error: {error_pct:.1f}%")
-        print(f"  Data points: {len(dept_demand)}")
-    
-    return results
+    # Daily demand (weekly issues / 7) statistics for every pair with at least 2 records
+    calculated = compare_safety_stock(combinations, demand_data,
+                                      keys=['Oracle Item Number', 'Department Number'])
+    print(f"Calculated safety stock for {len(calculated)} combinations "
+          f"({len(combinations) - len(calculated)} with insufficient demand data)")
+    
+    results = calculated.rename(columns={
+        'Oracle Item Number': 'sku',
+        'Department Name': 'department',
+        'Department Number': 'department_number',
+        'Z-score': 'z_score',
+        'Safety stock_units': 'actual_ss',
+        'Avg Daily Burn Rate': 'avg_daily_burn',
+    })
+    return results[['sku', 'department', 'department_number', 'z_score', 'lead_time', 'demand_std',
+                    'demand_mean', 'calculated_ss', 'actual_ss', 'error', 'error_pct', 'data_points',
+                    'avg_daily_burn']].to_dict('records')
 
 def analyze_results(results):
     """Analyze the calculation results"""
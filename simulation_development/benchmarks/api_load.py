@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+CedarSim API Load Benchmark - Dashboard Endpoints Under Concurrent Requests
+
+This module serves the integrated dashboard API (frontend/dashboard_api_integrated.py)
+over a structure that is already built and measures each endpoint's latency and
+throughput with a concurrent HTTP client.
+
+ARCHITECTURE:
+- The Flask app is served by werkzeug's threaded server on an ephemeral localhost
+  port, in a daemon thread; the dashboard's globals are pointed at the given
+  antology / integrator instead of running its own initialization
+- The client sends requests_per_endpoint requests per endpoint from `concurrency`
+  threads with urllib (standard library only); per-SKU endpoints rotate through
+  the SKUs of the structure
+- Every response is read completely; status codes are counted, so endpoints that
+  fail are visible in the results instead of stopping the benchmark
+
+Key Features:
+- run_api_load: endpoint -> latency (min / median / p95 / max / mean), requests per
+  second, status code counts and mean response size
+- ENDPOINTS: the GET endpoints benchmarked by default
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Sequence, Tuple
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import numpy as np
+
+FRONTEND_DIR = os.path.join(os.path.dirname(__file__), '..', 'frontend')
+
+logger = logging.getLogger(__name__)
+
+# GET endpoints; {sku_id} is filled in per request ('/api/export-data' writes files and is skipped)
+ENDPOINTS = [
+    '/',
+    '/api/status',
+    '/api/skus',
+    '/api/sku/{sku_id}',
+    '/api/hospital-layout',
+    '/api/sku-connections',
+    '/api/inventory-data/{sku_id}',
+]
+
+DEFAULT_REQUESTS = 50
+DEFAULT_CONCURRENCY = 8
+
+
+def _request(url: str, timeout: float) -> Tuple[int, float, int]:
+    """(status code, seconds, response bytes) of one GET request."""
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            status, size = response.status, len(response.read())
+    except urllib.error.HTTPError as e:
+        status, size = e.code, len(e.read())
+    return status, time.perf_counter() - start, size
+
+
+def _summarize(responses: List[Tuple[int, float, int]], wall_seconds: float, concurrency: int) -> Dict[str, Any]:
+    latencies = [seconds for _, seconds, _ in responses]
+    status_counts: Dict[str, int] = {}
+    for status, _, _ in responses:
+        status_counts[str(status)] = status_counts.get(str(status), 0) + 1
+    return {
+        'requests': len(responses),
+        'concurrency': concurrency,
+        'min': min(latencies),
+        'median': statistics.median(latencies),
+        'p95': float(np.percentile(latencies, 95)),
+        'max': max(latencies),
+        'mean': statistics.fmean(latencies),
+        'requests_per_second': len(responses) / wall_seconds,
+        'status_counts': status_counts,
+        'errors': sum(count for status, count in status_counts.items() if not status.startswith('2')),
+        'mean_bytes': statistics.fmean(size for _, _, size in responses),
+    }
+
+
+def _import_dashboard():
+    """
+    Import the integrated dashboard module.
+
+    The dashboard imports frontend_generator as a top-level module, so frontend/ is on
+    sys.path only for the import, and that top-level module is not left in sys.modules:
+    AntologyGenerator.finalize_network exports frontend_data.json to the working
+    directory whenever `import frontend_generator` succeeds.
+    """
+    had_generator = 'frontend_generator' in sys.modules
+    sys.path.append(FRONTEND_DIR)
+    try:
+        import frontend.dashboard_api_integrated as dashboard
+    finally:
+        sys.path.remove(FRONTEND_DIR)
+        if not had_generator:
+            sys.modules.pop('frontend_generator', None)
+    return dashboard
+
+
+def run_api_load(antology, integrator=None, requests_per_endpoint: int = DEFAULT_REQUESTS,
+                 concurrency: int = DEFAULT_CONCURRENCY, endpoints: Sequence[str] = ENDPOINTS,
+                 timeout: float = 120.0) -> Dict[str, Dict[str, Any]]:
+    """
+    Serve the dashboard API over a built structure and load every endpoint.
+
+    Args:
+        antology: Built AntologyGenerator to serve
+        integrator: DataIntegrator behind it (None = the dashboard's sample-data paths)
+        requests_per_endpoint: Requests sent to each endpoint
+        concurrency: Client threads
+        endpoints: Endpoint paths; '{sku_id}' is replaced per request
+        timeout: Per-request timeout in seconds
+
+    Returns:
+        Endpoint path -> load summary
+    """
+    from werkzeug.serving import make_server
+    from frontend.frontend_generator import FrontendDataGenerator
+
+    dashboard = _import_dashboard()
+
+    dashboard.antology = antology
+    dashboard.frontend_generator = FrontendDataGenerator(antology)
+    dashboard.data_integrator = integrator
+    sku_ids = sorted(antology.sku_registry) or ['UNKNOWN']
+
+    # Per-request logging would dominate the timings
+    quiet = [logging.getLogger('werkzeug'), dashboard.logger, logging.getLogger('frontend_generator'),
+             logging.getLogger('frontend.frontend_generator')]
+    levels = [log.level for log in quiet]
+    for log in quiet:
+        log.setLevel(logging.CRITICAL)
+
+    server = make_server('127.0.0.1', 0, dashboard.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    results = {}
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for endpoint in endpoints:
+                urls = [base_url + endpoint.format(sku_id=sku_ids[i % len(sku_ids)])
+                        for i in range(requests_per_endpoint)]
+                start = time.perf_counter()
+                responses = list(pool.map(lambda url: _request(url, timeout), urls))
+                results[endpoint] = _summarize(responses, time.perf_counter() - start, concurrency)
+                logger.info(f"{endpoint}: median {results[endpoint]['median'] * 1000:.1f} ms, "
+                            f"{results[endpoint]['requests_per_second']:.0f} req/s, "
+                            f"{results[endpoint]['errors']} errors")
+    finally:
+        server.shutdown()
+        thread.join()
+        for log, level in zip(quiet, levels):
+            log.setLevel(level)
+    return results
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+CedarSim Benchmark Results - JSON Records and Baseline Comparison
+
+This module stores benchmark suite results as JSON together with the machine and
+software they were measured on, and compares a run against a stored baseline to
+flag slowdowns.
+
+ARCHITECTURE:
+- A result file holds {'format_version', 'created', 'machine', 'config', 'datasets'};
+  'datasets' is run_suite's dataset name -> stages / api mapping
+- Machine metadata: host, platform, CPU, memory, Python / NumPy / pandas versions and
+  the git commit of the working tree (when available)
+- compare_results matches datasets, stages and API endpoints by name and compares
+  their median seconds; a slowdown is flagged when the ratio exceeds 1 + threshold
+  AND the difference exceeds min_seconds (so microsecond stages do not flag noise)
+- Entries only present on one side are reported, not flagged
+
+Key Features:
+- machine_metadata / save_results / load_results
+- compare_results: list of Comparison rows (with .regression)
+- format_comparison: text table of a comparison
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import json
+import os
+import platform
+import socket
+import subprocess
+
+import numpy as np
+import pandas as pd
+
+# Bump when the result file layout changes
+FORMAT_VERSION = 1
+
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_MIN_SECONDS = 0.005
+
+
+@dataclass
+class Comparison:
+    """One benchmark entry of a run compared with the baseline."""
+    dataset: str
+    name: str                           # Stage name or 'api <endpoint>'
+    baseline: Optional[float]           # Median seconds
+    current: Optional[float]
+    regression: bool = False
+
+    @property
+    def ratio(self) -> Optional[float]:
+        if self.baseline is None or self.current is None or self.baseline == 0:
+            return None
+        return self.current / self.baseline
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, timeout=10,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def machine_metadata() -> Dict[str, Any]:
+    """Host, hardware and software versions the benchmark runs on."""
+    try:
+        memory_bytes = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        memory_bytes = None
+    return {
+        'hostname': socket.gethostname(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'memory_bytes': memory_bytes,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'git_commit': _git_commit(),
+    }
+
+
+def save_results(suite_result: Dict[str, Any], path: Path) -> Path:
+    """Write a run_suite result with machine metadata to a JSON file."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    record = {'format_version': FORMAT_VERSION, 'created': datetime.now().isoformat(timespec='seconds'),
+              'machine': machine_metadata(), **suite_result}
+    tmp_path = path.with_name(f"{path.name}.tmp{os.getpid()}")
+    tmp_path.write_text(json.dumps(record, indent=2))
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_results(path: Path) -> Dict[str, Any]:
+    """Read a result file written by save_results."""
+    record = json.loads(Path(path).read_text())
+    if record.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported benchmark result format {record.get('format_version')}")
+    return record
+
+
+def _medians(dataset: Dict[str, Any]) -> Dict[str, float]:
+    """Entry name -> median seconds of one dataset's stages and API endpoints."""
+    medians = {name: timing['median'] for name, timing in dataset.get('stages', {}).items()}
+    medians.update({f"api {endpoint}": load['median'] for endpoint, load in (dataset.get('api') or {}).items()})
+    return medians
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD,
+                    min_seconds: float = DEFAULT_MIN_SECONDS) -> List[Comparison]:
+    """
+    Compare the median timings of a run against a baseline run.
+
+    Args:
+        current: Result record of the run to check
+        baseline: Result record to compare against
+        threshold: Relative slowdown that counts as a regression (0.25 = 25% slower)
+        min_seconds: Absolute slowdown below which nothing is flagged
+
+    Returns:
+        One Comparison per dataset entry present in either record
+    """
+    comparisons = []
+    for dataset in sorted(set(current['datasets']) | set(baseline['datasets'])):
+        now = _medians(current['datasets'].get(dataset, {}))
+        before = _medians(baseline['datasets'].get(dataset, {}))
+        for name in list(before) + [name for name in now if name not in before]:
+            comparison = Comparison(dataset, name, before.get(name), now.get(name))
+            if comparison.ratio is not None:
+                comparison.regression = (comparison.ratio > 1 + threshold
+                                         and comparison.current - comparison.baseline > min_seconds)
+            comparisons.append(comparison)
+    return comparisons
+
+
+def format_comparison(comparisons: List[Comparison]) -> str:
+    """Text table of a comparison, slowdowns marked."""
+    width = max([len(c.name) for c in comparisons] + [5])
+    lines = [f"{'Dataset':<14}  {'Entry':<{width}}  {'Baseline':>10}  {'Current':>10}  {'Ratio':>6}"]
+    for c in comparisons:
+        baseline = f"{c.baseline * 1000:.1f}ms" if c.baseline is not None else "-"
+        current = f"{c.current * 1000:.1f}ms" if c.current is not None else "-"
+        ratio = f"{c.ratio:.2f}" if c.ratio is not None else "new" if c.baseline is None else "gone"
+        flag = "  ⚠️  SLOWER" if c.regression else ""
+        lines.append(f"{c.dataset:<14}  {c.name:<{width}}  {baseline:>10}  {current:>10}  {ratio:>6}{flag}")
+    return "\n".join(lines)
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+CedarSim Benchmark Suite - Timed Pipeline Stages Across Dataset Sizes
+
+This module times the stages a CedarSim run goes through, from reading the input
+CSVs to serving the dashboard API, on datasets of several sizes, and returns the
+timings as a JSON-serializable result with machine metadata (see results.py).
+
+ARCHITECTURE:
+- Datasets are synthetic hospitals (data/input_data/synthetic_data.py) fitted from
+  the shipped data, generated once per (scale, facilities, seed) into
+  benchmarks/.datasets/ and reused; any directory with the production CSVs can be
+  benchmarked as well
+- Every stage is run `repeat` times on fresh objects and reports all run times plus
+  min / median / mean; stdout of the stages (progress prints) is suppressed
+- Stages:
+  - load_production_data: DataIntegrator.load_production_data with the Parquet
+    sidecars removed first (CSV parse); load_production_data_cached: sidecars present
+  - create_antology_structure: the complete structure build
+  - generate_network_connections / finalize_network: the two network steps alone,
+    on a structure built without them
+  - Structure builds skip AntologyGenerator's frontend_data.json export, so those
+    timings hold no JSON I/O and a run writes nothing to the working directory
+  - build_demand_matrix: week x slot demand matrix from the loaded demand
+  - simulate_week: one VectorizedWeeklyEngine.step; full_history_replay: every
+    week of the demand history (state restored between runs)
+  - generate_frontend_data: FrontendDataGenerator.generate_frontend_data
+- The dashboard API is benchmarked under concurrent load by api_load.py
+
+Key Features:
+- run_dataset: every stage (and optionally the API) for one data directory
+- run_suite: generate / reuse the synthetic datasets and benchmark each of them
+- STAGES: the stage names, in run order
+"""
+
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import io
+import logging
+import os
+import shutil
+import statistics
+import sys
+import time
+
+import pandas as pd
+
+# Add the simulation_development directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from core.core_models import AntologyGenerator
+from core.state_store import STATE_FIELDS
+from core.vectorized_engine import VectorizedWeeklyEngine
+from data.input_data.data_integration import DEMAND_DATA_FILE, DataIntegrator
+from data.input_data.synthetic_data import fit_hospital_profile, write_synthetic_dataset
+from data.input_data.typed_loader import CACHE_DIR_NAME, load_sku_inventory
+from frontend.frontend_generator import FrontendDataGenerator
+
+from .api_load import run_api_load
+
+logger = logging.getLogger(__name__)
+
+DATASET_DIR = Path(__file__).parent / ".datasets"
+SKU_INVENTORY_FILE = Path(__file__).parent.parent / "data" / "prod-input-data" / "SIMULATION_READY_SKU_INVENTORY_DATA.csv"
+DEMAND_EXTRACT_FILE = Path(__file__).parent.parent.parent / "data" / "final" / "validation_subset" / "validation_demand_subset.csv"
+
+DEFAULT_SCALES = (0.1, 1.0, 10.0)
+DEFAULT_REPEAT = 3
+
+STAGES = [
+    'load_production_data',
+    'load_production_data_cached',
+    'create_antology_structure',
+    'generate_network_connections',
+    'finalize_network',
+    'build_demand_matrix',
+    'simulate_week',
+    'full_history_replay',
+    'generate_frontend_data',
+]
+
+
+def _summarize(seconds: List[float]) -> Dict[str, Any]:
+    """Run times and their min / median / mean."""
+    return {'seconds': seconds, 'min': min(seconds), 'median': statistics.median(seconds),
+            'mean': statistics.fmean(seconds), 'runs': len(seconds)}
+
+
+def _time(function: Callable[[], Any], repeat: int, setup: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+    """Time function() repeat times; setup() runs before each call, untimed."""
+    seconds = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        with redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            function()
+            seconds.append(time.perf_counter() - start)
+    return _summarize(seconds)
+
+
+def _unconnected_structure(data_dir: Path) -> AntologyGenerator:
+    """Locations and SKUs of a data directory, without the network steps."""
+    integrator = DataIntegrator(data_dir=data_dir)
+    with redirect_stdout(io.StringIO()):
+        integrator.antology = AntologyGenerator()
+        integrator._create_locations()
+        integrator._create_skus_from_production()
+    return integrator.antology
+
+
+def run_dataset(data_dir: Path, repeat: int = DEFAULT_REPEAT, api: bool = True,
+                api_options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Benchmark every stage on one data directory.
+
+    Args:
+        data_dir: Directory with the SKU inventory and demand CSVs
+        repeat: Runs per stage
+        api: Also benchmark the dashboard API endpoints (api_load.run_api_load)
+        api_options: Keyword arguments for run_api_load
+
+    Returns:
+        {'data_dir', 'sku_rows', 'skus', 'locations', 'demand_cells', 'weeks',
+         'stages': stage -> timing summary, 'api': endpoint -> load summary}
+    """
+    data_dir = Path(data_dir)
+    typed_cache = data_dir / CACHE_DIR_NAME
+    stages: Dict[str, Dict[str, Any]] = {}
+    logger.info(f"Benchmarking {data_dir}")
+
+    stages['load_production_data'] = _time(
+        lambda: DataIntegrator(data_dir=data_dir).load_production_data(), repeat,
+        setup=lambda: shutil.rmtree(typed_cache, ignore_errors=True))
+    stages['load_production_data_cached'] = _time(
+        lambda: DataIntegrator(data_dir=data_dir).load_production_data(), repeat)
+
+    integrator = DataIntegrator(data_dir=data_dir)
+    stages['create_antology_structure'] = _time(
+        lambda: integrator.create_antology_structure(use_cache=False, export_frontend=False), repeat)
+    antology = integrator.antology
+
+    structures: List[AntologyGenerator] = []
+    stages['generate_network_connections'] = _time(
+        lambda: structures[-1].generate_network_connections(), repeat,
+        setup=lambda: structures.append(_unconnected_structure(data_dir)))
+    stages['finalize_network'] = _time(lambda: structures.pop().finalize_network(export_frontend=False), repeat)
+
+    integrator.demand_data  # Read once, outside the timed builds
+    matrices = []
+    stages['build_demand_matrix'] = _time(
+        lambda: matrices.append(integrator.build_demand_matrix(use_cache=False)), repeat)
+    demand = matrices[-1]
+
+    # The engine writes the state store; every run starts from the loaded state
+    store = antology.state_store
+    initial_state = {field: store.column(field).copy() for field in STATE_FIELDS}
+
+    def restore():
+        for field, values in initial_state.items():
+            store.column(field)[:] = values
+
+    engine = VectorizedWeeklyEngine.from_antology(antology)
+    stages['simulate_week'] = _time(lambda: engine.step(demand[0]), repeat, setup=restore)
+    stages['full_history_replay'] = _time(lambda: VectorizedWeeklyEngine.from_antology(antology).run(demand),
+                                          repeat, setup=restore)
+    restore()
+
+    stages['generate_frontend_data'] = _time(lambda: FrontendDataGenerator(antology).generate_frontend_data(), repeat)
+
+    result = {
+        'data_dir': str(data_dir),
+        'sku_rows': store.size,
+        'skus': len(antology.sku_registry),
+        'locations': len(antology.locations),
+        'demand_cells': int(demand.nnz),
+        'weeks': int(demand.shape[0]),
+        'stages': stages,
+        'api': None,
+    }
+    if api:
+        result['api'] = run_api_load(antology, integrator, **(api_options or {}))
+    return result
+
+
+def dataset_name(scale: float, facilities: int = 1) -> str:
+    """Name of a synthetic dataset size, e.g. 'scale_10' or 'scale_1_f3'."""
+    name = f"scale_{scale:g}"
+    return name if facilities == 1 else f"{name}_f{facilities}"
+
+
+def ensure_dataset(scale: float, facilities: int = 1, seed: int = 0,
+                   dataset_dir: Path = DATASET_DIR) -> Path:
+    """Generate a synthetic dataset unless it already exists; returns its directory."""
+    directory = Path(dataset_dir) / f"{dataset_name(scale, facilities)}_seed{seed}"
+    if (directory / DEMAND_DATA_FILE).exists():
+        return directory
+    demand_data = pd.read_csv(DEMAND_EXTRACT_FILE) if DEMAND_EXTRACT_FILE.exists() else None
+    profile = fit_hospital_profile(load_sku_inventory(SKU_INVENTORY_FILE, use_cache=False), demand_data,
+                                   sku_column='Oracle Item Number', location_column='Deliver to Location',
+                                   quantity_column='Total Quantity')
+    write_synthetic_dataset(directory, profile, scale=scale, facilities=facilities, seed=seed)
+    return directory
+
+
+def run_suite(scales: Sequence[float] = DEFAULT_SCALES, facilities: int = 1, repeat: int = DEFAULT_REPEAT,
+              seed: int = 0, api: bool = True, api_options: Optional[Dict[str, Any]] = None,
+              data_dirs: Sequence[Path] = (), dataset_dir: Path = DATASET_DIR) -> Dict[str, Any]:
+    """
+    Benchmark synthetic datasets of several sizes (and any extra data directories).
+
+    Args:
+        scales: Catalog sizes relative to the real hospital
+        facilities: Facilities per synthetic dataset
+        repeat: Runs per stage
+        seed: Seed of the synthetic datasets
+        api / api_options: See run_dataset
+        data_dirs: Additional directories with the production CSVs (named by directory)
+        dataset_dir: Where synthetic datasets are generated and reused
+
+    Returns:
+        {'config': ..., 'datasets': dataset name -> run_dataset result}
+    """
+    datasets = {}
+    for scale in scales:
+        directory = ensure_dataset(scale, facilities, seed, dataset_dir)
+        datasets[dataset_name(scale, facilities)] = dict(run_dataset(directory, repeat, api, api_options),
+                                                          scale=scale, facilities=facilities)
+    for directory in data_dirs:
+        datasets[Path(directory).name] = run_dataset(Path(directory), repeat, api, api_options)
+    return {
+        'config': {'scales': list(scales), 'facilities': facilities, 'repeat': repeat, 'seed': seed,
+                   'api': api, 'api_options': api_options or {}},
+        'datasets': datasets,
+    }
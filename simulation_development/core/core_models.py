@@ -6,13 +6,15 @@ CedarSim hospital inventory management system.
 
 ARCHITECTURE SEPARATION:
 - This module creates the OBJECT STRUCTURE and NETWORK TOPOLOGY
-- The actual SIMULATION EXECUTION is handled by SimPy (separate module)
+- The actual SIMULATION EXECUTION is handled by SimPy (separate module) or by the
+  whole-network VectorizedWeeklyEngine (vectorized_engine.py)
 - AntologyGenerator is NOT part of the simulator - it's a pre-simulation setup tool
 
 Key Classes:
 - Resource: Abstract base class for all resources
 - Location: Container resource for PARs and Perpetual warehouse with reporting methods
 - SKU: Individual medical supplies with business logic for inventory management
+  (a thin view over one slot of an InventoryStateStore)
 - AntologyGenerator: Pre-simulation network topology generator (NOT part of simulator)
 
 Core Responsibilities:
@@ -39,9 +41,22 @@ from abc import ABC, abstractmethod
 from typing import Dict, List, Optional, Any
 from enum import Enum
 from dataclasses import dataclass
+import heapq
+import itertools
 import logging
 import math
 
+import numpy as np
+
+try:
+    from .state_store import InventoryStateStore, get_default_state_store
+    from .id_registry import get_location_id_registry, get_sku_id_registry
+    from .event_trace import TraceEvent, event_tracer
+except ImportError:  # Running this module directly as a script
+    from state_store import InventoryStateStore, get_default_state_store
+    from id_registry import get_location_id_registry, get_sku_id_registry
+    from event_trace import TraceEvent, event_tracer
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -74,6 +89,111 @@ class DemandData:
     time: int
     location_id: str
 
+class PendingShipmentQueue:
+    """Time-ordered queue of in-flight deliveries for one SKU.
+    
+    Deliveries are kept in a binary heap keyed by (arrival time, insertion order), so
+    insertion and popping due deliveries are O(log n). Cancellation is lazy: removed
+    entries are flagged and skipped, and the heap is compacted once they dominate.
+    The total quantity in transit is cached for O(1) inventory-position reads.
+    """
+    
+    def __init__(self):
+        self._heap: List[list] = []  # [time, sequence, delivery, active]
+        self._entries: Dict[int, List[list]] = {}  # id(delivery) -> live heap entries
+        self._sequence = itertools.count()
+        self._active_count = 0
+        self._cancelled_count = 0
+        self.quantity_in_transit = 0.0
+    
+    def __len__(self) -> int:
+        """Number of deliveries still in transit."""
+        return self._active_count
+    
+    def __iter__(self):
+        """Iterate in-transit deliveries in arrival order."""
+        return (entry[2] for entry in sorted(self._heap) if entry[3])
+    
+    def push(self, delivery_data: 'DeliveryData'):
+        """Add a delivery to the queue."""
+        entry = [delivery_data.time, next(self._sequence), delivery_data, True]
+        heapq.heappush(self._heap, entry)
+        self._entries.setdefault(id(delivery_data), []).append(entry)
+        self._active_count += 1
+        self.quantity_in_transit += delivery_data.quantity
+    
+    def peek_time(self) -> Optional[float]:
+        """Get the arrival time of the next delivery, or None if the queue is empty."""
+        self._discard_cancelled_head()
+        return self._heap[0][0] if self._heap else None
+    
+    def pop_due(self, current_time: float) -> List['DeliveryData']:
+        """Remove and return all deliveries arriving by current_time, in arrival order."""
+        due = []
+        self._discard_cancelled_head()
+        while self._heap and self._heap[0][0] <= current_time:
+            entry = heapq.heappop(self._heap)
+            self._forget(entry)
+            due.append(entry[2])
+            self._discard_cancelled_head()
+        return due
+    
+    def remove(self, delivery_data: 'DeliveryData') -> bool:
+        """Cancel a specific delivery; returns False if it is not in transit.
+        
+        Deliveries are matched by identity, so twin deliveries with equal fields
+        are never confused with each other.
+        """
+        entries = self._entries.get(id(delivery_data))
+        if not entries:
+            return False
+        entry = entries[0]
+        self._forget(entry)
+        entry[3] = False
+        self._cancelled_count += 1
+        if self._cancelled_count > self._active_count:
+            self._compact()
+        return True
+    
+    def quantity_due(self, current_time: float) -> float:
+        """Get the total quantity arriving by current_time (visits only due entries)."""
+        total = 0.0
+        stack = [0] if self._heap else []
+        while stack:
+            index = stack.pop()
+            entry = self._heap[index]
+            if entry[0] > current_time:
+                continue  # Heap order: every child arrives later
+            if entry[3]:
+                total += entry[2].quantity
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(self._heap):
+                    stack.append(child)
+        return total
+    
+    def _forget(self, entry: list):
+        """Drop an entry from the in-transit bookkeeping."""
+        entries = self._entries[id(entry[2])]
+        entries.remove(entry)
+        if not entries:
+            del self._entries[id(entry[2])]
+        self._active_count -= 1
+        self.quantity_in_transit -= entry[2].quantity
+        if not self._active_count:
+            self.quantity_in_transit = 0.0  # Clear accumulated rounding error
+    
+    def _discard_cancelled_head(self):
+        """Pop cancelled entries sitting at the top of the heap."""
+        while self._heap and not self._heap[0][3]:
+            heapq.heappop(self._heap)
+            self._cancelled_count -= 1
+    
+    def _compact(self):
+        """Rebuild the heap without cancelled entries."""
+        self._heap = [entry for entry in self._heap if entry[3]]
+        heapq.heapify(self._heap)
+        self._cancelled_count = 0
+
 class InventoryObserver(ABC):
     """Abstract observer for inventory changes."""
     
@@ -81,6 +201,18 @@ class InventoryObserver(ABC):
     def on_inventory_change(self, resource: 'Resource', old_level: float, new_level: float):
         """Called when a resource's inventory level changes."""
         pass
+    
+    def on_stockout_change(self, resource: 'Resource', old_amount: float, new_amount: float):
+        """Called when a resource's current stockout amount changes."""
+        pass
+    
+    def on_emergency_transfer(self, resource: 'Resource', amount: float):
+        """Called when a resource allocates emergency supply."""
+        pass
+    
+    def on_demand_rate_change(self, resource: 'Resource', old_rate: float, new_rate: float):
+        """Called when a resource's demand rate changes."""
+        pass
 
 class Resource(ABC):
     """Abstract base class for all resources in the simulation."""
@@ -90,7 +222,6 @@ class Resource(ABC):
         self.resource_type = resource_type
         self.state = ResourceState(0, 0, 0)
         self.observers: List[InventoryObserver] = []
-        logger.debug(f"Created {resource_type.value} resource: {resource_id}")
     
     @abstractmethod
     def get_capacity(self) -> float:
@@ -105,12 +236,31 @@ class Resource(ABC):
     def add_observer(self, observer: InventoryObserver):
         """Add an observer for inventory changes."""
         self.observers.append(observer)
-        logger.debug(f"Added observer to {self.resource_id}")
+    
+    def remove_observer(self, observer: InventoryObserver):
+        """Remove an observer for inventory changes."""
+        if observer in self.observers:
+            self.observers.remove(observer)
     
     def notify_observers(self, old_level: float, new_level: float):
         """Notify all observers of inventory changes."""
         for observer in self.observers:
             observer.on_inventory_change(self, old_level, new_level)
+    
+    def notify_stockout_change(self, old_amount: float, new_amount: float):
+        """Notify all observers of stockout amount changes."""
+        for observer in self.observers:
+            observer.on_stockout_change(self, old_amount, new_amount)
+    
+    def notify_emergency_transfer(self, amount: float):
+        """Notify all observers of an emergency supply allocation."""
+        for observer in self.observers:
+            observer.on_emergency_transfer(self, amount)
+    
+    def notify_demand_rate_change(self, old_rate: float, new_rate: float):
+        """Notify all observers of demand rate changes."""
+        for observer in self.observers:
+            observer.on_demand_rate_change(self, old_rate, new_rate)
 
 class ReplenishmentStrategy(ABC):
     """Abstract strategy for replenishment policies."""
@@ -136,22 +286,70 @@ class OrderUpToLevelStrategy(ReplenishmentStrategy):
         """Order up to target level."""
         return max(0, sku.target_level - sku.get_current_level())
 
-class Location(Resource):
-    """Location resource representing PARs and Perpetual warehouse."""
+class Location(Resource, InventoryObserver):
+    """Location resource representing PARs and Perpetual warehouse.
+    
+    Aggregates over contained SKUs (total inventory, stockout count, emergency transfer
+    total and demand rate moments) are kept as running totals updated by the deltas
+    reported through the observer callbacks, so reporting reads are O(1).
+    """
     
     def __init__(self, location_id: str, location_type: str, max_capacity: float = float('inf')):
         super().__init__(location_id, ResourceType.LOCATION)
         self.location_type = location_type  # "PAR" or "Perpetual"
         self.max_capacity = max_capacity
+        self.location_code = get_location_id_registry().intern(location_id)
         self.skus: Dict[str, SKU] = {}
         self.replenishment_strategy: ReplenishmentStrategy = OrderUpToLevelStrategy()
+        self._reset_aggregates()
         logger.info(f"Created {location_type} location: {location_id}")
     
     def add_sku(self, sku: 'SKU'):
         """Add a SKU to this location."""
+        existing = self.skus.get(sku.resource_id)
+        if existing is sku:
+            return
+        if existing is not None:
+            self._remove_from_aggregates(existing)
+            existing.remove_observer(self)
         self.skus[sku.resource_id] = sku
+        self._add_to_aggregates(sku)
         sku.add_observer(self)
-        logger.debug(f"Added SKU {sku.resource_id} to location {self.resource_id}")
+    
+    def _reset_aggregates(self):
+        """Zero all running totals."""
+        self._total_inventory = 0.0
+        self._stockout_sku_count = 0
+        self._emergency_transfer_total = 0.0
+        self._demand_rate_sum = 0.0
+        self._demand_rate_sum_sq = 0.0
+    
+    def _add_to_aggregates(self, sku: 'SKU'):
+        """Fold a SKU's current state into the running totals."""
+        self._total_inventory += sku.get_current_level()
+        self._stockout_sku_count += sku.get_stockout_amount() > 0
+        self._emergency_transfer_total += sku._total_emergency_transfers
+        self._demand_rate_sum += sku.demand_rate
+        self._demand_rate_sum_sq += sku.demand_rate ** 2
+    
+    def _remove_from_aggregates(self, sku: 'SKU'):
+        """Remove a SKU's current state from the running totals."""
+        self._total_inventory -= sku.get_current_level()
+        self._stockout_sku_count -= sku.get_stockout_amount() > 0
+        self._emergency_transfer_total -= sku._total_emergency_transfers
+        self._demand_rate_sum -= sku.demand_rate
+        self._demand_rate_sum_sq -= sku.demand_rate ** 2
+    
+    def recompute_aggregates(self):
+        """Rebuild running totals from the contained SKUs.
+        
+        Call after state has been written directly to the state store arrays
+        (e.g. by a vectorized engine), which bypasses the observer callbacks.
+        """
+        self._reset_aggregates()
+        for sku in self.skus.values():
+            self._add_to_aggregates(sku)
+        self.state.current_level = self._total_inventory
     
     def get_sku(self, sku_id: str) -> Optional['SKU']:
         """Get a SKU by ID from this location."""
@@ -163,13 +361,27 @@ class Location(Resource):
     
     def get_current_level(self) -> float:
         """Get the total current inventory level of all SKUs in this location."""
-        return sum(sku.get_current_level() for sku in self.skus.values())
+        return self._total_inventory
     
     def on_inventory_change(self, resource: Resource, old_level: float, new_level: float):
         """React to inventory changes in contained SKUs."""
-        # Location can react to SKU inventory changes
-        self.state.current_level = self.get_current_level()
-        self.notify_observers(self.get_current_level(), self.get_current_level())
+        old_total = self._total_inventory
+        self._total_inventory += new_level - old_level
+        self.state.current_level = self._total_inventory
+        self.notify_observers(old_total, self._total_inventory)
+    
+    def on_stockout_change(self, resource: Resource, old_amount: float, new_amount: float):
+        """Track how many contained SKUs are currently stocked out."""
+        self._stockout_sku_count += (new_amount > 0) - (old_amount > 0)
+    
+    def on_emergency_transfer(self, resource: Resource, amount: float):
+        """Accumulate emergency transfers made by contained SKUs."""
+        self._emergency_transfer_total += amount
+    
+    def on_demand_rate_change(self, resource: Resource, old_rate: float, new_rate: float):
+        """Update the demand rate moments of contained SKUs."""
+        self._demand_rate_sum += new_rate - old_rate
+        self._demand_rate_sum_sq += new_rate ** 2 - old_rate ** 2
     
     # Location Get Methods for Reporting and Summaries
     
@@ -191,7 +403,7 @@ class Location(Resource):
     
     def get_total_inventory(self) -> float:
         """Get sum of all SKU inventory levels in this location."""
-        return sum(sku.get_current_level() for sku in self.skus.values())
+        return self._total_inventory
     
     def get_sku_count(self) -> int:
         """Get number of SKUs in this location."""
@@ -201,12 +413,11 @@ class Location(Resource):
         """Get percentage of SKUs experiencing stockouts in this location."""
         if not self.skus:
             return 0.0
-        stockout_count = sum(1 for sku in self.skus.values() if sku.get_stockout_amount() > 0)
-        return (stockout_count / len(self.skus)) * 100.0
+        return (self._stockout_sku_count / len(self.skus)) * 100.0
     
     def get_emergency_transfer_count(self) -> int:
         """Get total number of emergency transfers for all SKUs in this location."""
-        return sum(sku._total_emergency_transfers for sku in self.skus.values())
+        return self._emergency_transfer_total
     
     def get_average_lead_time(self) -> float:
         """Get average lead time across all SKUs in this location."""
@@ -219,23 +430,49 @@ class Location(Resource):
         """Get variability in demand across SKUs in this location."""
         if not self.skus:
             return 0.0
-        demand_rates = [sku.demand_rate for sku in self.skus.values()]
-        if not demand_rates:
-            return 0.0
-        mean_demand = sum(demand_rates) / len(demand_rates)
-        variance = sum((rate - mean_demand) ** 2 for rate in demand_rates) / len(demand_rates)
+        count = len(self.skus)
+        mean_demand = self._demand_rate_sum / count
+        variance = max(0.0, self._demand_rate_sum_sq / count - mean_demand ** 2)
         return variance ** 0.5  # Standard deviation
     
     def get_sku_by_id(self, sku_id: str) -> Optional['SKU']:
         """Get a specific SKU by ID from this location."""
         return self.skus.get(sku_id)
 
+def _state_field(field: str, doc: str) -> property:
+    """Create a property that reads and writes one column of the SKU's state store slot."""
+    def fget(self) -> float:
+        return float(getattr(self._state_store, field)[self._slot])
+    
+    def fset(self, value: float):
+        getattr(self._state_store, field)[self._slot] = value
+    
+    return property(fget, fset, doc=doc)
+
 class SKU(Resource):
-    """SKU resource representing individual medical supplies."""
+    """SKU resource representing individual medical supplies.
+    
+    Numeric state lives in an InventoryStateStore slot; the attributes below are views
+    over that slot so vectorized engines and object code share the same state.
+    """
+    
+    target_level = _state_field('target_level', "Target inventory level (order-up-to point).")
+    lead_time_days = _state_field('lead_time_days', "Original lead time in days.")
+    lead_time_weeks = _state_field('lead_time_weeks', "Lead time in fractional weeks.")
+    _current_inventory_level = _state_field('current_level', "Current inventory level.")
+    _stockout_amount = _state_field('stockout_amount', "Current stockout amount.")
+    _total_stockouts = _state_field('total_stockouts', "Cumulative stockouts.")
+    _total_emergency_transfers = _state_field('total_emergency_transfers', "Cumulative emergency transfers.")
     
     def __init__(self, sku_id: str, location_id: str, target_level: float = 0, 
-                 lead_time_days: float = 0, demand_rate: float = 0):
+                 lead_time_days: float = 0, demand_rate: float = 0,
+                 state_store: Optional[InventoryStateStore] = None):
         super().__init__(sku_id, ResourceType.SKU)
+        self._state_store = state_store if state_store is not None else get_default_state_store()
+        self._slot = self._state_store.allocate_slot()
+        self._state_store.is_perpetual[self._slot] = location_id == "PERPETUAL"
+        self._state_store.sku_code[self._slot] = get_sku_id_registry().intern(sku_id)
+        self._state_store.location_code[self._slot] = get_location_id_registry().intern(location_id)
         self.location_id = location_id
         self.target_level = target_level
         self.lead_time_days = lead_time_days  # Original lead time in days
@@ -243,12 +480,49 @@ class SKU(Resource):
         self.demand_rate = demand_rate  # Weekly demand rate
         self.connected_par_skus: List['SKU'] = []  # For perpetual SKUs only
         self._connected_perpetual_sku: Optional['SKU'] = None  # For PAR SKUs only
-        self._current_inventory_level = 0
-        self._pending_shipments: List['DeliveryData'] = []  # Discrete event shipments
-        self._stockout_amount = 0  # Current stockout amount
-        self._total_stockouts = 0  # Cumulative stockouts
-        self._total_emergency_transfers = 0  # Cumulative emergency transfers
-        logger.debug(f"Created SKU {sku_id} in location {location_id} (lead time: {lead_time_days} days = {self.lead_time_weeks:.3f} weeks)")
+        self._pending_shipments = PendingShipmentQueue()  # Discrete event shipments by arrival time
+    
+    @property
+    def demand_rate(self) -> float:
+        """Weekly demand rate."""
+        return float(self._state_store.demand_rate[self._slot])
+    
+    @demand_rate.setter
+    def demand_rate(self, value: float):
+        old_rate = float(self._state_store.demand_rate[self._slot])
+        self._state_store.demand_rate[self._slot] = value
+        if value != old_rate:
+            self.notify_demand_rate_change(old_rate, value)
+    
+    @property
+    def state_store(self) -> InventoryStateStore:
+        """Get the state store backing this SKU."""
+        return self._state_store
+    
+    @property
+    def slot(self) -> int:
+        """Get this SKU's slot index in its state store."""
+        return self._slot
+    
+    @property
+    def sku_code(self) -> int:
+        """Interned int code of this SKU's id (see id_registry)."""
+        return int(self._state_store.sku_code[self._slot])
+    
+    @property
+    def location_code(self) -> int:
+        """Interned int code of this SKU's location."""
+        return int(self._state_store.location_code[self._slot])
+    
+    def bind_state_store(self, state_store: InventoryStateStore):
+        """Move this SKU's state into another store, releasing its current slot."""
+        if state_store is self._state_store:
+            return
+        new_slot = state_store.allocate_slot()
+        state_store.copy_slot(self._state_store, self._slot, new_slot)
+        self._state_store.release_slot(self._slot)
+        self._state_store = state_store
+        self._slot = new_slot
     
     def get_capacity(self) -> float:
         """Get the target level (capacity) of this SKU."""
@@ -271,12 +545,12 @@ class SKU(Resource):
         self.state.current_level = self._current_inventory_level
         self.state.last_updated = 0  # Will be updated by simulation time
         self.notify_observers(old_level, self._current_inventory_level)
-        logger.debug(f"SKU {self.resource_id} inventory changed: {old_level} -> {self._current_inventory_level}")
+        if event_tracer.enabled:
+            event_tracer.record(TraceEvent.INVENTORY_LEVEL, self._slot, self._current_inventory_level)
     
     def add_emergency_connection(self, par_sku: 'SKU'):
         """Add an emergency connection to a PAR SKU (for perpetual SKUs only)."""
         self.connected_par_skus.append(par_sku)
-        logger.debug(f"Added emergency connection from {self.resource_id} to {par_sku.resource_id}")
     
     def can_supply_emergency(self) -> bool:
         """Check if this SKU can supply emergency replenishment."""
@@ -299,30 +573,45 @@ class SKU(Resource):
             self.set_inventory_level(available - allocated, allow_negative=True)  # This will be negative
             # Record hospital-level stockout
             self._total_stockouts += (demand - available)
-            logger.warning(f"Hospital-level stockout for {self.resource_id}: went negative by {demand - available} units")
+            if event_tracer.enabled:
+                event_tracer.record(TraceEvent.HOSPITAL_STOCKOUT, self._slot, demand - available)
         
         self._total_emergency_transfers += allocated
-        logger.info(f"Allocated {allocated} units of {self.resource_id} for emergency supply")
+        self.notify_emergency_transfer(allocated)
+        if event_tracer.enabled:
+            event_tracer.record(TraceEvent.EMERGENCY_ALLOCATED, self._slot, allocated)
         
         return allocated
     
     def add_pending_shipment(self, delivery_data: 'DeliveryData'):
         """Add a pending shipment to the SKU."""
-        self._pending_shipments.append(delivery_data)
-        logger.debug(f"Added pending shipment for {self.resource_id}: {delivery_data.quantity} units at time {delivery_data.time}")
+        self._pending_shipments.push(delivery_data)
+        if event_tracer.enabled:
+            event_tracer.record(TraceEvent.ORDER_PLACED, self._slot, delivery_data.quantity)
     
     def get_pending_shipments(self, current_time: int) -> float:
         """Get total quantity of pending shipments arriving by current time."""
-        total_pending = sum(shipment.quantity for shipment in self._pending_shipments 
-                           if shipment.time <= current_time)
-        return total_pending
+        return self._pending_shipments.quantity_due(current_time)
+    
+    def get_quantity_in_transit(self) -> float:
+        """Get total quantity of all pending shipments (O(1), cached)."""
+        return self._pending_shipments.quantity_in_transit
     
     def process_delivery_data(self, delivery_data: 'DeliveryData'):
         """Process a delivery event and update inventory."""
-        if delivery_data in self._pending_shipments:
-            self._pending_shipments.remove(delivery_data)
+        if self._pending_shipments.remove(delivery_data):
             self.set_inventory_level(self.get_current_level() + delivery_data.quantity)
-            logger.info(f"Processed delivery for {self.resource_id}: +{delivery_data.quantity} units")
+            if event_tracer.enabled:
+                event_tracer.record(TraceEvent.DELIVERY, self._slot, delivery_data.quantity, delivery_data.time)
+    
+    def process_due_deliveries(self, current_time: float) -> float:
+        """Land every pending shipment arriving by current_time; returns the quantity received."""
+        received = sum(delivery.quantity for delivery in self._pending_shipments.pop_due(current_time))
+        if received:
+            self.set_inventory_level(self.get_current_level() + received)
+            if event_tracer.enabled:
+                event_tracer.record(TraceEvent.DELIVERY, self._slot, received, current_time)
+        return received
     
     def process_demand_data(self, demand_data: 'DemandData'):
         """Process a discrete demand event."""
@@ -332,13 +621,15 @@ class SKU(Resource):
         if available_inventory >= demand_amount:
             # Normal fulfillment
             self.set_inventory_level(available_inventory - demand_amount)
-            logger.debug(f"Fulfilled demand for {self.resource_id}: {demand_amount} units")
+            if event_tracer.enabled:
+                event_tracer.record(TraceEvent.DEMAND_FILLED, self._slot, demand_amount, demand_data.time)
         else:
             # Stockout occurs - need to find connected perpetual SKU for emergency supply
             self.set_inventory_level(0)
-            self._stockout_amount = demand_amount - available_inventory
+            self._set_stockout_amount(demand_amount - available_inventory)
             self._total_stockouts += self._stockout_amount
-            logger.warning(f"Stockout for {self.resource_id}: {self._stockout_amount} units short")
+            if event_tracer.enabled:
+                event_tracer.record(TraceEvent.STOCKOUT, self._slot, self._stockout_amount, demand_data.time)
             
             # Find connected perpetual SKU for emergency supply
             perpetual_sku = self._find_connected_perpetual_sku()
@@ -349,8 +640,10 @@ class SKU(Resource):
                 emergency_received = perpetual_sku.allocate_emergency_supply(self._stockout_amount)
                 if emergency_received > 0:
                     self.set_inventory_level(emergency_received)
-                    self._stockout_amount = max(0, self._stockout_amount - emergency_received)
-                    logger.info(f"Received emergency supply for {self.resource_id}: {emergency_received} units")
+                    self._set_stockout_amount(max(0, self._stockout_amount - emergency_received))
+                    if event_tracer.enabled:
+                        event_tracer.record(TraceEvent.EMERGENCY_RECEIVED, self._slot, emergency_received,
+                                            demand_data.time)
     
     def _find_connected_perpetual_sku(self) -> Optional['SKU']:
         """Find the connected perpetual SKU for this PAR SKU."""
@@ -359,7 +652,6 @@ class SKU(Resource):
     def set_connected_perpetual_sku(self, perpetual_sku: 'SKU'):
         """Set the connected perpetual SKU for this PAR SKU."""
         self._connected_perpetual_sku = perpetual_sku
-        logger.debug(f"Connected PAR SKU {self.resource_id} to perpetual SKU {perpetual_sku.resource_id}")
     
     def trigger_emergency_replenishment(self, stockout_amount: float):
         """Trigger emergency replenishment from perpetual location."""
@@ -370,29 +662,42 @@ class SKU(Resource):
                 allocated = perpetual_sku.allocate_emergency_supply(stockout_amount)
                 if allocated > 0:
                     self.set_inventory_level(self.get_current_level() + allocated)
-                    self._stockout_amount = max(0, self._stockout_amount - allocated)
-                    logger.info(f"Emergency replenishment for {self.resource_id}: {allocated} units")
+                    self._set_stockout_amount(max(0, self._stockout_amount - allocated))
+                    if event_tracer.enabled:
+                        event_tracer.record(TraceEvent.EMERGENCY_RECEIVED, self._slot, allocated)
     
     def get_stockout_amount(self) -> float:
         """Get current stockout amount."""
         return self._stockout_amount
     
+    def _set_stockout_amount(self, amount: float):
+        """Set the current stockout amount and notify observers."""
+        old_amount = self._stockout_amount
+        self._stockout_amount = amount
+        if amount != old_amount:
+            self.notify_stockout_change(old_amount, amount)
+    
     def record_stockout(self, amount: float):
         """Record a stockout event."""
-        self._stockout_amount = amount
+        self._set_stockout_amount(amount)
         self._total_stockouts += amount
     
     def add_emergency_supply(self, amount: float):
         """Add emergency supply from perpetual location."""
         self.set_inventory_level(self.get_current_level() + amount)
-        self._stockout_amount = max(0, self._stockout_amount - amount)
-        logger.info(f"Added emergency supply to {self.resource_id}: {amount} units")
+        self._set_stockout_amount(max(0, self._stockout_amount - amount))
+        if event_tracer.enabled:
+            event_tracer.record(TraceEvent.EMERGENCY_RECEIVED, self._slot, amount)
     
     def calculate_inventory_gap(self, current_time: int) -> float:
-        """Calculate inventory gap for discrete event simulation."""
+        """Calculate inventory gap for discrete event simulation.
+        
+        The inventory position counts every shipment still in transit, so orders
+        already placed against a long lead time are not re-ordered.
+        """
         target_inventory = self.target_level
         current_inventory = self.get_current_level()
-        pending_shipments = self.get_pending_shipments(current_time)
+        pending_shipments = self.get_quantity_in_transit()
         
         inventory_gap = max(0, target_inventory - (current_inventory + pending_shipments))
         return inventory_gap
@@ -427,7 +732,43 @@ class ResourceFactory:
         """
         return SKU(sku_id, location_id, **kwargs)
 
-class AntologyGenerator:
+@dataclass
+class EmergencyNetworkIndex:
+    """Compressed sparse (CSR-style) index of the perpetual -> PAR emergency network.
+    
+    All arrays are indexed by state store slot:
+    - par_offsets[p]:par_offsets[p + 1] is the range of par_slots connected to perpetual slot p
+    - perpetual_of[s] is the perpetual slot supplying PAR slot s (-1 if not connected)
+    """
+    par_offsets: np.ndarray
+    par_slots: np.ndarray
+    perpetual_of: np.ndarray
+    
+    @property
+    def num_connections(self) -> int:
+        """Total number of PAR-perpetual connections."""
+        return len(self.par_slots)
+    
+    def connection_count(self, perpetual_slot: int) -> int:
+        """Number of PAR slots connected to a perpetual slot (O(1))."""
+        return int(self.par_offsets[perpetual_slot + 1] - self.par_offsets[perpetual_slot])
+    
+    def get_par_slots(self, perpetual_slot: int) -> np.ndarray:
+        """PAR slots connected to a perpetual slot (a view, no copy)."""
+        return self.par_slots[self.par_offsets[perpetual_slot]:self.par_offsets[perpetual_slot + 1]]
+    
+    def gather_from_perpetual(self, values: np.ndarray) -> np.ndarray:
+        """For every connected PAR slot, read the value at its perpetual slot."""
+        return values[self.perpetual_of[self.par_slots]]
+    
+    def scatter_to_perpetual(self, par_values: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Sum per-slot PAR values onto their perpetual slots (e.g. emergency transfers)."""
+        if out is None:
+            out = np.zeros(len(self.perpetual_of))
+        np.add.at(out, self.perpetual_of[self.par_slots], par_values[self.par_slots])
+        return out
+
+class AntologyGenerator(InventoryObserver):
     """Pre-simulation network generator that creates the object structure and network topology.
     
     This class is NOT part of the simulator itself. It:
@@ -438,10 +779,13 @@ class AntologyGenerator:
     The simulation then runs on top of this pre-built structure.
     """
     
-    def __init__(self):
+    def __init__(self, state_store: Optional[InventoryStateStore] = None):
         self.locations: Dict[str, Location] = {}
         self.sku_registry: Dict[str, List[SKU]] = {}  # SKU ID -> List of SKU objects
         self.observers: List[InventoryObserver] = []
+        self.state_store = state_store if state_store is not None else InventoryStateStore()
+        self.network_index: Optional[EmergencyNetworkIndex] = None
+        self._par_sku_cache: Dict[str, List[SKU]] = {}
         logger.info("Initialized AntologyGenerator")
     
     def add_location(self, location: Location):
@@ -451,12 +795,49 @@ class AntologyGenerator:
         logger.info(f"Added location: {location.resource_id}")
     
     def add_sku(self, sku: SKU):
-        """Add a SKU to the simulation."""
+        """Add a SKU to the simulation and move its state into the network's state store."""
+        sku.bind_state_store(self.state_store)
+        self._par_sku_cache.pop(sku.resource_id, None)
+        self.network_index = None
         if sku.resource_id not in self.sku_registry:
             self.sku_registry[sku.resource_id] = []
         self.sku_registry[sku.resource_id].append(sku)
         sku.add_observer(self)
-        logger.debug(f"Added SKU: {sku.resource_id}")
+    
+    def add_skus_bulk(self, sku_ids: List[str], location_ids: List[str], target_level: Any,
+                      lead_time_days: Any, demand_rate: Any, current_level: Any = None) -> List[SKU]:
+        """Create and register many SKUs at once, filling their state columns in one pass.
+        
+        Args:
+            sku_ids: SKU identifier per instance
+            location_ids: Location per instance (SKUs are added to existing locations)
+            target_level: Target levels (array-like, one per instance)
+            lead_time_days: Lead times in days (converted to weeks vectorially)
+            demand_rate: Weekly demand rates
+            current_level: Optional initial inventory levels (default 0)
+            
+        Returns:
+            The created SKUs, in input order
+        """
+        skus = [SKU(sku_id, location_id, state_store=self.state_store)
+                for sku_id, location_id in zip(sku_ids, location_ids)]
+        slots = np.fromiter((sku.slot for sku in skus), dtype=np.int64, count=len(skus))
+        lead_time_days = np.asarray(lead_time_days, dtype=np.float64)
+        store = self.state_store
+        store.target_level[slots] = target_level
+        store.lead_time_days[slots] = lead_time_days
+        store.lead_time_weeks[slots] = lead_time_days / 7.0
+        store.demand_rate[slots] = demand_rate
+        if current_level is not None:
+            store.current_level[slots] = current_level
+        
+        # Register after the columns are filled so location aggregates see the final values
+        for sku in skus:
+            self.add_sku(sku)
+            location = self.locations.get(sku.location_id)
+            if location:
+                location.add_sku(sku)
+        return skus
     
     def generate_network_connections(self):
         """Generate the network topology by setting up emergency connections between perpetual and PAR SKUs."""
@@ -470,8 +851,39 @@ class AntologyGenerator:
                     perpetual_sku.add_emergency_connection(par_sku)  # Perpetual -> PAR
                     par_sku.set_connected_perpetual_sku(perpetual_sku)  # PAR -> Perpetual
         
+        self.network_index = self.compile_network()
         logger.info("Network topology generated - emergency connections established")
     
+    def compile_network(self) -> EmergencyNetworkIndex:
+        """Compile the established PAR-perpetual connections into CSR arrays over state store slots."""
+        perpetual_of = np.full(self.state_store.size, -1, dtype=np.int64)
+        for sku_list in self.sku_registry.values():
+            for sku in sku_list:
+                perpetual_sku = sku._find_connected_perpetual_sku()
+                if perpetual_sku is not None:
+                    perpetual_of[sku.slot] = perpetual_sku.slot
+        
+        connected = np.flatnonzero(perpetual_of >= 0)
+        order = np.argsort(perpetual_of[connected], kind='stable')
+        counts = np.bincount(perpetual_of[connected], minlength=len(perpetual_of))
+        par_offsets = np.zeros(len(perpetual_of) + 1, dtype=np.int64)
+        np.cumsum(counts, out=par_offsets[1:])
+        return EmergencyNetworkIndex(par_offsets=par_offsets, par_slots=connected[order],
+                                     perpetual_of=perpetual_of)
+    
+    def get_network_index(self) -> EmergencyNetworkIndex:
+        """Get the compiled emergency network, compiling it if SKUs changed since the last build."""
+        if self.network_index is None or len(self.network_index.perpetual_of) != self.state_store.size:
+            self.network_index = self.compile_network()
+        return self.network_index
+    
+    def get_connection_count(self, sku_id: str) -> int:
+        """Get the number of PAR SKUs connected to a SKU's perpetual instance (O(1))."""
+        perpetual_sku = self.get_perpetual_sku(sku_id)
+        if perpetual_sku is None:
+            return 0
+        return self.get_network_index().connection_count(perpetual_sku.slot)
+    
     def get_perpetual_sku(self, sku_id: str) -> Optional[SKU]:
         """Get a SKU from the perpetual location."""
         perpetual_location = self.locations.get("PERPETUAL")
@@ -479,11 +891,21 @@ class AntologyGenerator:
     
     def get_par_skus(self, sku_id: str) -> List[SKU]:
         """Get all PAR SKUs of a given type."""
-        return [sku for sku in self.sku_registry.get(sku_id, []) 
-                if sku.location_id != "PERPETUAL"]
-    
-    def finalize_network(self):
-        """Finalize the network structure and prepare for simulation handoff."""
+        par_skus = self._par_sku_cache.get(sku_id)
+        if par_skus is None:
+            par_skus = [sku for sku in self.sku_registry.get(sku_id, []) 
+                        if sku.location_id != "PERPETUAL"]
+            self._par_sku_cache[sku_id] = par_skus
+        return list(par_skus)
+    
+    def finalize_network(self, export_frontend: bool = True):
+        """
+        Finalize the network structure and prepare for simulation handoff.
+        
+        Args:
+            export_frontend: Whether to generate and export the frontend visualization
+                data (frontend_data.json in the working directory)
+        """
         logger.info("Finalizing network structure for simulation handoff")
         
         # Validate all connections are properly established
@@ -493,19 +915,14 @@ class AntologyGenerator:
         self._update_network_status()
         
         # Generate frontend visualization data
-        self._generate_frontend_data()
+        if export_frontend:
+            self._generate_frontend_data()
         
         logger.info("Network structure finalized - ready for simulation and frontend")
     
     def _update_network_status(self):
         """Update the internal network status for monitoring."""
-        # Count network connections by checking SKU connections
-        total_connections = 0
-        for sku_id, sku_list in self.sku_registry.items():
-            perpetual_sku = self.get_perpetual_sku(sku_id)
-            par_skus = self.get_par_skus(sku_id)
-            if perpetual_sku and par_skus:
-                total_connections += len(par_skus)
+        total_connections = self.get_network_index().num_connections
         
         self.network_status = {
             "total_locations": len(self.locations),
@@ -533,8 +950,7 @@ class AntologyGenerator:
             logger.error(f"Error generating frontend data: {e}")
     
     def on_inventory_change(self, resource: Resource, old_level: float, new_level: float):
-        """Handle inventory changes at the system level."""
-        logger.debug(f"System-level inventory change: {resource.resource_id} {old_level} -> {new_level}")
+        """Handle inventory changes at the system level (per-event activity goes to the event tracer)."""
     
     def get_network_status(self) -> Dict[str, Any]:
         """Get the current status of the entire network topology."""
@@ -0,0 +1,247 @@
+"""
+CedarSim Demand Matrix - Week x Slot Demand Tensor
+
+This module compiles the long-format demand table (week ending date, oid, location,
+quantity) once into a week x SKU-location matrix aligned to the state store slots, so
+engines and analyses index demand by (week, slot) instead of re-slicing the DataFrame.
+
+ARCHITECTURE:
+- Demand locations are resolved to SKU (PAR) locations: values that already are SKU
+  locations are used as-is, other codes go through
+  LocationMapper.map_demand_to_sku_locations
+- When a demand location maps to several SKU locations, its quantity is split evenly
+  across the ones that actually stock the SKU; rows with no matching slot are counted
+  as unmapped demand and dropped
+- SKU ids and locations are joined as interned int32 codes (id_registry); demand for
+  SKU ids that no slot stocks never enters the registry
+- Weeks are consecutive 7-day buckets from the first week ending date, so weeks with
+  no issues are explicit zero rows
+- The matrix is dense float32 or CSR (indptr / indices / data NumPy arrays, the
+  scipy.sparse layout); scipy itself is optional and only needed for to_scipy()
+- save/load write one .npy file per array, loaded with mmap_mode='r'
+
+Key Features:
+- build_demand_matrix: long-format DataFrame -> DemandMatrix
+- DemandMatrix: row access per week (dense float64 vector), usable directly by
+  VectorizedWeeklyEngine.run
+- slot_index_from_antology: (sku_code, location_code) -> slot lookup
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import hashlib
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .id_registry import canonicalize_sku_ids, get_location_id_registry, get_sku_id_registry
+except ImportError:  # Running this module directly as a script
+    from id_registry import canonicalize_sku_ids, get_location_id_registry, get_sku_id_registry
+
+logger = logging.getLogger(__name__)
+
+SlotIndex = Dict[Tuple[int, int], int]
+
+
+@dataclass
+class DemandMatrix:
+    """Week x slot demand, stored dense (float32) or as CSR arrays."""
+    weeks: np.ndarray
+    num_slots: int
+    dense: Optional[np.ndarray] = None
+    indptr: Optional[np.ndarray] = None
+    indices: Optional[np.ndarray] = None
+    data: Optional[np.ndarray] = None
+    unmapped_quantity: float = 0.0
+
+    @property
+    def is_sparse(self) -> bool:
+        """Whether the matrix is held in CSR form."""
+        return self.dense is None
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """(weeks, slots)."""
+        return len(self.weeks), self.num_slots
+
+    @property
+    def nnz(self) -> int:
+        """Number of non-zero (week, slot) entries."""
+        return len(self.data) if self.is_sparse else int(np.count_nonzero(self.dense))
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the matrix arrays."""
+        if self.is_sparse:
+            return self.indptr.nbytes + self.indices.nbytes + self.data.nbytes
+        return self.dense.nbytes
+
+    def __len__(self) -> int:
+        return len(self.weeks)
+
+    def __getitem__(self, week: int) -> np.ndarray:
+        """Demand of every slot in one week, as a dense float64 vector."""
+        if not self.is_sparse:
+            return self.dense[week].astype(np.float64)
+        row = np.zeros(self.num_slots)
+        start, end = self.indptr[week], self.indptr[week + 1]
+        row[self.indices[start:end]] = self.data[start:end]
+        return row
+
+    def to_dense(self) -> np.ndarray:
+        """Full (weeks, slots) float32 array."""
+        if not self.is_sparse:
+            return np.asarray(self.dense)
+        dense = np.zeros(self.shape, dtype=np.float32)
+        rows = np.repeat(np.arange(len(self.weeks)), np.diff(self.indptr))
+        dense[rows, self.indices] = self.data
+        return dense
+
+    def to_scipy(self):
+        """scipy.sparse.csr_matrix view of the matrix (requires scipy)."""
+        from scipy import sparse
+        if not self.is_sparse:
+            return sparse.csr_matrix(self.dense)
+        return sparse.csr_matrix((self.data, self.indices, self.indptr), shape=self.shape)
+
+    def slot_totals(self) -> np.ndarray:
+        """Total demand per slot over all weeks."""
+        if not self.is_sparse:
+            return self.dense.sum(axis=0, dtype=np.float64)
+        return np.bincount(self.indices, weights=self.data, minlength=self.num_slots)
+
+    def save(self, directory: Path, key: str = ""):
+        """Write the matrix as .npy files plus a JSON manifest."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / "weeks.npy", self.weeks)
+        arrays = ('indptr', 'indices', 'data') if self.is_sparse else ('dense',)
+        for name in arrays:
+            np.save(directory / f"{name}.npy", getattr(self, name))
+        (directory / "manifest.json").write_text(json.dumps({
+            'key': key, 'num_slots': self.num_slots, 'sparse': self.is_sparse,
+            'unmapped_quantity': self.unmapped_quantity,
+        }))
+
+    @classmethod
+    def load(cls, directory: Path, key: Optional[str] = None,
+             mmap: bool = True) -> Optional['DemandMatrix']:
+        """Load a saved matrix (memory-mapped by default); None if missing or the key differs."""
+        directory = Path(directory)
+        manifest_path = directory / "manifest.json"
+        if not manifest_path.exists():
+            return None
+        manifest = json.loads(manifest_path.read_text())
+        if key is not None and manifest.get('key') != key:
+            return None
+        mmap_mode = 'r' if mmap else None
+        arrays = ('indptr', 'indices', 'data') if manifest['sparse'] else ('dense',)
+        return cls(weeks=np.load(directory / "weeks.npy"), num_slots=manifest['num_slots'],
+                   unmapped_quantity=manifest.get('unmapped_quantity', 0.0),
+                   **{name: np.load(directory / f"{name}.npy", mmap_mode=mmap_mode) for name in arrays})
+
+
+def slot_index_from_antology(antology) -> SlotIndex:
+    """Map (sku_code, location_code) to a state store slot.
+
+    Duplicate SKU-location rows resolve to the last one added, matching Location.add_sku.
+    """
+    store = antology.state_store
+    index: SlotIndex = {}
+    for sku_list in antology.sku_registry.values():
+        for sku in sku_list:
+            index[(int(store.sku_code[sku.slot]), int(store.location_code[sku.slot]))] = sku.slot
+    return index
+
+
+def slot_index_key(slot_index: SlotIndex) -> str:
+    """Stable hash of a slot index, for keying cached matrices (hashes names, not codes)."""
+    sku_ids, locations = get_sku_id_registry(), get_location_id_registry()
+    digest = hashlib.sha256()
+    for (sku_code, location_code), slot in sorted(slot_index.items(), key=lambda item: item[1]):
+        digest.update(f"{slot}\t{sku_ids.name(sku_code)}\t{locations.name(location_code)}\n".encode())
+    return digest.hexdigest()
+
+
+def _resolve_locations(locations, location_mapper) -> pd.DataFrame:
+    """Table of demand location -> candidate SKU location codes."""
+    registry = get_location_id_registry()
+    pairs = []
+    for location in locations:
+        if location in registry:
+            pairs.append((location, registry.code(location)))
+        elif location_mapper is not None:
+            pairs.extend((location, registry.code(target))
+                         for target in location_mapper.map_demand_to_sku_locations(location)
+                         if target in registry)
+    return pd.DataFrame(pairs, columns=['location', 'location_code'])
+
+
+def build_demand_matrix(demand_data: pd.DataFrame, slot_index: SlotIndex, num_slots: int,
+                        location_mapper=None, sparse: bool = True,
+                        date_column: str = 'PO Week Ending Date', sku_column: str = 'oid',
+                        location_column: str = 'uniform_location',
+                        quantity_column: str = 'Total Qty Issues') -> DemandMatrix:
+    """
+    Compile long-format demand into a week x slot matrix.
+
+    Args:
+        demand_data: Demand rows (week ending date, SKU id, location, quantity)
+        slot_index: (sku_code, location_code) -> slot, e.g. from slot_index_from_antology
+        num_slots: Number of slots (columns)
+        location_mapper: LocationMapper for demand codes that are not SKU locations
+        sparse: Build CSR arrays instead of a dense float32 array
+        date_column, sku_column, location_column, quantity_column: Demand column names
+
+    Returns:
+        DemandMatrix aligned to the slot index
+    """
+    dates = pd.to_datetime(demand_data[date_column])
+    if len(dates) == 0:
+        weeks = np.array([], dtype='datetime64[ns]')
+        empty = np.array([], dtype=np.float32)
+        if sparse:
+            return DemandMatrix(weeks, num_slots, indptr=np.zeros(1, dtype=np.int64),
+                                indices=np.array([], dtype=np.int32), data=empty)
+        return DemandMatrix(weeks, num_slots, dense=np.zeros((0, num_slots), dtype=np.float32))
+
+    first_week = dates.min()
+    rows = pd.DataFrame({
+        'row': np.arange(len(demand_data)),
+        'week': ((dates - first_week).dt.days // 7).to_numpy(dtype=np.int64),
+        'sku_code': get_sku_id_registry().lookup(canonicalize_sku_ids(demand_data[sku_column])),
+        'location': demand_data[location_column].astype(str).to_numpy(),
+        'quantity': demand_data[quantity_column].to_numpy(dtype=np.float64),
+    })
+    num_weeks = int(rows['week'].max()) + 1
+
+    slots = pd.DataFrame([(sku_code, location_code, slot) for (sku_code, location_code), slot in slot_index.items()],
+                         columns=['sku_code', 'location_code', 'slot'], dtype=np.int32)
+    targets = _resolve_locations(rows['location'].unique(), location_mapper)
+    targets['location_code'] = targets['location_code'].astype(np.int32)
+    matched = rows.merge(targets, on='location').merge(slots, on=['sku_code', 'location_code'])
+    # Split each demand row evenly across the matched slots that stock the SKU
+    matched['quantity'] /= matched.groupby('row')['row'].transform('size')
+
+    unmapped_quantity = float(rows['quantity'].sum() - matched['quantity'].sum())
+    if unmapped_quantity > 0:
+        logger.info(f"{unmapped_quantity:,.0f} units of demand have no matching SKU-location slot")
+
+    cells = matched.groupby(['week', 'slot'], sort=True)['quantity'].sum()
+    week_index = cells.index.get_level_values('week').to_numpy(dtype=np.int64)
+    slot_index_values = cells.index.get_level_values('slot').to_numpy(dtype=np.int32)
+    values = cells.to_numpy(dtype=np.float32)
+    weeks = (first_week + pd.to_timedelta(np.arange(num_weeks) * 7, unit='D')).to_numpy(dtype='datetime64[ns]')
+
+    if sparse:
+        indptr = np.zeros(num_weeks + 1, dtype=np.int64)
+        np.cumsum(np.bincount(week_index, minlength=num_weeks), out=indptr[1:])
+        return DemandMatrix(weeks, num_slots, indptr=indptr, indices=slot_index_values, data=values,
+                            unmapped_quantity=unmapped_quantity)
+    dense = np.zeros((num_weeks, num_slots), dtype=np.float32)
+    dense[week_index, slot_index_values] = values
+    return DemandMatrix(weeks, num_slots, dense=dense, unmapped_quantity=unmapped_quantity)
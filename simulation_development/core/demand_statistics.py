@@ -0,0 +1,270 @@
+"""
+CedarSim Demand Statistics - Rolling Demand Statistics Cube
+
+This module precomputes rolling and trailing weekly demand statistics for every
+SKU-location slot once, so target-level calculators, the dashboard and simulation code
+read one columnar table instead of re-slicing and re-aggregating the raw demand.
+
+ARCHITECTURE:
+- Input is the week x slot demand history (DemandMatrix or a dense array), so every
+  SKU-location is covered, including weeks without issues
+- Means and zero-week fractions of every window come from cumulative sums over the
+  whole (weeks, slots) array; stds and quantiles work on a sliding_window_view of the
+  history in slot chunks (stds are two-pass, from deviations to the window mean, so
+  large early demand does not leak rounding error into later windows); fixed windows
+  emit NaN until they are full, the full-history window is expanding
+- The cube is a long table with one row per (week, slot) and one float32 column per
+  statistic and window, e.g. std_13w or p90_full; sku_id and location are categoricals
+- Statistics are of weekly quantities with population std (ddof=0); divide by 7 for
+  daily demand
+- The "trailing" statistics are the rows of the last week
+- save/load use Parquet (requires pyarrow); load can push a week filter down into the read
+
+Key Features:
+- build_demand_statistics: demand history -> statistics cube
+- trailing_statistics: last-week rows, one per slot
+- save_demand_statistics / load_demand_statistics: Parquet storage
+- slot_labels_from_antology: (sku_id, location) of every state store slot
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    from .id_registry import get_location_id_registry, get_sku_id_registry
+except ImportError:  # Running this module directly as a script
+    from id_registry import get_location_id_registry, get_sku_id_registry
+
+logger = logging.getLogger(__name__)
+
+# Rolling windows in weeks; None is the full (expanding) history
+DEFAULT_WINDOWS: Tuple[Optional[int], ...] = (4, 13, 26, 52, None)
+
+DEFAULT_QUANTILES: Tuple[float, ...] = (0.5, 0.9, 0.95)
+
+ROW_COLUMNS = ['week', 'slot', 'sku_id', 'location']
+
+# Memory budget for the sliding-window copy when computing rolling stds and quantiles
+WINDOW_CHUNK_BYTES = 64 << 20
+
+
+def window_label(window: Optional[int]) -> str:
+    """Column suffix of a window: '13w' or 'full'."""
+    return "full" if window is None else f"{window}w"
+
+
+def quantile_label(quantile: float) -> str:
+    """Statistic name of a quantile: 0.9 -> 'p90'."""
+    return f"p{quantile * 100:g}"
+
+
+def statistic_names(quantiles: Sequence[float] = DEFAULT_QUANTILES) -> list:
+    """Names of the statistics computed per window."""
+    return ['mean', 'std', 'cv', 'zero_fraction'] + [quantile_label(q) for q in quantiles]
+
+
+def _window_means(values: np.ndarray, window: Optional[int]) -> np.ndarray:
+    """Rolling (or expanding, window=None) mean along the week axis from one cumulative sum."""
+    num_weeks = len(values)
+    totals = np.zeros((num_weeks + 1,) + values.shape[1:])
+    np.cumsum(values, axis=0, out=totals[1:])
+    if window is None:
+        return totals[1:] / np.arange(1, num_weeks + 1)[:, None]
+    means = np.full(values.shape, np.nan)
+    if window <= num_weeks:
+        means[window - 1:] = (totals[window:] - totals[:-window]) / window
+    return means
+
+
+def _window_chunks(history: np.ndarray, span: int):
+    """
+    Yield (start, end, windows) per slot chunk, windows being a (weeks, chunk, span)
+    sliding_window_view over the history padded with span - 1 leading NaN weeks.
+
+    Chunks are sized so one copy of the windows fits in WINDOW_CHUNK_BYTES.
+    """
+    num_weeks, num_slots = history.shape
+    padded = np.vstack([np.full((span - 1, num_slots), np.nan), history])
+    chunk_slots = max(1, WINDOW_CHUNK_BYTES // (num_weeks * span * 8))
+    for start in range(0, num_slots, chunk_slots):
+        end = min(start + chunk_slots, num_slots)
+        yield start, end, sliding_window_view(padded[:, start:end], span, axis=0)
+
+
+def _window_stds(history: np.ndarray, window: Optional[int], mean: np.ndarray) -> np.ndarray:
+    """
+    Rolling (or expanding) population std, (weeks, slots), from deviations to the window mean.
+
+    Uses the corrected two-pass formula E[d^2] - E[d]^2 with d = x - mean, so rounding
+    in mean cancels and a constant window has a std of exactly 0 however large the
+    demand before it was.
+    """
+    num_weeks, num_slots = history.shape
+    span = num_weeks if window is None else window
+    std = np.full((num_weeks, num_slots), np.nan)
+    if num_weeks == 0 or span > num_weeks:
+        return std
+
+    counts = np.minimum(np.arange(1, num_weeks + 1), span)[:, None]
+    for start, end, windows in _window_chunks(history, span):
+        deviations = windows - mean[:, start:end, None]  # NaN padding drops out of the sums
+        residual = np.nansum(deviations, axis=-1) / counts
+        squares = np.nansum(np.square(deviations, out=deviations), axis=-1) / counts
+        std[:, start:end] = np.sqrt(np.maximum(squares - residual ** 2, 0.0))
+    if window is not None:
+        std[:window - 1] = np.nan
+    return std
+
+
+def _window_quantiles(history: np.ndarray, window: Optional[int],
+                      quantiles: Sequence[float]) -> np.ndarray:
+    """
+    Rolling (or expanding) quantiles with linear interpolation, (quantiles, weeks, slots).
+
+    Each week's window is a row of a sliding_window_view over the history padded with
+    NaN (which sorts last); the windows are sorted once per slot chunk and every
+    quantile is read off the sorted values.
+    """
+    num_weeks, num_slots = history.shape
+    span = num_weeks if window is None else window
+    result = np.full((len(quantiles), num_weeks, num_slots), np.nan)
+    if num_weeks == 0 or span > num_weeks:
+        return result
+
+    counts = np.minimum(np.arange(1, num_weeks + 1), span)
+    positions = np.asarray(quantiles, dtype=np.float64)[:, None] * (counts - 1)
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.minimum(lower + 1, counts - 1)
+    fraction = (positions - lower)[:, :, None]
+
+    weeks = np.arange(num_weeks)[:, None]
+    for start, end, windows in _window_chunks(history, span):
+        ordered = np.sort(windows, axis=-1)
+        slots = np.arange(end - start)[None, :]
+        for i in range(len(quantiles)):
+            low = ordered[weeks, slots, lower[i][:, None]]
+            high = ordered[weeks, slots, upper[i][:, None]]
+            result[i, :, start:end] = low + (high - low) * fraction[i]
+    if window is not None:
+        result[:, :window - 1] = np.nan
+    return result
+
+
+def rolling_statistics(history: np.ndarray, window: Optional[int],
+                       quantiles: Sequence[float] = DEFAULT_QUANTILES) -> Dict[str, np.ndarray]:
+    """
+    Rolling statistics of every slot for one window.
+
+    Args:
+        history: (weeks, slots) weekly demand
+        window: Window length in weeks, or None for the full history up to each week
+        quantiles: Demand quantiles to compute
+
+    Returns:
+        Statistic name -> (weeks, slots) float64 array (NaN until the window is full)
+    """
+    history = np.asarray(history, dtype=np.float64)
+    mean = _window_means(history, window)
+    std = _window_stds(history, window, mean)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cv = np.where(mean > 0, std / mean, np.nan)
+    stats = {'mean': mean, 'std': std, 'cv': cv,
+             'zero_fraction': _window_means((history == 0).astype(np.float64), window)}
+    for quantile, values in zip(quantiles, _window_quantiles(history, window, quantiles)):
+        stats[quantile_label(quantile)] = values
+    return stats
+
+
+def slot_labels_from_antology(antology) -> Tuple[np.ndarray, np.ndarray]:
+    """SKU id and location name of every state store slot."""
+    store = antology.state_store
+    return (get_sku_id_registry().names(store.sku_code[:store.size]),
+            get_location_id_registry().names(store.location_code[:store.size]))
+
+
+def build_demand_statistics(demand, sku_ids: Sequence[str], locations: Sequence[str],
+                            weeks: Optional[np.ndarray] = None,
+                            windows: Iterable[Optional[int]] = DEFAULT_WINDOWS,
+                            quantiles: Sequence[float] = DEFAULT_QUANTILES) -> pd.DataFrame:
+    """
+    Build the statistics cube from the week x slot demand history.
+
+    Args:
+        demand: DemandMatrix or (weeks, slots) array of weekly demand
+        sku_ids: SKU id of every slot
+        locations: Location name of every slot
+        weeks: Week ending dates (default: demand.weeks, else week numbers)
+        windows: Rolling windows in weeks (None = full history)
+        quantiles: Demand quantiles per window
+
+    Returns:
+        DataFrame with week, slot, sku_id, location and one float32 column per
+        statistic and window, ordered by week then slot
+    """
+    history = demand.to_dense() if hasattr(demand, 'to_dense') else np.asarray(demand)
+    num_weeks, num_slots = history.shape
+    if len(sku_ids) != num_slots or len(locations) != num_slots:
+        raise ValueError(f"Expected {num_slots} slot labels, got {len(sku_ids)} SKU ids "
+                         f"and {len(locations)} locations")
+    if weeks is None:
+        weeks = demand.weeks if hasattr(demand, 'weeks') else np.arange(num_weeks)
+
+    def tiled(labels) -> pd.Categorical:
+        codes, categories = pd.factorize(np.asarray(labels, dtype=object))
+        return pd.Categorical.from_codes(np.tile(codes, num_weeks), categories)
+
+    columns = {
+        'week': np.repeat(np.asarray(weeks), num_slots),
+        'slot': np.tile(np.arange(num_slots, dtype=np.int32), num_weeks),
+        'sku_id': tiled(sku_ids),
+        'location': tiled(locations),
+    }
+    for window in windows:
+        for name, values in rolling_statistics(history, window, quantiles).items():
+            columns[f"{name}_{window_label(window)}"] = values.astype(np.float32).ravel()
+
+    cube = pd.DataFrame(columns)
+    logger.info(f"Built demand statistics for {num_slots:,} slots x {num_weeks} weeks "
+                f"({cube.memory_usage(deep=True).sum() / 1e6:.1f} MB)")
+    return cube
+
+
+def trailing_statistics(cube: pd.DataFrame) -> pd.DataFrame:
+    """Statistics as of the last week, one row per slot."""
+    if cube.empty:
+        return cube.copy()
+    return cube[cube['week'] == cube['week'].max()].reset_index(drop=True)
+
+
+def save_demand_statistics(cube: pd.DataFrame, path: Path):
+    """Write the cube to a Parquet file (atomically replaced)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    cube.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def load_demand_statistics(path: Path, columns: Optional[Sequence[str]] = None,
+                           weeks: Optional[Iterable] = None) -> pd.DataFrame:
+    """
+    Read a saved cube, optionally only some statistic columns and weeks.
+
+    Args:
+        path: Parquet file written by save_demand_statistics
+        columns: Statistic columns to read (the row columns are always included)
+        weeks: Only read these weeks (pushed down into the Parquet read)
+
+    Returns:
+        Statistics cube
+    """
+    if columns is not None:
+        columns = ROW_COLUMNS + [column for column in columns if column not in ROW_COLUMNS]
+    filters = [('week', 'in', list(weeks))] if weeks is not None else None
+    return pd.read_parquet(path, columns=columns, filters=filters)
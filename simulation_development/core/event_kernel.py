@@ -0,0 +1,453 @@
+"""
+CedarSim Event Kernel - Lightweight Discrete-Event Scheduler
+
+This module implements a purpose-built discrete-event kernel for runs that need
+sub-weekly timing (e.g. the fractional lead_time_weeks computed by SKU.__init__),
+as a faster alternative to running one SimPy process per SKU-location.
+
+ARCHITECTURE:
+- EventKernel: binary heap of distinct (time, kind) keys, each owning a FIFO bucket
+  of events, so events sharing a timestamp cost one dict append instead of a heap push
+- Typed event records: DeliveryData / DemandData payloads addressed to a SKU
+- Batch dispatch: all events sharing a timestamp and kind go to one handler call
+- No generators or coroutines on the hot path - handlers are plain callables
+- SimPyCompatibleEnvironment: small SimPy-style API (now, timeout, event, process,
+  run) on top of the kernel, so SimPy-style models can switch backends
+
+Within one timestamp, deliveries are dispatched before demand so stock that arrives
+at time t can serve demand at time t.
+"""
+
+from enum import IntEnum
+from typing import Callable, Dict, List, Optional, Any, Tuple
+import heapq
+import logging
+import time as _time
+
+try:
+    from .core_models import DeliveryData, DemandData, SKU
+    from .event_trace import event_tracer
+except ImportError:  # Running this module directly as a script
+    from core_models import DeliveryData, DemandData, SKU
+    from event_trace import event_tracer
+
+logger = logging.getLogger(__name__)
+
+class EventKind(IntEnum):
+    """Event kinds; the value is the dispatch order within one timestamp."""
+    DELIVERY = 0
+    DEMAND = 1
+    REVIEW = 2
+    CALLBACK = 3
+
+# Handler signature: handler(batch, time) with batch = [(payload, target), ...]
+EventHandler = Callable[[List[Tuple[Any, Any]], float], None]
+
+
+def _dispatch_deliveries(batch: List[Tuple[DeliveryData, SKU]], time: float):
+    """Land a batch of deliveries on their SKUs."""
+    for delivery, sku in batch:
+        sku.process_delivery_data(delivery)
+
+def _dispatch_demand(batch: List[Tuple[DemandData, SKU]], time: float):
+    """Apply a batch of demand events to their SKUs."""
+    for demand, sku in batch:
+        sku.process_demand_data(demand)
+
+
+class EventKernel:
+    """Heap-based future event list with batch dispatch of same-time events."""
+
+    def __init__(self, start_time: float = 0.0):
+        self.now = start_time
+        self.events_processed = 0
+        self._heap: List[Tuple[float, EventKind]] = []  # distinct (time, kind) keys
+        self._buckets: Dict[Tuple[float, EventKind], List[Tuple[Any, Any]]] = {}
+        self._pending = 0
+        self._handlers: Dict[EventKind, EventHandler] = {
+            EventKind.DELIVERY: _dispatch_deliveries,
+            EventKind.DEMAND: _dispatch_demand,
+        }
+
+    def __len__(self) -> int:
+        """Number of scheduled events."""
+        return self._pending
+
+    def register_handler(self, kind: EventKind, handler: EventHandler):
+        """Set the batch handler for an event kind."""
+        self._handlers[kind] = handler
+
+    def schedule(self, time: float, kind: EventKind, payload: Any = None, target: Any = None):
+        """Schedule an event at an absolute time."""
+        if time < self.now:
+            raise ValueError(f"Cannot schedule event in the past: {time} < {self.now}")
+        key = (time, kind)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            self._buckets[key] = [(payload, target)]
+            heapq.heappush(self._heap, key)
+        else:
+            bucket.append((payload, target))
+        self._pending += 1
+
+    def schedule_delivery(self, sku: SKU, delivery_data: DeliveryData):
+        """Register a pending shipment on the SKU and schedule its arrival."""
+        sku.add_pending_shipment(delivery_data)
+        self.schedule(delivery_data.time, EventKind.DELIVERY, delivery_data, sku)
+
+    def schedule_demand(self, sku: SKU, demand_data: DemandData):
+        """Schedule a demand event for the SKU."""
+        self.schedule(demand_data.time, EventKind.DEMAND, demand_data, sku)
+
+    def peek(self) -> Optional[float]:
+        """Get the time of the next event, or None if nothing is scheduled."""
+        return self._heap[0][0] if self._heap else None
+
+    def step(self) -> int:
+        """Dispatch the next batch of events sharing one timestamp and kind.
+
+        Returns:
+            Number of events dispatched
+        """
+        key = heapq.heappop(self._heap)
+        batch = self._buckets.pop(key)
+        event_time, kind = key
+        self.now = event_time
+        event_tracer.now = event_time
+        self._pending -= len(batch)
+        handler = self._handlers.get(kind)
+        if handler is None:
+            raise KeyError(f"No handler registered for event kind {kind.name}")
+        handler(batch, event_time)
+        self.events_processed += len(batch)
+        return len(batch)
+
+    def run(self, until: Optional[float] = None):
+        """Dispatch events until the queue is empty or the next event is at/after until."""
+        heap = self._heap
+        while heap and (until is None or heap[0][0] < until):
+            self.step()
+        if until is not None:
+            self.now = max(self.now, until)
+
+
+# ---------------------------------------------------------------------------
+# SimPy-compatible adapter
+# ---------------------------------------------------------------------------
+
+_PENDING = object()
+
+class KernelEvent:
+    """SimPy-style event that processes can yield on."""
+
+    def __init__(self, env: 'SimPyCompatibleEnvironment'):
+        self.env = env
+        self.callbacks: Optional[List[Callable[['KernelEvent'], None]]] = []
+        self._value = _PENDING
+
+    @property
+    def triggered(self) -> bool:
+        """Whether the event has been given a value."""
+        return self._value is not _PENDING
+
+    @property
+    def processed(self) -> bool:
+        """Whether the event's callbacks have run."""
+        return self.callbacks is None
+
+    @property
+    def value(self) -> Any:
+        """The event's value (only available once triggered)."""
+        if self._value is _PENDING:
+            raise AttributeError("Value of event is not yet available")
+        return self._value
+
+    def succeed(self, value: Any = None) -> 'KernelEvent':
+        """Trigger the event now; callbacks run when the kernel reaches it."""
+        if self.triggered:
+            raise RuntimeError(f"{self} has already been triggered")
+        self._value = value
+        self.env._kernel.schedule(self.env.now, EventKind.CALLBACK, self)
+        return self
+
+    def _add_callback(self, callback: Callable[['KernelEvent'], None]) -> 'KernelEvent':
+        self.callbacks.append(callback)
+        return self
+
+    def _run_callbacks(self):
+        callbacks, self.callbacks = self.callbacks, None
+        for callback in callbacks:
+            callback(self)
+
+class Timeout(KernelEvent):
+    """Event that triggers after a delay."""
+
+    def __init__(self, env: 'SimPyCompatibleEnvironment', delay: float, value: Any = None):
+        if delay < 0:
+            raise ValueError(f"Negative delay {delay}")
+        super().__init__(env)
+        self._value = value
+        env._kernel.schedule(env.now + delay, EventKind.CALLBACK, self)
+
+class Process(KernelEvent):
+    """Drives a generator that yields events; triggers with the generator's return value."""
+
+    def __init__(self, env: 'SimPyCompatibleEnvironment', generator):
+        super().__init__(env)
+        self._generator = generator
+        KernelEvent(env).succeed()._add_callback(self._resume)
+
+    def _resume(self, event: KernelEvent):
+        try:
+            target = self._generator.send(event._value if event._value is not _PENDING else None)
+        except StopIteration as stop:
+            self.succeed(stop.value)
+            return
+        if not isinstance(target, KernelEvent):
+            raise RuntimeError(f"Process yielded a non-event: {target!r}")
+        if target.processed:
+            KernelEvent(self.env).succeed(target._value)._add_callback(self._resume)
+        else:
+            target.callbacks.append(self._resume)
+
+    @property
+    def is_alive(self) -> bool:
+        """Whether the generator has not finished yet."""
+        return not self.triggered
+
+class SimPyCompatibleEnvironment:
+    """Subset of the simpy.Environment API backed by an EventKernel."""
+
+    def __init__(self, initial_time: float = 0.0, kernel: Optional[EventKernel] = None):
+        self._kernel = kernel if kernel is not None else EventKernel(initial_time)
+        self._kernel.register_handler(EventKind.CALLBACK, self._dispatch_callbacks)
+
+    @staticmethod
+    def _dispatch_callbacks(batch: List[Tuple[KernelEvent, Any]], time: float):
+        for event, _ in batch:
+            event._run_callbacks()
+
+    @property
+    def now(self) -> float:
+        """Current simulation time."""
+        return self._kernel.now
+
+    @property
+    def kernel(self) -> EventKernel:
+        """The underlying event kernel (for typed delivery/demand events)."""
+        return self._kernel
+
+    def event(self) -> KernelEvent:
+        """Create an untriggered event."""
+        return KernelEvent(self)
+
+    def timeout(self, delay: float, value: Any = None) -> Timeout:
+        """Create an event that triggers after delay."""
+        return Timeout(self, delay, value)
+
+    def process(self, generator) -> Process:
+        """Start a process from a generator."""
+        return Process(self, generator)
+
+    def run(self, until: Optional[float] = None):
+        """Run until no events remain or until the given time."""
+        self._kernel.run(until)
+
+def create_environment(backend: str = "kernel", initial_time: float = 0.0):
+    """
+    Create a simulation environment for the requested backend.
+
+    Args:
+        backend: "kernel" for the built-in EventKernel, "simpy" for simpy.Environment
+        initial_time: Starting simulation time
+
+    Returns:
+        An environment exposing now, timeout, event, process and run
+    """
+    if backend == "kernel":
+        return SimPyCompatibleEnvironment(initial_time)
+    if backend == "simpy":
+        try:
+            import simpy
+        except ImportError as e:
+            raise ImportError("SimPy backend requested but simpy is not installed") from e
+        return simpy.Environment(initial_time)
+    raise ValueError(f"Unknown simulation backend: {backend}")
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def _order_up_to(sku: SKU, now: float) -> Optional[DeliveryData]:
+    """Place an order-up-to-level order; returns the delivery or None."""
+    gap = sku.calculate_inventory_gap(now)
+    if gap <= 0:
+        return None
+    return DeliveryData(sku.resource_id, gap, now + max(sku.lead_time_weeks, 1.0 / 7.0))
+
+def benchmark_against_simpy(antology, weeks: int = 52, seed: int = 0) -> Dict[str, Any]:
+    """
+    Compare events per second of EventKernel and SimPy on an antology's topology.
+
+    Every SKU-location gets one demand event per week on a fixed day of the week;
+    each demand event places an order-up-to-level order whose delivery arrives after
+    the SKU's fractional lead time. Both backends run the identical workload.
+
+    Returns:
+        Dictionary with events and events/second for each backend
+    """
+    import random
+
+    skus = [sku for sku_list in antology.sku_registry.values() for sku in sku_list]
+    rng = random.Random(seed)
+    offsets = [rng.randrange(7) / 7.0 for _ in skus]
+    demand = [[float(int(rng.expovariate(1.0) * sku.demand_rate)) for _ in range(weeks)] for sku in skus]
+    initial_levels = [sku.target_level for sku in skus]
+
+    def reset():
+        for sku, level in zip(skus, initial_levels):
+            sku._pending_shipments = type(sku._pending_shipments)()
+            sku.set_inventory_level(level)
+
+    results: Dict[str, Any] = {'sku_locations': len(skus), 'weeks': weeks}
+
+    # EventKernel: typed events, batch dispatch
+    reset()
+    kernel = EventKernel()
+
+    def on_demand(batch, now):
+        for demand_data, sku in batch:
+            sku.process_demand_data(demand_data)
+            delivery = _order_up_to(sku, now)
+            if delivery is not None:
+                kernel.schedule_delivery(sku, delivery)
+
+    kernel.register_handler(EventKind.DEMAND, on_demand)
+    for sku, offset, series in zip(skus, offsets, demand):
+        for week, quantity in enumerate(series):
+            kernel.schedule_demand(sku, DemandData(sku.resource_id, quantity, week + offset, sku.location_id))
+    start = _time.perf_counter()
+    kernel.run()
+    elapsed = _time.perf_counter() - start
+    results['kernel_events'] = kernel.events_processed
+    results['kernel_seconds'] = elapsed
+    results['kernel_events_per_second'] = kernel.events_processed / elapsed if elapsed else float('inf')
+
+    # SimPy: one process per SKU-location plus one per delivery
+    try:
+        import simpy
+    except ImportError:
+        logger.warning("simpy not installed - skipping SimPy side of the benchmark")
+        return results
+
+    reset()
+    env = simpy.Environment()
+    counter = {'events': 0}
+
+    def deliver(sku, delivery):
+        yield env.timeout(delivery.time - env.now)
+        sku.process_delivery_data(delivery)
+        counter['events'] += 1
+
+    def sku_process(sku, offset, series):
+        yield env.timeout(offset)
+        for week, quantity in enumerate(series):
+            sku.process_demand_data(DemandData(sku.resource_id, quantity, env.now, sku.location_id))
+            counter['events'] += 1
+            delivery = _order_up_to(sku, env.now)
+            if delivery is not None:
+                sku.add_pending_shipment(delivery)
+                env.process(deliver(sku, delivery))
+            if week + 1 < len(series):
+                yield env.timeout(1)
+
+    for sku, offset, series in zip(skus, offsets, demand):
+        env.process(sku_process(sku, offset, series))
+    start = _time.perf_counter()
+    env.run()
+    elapsed = _time.perf_counter() - start
+    results['simpy_events'] = counter['events']
+    results['simpy_seconds'] = elapsed
+    results['simpy_events_per_second'] = counter['events'] / elapsed if elapsed else float('inf')
+
+    results.update(benchmark_scheduling_overhead(len(skus), weeks, offsets))
+    return results
+
+def benchmark_scheduling_overhead(num_processes: int, weeks: int,
+                                  offsets: Optional[List[float]] = None) -> Dict[str, Any]:
+    """
+    Compare pure scheduling cost (no model work) of EventKernel and SimPy.
+
+    Schedules num_processes weekly recurring events for the given number of weeks.
+    Both sides are timed from scheduling the first event to the end of the run.
+
+    Args:
+        num_processes: Recurring event streams
+        weeks: Events per stream
+        offsets: Start offset of each stream within the first week (the first
+            num_processes are used; default: evenly spread over [0, 1), so no two
+            streams share a timestamp)
+
+    Returns:
+        Dictionary with events/second for the kernel and, if installed, SimPy
+    """
+    if offsets is None:
+        offsets = [i / num_processes for i in range(num_processes)]
+    elif len(offsets) < num_processes:
+        raise ValueError(f"Expected {num_processes} offsets, got {len(offsets)}")
+    offsets = list(offsets)[:num_processes]
+    results: Dict[str, Any] = {}
+
+    start = _time.perf_counter()
+    kernel = EventKernel()
+    kernel.register_handler(EventKind.REVIEW, lambda batch, now: None)
+    for offset in offsets:
+        for week in range(weeks):
+            kernel.schedule(week + offset, EventKind.REVIEW)
+    kernel.run()
+    elapsed = _time.perf_counter() - start
+    results['kernel_overhead_events_per_second'] = kernel.events_processed / elapsed if elapsed else float('inf')
+
+    try:
+        import simpy
+    except ImportError:
+        return results
+
+    def ticker(env, offset):
+        yield env.timeout(offset)
+        for _ in range(weeks - 1):
+            yield env.timeout(1)
+
+    start = _time.perf_counter()
+    env = simpy.Environment()
+    for offset in offsets:
+        env.process(ticker(env, offset))
+    env.run()
+    elapsed = _time.perf_counter() - start
+    results['simpy_overhead_events_per_second'] = num_processes * weeks / elapsed if elapsed else float('inf')
+    return results
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from data.input_data.data_integration import DataIntegrator
+
+    antology = DataIntegrator().create_antology_structure()
+
+    results = benchmark_against_simpy(antology)
+    print("=" * 60)
+    print("EVENT KERNEL vs SIMPY")
+    print("=" * 60)
+    print(f"SKU-locations: {results['sku_locations']:,}  Weeks: {results['weeks']}")
+    print(f"EventKernel: {results['kernel_events']:,} events, "
+          f"{results['kernel_events_per_second']:,.0f} events/s")
+    if 'simpy_events' in results:
+        print(f"SimPy:       {results['simpy_events']:,} events, "
+              f"{results['simpy_events_per_second']:,.0f} events/s")
+    print("\nScheduling overhead only (no model work):")
+    print(f"EventKernel: {results['kernel_overhead_events_per_second']:,.0f} events/s")
+    if 'simpy_overhead_events_per_second' in results:
+        print(f"SimPy:       {results['simpy_overhead_events_per_second']:,.0f} events/s")
@@ -0,0 +1,113 @@
+"""
+CedarSim ID Registry - Dictionary-Encoded SKU and Location IDs
+
+This module interns canonical SKU ids and location names into dense int32 codes, so
+arrays and joins work on small integers and the strings are only needed for display.
+
+ARCHITECTURE:
+- canonical_sku_id / canonicalize_sku_ids define the one canonical SKU id format:
+  stripped, Excel-style "5.0" floats collapsed, zero-padded to 6 characters
+- IdRegistry assigns codes 0..n-1 in first-seen order and keeps the reverse table
+- Process-wide registries for SKUs and locations (get_sku_id_registry /
+  get_location_id_registry); codes are local to a process, so anything persisted to
+  disk stores names, not codes
+- Every SKU records its codes in the state store (sku_code / location_code columns)
+
+Key Features:
+- intern / intern_many: name(s) -> code(s), adding unseen names
+- lookup: vectorized name -> code without adding names (-1 if unknown)
+- name / names: reverse lookup for display
+"""
+
+from typing import Any, Dict, Iterable, List
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SKU_ID_WIDTH = 6
+
+UNKNOWN_CODE = -1
+
+
+def canonical_sku_id(value: Any) -> str:
+    """Canonical SKU id for a single value (e.g. 5, "5", "5.0", "000005" -> "000005")."""
+    text = str(value).strip()
+    if text.endswith('.0') and text[:-2].isdigit():
+        text = text[:-2]
+    return text.zfill(SKU_ID_WIDTH)
+
+
+def canonicalize_sku_ids(values: Iterable[Any]) -> pd.Series:
+    """Vectorized canonical_sku_id over a column of SKU ids; missing ids stay NaN."""
+    values = pd.Series(values)
+    missing = values.isna()
+    text = values.astype(str).str.strip()
+    text = text.str.replace(r'^(\d+)\.0$', r'\1', regex=True)
+    return text.str.zfill(SKU_ID_WIDTH).where(~missing)
+
+
+class IdRegistry:
+    """Bidirectional string <-> dense int32 code table."""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self._codes: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._index: pd.Index = None  # Lazily rebuilt for vectorized lookups
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._codes
+
+    def intern(self, name: str) -> int:
+        """Get the code of a name, assigning the next code if it is new."""
+        code = self._codes.get(name)
+        if code is None:
+            code = len(self._names)
+            self._codes[name] = code
+            self._names.append(name)
+            self._index = None
+        return code
+
+    def intern_many(self, names: Iterable[str]) -> np.ndarray:
+        """Intern a column of names and return their codes (missing names are not interned: -1)."""
+        names = pd.Series(names, dtype=object)
+        for name in pd.unique(names.dropna()):
+            self.intern(name)
+        return self.lookup(names)
+
+    def code(self, name: str) -> int:
+        """Get the code of a known name (KeyError if unknown)."""
+        return self._codes[name]
+
+    def lookup(self, names: Iterable[str]) -> np.ndarray:
+        """Vectorized name -> code for known names; unknown names map to -1."""
+        if self._index is None:
+            self._index = pd.Index(self._names, dtype=object)
+        return self._index.get_indexer(pd.Index(names, dtype=object)).astype(np.int32)
+
+    def name(self, code: int) -> str:
+        """Reverse lookup of one code."""
+        return self._names[code]
+
+    def names(self, codes: Iterable[int]) -> np.ndarray:
+        """Reverse lookup of an array of codes."""
+        return np.asarray(self._names, dtype=object)[np.asarray(codes, dtype=np.int64)]
+
+
+# Global instances shared by every SKU and Location in the process
+sku_id_registry = IdRegistry("SKU")
+location_id_registry = IdRegistry("location")
+
+def get_sku_id_registry() -> IdRegistry:
+    """Get the global SKU id registry."""
+    return sku_id_registry
+
+def get_location_id_registry() -> IdRegistry:
+    """Get the global location name registry."""
+    return location_id_registry
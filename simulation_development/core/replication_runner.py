@@ -0,0 +1,277 @@
+"""
+CedarSim Replication Runner - Parallel Monte Carlo Replications
+
+This module runs many independent replications of the VectorizedWeeklyEngine across a
+process pool to put confidence intervals on stockout KPIs.
+
+ARCHITECTURE:
+- The topology and parameters are compiled ONCE into flat NumPy arrays
+  (CompiledTopology) and placed in a single shared-memory block
+- Each worker attaches to the block once (pool initializer) - no AntologyGenerator is
+  rebuilt or pickled per worker
+- Every replication gets its own random stream spawned from one SeedSequence, so
+  results are reproducible and independent of worker count and scheduling
+- Per-replication KPI totals stream back as futures complete and are folded into
+  online (Welford) statistics
+
+Key Features:
+- compile_topology: AntologyGenerator -> CompiledTopology arrays
+- SharedTopology: shared-memory packing/attachment of the compiled arrays
+- ReplicationRunner: ProcessPoolExecutor fan-out with chunked submission
+- OnlineStatistics: streaming mean, standard deviation and 95% confidence interval
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, fields
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Optional, Any, Tuple
+import logging
+import math
+import time
+
+import numpy as np
+
+try:
+    from .state_store import InventoryStateStore
+    from .vectorized_engine import VectorizedWeeklyEngine, KPI_NAMES
+except ImportError:  # Running this module directly as a script
+    from state_store import InventoryStateStore
+    from vectorized_engine import VectorizedWeeklyEngine, KPI_NAMES
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CompiledTopology:
+    """Flat per-slot arrays describing the network and its replenishment parameters."""
+    target_level: np.ndarray
+    lead_time_days: np.ndarray
+    lead_time_weeks: np.ndarray
+    demand_rate: np.ndarray
+    initial_level: np.ndarray
+    is_perpetual: np.ndarray
+    perpetual_slot: np.ndarray
+
+    @property
+    def num_slots(self) -> int:
+        """Number of SKU-location slots."""
+        return len(self.target_level)
+
+    def build_state_store(self) -> InventoryStateStore:
+        """Create a fresh, independently mutable state store for one replication."""
+        return InventoryStateStore.from_columns({
+            'target_level': self.target_level,
+            'lead_time_days': self.lead_time_days,
+            'lead_time_weeks': self.lead_time_weeks,
+            'demand_rate': self.demand_rate,
+            'current_level': self.initial_level,
+            'is_perpetual': self.is_perpetual,
+        })
+
+
+def compile_topology(antology) -> CompiledTopology:
+    """Compile an AntologyGenerator's state store and emergency network into flat arrays."""
+    store = antology.state_store
+    return CompiledTopology(
+        target_level=store.column('target_level').copy(),
+        lead_time_days=store.column('lead_time_days').copy(),
+        lead_time_weeks=store.column('lead_time_weeks').copy(),
+        demand_rate=store.column('demand_rate').copy(),
+        initial_level=store.column('current_level').copy(),
+        is_perpetual=store.column('is_perpetual').copy(),
+        perpetual_slot=antology.get_network_index().perpetual_of.copy(),
+    )
+
+
+class SharedTopology:
+    """A CompiledTopology packed into one shared-memory block."""
+
+    def __init__(self, shm: shared_memory.SharedMemory, layout: Dict[str, Tuple[int, str, int]],
+                 owner: bool):
+        self._shm = shm
+        self.layout = layout
+        self._owner = owner
+        self.topology = CompiledTopology(**{
+            name: np.ndarray((length,), dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+            for name, (offset, dtype, length) in layout.items()
+        })
+
+    @classmethod
+    def create(cls, topology: CompiledTopology) -> 'SharedTopology':
+        """Copy a compiled topology into a new shared-memory block."""
+        layout = {}
+        offset = 0
+        for field in fields(CompiledTopology):
+            array = np.ascontiguousarray(getattr(topology, field.name))
+            offset = (offset + 7) // 8 * 8  # 8-byte alignment
+            layout[field.name] = (offset, array.dtype.str, len(array))
+            offset += array.nbytes
+        shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        shared = cls(shm, layout, owner=True)
+        for field in fields(CompiledTopology):
+            getattr(shared.topology, field.name)[:] = getattr(topology, field.name)
+        return shared
+
+    @classmethod
+    def attach(cls, spec: Tuple[str, Dict[str, Tuple[int, str, int]]]) -> 'SharedTopology':
+        """Attach to an existing block from its (name, layout) spec."""
+        name, layout = spec
+        return cls(shared_memory.SharedMemory(name=name), layout, owner=False)
+
+    @property
+    def spec(self) -> Tuple[str, Dict[str, Tuple[int, str, int]]]:
+        """Picklable handle for attaching from another process."""
+        return self._shm.name, self.layout
+
+    def close(self):
+        """Release this process's mapping (and the block itself if this process created it)."""
+        self.topology = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+class OnlineStatistics:
+    """Streaming mean/variance (Welford) with a normal-approximation confidence interval."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value: float):
+        """Fold one observation into the statistics."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def std(self) -> float:
+        """Sample standard deviation."""
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def confidence_interval(self, z: float = 1.96) -> Tuple[float, float]:
+        """Confidence interval for the mean (95% by default)."""
+        half_width = z * self.std / math.sqrt(self.count) if self.count else 0.0
+        return self.mean - half_width, self.mean + half_width
+
+    def summary(self) -> Dict[str, float]:
+        """Get count, mean, std and confidence bounds."""
+        low, high = self.confidence_interval()
+        return {'count': self.count, 'mean': self.mean, 'std': self.std, 'ci_low': low, 'ci_high': high}
+
+
+# Worker-side state, set once per process by _init_worker
+_worker_topology: Optional[SharedTopology] = None
+
+def _init_worker(spec):
+    """Attach the shared topology once per worker process."""
+    global _worker_topology
+    _worker_topology = SharedTopology.attach(spec)
+
+def _run_replications(seeds: List[np.random.SeedSequence], weeks: int,
+                      topology: Optional[CompiledTopology] = None) -> List[Dict[str, float]]:
+    """Run a chunk of replications and return their KPI totals."""
+    topology = topology if topology is not None else _worker_topology.topology
+    results = []
+    for seed in seeds:
+        rng = np.random.default_rng(seed)
+        store = topology.build_state_store()
+        engine = VectorizedWeeklyEngine(store, topology.perpetual_slot)
+        demand = rng.poisson(topology.demand_rate, size=(weeks, topology.num_slots)).astype(np.float64)
+        history = engine.run(demand)
+        kpis = {name: float(history[name].sum()) for name in KPI_NAMES if name != 'total_inventory'}
+        kpis['average_inventory'] = float(history['total_inventory'].mean())
+        kpis['fill_rate'] = 1.0 - kpis['unfilled_demand'] / kpis['demand'] if kpis['demand'] else 1.0
+        kpis['replication'] = int(seed.spawn_key[-1])
+        results.append(kpis)
+    return results
+
+
+class ReplicationRunner:
+    """Fan Monte Carlo replications of the weekly engine out over a process pool."""
+
+    def __init__(self, topology: CompiledTopology, weeks: int = 189,
+                 max_workers: Optional[int] = None, chunk_size: int = 4):
+        """
+        Initialize the runner.
+
+        Args:
+            topology: Compiled topology (see compile_topology)
+            weeks: Simulated weeks per replication
+            max_workers: Worker processes (None = CPU count; 0 = run in this process)
+            chunk_size: Replications per submitted task
+        """
+        self.topology = topology
+        self.weeks = weeks
+        self.max_workers = max_workers
+        self.chunk_size = max(1, chunk_size)
+
+    @classmethod
+    def from_antology(cls, antology, **kwargs) -> 'ReplicationRunner':
+        """Compile an antology and build a runner over it."""
+        return cls(compile_topology(antology), **kwargs)
+
+    def run(self, replications: int, seed: Optional[int] = None,
+            on_result: Optional[Callable[[Dict[str, float]], None]] = None) -> Dict[str, Any]:
+        """
+        Run replications and aggregate their KPIs online.
+
+        Args:
+            replications: Number of independent replications
+            seed: Root seed for the SeedSequence (None = fresh entropy)
+            on_result: Optional callback invoked with each replication's KPIs as it arrives
+
+        Returns:
+            Dictionary with per-KPI summary statistics, the root entropy and wall time
+        """
+        root = np.random.SeedSequence(seed)
+        seeds = root.spawn(replications)
+        chunks = [seeds[i:i + self.chunk_size] for i in range(0, replications, self.chunk_size)]
+        statistics: Dict[str, OnlineStatistics] = {}
+
+        def collect(results):
+            for kpis in results:
+                for name, value in kpis.items():
+                    if name != 'replication':
+                        statistics.setdefault(name, OnlineStatistics()).add(value)
+                if on_result is not None:
+                    on_result(kpis)
+
+        start = time.perf_counter()
+        if self.max_workers == 0:
+            for chunk in chunks:
+                collect(_run_replications(chunk, self.weeks, self.topology))
+        else:
+            shared = SharedTopology.create(self.topology)
+            try:
+                with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                         initargs=(shared.spec,)) as pool:
+                    futures = [pool.submit(_run_replications, chunk, self.weeks) for chunk in chunks]
+                    for future in as_completed(futures):
+                        collect(future.result())
+            finally:
+                shared.close()
+        elapsed = time.perf_counter() - start
+
+        logger.info(f"Completed {replications} replications in {elapsed:.2f}s")
+        return {
+            'replications': replications,
+            'weeks': self.weeks,
+            'entropy': root.entropy,
+            'seconds': elapsed,
+            'kpis': {name: stats.summary() for name, stats in statistics.items()},
+        }
+
+
+def benchmark_scaling(topology: CompiledTopology, replications: int = 32, weeks: int = 189,
+                      worker_counts: Optional[List[int]] = None) -> Dict[int, float]:
+    """Time the same set of replications with different worker counts (seconds per count)."""
+    import os
+    worker_counts = worker_counts or sorted({1, 2, 4, os.cpu_count() or 1})
+    timings = {}
+    for workers in worker_counts:
+        runner = ReplicationRunner(topology, weeks=weeks, max_workers=workers)
+        timings[workers] = runner.run(replications, seed=0)['seconds']
+    return timings
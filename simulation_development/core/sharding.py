@@ -0,0 +1,210 @@
+"""
+CedarSim Sharding - SKU-Family Partitioning for Parallel Execution
+
+A PAR SKU only interacts with other SKU instances through its perpetual twin for the
+same SKU ID (AntologyGenerator.generate_network_connections). Each SKU ID's
+perpetual-plus-PARs family is therefore an independent subproblem, and the network can
+be split into shards of whole families that run without any communication.
+
+ARCHITECTURE:
+- partition_sku_families: balanced greedy (longest-processing-time-first) assignment of
+  families to shards, weighted by instance count and demand volume
+- compile_shard: slices a CompiledTopology down to one shard's slots and remaps the
+  perpetual slot indices
+- run_sharded: runs every shard through the VectorizedWeeklyEngine on a process pool
+  and merges per-week KPI series and per-slot totals back to global slot order
+- save_shard / run_shard_file: self-contained .npz shard files for running shards on
+  other machines
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+import heapq
+import logging
+
+import numpy as np
+
+try:
+    from .replication_runner import CompiledTopology, compile_topology
+    from .vectorized_engine import VectorizedWeeklyEngine, KPI_NAMES
+except ImportError:  # Running this module directly as a script
+    from replication_runner import CompiledTopology, compile_topology
+    from vectorized_engine import VectorizedWeeklyEngine, KPI_NAMES
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Shard:
+    """A group of whole SKU families that can be simulated independently."""
+    index: int
+    sku_ids: List[str]
+    slots: np.ndarray
+    weight: float
+
+
+def partition_sku_families(sku_registry: Dict[str, List[Any]], num_shards: int,
+                           demand_weight: float = 1.0) -> List[Shard]:
+    """
+    Group SKU families into balanced shards.
+
+    A family's weight is its instance count plus demand_weight times its share of total
+    demand volume scaled to the total instance count, so both terms are comparable.
+
+    Args:
+        sku_registry: AntologyGenerator.sku_registry (SKU ID -> SKU instances)
+        num_shards: Number of shards to produce
+        demand_weight: Relative importance of demand volume vs instance count
+
+    Returns:
+        List of shards, each holding whole SKU families
+    """
+    if num_shards < 1:
+        raise ValueError("num_shards must be at least 1")
+    total_instances = sum(len(skus) for skus in sku_registry.values())
+    total_demand = sum(sku.demand_rate for skus in sku_registry.values() for sku in skus)
+    demand_scale = demand_weight * total_instances / total_demand if total_demand > 0 else 0.0
+
+    families = []
+    for sku_id, skus in sku_registry.items():
+        weight = len(skus) + demand_scale * sum(sku.demand_rate for sku in skus)
+        families.append((weight, sku_id, [sku.slot for sku in skus]))
+    families.sort(key=lambda family: (-family[0], family[1]))
+
+    loads = [(0.0, index) for index in range(num_shards)]
+    members: List[List[tuple]] = [[] for _ in range(num_shards)]
+    for family in families:
+        load, index = heapq.heappop(loads)
+        members[index].append(family)
+        heapq.heappush(loads, (load + family[0], index))
+
+    shards = []
+    for index, shard_families in enumerate(members):
+        slots = [slot for _, _, family_slots in shard_families for slot in family_slots]
+        shards.append(Shard(
+            index=index,
+            sku_ids=[sku_id for _, sku_id, _ in shard_families],
+            slots=np.array(sorted(slots), dtype=np.int64),
+            weight=sum(weight for weight, _, _ in shard_families),
+        ))
+    logger.info(f"Partitioned {len(families):,} SKU families into {num_shards} shards "
+                f"(weights {min(s.weight for s in shards):.0f}-{max(s.weight for s in shards):.0f})")
+    return shards
+
+
+def compile_shard(topology: CompiledTopology, slots: np.ndarray) -> CompiledTopology:
+    """Slice a compiled topology to the given slots, remapping perpetual slot indices."""
+    local_index = np.full(topology.num_slots, -1, dtype=np.int64)
+    local_index[slots] = np.arange(len(slots))
+    columns = {field.name: getattr(topology, field.name)[slots] for field in fields(CompiledTopology)}
+    perpetual = columns['perpetual_slot']
+    remapped = np.where(perpetual >= 0, local_index[np.maximum(perpetual, 0)], -1)
+    if ((perpetual >= 0) & (remapped < 0)).any():
+        raise ValueError("Shard splits a SKU family: a PAR slot's perpetual twin is outside the shard")
+    columns['perpetual_slot'] = remapped
+    return CompiledTopology(**columns)
+
+
+def _run_shard(topology: CompiledTopology, weeks: int, demand: Optional[np.ndarray],
+               seed: Optional[np.random.SeedSequence]) -> Dict[str, Any]:
+    """Run one shard and return its KPI series and per-slot totals."""
+    if demand is None:
+        rng = np.random.default_rng(seed)
+        demand = rng.poisson(topology.demand_rate, size=(weeks, topology.num_slots)).astype(np.float64)
+    store = topology.build_state_store()
+    engine = VectorizedWeeklyEngine(store, topology.perpetual_slot)
+    history = engine.run(demand)
+    return {
+        'history': history,
+        'total_stockouts': store.column('total_stockouts').copy(),
+        'total_emergency_transfers': store.column('total_emergency_transfers').copy(),
+        'final_level': store.column('current_level').copy(),
+    }
+
+
+def merge_shard_results(shards: List[Shard], results: List[Dict[str, Any]],
+                        num_slots: int) -> Dict[str, Any]:
+    """Sum per-week KPI series across shards and scatter per-slot totals to global slots."""
+    weeks = len(results[0]['history'][KPI_NAMES[0]]) if results else 0
+    merged: Dict[str, Any] = {'history': {name: np.zeros(weeks) for name in KPI_NAMES}}
+    for name in ('total_stockouts', 'total_emergency_transfers', 'final_level'):
+        merged[name] = np.zeros(num_slots)
+    for shard, result in zip(shards, results):
+        for name in KPI_NAMES:
+            merged['history'][name] += result['history'][name]
+        for name in ('total_stockouts', 'total_emergency_transfers', 'final_level'):
+            merged[name][shard.slots] = result[name]
+    return merged
+
+
+def run_sharded(antology, num_shards: int, weeks: int, demand_matrix: Optional[np.ndarray] = None,
+                seed: Optional[int] = None, max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Partition an antology by SKU family, run the shards in parallel and merge the results.
+
+    Args:
+        antology: AntologyGenerator with its network generated
+        num_shards: Number of shards
+        weeks: Weeks to simulate (ignored if demand_matrix is given)
+        demand_matrix: Optional (weeks, slots) demand aligned to the antology's state store;
+            if omitted each shard draws Poisson demand from its own spawned seed
+        seed: Root seed for generated demand
+        max_workers: Worker processes (None = CPU count; 0 = run shards in this process)
+
+    Returns:
+        Merged per-week KPI history, per-slot totals (global slot order) and shard list
+    """
+    topology = compile_topology(antology)
+    shards = partition_sku_families(antology.sku_registry, num_shards)
+    seeds = np.random.SeedSequence(seed).spawn(num_shards)
+    jobs = []
+    for shard, shard_seed in zip(shards, seeds):
+        shard_demand = demand_matrix[:, shard.slots] if demand_matrix is not None else None
+        jobs.append((compile_shard(topology, shard.slots), weeks, shard_demand, shard_seed))
+
+    if max_workers == 0:
+        results = [_run_shard(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_run_shard, *zip(*jobs)))
+
+    merged = merge_shard_results(shards, results, topology.num_slots)
+    merged['shards'] = shards
+    return merged
+
+
+def _shard_file(path: Path) -> Path:
+    """Shard file path with the .npz suffix np.savez_compressed adds."""
+    path = Path(path)
+    return path if path.suffix == '.npz' else path.with_name(path.name + '.npz')
+
+
+def save_shard(path: Path, shard: Shard, topology: CompiledTopology) -> Path:
+    """
+    Write a self-contained shard file for running on another machine.
+
+    Args:
+        path: Shard file (.npz is appended if missing)
+        shard: The shard being saved
+        topology: The shard's own topology (compile_shard)
+
+    Returns:
+        Path of the written file
+    """
+    path = _shard_file(path)
+    arrays = {field.name: getattr(topology, field.name) for field in fields(CompiledTopology)}
+    np.savez_compressed(path, shard_index=shard.index, global_slots=shard.slots,
+                        sku_ids=np.array(shard.sku_ids), **arrays)
+    return path
+
+
+def run_shard_file(path: Path, weeks: int, seed: Optional[int] = None) -> Dict[str, Any]:
+    """Load a shard file written by save_shard (same path, .npz optional) and run it."""
+    with np.load(_shard_file(path)) as data:
+        topology = CompiledTopology(**{field.name: data[field.name] for field in fields(CompiledTopology)})
+        global_slots = data['global_slots']
+    result = _run_shard(topology, weeks, None, np.random.SeedSequence(seed))
+    result['global_slots'] = global_slots
+    return result
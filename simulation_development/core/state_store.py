@@ -0,0 +1,242 @@
+"""
+CedarSim Inventory State Store - Columnar SKU-Location State
+
+This module keeps the mutable per-SKU-location state of the simulation in contiguous
+NumPy arrays indexed by an integer slot, instead of scattering it across thousands of
+Python objects.
+
+ARCHITECTURE:
+- InventoryStateStore owns one array per state field (inventory level, target level,
+  lead time, demand rate, stockout and emergency-transfer counters, and the interned
+  SKU / location codes)
+- Every SKU object holds a (store, slot) pair and exposes its fields as properties,
+  so existing object-oriented code keeps working unchanged
+- Vectorized engines read and write the arrays directly for whole-network passes
+
+Key Features:
+- Amortized O(1) slot allocation with geometric growth
+- Released slots are zeroed and recycled through a free list
+- Active-slot mask so vectorized code can ignore recycled slots
+- Memory and throughput comparison against the plain object layout
+"""
+
+from typing import Dict, List, Any
+import logging
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Field name -> dtype for every per-slot state column
+STATE_FIELDS: Dict[str, Any] = {
+    'current_level': np.float64,
+    'target_level': np.float64,
+    'lead_time_days': np.float64,
+    'lead_time_weeks': np.float64,
+    'demand_rate': np.float64,
+    'stockout_amount': np.float64,
+    'total_stockouts': np.float64,
+    'total_emergency_transfers': np.float64,
+    'sku_code': np.int32,
+    'location_code': np.int32,
+    'is_perpetual': np.bool_,
+    'active': np.bool_,
+}
+
+
+class InventoryStateStore:
+    """Contiguous NumPy arrays holding the state of every SKU-location slot."""
+
+    def __init__(self, initial_capacity: int = 1024):
+        self._capacity = max(1, int(initial_capacity))
+        self._size = 0
+        self._free_slots: List[int] = []
+        for field, dtype in STATE_FIELDS.items():
+            setattr(self, field, np.zeros(self._capacity, dtype=dtype))
+        logger.debug(f"Created InventoryStateStore with capacity {self._capacity}")
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, np.ndarray]) -> 'InventoryStateStore':
+        """Build a store whose slots are filled from equal-length column arrays.
+
+        Missing fields are zero; every slot is marked active. Arrays are copied.
+        """
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Columns have different lengths: {sorted(lengths)}")
+        num_slots = lengths.pop() if lengths else 0
+        store = cls(initial_capacity=num_slots)
+        for field, values in columns.items():
+            if field not in STATE_FIELDS:
+                raise KeyError(f"Unknown state field: {field}")
+            getattr(store, field)[:num_slots] = values
+        store.active[:num_slots] = True
+        store._size = num_slots
+        return store
+
+    @property
+    def size(self) -> int:
+        """Number of slots ever handed out (high-water mark, includes released slots)."""
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        """Number of slots currently allocated in the backing arrays."""
+        return self._capacity
+
+    def __len__(self) -> int:
+        """Number of active slots."""
+        return self._size - len(self._free_slots)
+
+    def allocate_slot(self) -> int:
+        """Reserve a slot and return its index."""
+        if self._free_slots:
+            slot = self._free_slots.pop()
+        else:
+            if self._size == self._capacity:
+                self._grow(self._capacity * 2)
+            slot = self._size
+            self._size += 1
+        self.active[slot] = True
+        return slot
+
+    def release_slot(self, slot: int):
+        """Zero a slot and return it to the free list."""
+        if not self.active[slot]:
+            return
+        for field in STATE_FIELDS:
+            getattr(self, field)[slot] = 0
+        self._free_slots.append(slot)
+
+    def copy_slot(self, source: 'InventoryStateStore', source_slot: int, target_slot: int):
+        """Copy every field of a slot in another store into a slot of this store."""
+        for field in STATE_FIELDS:
+            getattr(self, field)[target_slot] = getattr(source, field)[source_slot]
+
+    def column(self, field: str) -> np.ndarray:
+        """Get a writable view of a state column trimmed to the used slots."""
+        if field not in STATE_FIELDS:
+            raise KeyError(f"Unknown state field: {field}")
+        return getattr(self, field)[:self._size]
+
+    def active_slots(self) -> np.ndarray:
+        """Get the indices of all active slots."""
+        return np.flatnonzero(self.active[:self._size])
+
+    def get_memory_usage(self) -> int:
+        """Get the number of bytes held by the backing arrays."""
+        return sum(getattr(self, field).nbytes for field in STATE_FIELDS)
+
+    def _grow(self, new_capacity: int):
+        """Reallocate every column to a larger capacity."""
+        for field, dtype in STATE_FIELDS.items():
+            grown = np.zeros(new_capacity, dtype=dtype)
+            grown[:self._capacity] = getattr(self, field)
+            setattr(self, field, grown)
+        logger.debug(f"Grew InventoryStateStore from {self._capacity} to {new_capacity} slots")
+        self._capacity = new_capacity
+
+
+# Global instance for SKUs created outside an AntologyGenerator
+default_state_store = InventoryStateStore()
+
+def get_default_state_store() -> InventoryStateStore:
+    """Get the global state store used by standalone SKUs."""
+    return default_state_store
+
+
+class _ObjectLayoutSKU:
+    """Plain-attribute SKU state, mirroring the pre-store object layout (benchmark only)."""
+
+    def __init__(self, target_level: float, lead_time_days: float, demand_rate: float):
+        self.target_level = target_level
+        self.lead_time_days = lead_time_days
+        self.lead_time_weeks = lead_time_days / 7.0
+        self.demand_rate = demand_rate
+        self._current_inventory_level = target_level
+        self._stockout_amount = 0
+        self._total_stockouts = 0
+        self._total_emergency_transfers = 0
+
+
+def compare_with_object_layout(num_slots: int = 5941 * 18, weeks: int = 10) -> Dict[str, Any]:
+    """
+    Compare memory and weekly-update throughput of the object layout and the store.
+
+    Args:
+        num_slots: Number of SKU-location slots to build
+        weeks: Number of simulated weekly demand passes to time
+
+    Returns:
+        Dictionary with bytes per slot and seconds per week for both layouts
+    """
+    rng = np.random.default_rng(0)
+    targets = rng.uniform(10, 200, num_slots)
+    lead_times = rng.uniform(0.5, 30, num_slots)
+    rates = rng.uniform(0, 50, num_slots)
+
+    # Object layout
+    tracemalloc.start()
+    objects = [_ObjectLayoutSKU(float(t), float(l), float(r))
+               for t, l, r in zip(targets, lead_times, rates)]
+    object_bytes = tracemalloc.get_traced_memory()[0] + sys.getsizeof(objects)
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(weeks):
+        for obj in objects:
+            level = obj._current_inventory_level - obj.demand_rate
+            if level < 0:
+                obj._stockout_amount = -level
+                obj._total_stockouts += -level
+                level = 0
+            obj._current_inventory_level = level
+    object_seconds = (time.perf_counter() - start) / weeks
+
+    # Columnar layout
+    store = InventoryStateStore(initial_capacity=num_slots)
+    for _ in range(num_slots):
+        store.allocate_slot()
+    store.target_level[:num_slots] = targets
+    store.lead_time_days[:num_slots] = lead_times
+    store.lead_time_weeks[:num_slots] = lead_times / 7.0
+    store.demand_rate[:num_slots] = rates
+    store.current_level[:num_slots] = targets
+    store_bytes = store.get_memory_usage()
+
+    level = store.column('current_level')
+    demand = store.column('demand_rate')
+    stockout = store.column('stockout_amount')
+    total_stockouts = store.column('total_stockouts')
+    start = time.perf_counter()
+    for _ in range(weeks):
+        level -= demand
+        np.maximum(-level, 0, out=stockout)
+        total_stockouts += stockout
+        np.maximum(level, 0, out=level)
+    store_seconds = (time.perf_counter() - start) / weeks
+
+    return {
+        'num_slots': num_slots,
+        'object_bytes_per_slot': object_bytes / num_slots,
+        'store_bytes_per_slot': store_bytes / num_slots,
+        'object_seconds_per_week': object_seconds,
+        'store_seconds_per_week': store_seconds,
+        'speedup': object_seconds / store_seconds if store_seconds > 0 else float('inf'),
+    }
+
+
+if __name__ == "__main__":
+    results = compare_with_object_layout()
+    print("=" * 60)
+    print("INVENTORY STATE STORE vs OBJECT LAYOUT")
+    print("=" * 60)
+    print(f"Slots: {results['num_slots']:,}")
+    print(f"Memory per slot:  object {results['object_bytes_per_slot']:.1f} B, "
+          f"store {results['store_bytes_per_slot']:.1f} B")
+    print(f"Weekly update:    object {results['object_seconds_per_week'] * 1000:.2f} ms, "
+          f"store {results['store_seconds_per_week'] * 1000:.2f} ms "
+          f"({results['speedup']:.0f}x faster)")
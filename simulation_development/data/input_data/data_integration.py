@@ -10,29 +10,50 @@ Key Features:
 - Loads demand data from SIMULATION_READY_DEMAND_DATA.csv
 - Creates AntologyGenerator with real data
 - Handles column name mapping between old and new formats
+- Typed CSV loading with a Parquet cache (see typed_loader.py)
 - Supports both validation subset and full dataset modes
+- Loads input files lazily; demand data only when an engine or analysis asks for it
+- Caches the compiled structure in a snapshot keyed by the input data hash
+- Builds the week x slot demand matrix and the rolling demand statistics cube
 """
 
+import numpy as np
 import pandas as pd
 import os
+import shutil
 import sys
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
+import hashlib
 import logging
+import time
 
 # Add parent directory to path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
 from core.core_models import AntologyGenerator, ResourceFactory, Location, SKU
+from core.id_registry import canonicalize_sku_ids
+from core.demand_matrix import DemandMatrix, build_demand_matrix, slot_index_from_antology, slot_index_key
+from core.demand_statistics import (DEFAULT_QUANTILES, DEFAULT_WINDOWS, build_demand_statistics,
+                                    load_demand_statistics, save_demand_statistics, slot_labels_from_antology)
 from .location_mapper import get_location_mapper
+from .typed_loader import PARQUET_AVAILABLE, file_sha256, load_demand, load_sku_inventory
+from .topology_cache import SKU_DATA_FILE, TopologyCache, TopologySnapshot, compute_input_hash
 
 logger = logging.getLogger(__name__)
 
+DEMAND_DATA_FILE = "SIMULATION_READY_DEMAND_DATA_WITH_UNIFORM_LOCATIONS.csv"
+
 class DataIntegrator:
     """Integrates production-ready data with AntologyGenerator for simulation structure."""
     
-    def __init__(self, data_dir: Optional[Path] = None):
-        """Initialize the data integrator."""
+    def __init__(self, data_dir: Optional[Path] = None, validate_mappings: bool = False):
+        """Initialize the data integrator.
+        
+        Input files are read lazily, the first time sku_data, demand_data or
+        validation_data is accessed. Location mapping validation is an opt-in diagnostic
+        (validate_mappings=True or validate_location_mappings()).
+        """
         if data_dir is None:
             # Default to the production input data directory
             self.data_dir = Path(__file__).parent.parent / "prod-input-data"
@@ -40,13 +61,88 @@ class DataIntegrator:
             self.data_dir = Path(data_dir)
         
         self.antology = None
-        self.sku_data = None
-        self.demand_data = None
-        self.validation_data = None
+        self._sku_data = None
+        self._demand_data = None
+        self._validation_data = None
+        self.validate_mappings = validate_mappings
         self.location_mapper = get_location_mapper()
+        self.topology_cache = TopologyCache(self.data_dir / ".topology_cache")
+        self.input_hash = None  # Set when sku_data is read from disk by this integrator
+    
+    @property
+    def sku_file(self) -> Path:
+        """Path to the SKU inventory CSV."""
+        return self.data_dir / SKU_DATA_FILE
+    
+    @property
+    def demand_file(self) -> Path:
+        """Path to the demand CSV (with uniform locations)."""
+        return self.data_dir / DEMAND_DATA_FILE
+    
+    @property
+    def sku_data(self) -> pd.DataFrame:
+        """SKU inventory data, read from disk on first access."""
+        if self._sku_data is None:
+            if not self.sku_file.exists():
+                raise FileNotFoundError(f"SKU inventory data not found: {self.sku_file}")
+            self._sku_data = load_sku_inventory(self.sku_file)
+            self.input_hash = compute_input_hash(self.sku_file, self.location_mapper)
+        return self._sku_data
+    
+    @sku_data.setter
+    def sku_data(self, value: Optional[pd.DataFrame]):
+        self._sku_data = value
+        self._validation_data = None
+        self.input_hash = None  # In-memory data no longer matches the file on disk
+    
+    @property
+    def demand_data(self) -> pd.DataFrame:
+        """Full demand data, read from disk on first access."""
+        if self._demand_data is None:
+            self._demand_data = self.load_demand_data()
+        return self._demand_data
+    
+    @demand_data.setter
+    def demand_data(self, value: Optional[pd.DataFrame]):
+        self._demand_data = value
+    
+    @property
+    def validation_data(self) -> pd.DataFrame:
+        """SKU records with analytical safety stock, derived from sku_data on first access."""
+        if self._validation_data is None:
+            self._validation_data = self._create_validation_subset()
+        return self._validation_data
+    
+    @validation_data.setter
+    def validation_data(self, value: Optional[pd.DataFrame]):
+        self._validation_data = value
+    
+    def load_demand_data(self, sku_ids: Optional[List[str]] = None,
+                         locations: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Read demand data, optionally only for some SKUs and/or uniform locations.
+        
+        Filtered reads are pushed down into the Parquet cache (or the chunked CSV parse)
+        and are not stored on the integrator.
+        
+        Args:
+            sku_ids: SKU ids to load (None = all)
+            locations: Uniform locations to load (None = all)
+            
+        Returns:
+            Demand DataFrame
+        """
+        if not self.demand_file.exists():
+            raise FileNotFoundError(f"Demand data not found: {self.demand_file}")
+        return load_demand(self.demand_file, sku_ids=sku_ids, locations=locations)
+    
+    def load_production_data(self, validate_mappings: Optional[bool] = None) -> Dict[str, pd.DataFrame]:
+        """Eagerly load the production-ready dataset from the CSV files.
         
-    def load_production_data(self) -> Dict[str, pd.DataFrame]:
-        """Load the production-ready dataset from Excel and CSV files."""
+        Args:
+            validate_mappings: Print the location mapping report (default: the
+                integrator's validate_mappings setting)
+        """
         
         print("=" * 60)
         print("LOADING CEDARSIM PRODUCTION INPUT DATA")
@@ -54,11 +150,6 @@ class DataIntegrator:
         
         # Load SKU inventory data from CSV
         print("\n1. Loading SKU inventory data...")
-        sku_file = self.data_dir / "SIMULATION_READY_SKU_INVENTORY_DATA.csv"
-        if not sku_file.exists():
-            raise FileNotFoundError(f"SKU inventory data not found: {sku_file}")
-        
-        self.sku_data = pd.read_csv(sku_file)
         print(f"   ✅ Loaded {len(self.sku_data):,} SKU records")
         print(f"   Columns: {list(self.sku_data.columns)}")
         print(f"   Unique SKUs: {self.sku_data['oid'].nunique():,}")
@@ -66,23 +157,18 @@ class DataIntegrator:
         
         # Load demand data from CSV (with uniform locations)
         print("\n2. Loading demand data...")
-        demand_file = self.data_dir / "SIMULATION_READY_DEMAND_DATA_WITH_UNIFORM_LOCATIONS.csv"
-        if not demand_file.exists():
-            raise FileNotFoundError(f"Demand data not found: {demand_file}")
-        
-        self.demand_data = pd.read_csv(demand_file)
         print(f"   ✅ Loaded {len(self.demand_data):,} demand records")
         print(f"   Time range: {self.demand_data['PO Week Ending Date'].min()} to {self.demand_data['PO Week Ending Date'].max()}")
         print(f"   Unique SKUs in demand: {self.demand_data['oid'].nunique():,}")
         
         # Create validation subset from SKU data
         print("\n3. Creating validation subset...")
-        self.validation_data = self._create_validation_subset()
         print(f"   ✅ Created validation subset with {len(self.validation_data):,} SKUs")
         
         # Validate location mappings
-        print("\n4. Validating location mappings...")
-        self._validate_location_mappings()
+        if validate_mappings if validate_mappings is not None else self.validate_mappings:
+            print("\n4. Validating location mappings...")
+            self.validate_location_mappings()
         
         print("\n" + "=" * 60)
         print("✅ PRODUCTION DATA LOADED SUCCESSFULLY!")
@@ -105,15 +191,15 @@ class DataIntegrator:
         
         return validation_data
     
-    def _validate_location_mappings(self):
-        """Validate location mappings between SKU and demand data."""
-        if self.sku_data is None or self.demand_data is None:
-            print("   ⚠️  Cannot validate mappings - data not loaded")
-            return
-        
+    def validate_location_mappings(self):
+        """Validate location mappings between SKU and demand data (diagnostic report)."""
         # Get unique locations from both datasets
-        sku_locations = set(self.sku_data['lo'].dropna().astype(str).unique())
-        demand_locations = set(self.demand_data['uniform_location'].dropna().astype(str).unique())
+        try:
+            sku_locations = set(self.sku_data['lo'].dropna().astype(str).unique())
+            demand_locations = set(self.demand_data['uniform_location'].dropna().astype(str).unique())
+        except FileNotFoundError as e:
+            print(f"   ⚠️  Cannot validate mappings - {e}")
+            return
         
         # Validate mappings
         validation_results = self.location_mapper.validate_mappings(sku_locations, demand_locations)
@@ -140,8 +226,42 @@ class DataIntegrator:
         print("\n   🔗 Location Mapping Summary:")
         self.location_mapper.print_mapping_summary()
     
-    def create_antology_structure(self, use_validation_subset: bool = False) -> AntologyGenerator:
-        """Create the complete AntologyGenerator structure with production data."""
+    def load_cached_antology(self, use_validation_subset: bool = False) -> Optional[AntologyGenerator]:
+        """
+        Restore the AntologyGenerator from the topology snapshot if the inputs are unchanged.
+        
+        Args:
+            use_validation_subset: Whether to look up the validation subset snapshot
+            
+        Returns:
+            The restored AntologyGenerator (also stored on self.antology), or None on a cache miss
+        """
+        sku_file = self.sku_file
+        if not sku_file.exists():
+            return None
+        
+        start = time.perf_counter()
+        input_hash = compute_input_hash(sku_file, self.location_mapper)
+        snapshot = self.topology_cache.load(input_hash, use_validation_subset)
+        if snapshot is None:
+            logger.info(f"No topology snapshot for input hash {input_hash[:16]}")
+            return None
+        
+        self.input_hash = input_hash
+        self.antology = snapshot.to_antology()
+        logger.info(f"Restored {snapshot.num_skus:,} SKUs from topology snapshot in "
+                    f"{(time.perf_counter() - start) * 1000:.1f} ms")
+        return self.antology
+    
+    def create_antology_structure(self, use_validation_subset: bool = False,
+                                  use_cache: bool = True, export_frontend: bool = True) -> AntologyGenerator:
+        """Create the complete AntologyGenerator structure with production data.
+        
+        Only the SKU inventory data is read; demand data stays unloaded. When use_cache
+        is set and the SKU data was read from disk by this integrator, the result is
+        saved as a topology snapshot for load_cached_antology. export_frontend is passed
+        to AntologyGenerator.finalize_network.
+        """
         
         print("\n" + "=" * 60)
         print("CREATING ANTOLOGY GENERATOR STRUCTURE")
@@ -154,10 +274,6 @@ class DataIntegrator:
         print("\n1. Creating locations...")
         self._create_locations()
         
-        # Load data if not already loaded
-        if self.sku_data is None:
-            self.load_production_data()
-        
         # Create SKUs
         print("\n2. Creating SKUs...")
         if use_validation_subset:
@@ -168,7 +284,11 @@ class DataIntegrator:
         # Generate network connections
         print("\n3. Generating network topology...")
         self.antology.generate_network_connections()
-        self.antology.finalize_network()
+        self.antology.finalize_network(export_frontend=export_frontend)
+        
+        if use_cache and self.input_hash is not None:
+            snapshot = TopologySnapshot.from_antology(self.antology, self.input_hash)
+            self.topology_cache.save(snapshot, use_validation_subset)
         
         print("\n" + "=" * 60)
         print("✅ ANTOLOGY STRUCTURE CREATED SUCCESSFULLY!")
@@ -178,12 +298,8 @@ class DataIntegrator:
     
     def _create_locations(self):
         """Create all hospital locations using location mapping."""
-        # Get unique locations from the data
-        unique_locations = set()
-        if self.sku_data is not None:
-            # Filter out any NaN values and ensure we have strings
-            valid_locations = self.sku_data['lo'].dropna().astype(str).unique()
-            unique_locations = set(valid_locations)
+        # Get unique locations from the data (filter out any NaN values and ensure we have strings)
+        unique_locations = set(self.sku_data['lo'].dropna().astype(str).unique())
         
         # Add standard locations
         standard_locations = [
@@ -196,18 +312,19 @@ class DataIntegrator:
         all_locations = unique_locations.union(set(standard_locations))
         
         # Validate mappings
-        print("\n🔍 Validating location mappings...")
-        validation_results = self.location_mapper.validate_mappings(
-            all_locations, 
-            set()  # We'll validate demand locations separately
-        )
-        
-        print(f"   📊 Location Mapping Coverage: {validation_results['coverage_percentage']:.1f}%")
-        print(f"   ✅ Mapped SKU Locations: {validation_results['mapped_sku_locations']}")
-        if validation_results['unmapped_sku_locations']:
-            print(f"   ⚠️  Unmapped SKU Locations: {len(validation_results['unmapped_sku_locations'])}")
-            for loc in validation_results['unmapped_sku_locations']:
-                print(f"      - {loc}")
+        if self.validate_mappings:
+            print("\n🔍 Validating location mappings...")
+            validation_results = self.location_mapper.validate_mappings(
+                all_locations, 
+                set()  # We'll validate demand locations separately
+            )
+            
+            print(f"   📊 Location Mapping Coverage: {validation_results['coverage_percentage']:.1f}%")
+            print(f"   ✅ Mapped SKU Locations: {validation_results['mapped_sku_locations']}")
+            if validation_results['unmapped_sku_locations']:
+                print(f"   ⚠️  Unmapped SKU Locations: {len(validation_results['unmapped_sku_locations'])}")
+                for loc in validation_results['unmapped_sku_locations']:
+                    print(f"      - {loc}")
         
         for location_name in all_locations:
             # Ensure location_name is a string
@@ -230,89 +347,119 @@ class DataIntegrator:
     
     def _create_skus_from_production(self):
         """Create SKUs from production data."""
-        print(f"   Processing {len(self.sku_data):,} SKU records...")
-        
-        for _, row in self.sku_data.iterrows():
-            sku_id = str(row['oid']).zfill(6)  # Ensure 6-digit format
-            location_id = row['lo']
-            item_description = row['Item Description']
-            unit_of_measure = row['unit_of_measure']
-            lead_time_days = float(row['lead_time'])
-            burn_rate = float(row['burn_rate'])
-            
-            # Use analytical safety stock if available, otherwise calculate
-            analytical_safety_stock = row.get('Stock Units Analytical')
-            if pd.notna(analytical_safety_stock):
-                target_level = float(analytical_safety_stock)
-            else:
-                target_level = burn_rate * lead_time_days * 2.05  # Fallback calculation
-            
-            # Create SKU
-            sku = ResourceFactory.create_sku(
-                sku_id=sku_id,
-                location_id=location_id,
-                target_level=target_level,
-                lead_time_days=lead_time_days,
-                demand_rate=burn_rate
-            )
-            
-            # Add additional attributes
-            sku.name = item_description
-            sku.unit_of_measure = unit_of_measure
-            sku.analytical_safety_stock = row.get('Stock Units Analytical', None)
-            
-            self.antology.add_sku(sku)
-            
-            # Add SKU to location
-            location = self.antology.locations.get(location_id)
-            if location:
-                location.add_sku(sku)
-        
-        print(f"   ✅ Created {len(self.antology.sku_registry)} SKU instances")
-        print(f"   ✅ Unique SKU types: {len(set(sku.resource_id for sku_list in self.antology.sku_registry.values() for sku in sku_list))}")
+        self._create_skus_bulk(self.sku_data, "SKU")
     
     def _create_skus_from_validation(self):
         """Create SKUs from validation subset."""
-        print(f"   Processing {len(self.validation_data):,} validation SKU records...")
-        
-        for _, row in self.validation_data.iterrows():
-            sku_id = str(row['oid']).zfill(6)
-            location_id = row['lo']
-            item_description = row['Item Description']
-            unit_of_measure = row['unit_of_measure']
-            lead_time_days = float(row['lead_time'])
-            burn_rate = float(row['burn_rate'])
-            
-            # Use existing analytical safety stock for validation
-            analytical_safety_stock = row['Stock Units Analytical']
-            if pd.notna(analytical_safety_stock):
-                target_level = float(analytical_safety_stock)
-            else:
-                target_level = burn_rate * lead_time_days * 2.05  # Fallback calculation
-            
-            # Create SKU
-            sku = ResourceFactory.create_sku(
-                sku_id=sku_id,
-                location_id=location_id,
-                target_level=target_level,
-                lead_time_days=lead_time_days,
-                demand_rate=burn_rate
-            )
-            
-            # Add additional attributes
-            sku.name = item_description
-            sku.unit_of_measure = unit_of_measure
-            sku.analytical_safety_stock = row['Stock Units Analytical']
-            
-            self.antology.add_sku(sku)
+        self._create_skus_bulk(self.validation_data, "validation SKU")
+    
+    def _create_skus_bulk(self, sku_data: pd.DataFrame, label: str):
+        """Create SKUs from whole columns of SKU data and register them in one pass."""
+        print(f"   Processing {len(sku_data):,} {label} records...")
+        
+        sku_ids = canonicalize_sku_ids(sku_data['oid'])  # Ensure 6-digit format
+        lead_time_days = sku_data['lead_time'].to_numpy(dtype=np.float64)
+        burn_rate = sku_data['burn_rate'].to_numpy(dtype=np.float64)
+        if 'Stock Units Analytical' in sku_data.columns:
+            analytical_safety_stock = sku_data['Stock Units Analytical'].to_numpy(dtype=np.float64)
+        else:
+            analytical_safety_stock = np.full(len(sku_data), np.nan)
+        
+        # Use analytical safety stock if available, otherwise the fallback calculation
+        target_level = np.where(np.isnan(analytical_safety_stock),
+                                burn_rate * lead_time_days * 2.05,
+                                analytical_safety_stock)
+        
+        skus = self.antology.add_skus_bulk(sku_ids.tolist(), sku_data['lo'].tolist(),
+                                           target_level=target_level,
+                                           lead_time_days=lead_time_days,
+                                           demand_rate=burn_rate)
+        
+        # Add additional attributes
+        for sku, name, unit, analytical in zip(skus, sku_data['Item Description'].tolist(),
+                                               sku_data['unit_of_measure'].tolist(),
+                                               analytical_safety_stock.tolist()):
+            sku.name = name
+            sku.unit_of_measure = unit
+            sku.analytical_safety_stock = analytical
+        
+        print(f"   ✅ Created {len(self.antology.sku_registry)} {label} instances")
+        print(f"   ✅ Unique SKU types: {len(set(sku.resource_id for sku_list in self.antology.sku_registry.values() for sku in sku_list))}")
+    
+    def build_demand_matrix(self, sparse: bool = True, use_cache: bool = True) -> DemandMatrix:
+        """
+        Compile the demand data into a week x slot matrix aligned to the antology's state store.
+        
+        The matrix is cached under .demand_matrix_cache/ keyed by the demand file contents
+        and the slot layout, and memory-mapped on later calls.
+        
+        Args:
+            sparse: CSR arrays (default) instead of a dense float32 array
+            use_cache: Reuse/write the on-disk matrix
             
-            # Add SKU to location
-            location = self.antology.locations.get(location_id)
-            if location:
-                location.add_sku(sku)
+        Returns:
+            DemandMatrix whose columns are state store slots
+        """
+        antology = self.antology if self.antology is not None else self.create_antology_structure()
+        slot_index = slot_index_from_antology(antology)
+        
+        cache_root = self.data_dir / ".demand_matrix_cache" / ("sparse" if sparse else "dense")
+        key = None
+        if use_cache and self.demand_file.exists():
+            key = self._demand_cache_key(slot_index)
+            cached = DemandMatrix.load(cache_root / key[:16], key=key)
+            if cached is not None:
+                return cached
+        
+        matrix = build_demand_matrix(self.demand_data, slot_index, antology.state_store.size,
+                                     location_mapper=self.location_mapper, sparse=sparse)
+        logger.info(f"Built {matrix.shape[0]} x {matrix.shape[1]} demand matrix "
+                    f"({matrix.nnz:,} non-zero, {matrix.nbytes / 1e6:.1f} MB)")
+        if key is not None:
+            # One directory per key: never overwrite files another matrix may have memory-mapped
+            if cache_root.exists():
+                for stale in cache_root.iterdir():
+                    shutil.rmtree(stale, ignore_errors=True)
+            matrix.save(cache_root / key[:16], key=key)
+        return matrix
+    
+    def _demand_cache_key(self, slot_index, *parts) -> str:
+        """Cache key of demand-derived data: demand file contents, slot layout and extra parts."""
+        text = ":".join([file_sha256(self.demand_file), slot_index_key(slot_index)] + [str(part) for part in parts])
+        return hashlib.sha256(text.encode()).hexdigest()
+    
+    def build_demand_statistics(self, use_cache: bool = True) -> pd.DataFrame:
+        """
+        Build the rolling demand statistics cube for every SKU-location slot.
         
-        print(f"   ✅ Created {len(self.antology.sku_registry)} validation SKU instances")
-        print(f"   ✅ Unique SKU types: {len(set(sku.resource_id for sku_list in self.antology.sku_registry.values() for sku in sku_list))}")
+        The cube is derived from build_demand_matrix() and cached as Parquet under
+        .demand_statistics_cache/ with the same key (plus the window/quantile settings).
+        
+        Args:
+            use_cache: Reuse/write the on-disk cube (requires pyarrow)
+            
+        Returns:
+            Statistics cube (see core/demand_statistics.py)
+        """
+        antology = self.antology if self.antology is not None else self.create_antology_structure()
+        slot_index = slot_index_from_antology(antology)
+        
+        cache_root = self.data_dir / ".demand_statistics_cache"
+        path = None
+        if use_cache and PARQUET_AVAILABLE and self.demand_file.exists():
+            key = self._demand_cache_key(slot_index, DEFAULT_WINDOWS, DEFAULT_QUANTILES)
+            path = cache_root / f"{key[:16]}.parquet"
+            if path.exists():
+                return load_demand_statistics(path)
+        
+        sku_ids, locations = slot_labels_from_antology(antology)
+        cube = build_demand_statistics(self.build_demand_matrix(use_cache=use_cache), sku_ids, locations)
+        if path is not None:
+            if cache_root.exists():
+                for stale in cache_root.glob("*.parquet"):
+                    stale.unlink()
+            save_demand_statistics(cube, path)
+        return cube
     
     def get_sku_data_for_frontend(self, sku_id: str) -> Dict[str, Any]:
         """Get SKU data formatted for frontend consumption."""
@@ -343,12 +490,22 @@ class DataIntegrator:
         
         return sku_data
 
-def create_integrated_antology(use_validation_subset: bool = False) -> Tuple[AntologyGenerator, DataIntegrator]:
-    """Create a fully integrated AntologyGenerator with production data."""
+def create_integrated_antology(use_validation_subset: bool = False,
+                               use_cache: bool = True,
+                               data_dir: Optional[Path] = None) -> Tuple[AntologyGenerator, DataIntegrator]:
+    """Create a fully integrated AntologyGenerator with production data.
+    
+    With use_cache, an unchanged SKU data file and location mapping are restored from the
+    topology snapshot without reading the CSVs; otherwise the structure is rebuilt.
+    data_dir selects another input directory (e.g. generated by synthetic_data.py).
+    """
+    
+    integrator = DataIntegrator(data_dir=data_dir)
+    if use_cache and integrator.load_cached_antology(use_validation_subset) is not None:
+        return integrator.antology, integrator
     
-    integrator = DataIntegrator()
-    integrator.load_production_data()
-    antology = integrator.create_antology_structure(use_validation_subset=use_validation_subset)
+    antology = integrator.create_antology_structure(use_validation_subset=use_validation_subset,
+                                                    use_cache=use_cache)
     
     return antology, integrator
 
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+CedarSim Formula Variants - Batch Evaluation of Safety Stock Formula Variants
+
+This module scores many candidate safety stock formulas (King's method and
+variations) against reference safety stock values in one broadcast, instead of
+looping over pairs, then time windows, then formula parameters.
+
+ARCHITECTURE:
+- pair_moments: daily demand count / mean / variance for every SKU-department pair and
+  every time window, computed once with np.bincount over (pair, window) cells
+- A formula family is a vectorized expression over the moment arrays; its parameters
+  arrive as (variants, 1, 1) arrays, so one call predicts every
+  variant x pair x window
+- FormulaVariant is a (family, parameters) pair; variant_grid expands parameter lists
+  into the cartesian product
+- evaluate_variants scores variants in chunks (bounded memory) and can fan the chunks
+  out over a ProcessPoolExecutor for large grids
+- A prediction counts only where the window has more than one record, a positive
+  demand std and a positive prediction (the rule the King analysis scripts use)
+
+Key Features:
+- STANDARD_WINDOWS: all_data, 2024_only, 2023_2025, 2024_2025, last_12_months
+- FORMULA_FAMILIES: kings (Z × √(LT / t1) × σD), kings_with_lt_var, power
+- kings_variants: the basic, modified (T1) and lead-time-variance variants
+- evaluate_variants: MAE / MAPE / hit-rate table per variant and window
+- pair_results: long per-pair table for a handful of variants
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import itertools
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .safety_stock import DAYS_PER_PERIOD
+
+logger = logging.getLogger(__name__)
+
+WindowFilter = Callable[[pd.Series, pd.Timestamp], np.ndarray]
+
+
+def all_data_window(dates: pd.Series, max_date: pd.Timestamp) -> np.ndarray:
+    """Every record."""
+    return np.ones(len(dates), dtype=bool)
+
+
+def year_window(*years: int) -> WindowFilter:
+    """Records whose week ending date falls in one of the given years."""
+    return lambda dates, max_date: dates.dt.year.isin(years).to_numpy()
+
+
+def trailing_window(days: int) -> WindowFilter:
+    """Records within the given number of days of the latest date."""
+    return lambda dates, max_date: (dates >= max_date - pd.Timedelta(days=days)).to_numpy()
+
+
+STANDARD_WINDOWS: Dict[str, WindowFilter] = {
+    'all_data': all_data_window,
+    '2024_only': year_window(2024),
+    '2023_2025': year_window(2023, 2024, 2025),
+    '2024_2025': year_window(2024, 2025),
+    'last_12_months': trailing_window(365),
+}
+
+
+@dataclass
+class PairMoments:
+    """Per-pair, per-window daily demand moments aligned with the reference rows."""
+    pairs: pd.DataFrame
+    windows: List[str]
+    count: np.ndarray       # (pairs, windows)
+    mean: np.ndarray        # (pairs, windows)
+    var: np.ndarray         # (pairs, windows), population variance
+    z_score: np.ndarray     # (pairs,)
+    lead_time: np.ndarray   # (pairs,)
+    burn_rate: np.ndarray   # (pairs,)
+    actual: np.ndarray      # (pairs,) reference safety stock
+
+    @property
+    def std(self) -> np.ndarray:
+        """Population standard deviation, (pairs, windows)."""
+        return np.sqrt(self.var)
+
+    @property
+    def num_pairs(self) -> int:
+        return len(self.actual)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Moment arrays shaped for broadcasting against (variants, pairs, windows)."""
+        return {
+            'z': self.z_score[:, None], 'lead_time': self.lead_time[:, None],
+            'burn_rate': self.burn_rate[:, None], 'mean': self.mean, 'var': self.var,
+            'std': self.std, 'count': self.count, 'actual': self.actual,
+        }
+
+
+def pair_moments(reference: pd.DataFrame, demand_data: pd.DataFrame, keys: Sequence[str],
+                 windows: Optional[Dict[str, WindowFilter]] = None,
+                 reference_column: str = 'Safety stock_units',
+                 z_score_column: str = 'Z-score',
+                 date_column: str = 'PO Week Ending Date',
+                 quantity_column: str = 'Total Qty Issues',
+                 lead_time_column: str = 'Avg_Lead Time',
+                 burn_rate_column: str = 'Avg Daily Burn Rate',
+                 period_days: int = DAYS_PER_PERIOD) -> PairMoments:
+    """
+    Compute daily demand moments for every reference pair and window in one pass.
+
+    Lead time and burn rate are the first demand record's values for the pair (over all
+    data, not per window). Pairs without demand records get zero counts.
+
+    Args:
+        reference: Reference rows (key columns, Z-score, reference safety stock); rows
+            without a reference value are dropped
+        demand_data: Weekly demand records
+        keys: Columns shared by reference and demand_data that identify a pair
+        windows: Window name -> filter(dates, max_date) (default STANDARD_WINDOWS)
+        period_days: Days per demand period (weekly totals -> daily demand)
+
+    Returns:
+        PairMoments aligned with the retained reference rows
+    """
+    keys = list(keys)
+    windows = STANDARD_WINDOWS if windows is None else windows
+    reference = reference.dropna(subset=[reference_column]).reset_index(drop=True)
+
+    groups = demand_data.groupby(keys, sort=False, dropna=True)
+    # Rows with a missing key are not in any group: ngroup() gives them NaN
+    group_code = groups.ngroup().to_numpy(dtype=np.float64)
+    rows = ~np.isnan(group_code) & (group_code >= 0)
+    group_code = group_code[rows].astype(np.int64)
+    demand = demand_data[rows]
+    num_groups = groups.ngroups
+    num_windows = len(windows)
+
+    dates = pd.to_datetime(demand[date_column])
+    max_date = dates.max()
+    in_window = np.column_stack([np.asarray(window(dates, max_date), dtype=bool)
+                                 for window in windows.values()]) if len(demand) else \
+        np.zeros((0, num_windows), dtype=bool)
+    daily = demand[quantity_column].to_numpy(dtype=np.float64) / period_days
+
+    # One bincount per moment over flattened (group, window) cells
+    cell = (group_code[:, None] * num_windows + np.arange(num_windows)).ravel()
+    weights = in_window.ravel().astype(np.float64)
+    size = num_groups * num_windows
+    count = np.bincount(cell, weights=weights, minlength=size).reshape(num_groups, num_windows)
+    total = np.bincount(cell, weights=weights * np.repeat(daily, num_windows), minlength=size)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.where(count > 0, total.reshape(num_groups, num_windows) / count, 0.0)
+    deviation = (daily[:, None] - mean[group_code]) ** 2 * in_window
+    squares = np.bincount(cell, weights=deviation.ravel(), minlength=size).reshape(num_groups, num_windows)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        var = np.where(count > 0, squares / count, 0.0)
+
+    first = groups[[lead_time_column, burn_rate_column]].first()
+    group_keys = first.index.to_frame(index=False)
+    group_keys['_group'] = np.arange(num_groups)
+    group_of_pair = reference[keys].merge(group_keys, on=keys, how='left')['_group']
+    found = group_of_pair.notna().to_numpy()
+    group_of_pair = group_of_pair.fillna(0).to_numpy(dtype=np.int64)
+
+    def gather(values: np.ndarray) -> np.ndarray:
+        gathered = values[group_of_pair] if num_groups else np.zeros((len(reference),) + values.shape[1:])
+        gathered = gathered.astype(np.float64)
+        gathered[~found] = 0.0
+        return gathered
+
+    return PairMoments(
+        pairs=reference, windows=list(windows),
+        count=gather(count), mean=gather(mean), var=gather(var),
+        z_score=reference[z_score_column].to_numpy(dtype=np.float64),
+        lead_time=gather(first[lead_time_column].to_numpy(dtype=np.float64)),
+        burn_rate=gather(first[burn_rate_column].to_numpy(dtype=np.float64)),
+        actual=reference[reference_column].to_numpy(dtype=np.float64),
+    )
+
+
+# Formula families: vectorized expressions over PairMoments.arrays(); parameters are
+# (variants, 1, 1) arrays and the result is (variants, pairs, windows)
+
+def _kings(m: Dict[str, np.ndarray], t1=1.0) -> np.ndarray:
+    """King's method: Z × √(Lead Time / T1) × σD (T1 = 1 is the basic formula)."""
+    return m['z'] * np.sqrt(m['lead_time'] / t1) * m['std']
+
+
+def _kings_with_lt_var(m: Dict[str, np.ndarray], sigma_lt=0.0) -> np.ndarray:
+    """King's method with lead time variance: Z × √(Lead Time × σD² + σLT² × D²)."""
+    return m['z'] * np.sqrt(m['lead_time'] * m['var'] + sigma_lt ** 2 * m['burn_rate'] ** 2)
+
+
+def _power(m: Dict[str, np.ndarray], t1=1.0, exponent=0.5, scale=1.0) -> np.ndarray:
+    """Generalized King's method: scale × Z × (Lead Time / T1)^exponent × σD."""
+    return scale * m['z'] * (m['lead_time'] / t1) ** exponent * m['std']
+
+
+FORMULA_FAMILIES: Dict[str, Callable[..., np.ndarray]] = {
+    'kings': _kings,
+    'kings_with_lt_var': _kings_with_lt_var,
+    'power': _power,
+}
+
+
+@dataclass(frozen=True)
+class FormulaVariant:
+    """One formula family with fixed parameters.
+
+    The reported formula name is name.format(window=...) if the name contains
+    '{window}', otherwise f"{name}_{window}".
+    """
+    name: str
+    family: str
+    params: Tuple[Tuple[str, float], ...] = ()
+
+    def formula_name(self, window: str) -> str:
+        if '{window}' in self.name:
+            return self.name.format(window=window)
+        return f"{self.name}_{window}"
+
+
+def variant_grid(family: str, name: Optional[str] = None, **param_values: Iterable[float]) -> List[FormulaVariant]:
+    """
+    Expand parameter lists into one variant per combination.
+
+    Args:
+        family: Key of FORMULA_FAMILIES
+        name: Name template; '{param}' fields are filled from the parameters (default:
+            family followed by param_value pairs)
+        **param_values: Parameter name -> values to try
+
+    Returns:
+        List of FormulaVariant
+    """
+    if family not in FORMULA_FAMILIES:
+        raise ValueError(f"Unknown formula family: {family}")
+    names = list(param_values)
+    variants = []
+    for values in itertools.product(*(list(param_values[param]) for param in names)):
+        params = tuple(zip(names, (float(value) for value in values)))
+        if name is None:
+            variant_name = "_".join([family] + [f"{param}_{value:g}" for param, value in params])
+        else:
+            variant_name = name.format(window='{window}', **{param: f"{value:g}" for param, value in params})
+        variants.append(FormulaVariant(variant_name, family, params))
+    return variants
+
+
+def _predict(arrays: Dict[str, np.ndarray], family: str, param_names: List[str],
+             param_matrix: np.ndarray) -> np.ndarray:
+    """Predictions of one family for a block of variants, (variants, pairs, windows)."""
+    params = {param: param_matrix[:, i, None, None] for i, param in enumerate(param_names)}
+    predicted = FORMULA_FAMILIES[family](arrays, **params)
+    return np.broadcast_to(predicted, (len(param_matrix),) + arrays['count'].shape)
+
+
+def _score_block(arrays: Dict[str, np.ndarray], family: str, param_names: List[str],
+                 param_matrix: np.ndarray) -> Dict[str, np.ndarray]:
+    """Aggregate error metrics of a block of variants, each (variants, windows)."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        predicted = _predict(arrays, family, param_names, param_matrix)
+        actual = arrays['actual'][:, None]
+        valid = (arrays['count'] > 1) & (arrays['std'] > 0) & (predicted > 0)
+        error = np.abs(predicted - actual)
+        error_pct = np.where(actual > 0, error / actual * 100, 100.0)
+
+    metrics = {'count': valid.sum(axis=1)}
+    for metric, values in (('MAE', error), ('MAPE', error_pct)):
+        values = np.where(valid, values, 0.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = values.sum(axis=1) / metrics['count']
+            squares = np.where(valid, (values - mean[:, None, :]) ** 2, 0.0).sum(axis=1)
+            metrics[metric] = mean
+            metrics[f"{metric}_std"] = np.sqrt(squares / (metrics['count'] - 1))  # ddof=1, as pandas
+    metrics['within_10_pct'] = (valid & (error_pct <= 10)).sum(axis=1)
+    metrics['within_20_pct'] = (valid & (error_pct <= 20)).sum(axis=1)
+    return metrics
+
+
+def _blocks(variants: Sequence[FormulaVariant], chunk_size: int):
+    """Split variants into (family, param names, variants, param matrix) blocks."""
+    by_family: Dict[Tuple[str, Tuple[str, ...]], List[FormulaVariant]] = {}
+    for variant in variants:
+        by_family.setdefault((variant.family, tuple(param for param, _ in variant.params)), []).append(variant)
+    for (family, param_names), family_variants in by_family.items():
+        for start in range(0, len(family_variants), chunk_size):
+            chunk = family_variants[start:start + chunk_size]
+            param_matrix = np.array([[value for _, value in variant.params] for variant in chunk],
+                                    dtype=np.float64).reshape(len(chunk), len(param_names))
+            yield family, list(param_names), chunk, param_matrix
+
+
+def evaluate_variants(moments: PairMoments, variants: Sequence[FormulaVariant],
+                      chunk_size: int = 1024, max_workers: Optional[int] = 0) -> pd.DataFrame:
+    """
+    Score every variant x window over all pairs.
+
+    Args:
+        moments: PairMoments from pair_moments
+        variants: Formula variants to evaluate
+        chunk_size: Variants per broadcast block (bounds memory at
+            chunk_size x pairs x windows floats)
+        max_workers: Worker processes for the blocks (0 = this process, the default;
+            None = CPU count)
+
+    Returns:
+        One row per (variant, window) with at least one valid prediction: formula,
+        variant, family, window, parameter columns, MAE, MAE_std, MAPE, MAPE_std, count,
+        within_10_pct and within_20_pct, sorted by MAPE
+    """
+    arrays = moments.arrays()
+    blocks = list(_blocks(variants, chunk_size))
+    jobs = [(arrays, family, param_names, param_matrix) for family, param_names, _, param_matrix in blocks]
+    if max_workers == 0 or len(jobs) <= 1:
+        scores = [_score_block(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            scores = list(pool.map(_score_block, *zip(*jobs)))
+
+    frames = []
+    for (family, _, chunk, _), metrics in zip(blocks, scores):
+        num_variants, num_windows = len(chunk), len(moments.windows)
+        frame = pd.DataFrame({
+            'formula': [variant.formula_name(window) for variant in chunk for window in moments.windows],
+            'variant': np.repeat([variant.name for variant in chunk], num_windows),
+            'family': family,
+            'window': np.tile(moments.windows, num_variants),
+            **{metric: values.ravel() for metric, values in metrics.items()},
+        })
+        for i, (param, _) in enumerate(chunk[0].params if chunk else ()):
+            frame[param] = np.repeat([variant.params[i][1] for variant in chunk], num_windows)
+        frames.append(frame)
+
+    if not frames:
+        return pd.DataFrame(columns=['formula', 'variant', 'family', 'window', 'MAE', 'MAE_std',
+                                     'MAPE', 'MAPE_std', 'count', 'within_10_pct', 'within_20_pct'])
+    results = pd.concat(frames, ignore_index=True)
+    results = results[results['count'] > 0]
+    logger.info(f"Scored {len(variants):,} variants x {len(moments.windows)} windows "
+                f"over {moments.num_pairs} pairs")
+    return results.sort_values('MAPE', kind='stable').reset_index(drop=True)
+
+
+def pair_results(moments: PairMoments, variants: Sequence[FormulaVariant],
+                 pair_columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Long table of per-pair predictions for the given variants (valid predictions only).
+
+    Args:
+        moments: PairMoments from pair_moments
+        variants: Formula variants (keep this small; one row per variant x pair x window)
+        pair_columns: Reference columns to include (default: all)
+
+    Returns:
+        DataFrame with the pair columns plus formula, window, predicted_ss, actual_ss,
+        error, error_pct, lead_time, z_score, demand_std and data_points
+    """
+    arrays = moments.arrays()
+    pairs = moments.pairs if pair_columns is None else moments.pairs[list(pair_columns)]
+    frames = []
+    for family, param_names, chunk, param_matrix in _blocks(variants, chunk_size=len(variants) or 1):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            predicted = _predict(arrays, family, param_names, param_matrix)
+        valid = (moments.count > 1) & (moments.std > 0) & (predicted > 0)
+        v, p, w = np.nonzero(valid)
+        error = np.abs(predicted[v, p, w] - moments.actual[p])
+        frame = pairs.iloc[p].reset_index(drop=True)
+        frame['formula'] = [chunk[i].formula_name(moments.windows[j]) for i, j in zip(v, w)]
+        frame['window'] = np.asarray(moments.windows, dtype=object)[w]
+        frame['predicted_ss'] = predicted[v, p, w]
+        frame['actual_ss'] = moments.actual[p]
+        frame['error'] = error
+        with np.errstate(divide='ignore', invalid='ignore'):
+            frame['error_pct'] = np.where(moments.actual[p] > 0, error / moments.actual[p] * 100, 100.0)
+        frame['lead_time'] = moments.lead_time[p]
+        frame['z_score'] = moments.z_score[p]
+        frame['demand_std'] = moments.std[p, w]
+        frame['data_points'] = moments.count[p, w].astype(np.int64)
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def kings_variants(t1_values: Iterable[float] = (1, 7, 30)) -> List[FormulaVariant]:
+    """The King's method variants of the reverse engineering scripts, with their formula names."""
+    return ([FormulaVariant('basic_kings', 'kings')]
+            + variant_grid('kings', name='modified_kings_{window}_t1_{t1}', t1=t1_values)
+            + [FormulaVariant('kings_with_lt_var', 'kings_with_lt_var')])
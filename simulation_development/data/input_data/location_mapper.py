@@ -10,10 +10,18 @@ Key Features:
 - Handles both direct mappings and consolidated mappings
 - Provides reverse mapping for demand data to SKU locations
 - Supports validation and debugging of location mappings
+- Demand codes resolve through a rule engine: exact table, then prefix rules
+  (e.g. TORDC\\), then pattern families (e.g. MDR7010*, MDR6*); each distinct input
+  string is resolved once and memoized
+- map_demand_series / map_sku_series map whole columns by resolving unique values only
 """
 
 from typing import Dict, List, Optional, Tuple, Set
+import fnmatch
 import logging
+import re
+
+import pandas as pd
 
 logger = logging.getLogger(__name__)
 
@@ -24,7 +32,10 @@ class LocationMapper:
         """Initialize the location mapper with predefined mappings."""
         self.sku_to_demand_mapping = self._create_sku_to_demand_mapping()
         self.demand_to_sku_mapping = self._create_demand_to_sku_mapping()
+        self.prefix_rules = self._create_prefix_rules()
+        self.pattern_rules = self._create_pattern_rules()
         self.unmapped_locations = set()
+        self.clear_cache()
     
     def _create_sku_to_demand_mapping(self) -> Dict[str, str]:
         """Create mapping from SKU locations to demand locations based on analysis."""
@@ -111,6 +122,100 @@ class LocationMapper:
             "TORDC\\MDRRX": ["Level 2 Pharm"],  # RX with TORDC prefix
         }
     
+    def _create_prefix_rules(self) -> List[str]:
+        """Prefixes stripped from demand codes that have no exact mapping (consolidated codes)."""
+        return [
+            "TORDC\\",  # TORDC consolidated locations, e.g. TORDC\\MDRRT -> MDRRT
+        ]
+    
+    def _create_pattern_rules(self) -> List[Tuple[str, List[str]]]:
+        """Pattern families for demand codes not in the exact table, most specific first."""
+        return [
+            ("MDR7010*", ["Level 3 Medical"]),   # MDR7010 variations (Medical units)
+            ("MDR6*", ["Level 6 Surgical"]),     # MDR6 variations (Level 6 units)
+            ("MDR7*", ["Level 7 Surgical"]),     # MDR7 variations (Level 7 units)
+        ]
+    
+    def clear_cache(self):
+        """Recompile the rules and forget memoized lookups (call after editing the mappings)."""
+        self._compiled_patterns = [(re.compile(fnmatch.translate(pattern)), targets)
+                                   for pattern, targets in self.pattern_rules]
+        self._demand_cache: Dict[str, Tuple[str, ...]] = {}
+        self._sku_cache: Dict[str, Optional[str]] = {}
+    
+    def resolve_demand_location(self, demand_location: str) -> Tuple[str, ...]:
+        """
+        Resolve a demand code to SKU locations through the rule engine (memoized).
+        
+        Order: exact table, then prefix rules (strip and resolve the remainder), then
+        pattern families.
+        
+        Args:
+            demand_location: The location from demand data (e.g., "TORDC\\MDR7010XY")
+            
+        Returns:
+            Tuple of SKU locations (empty if no rule matches)
+        """
+        cached = self._demand_cache.get(demand_location)
+        if cached is not None:
+            return cached
+        
+        targets = self.demand_to_sku_mapping.get(demand_location)
+        if targets is None:
+            for prefix in self.prefix_rules:
+                if demand_location.startswith(prefix) and len(demand_location) > len(prefix):
+                    targets = list(self.resolve_demand_location(demand_location[len(prefix):]))
+                    break
+        if not targets:
+            targets = next((targets for pattern, targets in self._compiled_patterns
+                            if pattern.match(demand_location)), [])
+        
+        resolved = tuple(targets)
+        self._demand_cache[demand_location] = resolved
+        return resolved
+    
+    def map_demand_series(self, demand_locations: pd.Series) -> pd.Series:
+        """
+        Map a column of demand codes to their primary SKU location.
+        
+        Unique values are resolved once and the result is broadcast back as categorical
+        codes; unmapped values become NaN.
+        
+        Args:
+            demand_locations: Series of demand location codes
+            
+        Returns:
+            Categorical Series of SKU locations, aligned with the input
+        """
+        codes, uniques = pd.factorize(demand_locations)
+        return self._broadcast(codes, [
+            (self.resolve_demand_location(str(value)) or (None,))[0] for value in uniques
+        ], demand_locations.index)
+    
+    def map_sku_series(self, sku_locations: pd.Series) -> pd.Series:
+        """
+        Map a column of SKU locations to demand locations, resolving each unique value once.
+        
+        Args:
+            sku_locations: Series of SKU location names
+            
+        Returns:
+            Categorical Series of demand locations (NaN where unmapped), aligned with the input
+        """
+        codes, uniques = pd.factorize(sku_locations)
+        return self._broadcast(codes, [self.map_sku_to_demand_location(str(value)) for value in uniques],
+                               sku_locations.index)
+    
+    @staticmethod
+    def _broadcast(codes, resolved: List[Optional[str]], index) -> pd.Series:
+        """Turn per-unique results back into a categorical Series via the factorize codes."""
+        categories = pd.Index(sorted({value for value in resolved if value is not None}))
+        category_codes = pd.Series(categories.get_indexer(
+            [value if value is not None else "" for value in resolved]))
+        result_codes = category_codes.to_numpy()[codes] if len(resolved) else codes
+        result_codes[codes < 0] = -1  # NaN inputs stay NaN
+        return pd.Series(pd.Categorical.from_codes(result_codes, categories=categories), index=index)
+    
     def _create_demand_to_sku_mapping(self) -> Dict[str, List[str]]:
         """Create reverse mapping from demand locations to SKU locations."""
         # Start with the extended mapping
@@ -135,12 +240,16 @@ class LocationMapper:
         Returns:
             The corresponding demand location (e.g., "MDRER") or None if not found
         """
-        if sku_location in self.sku_to_demand_mapping:
-            return self.sku_to_demand_mapping[sku_location]
-        else:
+        if sku_location in self._sku_cache:
+            return self._sku_cache[sku_location]
+        
+        demand_location = self.sku_to_demand_mapping.get(sku_location)
+        if demand_location is None:
+            # Warn once per distinct location rather than on every lookup
             self.unmapped_locations.add(sku_location)
             logger.warning(f"No mapping found for SKU location: {sku_location}")
-            return None
+        self._sku_cache[sku_location] = demand_location
+        return demand_location
     
     def map_demand_to_sku_locations(self, demand_location: str) -> List[str]:
         """
@@ -152,7 +261,7 @@ class LocationMapper:
         Returns:
             List of corresponding SKU locations (e.g., ["Level 1 ED"])
         """
-        return self.demand_to_sku_mapping.get(demand_location, [])
+        return list(self.resolve_demand_location(demand_location))
     
     def get_all_sku_locations(self) -> Set[str]:
         """Get all SKU locations that have mappings."""
@@ -194,7 +303,7 @@ class LocationMapper:
         
         # Check demand locations
         for demand_loc in demand_locations:
-            if demand_loc in self.demand_to_sku_mapping:
+            if self.resolve_demand_location(demand_loc):
                 results['mapped_demand_locations'] += 1
             else:
                 results['unmapped_demand_locations'].append(demand_loc)
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+CedarSim Phase Runner - Content-Hashed Incremental Pipeline Phases
+
+This module runs data pipeline phases as a small DAG and caches each phase's
+outputs under a hash of its inputs and its code, so a rerun only executes the phases
+whose inputs (or code) changed; e.g. a new validation sample does not re-clean the
+demand data.
+
+ARCHITECTURE:
+- A Phase declares named inputs and outputs; an output is an artifact that later
+  phases can consume; artifacts not produced by a phase are supplied to run()
+- Phases run in dependency order (declaration order among independent phases)
+- Every artifact has a content hash: DataFrames hash their values, index, columns and
+  dtypes (pd.util.hash_pandas_object); Paths hash the file contents; other values
+  hash their pickle
+- A phase's cache key is sha256(name, version, source of its code, input hashes); the
+  outputs are pickled under <cache_dir>/<phase>/<key[:16]>/ with a manifest holding
+  the output hashes, so downstream keys never require re-hashing a cached output
+- Files a phase writes as side effects are part of its cache entry: a hit requires
+  each file to exist with the recorded hash, otherwise the phase runs again
+- Cached outputs are unpickled lazily, only when a phase that runs needs them or the
+  caller asks for them
+- Every phase reports whether it ran or was reused and how long it took
+
+Key Features:
+- Phase: name, run callable, inputs, outputs, side-effect files, version
+- PhaseRunner.run: execute the DAG, returning the artifact store
+- PhaseRunner.timings / format_timings: per-phase status and wall time
+- PhaseError: raised by a phase to stop the run (nothing is cached for it)
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import hashlib
+import inspect
+import json
+import logging
+import os
+import pickle
+import shutil
+import time
+
+import pandas as pd
+
+from .typed_loader import file_sha256
+
+logger = logging.getLogger(__name__)
+
+# Bump when the cache layout or the hashing below changes
+RUNNER_VERSION = 1
+
+MANIFEST_NAME = "manifest.json"
+
+
+class PhaseError(RuntimeError):
+    """Raised when a phase fails; the run stops and the phase is not cached."""
+
+
+@dataclass
+class Phase:
+    """
+    One pipeline phase.
+
+    run receives the input artifacts as keyword arguments and returns a dict with
+    (at least) every declared output. code is the callable whose source is hashed
+    into the cache key (default: run); bump version for changes the source does not
+    show (e.g. in helpers it calls).
+    """
+    name: str
+    run: Callable[..., Dict[str, Any]]
+    inputs: Sequence[str] = ()
+    outputs: Sequence[str] = ()
+    files: Sequence[Path] = ()
+    version: int = 1
+    code: Optional[Callable] = None
+
+
+@dataclass
+class PhaseTiming:
+    """How a phase was satisfied and how long it took."""
+    name: str
+    status: str          # 'ran' or 'cached'
+    seconds: float
+    key: str = ""
+
+
+def artifact_hash(value: Any) -> str:
+    """Content hash of an artifact value."""
+    digest = hashlib.sha256()
+    if isinstance(value, pd.DataFrame):
+        digest.update(b"frame")
+        digest.update(repr([(str(column), str(dtype)) for column, dtype in value.dtypes.items()]).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, Path):
+        digest.update(b"file")
+        digest.update(file_sha256(value).encode() if value.exists() else b"missing")
+    else:
+        digest.update(b"value")
+        digest.update(pickle.dumps(value, protocol=4))
+    return digest.hexdigest()
+
+
+def code_hash(code: Callable) -> str:
+    """Hash of a callable's source (its qualified name if the source is unavailable)."""
+    try:
+        source = inspect.getsource(code)
+    except (OSError, TypeError):
+        source = getattr(code, '__qualname__', repr(code))
+    return hashlib.sha256(source.encode()).hexdigest()
+
+
+class Artifacts:
+    """Artifact values and hashes; cached outputs are loaded on first access."""
+
+    def __init__(self):
+        self._values: Dict[str, Any] = {}
+        self._files: Dict[str, Path] = {}
+        self.hashes: Dict[str, str] = {}
+
+    def set(self, name: str, value: Any, value_hash: Optional[str] = None):
+        self._values[name] = value
+        self._files.pop(name, None)
+        self.hashes[name] = value_hash or artifact_hash(value)
+
+    def set_cached(self, name: str, path: Path, value_hash: str):
+        self._values.pop(name, None)
+        self._files[name] = path
+        self.hashes[name] = value_hash
+
+    def get(self, name: str) -> Any:
+        if name not in self._values:
+            with open(self._files.pop(name), 'rb') as f:
+                self._values[name] = pickle.load(f)
+        return self._values[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.hashes
+
+    def __getitem__(self, name: str) -> Any:
+        return self.get(name)
+
+
+def _order(phases: Sequence[Phase], initial: Sequence[str]) -> List[Phase]:
+    """Dependency order of the phases; declaration order among independent ones."""
+    producer = {}
+    for phase in phases:
+        for output in phase.outputs:
+            if output in producer or output in initial:
+                raise ValueError(f"Artifact '{output}' is produced more than once")
+            producer[output] = phase.name
+    ordered, available, pending = [], set(initial), list(phases)
+    while pending:
+        ready = [phase for phase in pending if all(name in available for name in phase.inputs)]
+        if not ready:
+            missing = {name for phase in pending for name in phase.inputs
+                       if name not in available and name not in producer}
+            raise ValueError(f"Unsatisfiable phase inputs: {sorted(missing) or 'dependency cycle'}")
+        phase = ready[0]
+        ordered.append(phase)
+        available.update(phase.outputs)
+        pending.remove(phase)
+    return ordered
+
+
+class PhaseRunner:
+    """Runs phases in dependency order, reusing cached outputs when inputs are unchanged."""
+
+    def __init__(self, phases: Sequence[Phase], cache_dir: Path, use_cache: bool = True):
+        self.phases = list(phases)
+        self.cache_dir = Path(cache_dir)
+        self.use_cache = use_cache
+        self.timings: List[PhaseTiming] = []
+
+    def phase_key(self, phase: Phase, artifacts: Artifacts) -> str:
+        """Cache key of a phase from its code and the hashes of its inputs."""
+        parts = {'runner': RUNNER_VERSION, 'phase': phase.name, 'version': phase.version,
+                 'code': code_hash(phase.code or phase.run),
+                 'inputs': [(name, artifacts.hashes[name]) for name in phase.inputs],
+                 'files': [str(path) for path in phase.files]}
+        return hashlib.sha256(json.dumps(parts).encode()).hexdigest()
+
+    def _load(self, phase: Phase, key: str, artifacts: Artifacts) -> bool:
+        """Register a cache entry's outputs if it is complete and its files are intact."""
+        entry = self.cache_dir / phase.name / key[:16]
+        try:
+            manifest = json.loads((entry / MANIFEST_NAME).read_text())
+        except (OSError, ValueError):
+            return False
+        if manifest.get('key') != key:
+            return False
+        for path, recorded in manifest['files'].items():
+            if not Path(path).exists() or file_sha256(Path(path)) != recorded:
+                logger.info(f"Phase '{phase.name}': {path} is missing or changed, running again")
+                return False
+        if not all((entry / f"{name}.pkl").exists() for name in phase.outputs):
+            return False
+        for name in phase.outputs:
+            artifacts.set_cached(name, entry / f"{name}.pkl", manifest['outputs'][name])
+        return True
+
+    def _store(self, phase: Phase, key: str, outputs: Dict[str, Any], artifacts: Artifacts):
+        """Pickle a phase's outputs into its cache entry (atomically replaced)."""
+        entry = self.cache_dir / phase.name / key[:16]
+        tmp_dir = entry.with_name(f"{entry.name}.tmp{os.getpid()}")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+        try:
+            for name in phase.outputs:
+                with open(tmp_dir / f"{name}.pkl", 'wb') as f:
+                    pickle.dump(outputs[name], f, protocol=4)
+            (tmp_dir / MANIFEST_NAME).write_text(json.dumps({
+                'key': key, 'phase': phase.name,
+                'outputs': {name: artifacts.hashes[name] for name in phase.outputs},
+                'files': {str(path): file_sha256(Path(path)) for path in phase.files}}, indent=2))
+            shutil.rmtree(entry, ignore_errors=True)
+            os.replace(tmp_dir, entry)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def run(self, initial: Optional[Dict[str, Any]] = None) -> Artifacts:
+        """
+        Run every phase, reusing cached outputs where the key matches.
+
+        Args:
+            initial: Artifacts not produced by any phase (e.g. input file Paths)
+
+        Returns:
+            Artifacts holding every initial and produced artifact
+
+        Raises:
+            PhaseError: A phase failed (earlier phases stay cached)
+        """
+        initial = initial or {}
+        artifacts = Artifacts()
+        for name, value in initial.items():
+            artifacts.set(name, value)
+
+        self.timings = []
+        for phase in _order(self.phases, list(initial)):
+            start = time.perf_counter()
+            key = self.phase_key(phase, artifacts)
+            if self.use_cache and self._load(phase, key, artifacts):
+                status = 'cached'
+            else:
+                outputs = phase.run(**{name: artifacts.get(name) for name in phase.inputs})
+                missing = [name for name in phase.outputs if name not in outputs]
+                if missing:
+                    raise PhaseError(f"Phase '{phase.name}' did not produce {missing}")
+                for name in phase.outputs:
+                    artifacts.set(name, outputs[name])
+                if self.use_cache:
+                    self._store(phase, key, outputs, artifacts)
+                status = 'ran'
+            timing = PhaseTiming(phase.name, status, time.perf_counter() - start, key)
+            self.timings.append(timing)
+            logger.info(f"Phase '{phase.name}' {timing.status} in {timing.seconds:.2f}s")
+        return artifacts
+
+    def format_timings(self) -> str:
+        """Per-phase timing table of the last run."""
+        width = max([len(timing.name) for timing in self.timings] + [5])
+        lines = [f"{'Phase':<{width}}  {'Status':<6}  {'Seconds':>8}"]
+        lines += [f"{timing.name:<{width}}  {timing.status:<6}  {timing.seconds:>8.2f}" for timing in self.timings]
+        lines.append(f"{'Total':<{width}}  {'':<6}  {sum(t.seconds for t in self.timings):>8.2f}")
+        return "\n".join(lines)
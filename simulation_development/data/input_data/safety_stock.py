@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+CedarSim Safety Stock Module - Group-By Safety Stock for Every SKU-Location
+
+This module computes historical demand statistics and safety stock
+(Z-score × √(Lead Time) × Demand Std) for every SKU-location pair in one pass over the
+demand table, instead of filtering the whole table once per pair.
+
+ARCHITECTURE:
+- demand_statistics: one groupby over the key columns gives daily demand mean, std
+  (population std, as np.std), the number of demand records and the lead time
+- Safety stock and the error against a reference column are plain column arithmetic,
+  so any number of pairs costs the same handful of vectorized operations
+- Demand locations that are not SKU locations are resolved with
+  LocationMapper.map_demand_series (each distinct code resolved once)
+- target_levels produces one row per (oid, lo) with a target_level column;
+  apply_target_levels merges it into SKU inventory data as 'Stock Units Analytical',
+  which DataIntegrator already uses as the SKU target level
+
+Key Features:
+- demand_statistics: grouped daily demand mean / std / record count / lead time
+- compare_safety_stock: calculated vs reference safety stock (validation test data)
+- target_levels / apply_target_levels: production target levels for DataIntegrator
+- target_levels_from_statistics: the same from the precomputed demand statistics cube
+"""
+
+from typing import Optional, Sequence
+import logging
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from core.id_registry import canonicalize_sku_ids
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_Z_SCORE = 2.05
+
+DAYS_PER_PERIOD = 7  # Demand records are weekly totals
+
+MIN_DATA_POINTS = 2
+
+
+def demand_statistics(demand_data: pd.DataFrame, keys: Sequence[str],
+                      quantity_column: str = 'Total Qty Issues',
+                      lead_time_column: Optional[str] = None,
+                      period_days: int = DAYS_PER_PERIOD) -> pd.DataFrame:
+    """
+    Daily demand statistics for every key group in a single groupby.
+
+    Args:
+        demand_data: Long-format demand records (one row per period)
+        keys: Columns identifying a SKU-location pair
+        quantity_column: Demand quantity per period
+        lead_time_column: Optional lead time column (first value per group is kept)
+        period_days: Days per demand period, to convert period totals to daily demand
+
+    Returns:
+        DataFrame with the key columns plus demand_mean, demand_std, data_points and
+        (if lead_time_column is given) lead_time
+    """
+    keys = list(keys)
+    columns = {'daily_demand': demand_data[quantity_column].to_numpy(dtype=np.float64) / period_days}
+    if lead_time_column is not None:
+        columns['lead_time'] = demand_data[lead_time_column].to_numpy(dtype=np.float64)
+    frame = demand_data[keys].assign(**columns)
+
+    grouped = frame.groupby(keys, sort=False, observed=True, dropna=True)
+    aggregations = {
+        'demand_mean': ('daily_demand', 'mean'),
+        'data_points': ('daily_demand', 'size'),
+    }
+    if lead_time_column is not None:
+        aggregations['lead_time'] = ('lead_time', 'first')
+    stats = grouped.agg(**aggregations).reset_index()
+    stats.insert(len(keys) + 1, 'demand_std', grouped['daily_demand'].std(ddof=0).to_numpy())
+    return stats
+
+
+def safety_stock(z_score, lead_time, demand_std):
+    """Z-score × √(Lead Time) × Demand Std, element-wise."""
+    return np.asarray(z_score, dtype=np.float64) * np.sqrt(lead_time) * demand_std
+
+
+def compare_safety_stock(reference: pd.DataFrame, demand_data: pd.DataFrame, keys: Sequence[str],
+                         reference_column: str = 'Safety stock_units',
+                         z_score_column: str = 'Z-score',
+                         lead_time_column: str = 'Avg_Lead Time',
+                         quantity_column: str = 'Total Qty Issues',
+                         min_data_points: int = MIN_DATA_POINTS) -> pd.DataFrame:
+    """
+    Calculate safety stock for every reference row and its error against the reference value.
+
+    Args:
+        reference: Rows with the key columns, Z-scores and reference safety stock
+            (e.g. validation_test_data.csv)
+        demand_data: Demand records with the key columns, quantities and lead times
+        keys: Columns shared by reference and demand_data that identify a pair
+        reference_column: Reference safety stock column
+        z_score_column: Z-score column in reference
+        lead_time_column: Lead time column in demand_data
+        quantity_column: Demand quantity column in demand_data
+        min_data_points: Pairs with fewer demand records are dropped
+
+    Returns:
+        One row per reference row with enough demand history: reference columns plus
+        demand_mean, demand_std, data_points, lead_time, calculated_ss, error and
+        error_pct (100% where the reference is not positive)
+    """
+    keys = list(keys)
+    reference = reference.dropna(subset=[reference_column])
+    stats = demand_statistics(demand_data, keys, quantity_column, lead_time_column)
+    results = reference.merge(stats[stats['data_points'] >= min_data_points], on=keys, how='inner')
+
+    results['calculated_ss'] = safety_stock(results[z_score_column], results['lead_time'], results['demand_std'])
+    actual = results[reference_column].to_numpy(dtype=np.float64)
+    results['error'] = np.abs(results['calculated_ss'].to_numpy() - actual)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        results['error_pct'] = np.where(actual > 0, results['error'].to_numpy() / actual * 100, 100.0)
+
+    skipped = len(reference) - len(results)
+    if skipped:
+        logger.info(f"{skipped} reference rows have fewer than {min_data_points} demand records")
+    return results
+
+
+def target_levels(demand_data: pd.DataFrame, sku_data: pd.DataFrame,
+                  z_score: float = DEFAULT_Z_SCORE, location_mapper=None,
+                  location_column: str = 'uniform_location',
+                  quantity_column: str = 'Total Qty Issues',
+                  min_data_points: int = MIN_DATA_POINTS) -> pd.DataFrame:
+    """
+    Safety stock target levels for every SKU-location in the SKU data that has demand history.
+
+    Lead times come from the SKU data. Demand locations that are not SKU locations are
+    mapped to their primary SKU location with the location mapper (if given).
+
+    Args:
+        demand_data: Demand records with oid, location and quantity columns
+        sku_data: SKU inventory data (oid, lo, lead_time)
+        z_score: Service level Z-score
+        location_mapper: LocationMapper for demand location codes
+        location_column: Demand location column
+        quantity_column: Demand quantity column
+        min_data_points: Pairs with fewer demand records get no target level
+
+    Returns:
+        DataFrame with oid, lo, lead_time, demand_mean, demand_std, data_points and
+        target_level, one row per SKU-location
+    """
+    locations = demand_data[location_column].astype(object)
+    if location_mapper is not None:
+        is_sku_location = locations.isin(set(sku_data['lo'].dropna().astype(str)))
+        mapped = location_mapper.map_demand_series(locations[~is_sku_location]).astype(object)
+        locations = locations.where(is_sku_location, mapped)
+    demand = pd.DataFrame({'oid': canonicalize_sku_ids(demand_data['oid']).to_numpy(), 'lo': locations.to_numpy(),
+                           quantity_column: demand_data[quantity_column].to_numpy()})
+
+    stats = demand_statistics(demand, ['oid', 'lo'], quantity_column)
+    stats = stats[stats['data_points'] >= min_data_points]
+
+    # Duplicate (oid, lo) rows in the SKU data share one lead time (the first)
+    lead_times = pd.DataFrame({'oid': canonicalize_sku_ids(sku_data['oid']).to_numpy(),
+                               'lo': sku_data['lo'].astype(str).to_numpy(),
+                               'lead_time': sku_data['lead_time'].to_numpy(dtype=np.float64)})
+    lead_times = lead_times.drop_duplicates(subset=['oid', 'lo'])
+    targets = lead_times.merge(stats, on=['oid', 'lo'], how='inner')
+    targets['target_level'] = safety_stock(z_score, targets['lead_time'], targets['demand_std'])
+    logger.info(f"Computed target levels for {len(targets):,} SKU-locations")
+    return targets
+
+
+def target_levels_from_statistics(statistics: pd.DataFrame, sku_data: pd.DataFrame,
+                                  window: str = '52w', z_score: float = DEFAULT_Z_SCORE,
+                                  period_days: int = DAYS_PER_PERIOD) -> pd.DataFrame:
+    """
+    Safety stock target levels from the demand statistics cube instead of raw demand.
+
+    Uses the trailing (last week) mean and std of the given window, converted from
+    weekly to daily demand, and lead times from the SKU data.
+
+    Args:
+        statistics: Statistics cube (DataIntegrator.build_demand_statistics) or its
+            trailing rows
+        sku_data: SKU inventory data (oid, lo, lead_time)
+        window: Cube window label ('4w', '13w', '26w', '52w' or 'full')
+        z_score: Service level Z-score
+        period_days: Days per demand period
+
+    Returns:
+        Same layout as target_levels (data_points is not available and omitted)
+    """
+    trailing = statistics[statistics['week'] == statistics['week'].max()]
+    trailing = trailing.dropna(subset=[f'std_{window}'])
+    stats = pd.DataFrame({'oid': trailing['sku_id'].astype(str).to_numpy(),
+                          'lo': trailing['location'].astype(str).to_numpy(),
+                          'demand_mean': trailing[f'mean_{window}'].to_numpy(dtype=np.float64) / period_days,
+                          'demand_std': trailing[f'std_{window}'].to_numpy(dtype=np.float64) / period_days})
+    stats = stats.drop_duplicates(subset=['oid', 'lo'], keep='last')
+
+    lead_times = pd.DataFrame({'oid': canonicalize_sku_ids(sku_data['oid']).to_numpy(),
+                               'lo': sku_data['lo'].astype(str).to_numpy(),
+                               'lead_time': sku_data['lead_time'].to_numpy(dtype=np.float64)})
+    targets = lead_times.drop_duplicates(subset=['oid', 'lo']).merge(stats, on=['oid', 'lo'], how='inner')
+    targets['target_level'] = safety_stock(z_score, targets['lead_time'], targets['demand_std'])
+    return targets
+
+
+def apply_target_levels(sku_data: pd.DataFrame, targets: pd.DataFrame) -> pd.DataFrame:
+    """
+    Copy of sku_data with 'Stock Units Analytical' replaced by target levels where available.
+
+    The result can be assigned to DataIntegrator.sku_data; SKU-locations without a target
+    level keep their analytical value (or the integrator's fallback calculation).
+    """
+    result = sku_data.copy()
+    keys = pd.MultiIndex.from_arrays([canonicalize_sku_ids(result['oid']), result['lo'].astype(str)])
+    target_index = pd.MultiIndex.from_arrays([canonicalize_sku_ids(targets['oid']), targets['lo'].astype(str)])
+    positions = target_index.get_indexer(keys)
+    found = positions >= 0
+
+    analytical = (result['Stock Units Analytical'].to_numpy(dtype=np.float64, copy=True)
+                  if 'Stock Units Analytical' in result.columns else np.full(len(result), np.nan))
+    analytical[found] = targets['target_level'].to_numpy(dtype=np.float64)[positions[found]]
+    result['Stock Units Analytical'] = analytical
+    return result
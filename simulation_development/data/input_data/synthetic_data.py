@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+CedarSim Synthetic Data - Large-Hospital Inputs for Scale Testing
+
+This module fits the statistical shape of the shipped input data (SKU inventory CSV
+and weekly demand extract) and generates inputs with the production schema at any
+scale: more SKUs per hospital, and several facilities in one dataset. The generated
+directory can be loaded with DataIntegrator(data_dir=...) like prod-input-data.
+
+ARCHITECTURE:
+- HospitalProfile holds the fitted distributions:
+  - lead time: the empirical per-SKU lead times (resampled; lead time is an item
+    property, so all locations of a SKU share it)
+  - burn rate: zero-inflated log-normal per SKU-location, clipped to the observed range
+  - Stock Units Analytical: log-normal days of cover x burn rate, clipped to the
+    observed max (empirical values for zero-burn rows)
+  - locations: location frequencies and the number of locations per SKU
+  - demand: Beta-distributed weekly order probability per series and the coefficient
+    of variation of order sizes, fitted from a weekly demand extract
+- SKU ids are distinct random 6-digit ids; each facility stocks every SKU of the
+  catalog at its own draw of locations; facility 1 keeps the real location names,
+  facility N prefixes them with "FNN " (unmapped names resolve to themselves)
+- Demand is intermittent (Croston-style): each week a SKU-location orders with its
+  probability p (capped at 7 x burn_rate for slow movers); order sizes are
+  Gamma-distributed with mean 7 x burn_rate / p, so the expected weekly demand
+  matches the daily burn rate; quantities are whole units
+- Demand rows are generated and appended to the CSV a block of slots at a time, so
+  memory stays bounded at 100x scale
+
+Key Features:
+- fit_hospital_profile: fit a profile from SKU data (and optionally a demand extract)
+- generate_sku_inventory: SKU inventory rows at a scale / facility count
+- generate_demand: weekly demand rows, in blocks
+- write_synthetic_dataset: both CSVs under the production file names
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+from .data_integration import DEMAND_DATA_FILE
+from .topology_cache import SKU_DATA_FILE
+
+logger = logging.getLogger(__name__)
+
+# Intermittency of the shipped weekly demand extract (validation_demand_subset.csv),
+# used when a profile is fitted without demand data
+DEFAULT_ORDER_PROBABILITY_MEAN = 0.29
+DEFAULT_ORDER_PROBABILITY_STD = 0.22
+DEFAULT_ORDER_SIZE_CV = 0.47
+DEFAULT_WEEKS = 133
+DEFAULT_START_DATE = "2022-01-02"  # A week-ending Sunday
+
+# Largest SKU id that fits the canonical 6-digit format
+MAX_SKU_ID = 999_999
+
+# SKU-location slots whose demand is generated at a time
+DEMAND_CHUNK_SLOTS = 50_000
+
+SKU_COLUMNS = ['oid', 'Item Description', 'unit_of_measure', 'lo', 'lead_time', 'burn_rate',
+               'Stock Units Analytical']
+DEMAND_COLUMNS = ['PO Week Ending Date', 'oid', 'lo', 'uniform_location', 'Total Qty Issues']
+
+
+@dataclass
+class HospitalProfile:
+    """Fitted input distributions of one hospital."""
+    num_skus: int
+    locations: List[str]
+    location_weights: np.ndarray
+    locations_per_sku: np.ndarray         # Observed locations-per-SKU counts (resampled)
+    lead_times: np.ndarray                # Observed per-SKU lead times (resampled)
+    units_of_measure: List[str]
+    unit_weights: np.ndarray
+    zero_burn_fraction: float
+    log_burn_mean: float
+    log_burn_std: float
+    min_burn_rate: float
+    max_burn_rate: float
+    log_cover_mean: float                 # log(Stock Units Analytical / burn_rate)
+    log_cover_std: float
+    max_analytical: float
+    zero_burn_analytical: np.ndarray      # Observed analytical stock of zero-burn rows
+    order_probability_mean: float = DEFAULT_ORDER_PROBABILITY_MEAN
+    order_probability_std: float = DEFAULT_ORDER_PROBABILITY_STD
+    order_size_cv: float = DEFAULT_ORDER_SIZE_CV
+    weeks: int = DEFAULT_WEEKS
+
+    def order_probability_beta(self) -> tuple:
+        """Beta(a, b) parameters with the fitted mean and standard deviation."""
+        mean, var = self.order_probability_mean, self.order_probability_std ** 2
+        common = max(mean * (1 - mean) / var - 1, 1e-3)
+        return mean * common, (1 - mean) * common
+
+
+def _fit_demand(profile: HospitalProfile, demand_data: pd.DataFrame, sku_column: str,
+                location_column: str, quantity_column: str, date_column: str):
+    """Fit the weekly order probability and order size variation of a demand extract."""
+    dates = pd.to_datetime(demand_data[date_column])
+    num_weeks = int((dates.max() - dates.min()).days // 7) + 1
+    orders = demand_data[demand_data[quantity_column] > 0].assign(_week=dates)
+    series = orders.groupby([sku_column, location_column])
+    probability = series['_week'].nunique() / num_weeks
+    weekly = orders.groupby([sku_column, location_column, '_week'])[quantity_column].sum()
+    size_cv = weekly.groupby(level=[0, 1]).agg(lambda x: x.std() / x.mean()).dropna()
+
+    profile.order_probability_mean = float(probability.mean())
+    profile.order_probability_std = float(probability.std()) if len(probability) > 1 else DEFAULT_ORDER_PROBABILITY_STD
+    if len(size_cv):
+        profile.order_size_cv = float(size_cv.median())
+    profile.weeks = num_weeks
+
+
+def fit_hospital_profile(sku_data: pd.DataFrame, demand_data: Optional[pd.DataFrame] = None,
+                         sku_column: str = 'oid', location_column: str = 'uniform_location',
+                         quantity_column: str = 'Total Qty Issues',
+                         date_column: str = 'PO Week Ending Date') -> HospitalProfile:
+    """
+    Fit a HospitalProfile from SKU inventory data and (optionally) weekly demand.
+
+    Args:
+        sku_data: SKU inventory rows (oid, lo, lead_time, burn_rate, Stock Units Analytical, ...)
+        demand_data: Weekly demand rows; without it the intermittency defaults above are used
+        sku_column, location_column, quantity_column, date_column: Demand column names
+            (the raw workbook extract uses 'Oracle Item Number' / 'Deliver to Location')
+
+    Returns:
+        HospitalProfile
+    """
+    burn = sku_data['burn_rate'].to_numpy(dtype=np.float64)
+    analytical = sku_data['Stock Units Analytical'].to_numpy(dtype=np.float64)
+    positive = burn > 0
+    log_burn = np.log(burn[positive])
+    with_cover = positive & (analytical > 0)
+    log_cover = np.log(analytical[with_cover] / burn[with_cover])
+
+    locations = sku_data['lo'].astype(str).value_counts()
+    units = sku_data['unit_of_measure'].astype(str).value_counts()
+    per_sku = sku_data.groupby('oid', observed=True)
+    profile = HospitalProfile(
+        num_skus=int(sku_data['oid'].nunique()),
+        locations=locations.index.tolist(),
+        location_weights=(locations / locations.sum()).to_numpy(),
+        locations_per_sku=per_sku.size().to_numpy(),
+        lead_times=per_sku['lead_time'].first().dropna().to_numpy(dtype=np.float64),
+        units_of_measure=units.index.tolist(),
+        unit_weights=(units / units.sum()).to_numpy(),
+        zero_burn_fraction=float(1 - positive.mean()),
+        log_burn_mean=float(log_burn.mean()),
+        log_burn_std=float(log_burn.std()),
+        min_burn_rate=float(burn[positive].min()),
+        max_burn_rate=float(burn.max()),
+        log_cover_mean=float(log_cover.mean()),
+        log_cover_std=float(log_cover.std()),
+        max_analytical=float(np.nanmax(analytical)),
+        zero_burn_analytical=np.nan_to_num(analytical[~positive]) if (~positive).any() else np.zeros(1),
+    )
+    if demand_data is not None and len(demand_data):
+        _fit_demand(profile, demand_data, sku_column, location_column, quantity_column, date_column)
+    return profile
+
+
+def facility_location(location: str, facility: int) -> str:
+    """Location name at a facility (facility 0 keeps the real names)."""
+    return location if facility == 0 else f"F{facility + 1:02d} {location}"
+
+
+def _stocked_locations(rng: np.random.Generator, profile: HospitalProfile, num_skus: int) -> tuple:
+    """(sku index, location index) pairs: locations drawn by frequency, without replacement."""
+    num_locations = len(profile.locations)
+    counts = np.minimum(rng.choice(profile.locations_per_sku, num_skus), num_locations)
+    # Gumbel top-k: weighted sampling without replacement for every SKU at once
+    keys = np.log(profile.location_weights) + rng.gumbel(size=(num_skus, num_locations))
+    order = np.argsort(-keys, axis=1)
+    take = np.arange(num_locations) < counts[:, None]
+    return np.nonzero(take)[0], order[take]
+
+
+def generate_sku_inventory(profile: HospitalProfile, scale: float = 1.0, facilities: int = 1,
+                           seed: int = 0) -> pd.DataFrame:
+    """
+    Generate SKU inventory rows with the production schema.
+
+    Args:
+        profile: Fitted HospitalProfile
+        scale: Catalog size relative to the fitted hospital (10 = ten times the SKUs)
+        facilities: Facilities stocking the catalog, each at its own locations
+        seed: Random seed
+
+    Returns:
+        SKU inventory DataFrame (SKU_COLUMNS)
+
+    Raises:
+        ValueError: The catalog does not fit the 6-digit SKU id space
+    """
+    num_skus = max(int(round(profile.num_skus * scale)), 1)
+    if num_skus > MAX_SKU_ID:
+        raise ValueError(f"{num_skus:,} SKUs do not fit the 6-digit SKU id space")
+    rng = np.random.default_rng(seed)
+
+    sku_ids = np.sort(rng.choice(MAX_SKU_ID, num_skus, replace=False) + 1)
+    oids = pd.Series(sku_ids).astype(str).str.zfill(6).to_numpy()
+    lead_times = rng.choice(profile.lead_times, num_skus)
+    units = rng.choice(np.array(profile.units_of_measure, dtype=object), num_skus, p=profile.unit_weights)
+    locations = np.array(profile.locations, dtype=object)
+
+    frames = []
+    for facility in range(facilities):
+        sku_index, location_index = _stocked_locations(rng, profile, num_skus)
+        num_rows = len(sku_index)
+        burn = np.exp(rng.normal(profile.log_burn_mean, profile.log_burn_std, num_rows))
+        burn = np.round(np.clip(burn, profile.min_burn_rate, profile.max_burn_rate), 2)
+        burn[rng.random(num_rows) < profile.zero_burn_fraction] = 0.0
+        cover = np.exp(rng.normal(profile.log_cover_mean, profile.log_cover_std, num_rows))
+        analytical = np.where(burn > 0, np.clip(np.rint(burn * cover), 1, profile.max_analytical),
+                              rng.choice(profile.zero_burn_analytical, num_rows))
+        facility_locations = np.array([facility_location(name, facility) for name in locations], dtype=object)
+        frames.append(pd.DataFrame({
+            'oid': oids[sku_index],
+            'Item Description': [f"Synthetic Item {oid}" for oid in oids[sku_index]],
+            'unit_of_measure': units[sku_index],
+            'lo': facility_locations[location_index],
+            'lead_time': lead_times[sku_index],
+            'burn_rate': burn,
+            'Stock Units Analytical': analytical,
+        }))
+    sku_data = pd.concat(frames, ignore_index=True)
+    logger.info(f"Generated {len(sku_data):,} SKU-location rows ({num_skus:,} SKUs, {facilities} facilities)")
+    return sku_data
+
+
+def generate_demand(sku_data: pd.DataFrame, profile: HospitalProfile, weeks: Optional[int] = None,
+                    start_date: str = DEFAULT_START_DATE, seed: int = 0,
+                    chunk_slots: int = DEMAND_CHUNK_SLOTS) -> Iterator[pd.DataFrame]:
+    """
+    Generate intermittent weekly demand for every SKU-location row, in blocks.
+
+    Args:
+        sku_data: SKU inventory rows (e.g. from generate_sku_inventory)
+        profile: Fitted HospitalProfile
+        weeks: Number of weeks (default: the profile's)
+        start_date: First week-ending date
+        seed: Random seed
+        chunk_slots: SKU-location rows per block
+
+    Yields:
+        Demand rows (DEMAND_COLUMNS) of a block of SKU-location rows; weeks without an
+        order have no row, as in the demand extract
+    """
+    weeks = weeks or profile.weeks
+    rng = np.random.default_rng([seed, 1])
+    week_dates = pd.date_range(start_date, periods=weeks, freq='7D')
+    a, b = profile.order_probability_beta()
+    shape = 1 / profile.order_size_cv ** 2
+
+    for start in range(0, len(sku_data), chunk_slots):
+        block = sku_data.iloc[start:start + chunk_slots]
+        burn = block['burn_rate'].to_numpy(dtype=np.float64)
+        # Slow movers order less often rather than in fractions of a unit
+        probability = np.minimum(rng.beta(a, b, len(block)), 7 * burn)
+        probability = np.clip(probability, 1 / weeks, 1.0) * (burn > 0)
+        slot, week = np.nonzero(rng.random((len(block), weeks)) < probability[:, None])
+        mean_size = 7 * burn[slot] / probability[slot]
+        quantity = np.maximum(np.rint(rng.gamma(shape, mean_size / shape)), 1)
+        locations = block['lo'].to_numpy(dtype=object)[slot]
+        yield pd.DataFrame({
+            'PO Week Ending Date': week_dates[week],
+            'oid': block['oid'].to_numpy(dtype=object)[slot],
+            'lo': locations,
+            'uniform_location': locations,
+            'Total Qty Issues': quantity,
+        })
+
+
+def write_synthetic_dataset(output_dir: Path, profile: HospitalProfile, scale: float = 1.0,
+                            facilities: int = 1, weeks: Optional[int] = None, seed: int = 0) -> Dict[str, object]:
+    """
+    Write a synthetic SKU inventory and demand CSV under the production file names.
+
+    Args:
+        output_dir: Directory to write (usable as DataIntegrator(data_dir=output_dir))
+        profile: Fitted HospitalProfile
+        scale, facilities, seed: See generate_sku_inventory
+        weeks: See generate_demand
+
+    Returns:
+        Summary: file paths, SKU / row / facility counts and total demand
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    sku_data = generate_sku_inventory(profile, scale=scale, facilities=facilities, seed=seed)
+    sku_file, demand_file = output_dir / SKU_DATA_FILE, output_dir / DEMAND_DATA_FILE
+
+    tmp_path = sku_file.with_name(f"{sku_file.name}.tmp{os.getpid()}")
+    sku_data.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, sku_file)
+
+    demand_rows, total_demand = 0, 0.0
+    tmp_path = demand_file.with_name(f"{demand_file.name}.tmp{os.getpid()}")
+    try:
+        for number, block in enumerate(generate_demand(sku_data, profile, weeks=weeks, seed=seed)):
+            block.to_csv(tmp_path, mode='w' if number == 0 else 'a', header=number == 0,
+                         index=False, date_format='%Y-%m-%d')
+            demand_rows += len(block)
+            total_demand += float(block['Total Qty Issues'].sum())
+        os.replace(tmp_path, demand_file)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    logger.info(f"Wrote {len(sku_data):,} SKU rows and {demand_rows:,} demand rows to {output_dir}")
+
+    return {
+        'sku_file': sku_file,
+        'demand_file': demand_file,
+        'skus': int(sku_data['oid'].nunique()),
+        'sku_rows': len(sku_data),
+        'facilities': facilities,
+        'locations': int(sku_data['lo'].nunique()),
+        'demand_rows': demand_rows,
+        'total_demand': total_demand,
+    }
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+CedarSim Topology Cache - Compiled Antology Snapshots
+
+This module stores the compiled simulation structure built by DataIntegrator in a
+flat .npz snapshot, so the dashboard APIs and tests can skip CSV parsing and row-by-row
+SKU construction when the inputs have not changed.
+
+ARCHITECTURE:
+- The cache key is a SHA-256 content hash of SIMULATION_READY_SKU_INVENTORY_DATA.csv,
+  the LocationMapper mappings and the snapshot format version
+- A TopologySnapshot holds the location list, per-slot SKU metadata and the
+  state store columns (CompiledTopology) in state store slot order
+- Snapshots are uncompressed .npz files of plain NumPy arrays (no pickling)
+- to_antology() replays the SKU/location registration from the arrays without
+  touching pandas, so the restored antology matches a fresh build (the frontend
+  data export is not repeated)
+- Array-only consumers (VectorizedWeeklyEngine, ReplicationRunner) can use
+  snapshot.topology directly and skip object construction entirely
+
+Key Features:
+- compute_input_hash: content hash of the SKU data file and the location mapping
+- TopologyCache: hash-keyed snapshot directory (load / save)
+- Rebuild happens only when the hash changes
+"""
+
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Optional
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from core.core_models import AntologyGenerator, ResourceFactory
+from core.replication_runner import CompiledTopology, compile_topology
+
+logger = logging.getLogger(__name__)
+
+# Bump when the snapshot layout or the SKU construction rules change
+CACHE_FORMAT_VERSION = 1
+
+SKU_DATA_FILE = "SIMULATION_READY_SKU_INVENTORY_DATA.csv"
+
+
+def compute_input_hash(sku_file: Path, location_mapper) -> str:
+    """
+    Hash the SKU inventory file contents together with the location mapping.
+
+    Args:
+        sku_file: Path to SIMULATION_READY_SKU_INVENTORY_DATA.csv
+        location_mapper: LocationMapper whose mappings shape the locations
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256(f"cedarsim-topology-v{CACHE_FORMAT_VERSION}".encode())
+    with open(sku_file, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    mapping = {
+        'sku_to_demand': location_mapper.sku_to_demand_mapping,
+        'demand_to_sku': location_mapper.demand_to_sku_mapping,
+    }
+    digest.update(json.dumps(mapping, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+@dataclass
+class TopologySnapshot:
+    """Everything needed to restore an AntologyGenerator without re-reading the CSV."""
+    input_hash: str
+    location_ids: np.ndarray
+    location_types: np.ndarray
+    sku_ids: np.ndarray
+    sku_locations: np.ndarray
+    names: np.ndarray
+    units_of_measure: np.ndarray
+    analytical_safety_stock: np.ndarray
+    topology: CompiledTopology
+
+    @property
+    def num_skus(self) -> int:
+        """Number of SKU instances (state store slots)."""
+        return len(self.sku_ids)
+
+    @classmethod
+    def from_antology(cls, antology: AntologyGenerator, input_hash: str) -> 'TopologySnapshot':
+        """Capture an antology built by DataIntegrator."""
+        skus = sorted((sku for sku_list in antology.sku_registry.values() for sku in sku_list),
+                      key=lambda sku: sku.slot)
+        if [sku.slot for sku in skus] != list(range(antology.state_store.size)):
+            raise ValueError("Antology state store has released slots; cannot snapshot")
+        return cls(
+            input_hash=input_hash,
+            location_ids=np.array(list(antology.locations), dtype=str),
+            location_types=np.array([loc.location_type for loc in antology.locations.values()], dtype=str),
+            sku_ids=np.array([sku.resource_id for sku in skus], dtype=str),
+            sku_locations=np.array([sku.location_id for sku in skus], dtype=str),
+            names=np.array([getattr(sku, 'name', sku.resource_id) for sku in skus], dtype=str),
+            units_of_measure=np.array([getattr(sku, 'unit_of_measure', '') for sku in skus], dtype=str),
+            analytical_safety_stock=np.array(
+                [np.nan if getattr(sku, 'analytical_safety_stock', None) is None
+                 else sku.analytical_safety_stock for sku in skus], dtype=np.float64),
+            topology=compile_topology(antology),
+        )
+
+    def save(self, path: Path):
+        """Write the snapshot as an uncompressed .npz file."""
+        arrays = {f"topology_{field.name}": getattr(self.topology, field.name)
+                  for field in fields(CompiledTopology)}
+        tmp_path = Path(path).with_suffix('.tmp.npz')
+        np.savez(tmp_path, input_hash=np.array(self.input_hash), location_ids=self.location_ids,
+                 location_types=self.location_types, sku_ids=self.sku_ids,
+                 sku_locations=self.sku_locations, names=self.names,
+                 units_of_measure=self.units_of_measure,
+                 analytical_safety_stock=self.analytical_safety_stock, **arrays)
+        os.replace(tmp_path, path)  # Never leave a half-written snapshot behind
+
+    @classmethod
+    def load(cls, path: Path) -> 'TopologySnapshot':
+        """Read a snapshot written by save()."""
+        with np.load(path, allow_pickle=False) as data:
+            topology = CompiledTopology(**{field.name: data[f"topology_{field.name}"]
+                                           for field in fields(CompiledTopology)})
+            return cls(
+                input_hash=str(data['input_hash']),
+                location_ids=data['location_ids'],
+                location_types=data['location_types'],
+                sku_ids=data['sku_ids'],
+                sku_locations=data['sku_locations'],
+                names=data['names'],
+                units_of_measure=data['units_of_measure'],
+                analytical_safety_stock=data['analytical_safety_stock'],
+                topology=topology,
+            )
+
+    def to_antology(self) -> AntologyGenerator:
+        """
+        Rebuild the AntologyGenerator, network connections included.
+        
+        The frontend data export is skipped: restoring a snapshot has no filesystem
+        side effects.
+        """
+        antology = AntologyGenerator()
+        for location_id, location_type in zip(self.location_ids.tolist(), self.location_types.tolist()):
+            antology.add_location(ResourceFactory.create_location(location_id, location_type))
+
+        topology = self.topology
+        skus = antology.add_skus_bulk(self.sku_ids.tolist(), self.sku_locations.tolist(),
+                                      target_level=topology.target_level,
+                                      lead_time_days=topology.lead_time_days,
+                                      demand_rate=topology.demand_rate,
+                                      current_level=topology.initial_level)
+        for sku, name, unit, analytical in zip(skus, self.names.tolist(), self.units_of_measure.tolist(),
+                                               self.analytical_safety_stock.tolist()):
+            sku.name = name
+            sku.unit_of_measure = unit
+            sku.analytical_safety_stock = analytical
+
+        antology.generate_network_connections()
+        antology.finalize_network(export_frontend=False)
+        return antology
+
+
+class TopologyCache:
+    """Directory of topology snapshots keyed by input hash."""
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+
+    def path_for(self, input_hash: str, use_validation_subset: bool) -> Path:
+        """Snapshot path for an input hash and dataset mode."""
+        mode = "validation" if use_validation_subset else "full"
+        return self.cache_dir / f"topology_{mode}_{input_hash[:16]}.npz"
+
+    def load(self, input_hash: str, use_validation_subset: bool) -> Optional[TopologySnapshot]:
+        """Load the snapshot for an input hash, or None on a miss."""
+        path = self.path_for(input_hash, use_validation_subset)
+        if not path.exists():
+            return None
+        try:
+            snapshot = TopologySnapshot.load(path)
+        except (OSError, KeyError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable topology snapshot {path}: {e}")
+            return None
+        if snapshot.input_hash != input_hash:
+            return None
+        return snapshot
+
+    def save(self, snapshot: TopologySnapshot, use_validation_subset: bool) -> Path:
+        """Store a snapshot, replacing older snapshots for the same dataset mode."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(snapshot.input_hash, use_validation_subset)
+        mode = "validation" if use_validation_subset else "full"
+        for stale in self.cache_dir.glob(f"topology_{mode}_*.npz"):
+            if stale != path:
+                stale.unlink()
+        snapshot.save(path)
+        logger.info(f"Saved topology snapshot ({snapshot.num_skus:,} SKUs) to {path}")
+        return path
+
+
+if __name__ == "__main__":
+    from data.input_data.data_integration import DataIntegrator
+
+    integrator = DataIntegrator()
+    start = time.perf_counter()
+    integrator.load_cached_antology()
+    print("=" * 60)
+    print("TOPOLOGY SNAPSHOT LOAD")
+    print("=" * 60)
+    print(f"Cache hit: {integrator.antology is not None} ({(time.perf_counter() - start) * 1000:.1f} ms)")
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+CedarSim Typed Loader - Schema-Driven CSV Loading with a Parquet Cache
+
+This module reads the production input CSVs with an explicit schema instead of letting
+pandas infer types, and keeps a Parquet copy of each parsed file so later loads skip
+CSV parsing entirely.
+
+ARCHITECTURE:
+- A schema maps column names to dtypes; columns not in the file are ignored, so one
+  schema covers older and multi-facility extracts
+- oid is read as a string and normalized to the canonical 6-digit format
+  (id_registry.canonicalize_sku_ids) once, at load time
+- Location columns (lo, uniform_location) and other low-cardinality text are categoricals
+- Demand quantities are float32 (exact for whole units); the SKU replenishment
+  parameters stay float64 because they feed the state store and target formulas directly
+- The Parquet sidecar lives in .typed_cache/ next to the CSV with a small JSON manifest
+  (CSV size, mtime and SHA-256); it is reused while the CSV is unchanged
+
+Key Features:
+- read_typed_csv: typed read with optional Parquet sidecar cache
+- SKU_INVENTORY_SCHEMA / DEMAND_SCHEMA for the two production files
+- Predicate pushdown: filters on column values are applied inside the Parquet read,
+  or chunk by chunk while parsing the CSV, so unrequested rows are never materialized
+- pyarrow is optional: without it files are still read with the schema, just not cached
+"""
+
+from pathlib import Path
+from typing import Dict, Any, Iterable, Optional
+import hashlib
+import json
+import logging
+import os
+import sys
+
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from core.id_registry import canonical_sku_id, canonicalize_sku_ids
+
+try:
+    import pyarrow  # noqa: F401 - only needed for the Parquet sidecar cache
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Bump when a schema or the post-processing below changes
+SCHEMA_VERSION = 2
+
+CACHE_DIR_NAME = ".typed_cache"
+
+SKU_INVENTORY_SCHEMA: Dict[str, Any] = {
+    'oid': 'str',
+    'Item Description': 'str',
+    'unit_of_measure': 'category',
+    'lo': 'category',
+    'lead_time': 'float64',
+    'burn_rate': 'float64',
+    'Stock Units Analytical': 'float64',
+}
+
+DEMAND_SCHEMA: Dict[str, Any] = {
+    'oid': 'str',
+    'Oracle Item Number': 'str',
+    'lo': 'category',
+    'uniform_location': 'category',
+    'Deliver to Location': 'category',
+    'Department Name': 'category',
+    'Department Number': 'category',
+    'Business Unit': 'category',
+    'Total Qty Issues': 'float32',
+}
+
+DEMAND_DATE_COLUMNS = ['PO Week Ending Date']
+
+# Rows per chunk when filtering a CSV without the Parquet cache
+CSV_FILTER_CHUNK_ROWS = 100_000
+
+Filters = Optional[Dict[str, Iterable[Any]]]
+
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+    """Apply the post-parse normalization shared by all typed reads."""
+    if 'oid' in df.columns:
+        df['oid'] = canonicalize_sku_ids(df['oid']).astype(df['oid'].dtype)  # Ensure 6-digit format
+    return df
+
+
+def _apply_filters(df: pd.DataFrame, filters: Filters) -> pd.DataFrame:
+    """Keep only rows whose column values are in the requested sets."""
+    if not filters:
+        return df
+    mask = pd.Series(True, index=df.index)
+    for column, values in filters.items():
+        mask &= df[column].isin(list(values))
+    return df[mask].reset_index(drop=True)
+
+
+def _read_csv(path: Path, schema: Dict[str, Any], date_columns, filters: Filters = None) -> pd.DataFrame:
+    """Parse a CSV with the given schema, filtering chunk by chunk if filters are given."""
+    header = pd.read_csv(path, nrows=0).columns
+    kwargs = {'dtype': schema, 'parse_dates': [column for column in date_columns if column in header]}
+    if not filters:
+        return _normalize(pd.read_csv(path, **kwargs))
+
+    chunks = [_apply_filters(_normalize(chunk), filters)
+              for chunk in pd.read_csv(path, chunksize=CSV_FILTER_CHUNK_ROWS, **kwargs)]
+    df = pd.concat(chunks, ignore_index=True)
+    # Chunks carry their own categories; restore one categorical per column
+    for column, dtype in schema.items():
+        if dtype == 'category' and column in df.columns:
+            df[column] = df[column].astype('category')
+    return df
+
+
+def read_typed_csv(path: Path, schema: Dict[str, Any], date_columns=(),
+                   use_cache: bool = True, cache_dir: Optional[Path] = None,
+                   filters: Filters = None) -> pd.DataFrame:
+    """
+    Read a CSV with an explicit schema, reusing a Parquet copy while the CSV is unchanged.
+
+    The cache is considered fresh when the CSV's size and mtime match the manifest; if
+    only the mtime moved (e.g. the file was copied), the contents are re-hashed and the
+    cache is kept when the hash still matches.
+
+    Args:
+        path: CSV file to read
+        schema: Column name -> dtype; columns missing from the file are ignored
+        date_columns: Columns to parse as datetimes (if present)
+        use_cache: Read/write the Parquet sidecar (requires pyarrow)
+        cache_dir: Sidecar directory (default: .typed_cache next to the CSV)
+        filters: Optional column -> allowed values; only matching rows are loaded
+            (oid values must already be in the 6-digit format)
+
+    Returns:
+        Typed DataFrame
+    """
+    path = Path(path)
+    if not use_cache or not PARQUET_AVAILABLE:
+        return _read_csv(path, schema, date_columns, filters)
+
+    cache_dir = Path(cache_dir) if cache_dir is not None else path.parent / CACHE_DIR_NAME
+    parquet_path = cache_dir / f"{path.stem}.parquet"
+    manifest_path = cache_dir / f"{path.stem}.json"
+    stat = path.stat()
+    identity = {'schema_version': SCHEMA_VERSION, 'schema': {k: str(v) for k, v in schema.items()},
+                'date_columns': list(date_columns)}
+
+    manifest = None
+    if parquet_path.exists() and manifest_path.exists():
+        try:
+            manifest = json.loads(manifest_path.read_text())
+        except (OSError, ValueError):
+            manifest = None
+
+    if manifest is not None and manifest.get('identity') == identity and manifest.get('size') == stat.st_size:
+        fresh = manifest.get('mtime_ns') == stat.st_mtime_ns
+        if not fresh and manifest.get('sha256') == file_sha256(path):
+            manifest['mtime_ns'] = stat.st_mtime_ns
+            manifest_path.write_text(json.dumps(manifest))
+            fresh = True
+        if fresh:
+            logger.debug(f"Loading {path.name} from Parquet cache")
+            if not filters:
+                return pd.read_parquet(parquet_path)
+            return pd.read_parquet(parquet_path, filters=[(column, 'in', list(values))
+                                                          for column, values in filters.items()])
+
+    df = _read_csv(path, schema, date_columns)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = parquet_path.with_suffix('.tmp')
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, parquet_path)
+    manifest_path.write_text(json.dumps({'identity': identity, 'size': stat.st_size,
+                                         'mtime_ns': stat.st_mtime_ns, 'sha256': file_sha256(path)}))
+    logger.info(f"Cached typed copy of {path.name} ({len(df):,} rows)")
+    return _apply_filters(df, filters)
+
+
+def _id_filters(sku_ids: Optional[Iterable[Any]], locations: Optional[Iterable[str]],
+                location_column: str) -> Dict[str, Iterable[Any]]:
+    """Build SKU id / location filters, normalizing ids to the 6-digit format."""
+    filters: Dict[str, Iterable[Any]] = {}
+    if sku_ids is not None:
+        filters['oid'] = [canonical_sku_id(sku_id) for sku_id in sku_ids]
+    if locations is not None:
+        filters[location_column] = list(locations)
+    return filters
+
+
+def load_sku_inventory(path: Path, use_cache: bool = True, sku_ids: Optional[Iterable[Any]] = None,
+                       locations: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """Load SIMULATION_READY_SKU_INVENTORY_DATA.csv with the SKU inventory schema."""
+    return read_typed_csv(path, SKU_INVENTORY_SCHEMA, use_cache=use_cache,
+                          filters=_id_filters(sku_ids, locations, 'lo'))
+
+
+def load_demand(path: Path, use_cache: bool = True, sku_ids: Optional[Iterable[Any]] = None,
+                locations: Optional[Iterable[str]] = None,
+                location_column: str = 'uniform_location') -> pd.DataFrame:
+    """
+    Load a demand CSV with the demand schema and parsed week-ending dates.
+
+    Args:
+        path: Demand CSV
+        use_cache: Read/write the Parquet sidecar
+        sku_ids: Only load these SKU ids
+        locations: Only load these locations
+        location_column: Column the locations filter applies to
+
+    Returns:
+        Typed (and filtered) demand DataFrame
+    """
+    return read_typed_csv(path, DEMAND_SCHEMA, DEMAND_DATE_COLUMNS, use_cache=use_cache,
+                          filters=_id_filters(sku_ids, locations, location_column))
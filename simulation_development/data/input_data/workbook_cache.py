@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+CedarSim Workbook Cache - Single-Pass Excel Ingestion with Parquet Sheets
+
+This module reads each Excel workbook once, with a read-only, row-iterating reader,
+validates its structure during that same pass and keeps every sheet as Parquet, so
+the pipeline and the alignment scripts read Parquet sheets instead of parsing the
+XLSX again for every validation step and every sheet they need.
+
+ARCHITECTURE:
+- openpyxl in read-only mode streams rows of one sheet at a time; each sheet is
+  turned into a DataFrame with pandas' own text parser, so the frames are the ones
+  pd.read_excel(path, sheet_name=...) would return
+- Validation happens in the streaming pass: the archive must open, required sheets
+  and (per sheet) required header columns must be present, and the row count and
+  columns of every sheet are recorded
+- Sheets are cached in .workbook_cache/<sha256[:16]>/ next to the workbook with a
+  JSON manifest of the sheet names, row counts and columns; a changed workbook gets
+  a new hash and therefore a new cache directory
+- Later opens of an unchanged workbook only hash the file and check the manifest;
+  requirements are validated against the manifest without touching the XLSX
+- Object columns with mixed cell types cannot be stored as Parquet; they are stored
+  as strings and listed in the manifest
+- pyarrow is optional: without it the workbook is still read once, and the sheets
+  are kept in memory for the lifetime of the CachedWorkbook
+
+Key Features:
+- open_workbook: validate + ingest (or reuse the cache) and return a CachedWorkbook
+- CachedWorkbook.read: one sheet (by name or position), optionally only some columns
+- read_sheet: one-call shortcut for scripts that need a single sheet
+- WorkbookValidationError for corrupt or structurally invalid workbooks
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Union
+import json
+import logging
+import os
+import shutil
+import zipfile
+
+import pandas as pd
+from pandas.errors import EmptyDataError
+from pandas.io.parsers import TextParser
+
+from .typed_loader import PARQUET_AVAILABLE, file_sha256
+
+try:
+    from openpyxl.cell.cell import ERROR_CODES
+except ImportError:  # openpyxl is only needed when a workbook has to be parsed
+    ERROR_CODES = ('#NULL!', '#DIV/0!', '#VALUE!', '#REF!', '#NAME?', '#NUM!', '#N/A')
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR_NAME = ".workbook_cache"
+
+# Bump when the sheet conversion below changes
+CACHE_VERSION = 1
+
+MANIFEST_NAME = "manifest.json"
+
+SheetKey = Union[str, int]
+
+
+class WorkbookValidationError(ValueError):
+    """Raised when a workbook is corrupt or does not have the required structure."""
+
+
+def _convert_cell(value):
+    """Convert a cell value the way pandas' openpyxl reader does."""
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else value
+    if isinstance(value, str) and value in ERROR_CODES:
+        return float('nan')  # Excel error values (#DIV/0!, #N/A, ...)
+    return value
+
+
+def _sheet_rows(worksheet) -> List[list]:
+    """Stream a worksheet into lists of converted cells, trimmed like pd.read_excel."""
+    worksheet.reset_dimensions()
+    rows = []
+    last_row_with_data = -1
+    for row_number, row in enumerate(worksheet.iter_rows(values_only=True)):
+        converted = [_convert_cell(value) for value in row]
+        while converted and converted[-1] == "":
+            converted.pop()
+        if converted:
+            last_row_with_data = row_number
+        rows.append(converted)
+    rows = rows[:last_row_with_data + 1]
+    if rows:
+        width = max(len(row) for row in rows)
+        rows = [row + [""] * (width - len(row)) for row in rows]
+    return rows
+
+
+def _rows_to_frame(rows: List[list]) -> pd.DataFrame:
+    """Parse the first row as the header and infer column types (as pd.read_excel)."""
+    try:
+        return TextParser(rows, header=0, skip_blank_lines=False).read()
+    except EmptyDataError:
+        return pd.DataFrame()
+
+
+def parquet_safe_columns(df: pd.DataFrame) -> List[str]:
+    """Convert mixed-type object columns to strings in place; return their names."""
+    stringified = []
+    for column in df.columns:
+        if df[column].dtype != object:
+            continue
+        types = {type(value) for value in df[column].dropna()}
+        if len(types) > 1:
+            df[column] = df[column].map(lambda value: value if pd.isna(value) else str(value))
+            stringified.append(str(column))
+    return stringified
+
+
+class CachedWorkbook:
+    """A validated workbook whose sheets are read from Parquet (or memory)."""
+
+    def __init__(self, path: Path, sha256: str, sheets: List[Dict], cache_dir: Optional[Path],
+                 frames: Optional[Dict[str, pd.DataFrame]] = None):
+        self.path = Path(path)
+        self.sha256 = sha256
+        self.sheets = sheets
+        self.cache_dir = cache_dir
+        self._frames = frames or {}
+
+    @property
+    def sheet_names(self) -> List[str]:
+        return [sheet['name'] for sheet in self.sheets]
+
+    def sheet_info(self, sheet: SheetKey) -> Dict:
+        """Manifest entry (name, file, rows, columns, stringified_columns) of a sheet."""
+        if isinstance(sheet, int):
+            return self.sheets[sheet]
+        for info in self.sheets:
+            if info['name'] == sheet:
+                return info
+        raise KeyError(f"Worksheet named '{sheet}' not found in {self.path.name}")
+
+    def read(self, sheet: SheetKey = 0, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Read one sheet.
+
+        Args:
+            sheet: Sheet name or position (default: the first sheet)
+            columns: Only read these columns
+
+        Returns:
+            The sheet as a DataFrame
+        """
+        info = self.sheet_info(sheet)
+        if info['name'] in self._frames:
+            df = self._frames[info['name']]
+            return (df[list(columns)] if columns is not None else df).copy()
+        return pd.read_parquet(self.cache_dir / info['file'],
+                               columns=list(columns) if columns is not None else None)
+
+    def read_all(self) -> Dict[str, pd.DataFrame]:
+        """Every sheet, keyed by name."""
+        return {name: self.read(name) for name in self.sheet_names}
+
+    def validate(self, required_sheets: Optional[Iterable[str]] = None,
+                 required_columns: Optional[Mapping[str, Iterable[str]]] = None):
+        """Check required sheets and header columns against the recorded structure."""
+        missing_sheets = [name for name in (required_sheets or []) if name not in self.sheet_names]
+        if missing_sheets:
+            raise WorkbookValidationError(f"{self.path.name}: missing required sheets {missing_sheets}")
+        for name, columns in (required_columns or {}).items():
+            info = self.sheet_info(name)
+            missing_columns = [column for column in columns if column not in info['columns']]
+            if missing_columns:
+                raise WorkbookValidationError(
+                    f"{self.path.name}: sheet '{name}' is missing required columns {missing_columns}")
+
+
+def _load_manifest(cache_dir: Path) -> Optional[Dict]:
+    """Read a complete cache manifest, or None if there is no usable cache."""
+    try:
+        manifest = json.loads((cache_dir / MANIFEST_NAME).read_text())
+    except (OSError, ValueError):
+        return None
+    if manifest.get('cache_version') != CACHE_VERSION:
+        return None
+    if not all((cache_dir / sheet['file']).exists() for sheet in manifest.get('sheets', [])):
+        return None
+    return manifest
+
+
+def _ingest(path: Path, required_sheets: Optional[Iterable[str]],
+            required_columns: Optional[Mapping[str, Iterable[str]]],
+            cache_dir: Optional[Path]) -> tuple:
+    """Stream every sheet once, validating and storing it; returns (sheets, frames)."""
+    import openpyxl
+
+    try:
+        workbook = openpyxl.load_workbook(path, read_only=True, data_only=True, keep_links=False)
+    except (zipfile.BadZipFile, KeyError, OSError, ValueError) as e:
+        raise WorkbookValidationError(f"{path.name} is not a readable Excel workbook: {e}") from e
+
+    try:
+        available = workbook.sheetnames
+        missing_sheets = [name for name in (required_sheets or []) if name not in available]
+        if missing_sheets:
+            raise WorkbookValidationError(f"{path.name}: missing required sheets {missing_sheets}")
+
+        sheets, frames = [], {}
+        for position, name in enumerate(available):
+            try:
+                df = _rows_to_frame(_sheet_rows(workbook[name]))
+            except (zipfile.BadZipFile, zipfile.LargeZipFile, OSError, ValueError) as e:
+                raise WorkbookValidationError(f"{path.name}: error reading sheet '{name}': {e}") from e
+
+            missing_columns = [column for column in (required_columns or {}).get(name, [])
+                               if column not in df.columns]
+            if missing_columns:
+                raise WorkbookValidationError(
+                    f"{path.name}: sheet '{name}' is missing required columns {missing_columns}")
+
+            info = {'name': name, 'file': f"sheet_{position:02d}.parquet", 'rows': len(df),
+                    'columns': [str(column) for column in df.columns], 'stringified_columns': []}
+            if cache_dir is not None:
+                info['stringified_columns'] = parquet_safe_columns(df)
+                df.columns = info['columns']
+                df.to_parquet(cache_dir / info['file'], index=False)
+            else:
+                frames[name] = df
+            sheets.append(info)
+            logger.info(f"Sheet '{name}': {len(df):,} rows x {df.shape[1]} columns")
+    finally:
+        workbook.close()
+    return sheets, frames
+
+
+def open_workbook(path: Path, required_sheets: Optional[Iterable[str]] = None,
+                  required_columns: Optional[Mapping[str, Iterable[str]]] = None,
+                  use_cache: bool = True, cache_dir: Optional[Path] = None) -> CachedWorkbook:
+    """
+    Validate a workbook and make its sheets available, parsing the XLSX at most once.
+
+    Args:
+        path: Excel workbook
+        required_sheets: Sheet names that must be present
+        required_columns: Sheet name -> header columns that must be present
+        use_cache: Read/write the Parquet sheets (requires pyarrow)
+        cache_dir: Cache root (default: .workbook_cache next to the workbook)
+
+    Returns:
+        CachedWorkbook
+
+    Raises:
+        FileNotFoundError: The workbook does not exist
+        WorkbookValidationError: The workbook is empty, corrupt or misses required structure
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Workbook not found: {path}")
+    if path.stat().st_size == 0:
+        raise WorkbookValidationError(f"Workbook is empty: {path}")
+
+    sha256 = file_sha256(path)
+    if not use_cache or not PARQUET_AVAILABLE:
+        sheets, frames = _ingest(path, required_sheets, required_columns, None)
+        return CachedWorkbook(path, sha256, sheets, None, frames)
+
+    cache_root = Path(cache_dir) if cache_dir is not None else path.parent / CACHE_DIR_NAME
+    sheet_dir = cache_root / sha256[:16]
+    manifest = _load_manifest(sheet_dir)
+    if manifest is not None:
+        logger.debug(f"Loading {path.name} from workbook cache")
+        workbook = CachedWorkbook(path, sha256, manifest['sheets'], sheet_dir)
+        workbook.validate(required_sheets, required_columns)
+        return workbook
+
+    # Write into a scratch directory and move it into place once every sheet is stored
+    tmp_dir = cache_root / f"{sha256[:16]}.tmp{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+    try:
+        sheets, _ = _ingest(path, required_sheets, required_columns, tmp_dir)
+        (tmp_dir / MANIFEST_NAME).write_text(json.dumps({
+            'cache_version': CACHE_VERSION, 'workbook': path.name, 'sha256': sha256,
+            'size': path.stat().st_size, 'sheets': sheets}, indent=2))
+        shutil.rmtree(sheet_dir, ignore_errors=True)
+        os.replace(tmp_dir, sheet_dir)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    logger.info(f"Cached {len(sheets)} sheets of {path.name} as Parquet")
+    return CachedWorkbook(path, sha256, sheets, sheet_dir)
+
+
+def read_sheet(path: Path, sheet: SheetKey = 0, columns: Optional[Sequence[str]] = None,
+               use_cache: bool = True) -> pd.DataFrame:
+    """Read one sheet of a workbook through the workbook cache."""
+    return open_workbook(path, use_cache=use_cache).read(sheet, columns)
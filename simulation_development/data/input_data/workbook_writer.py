@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+CedarSim Workbook Writer - Streaming XLSX Export with CSV/Parquet Siblings
+
+This module writes the pipeline's output frames as CSV and Parquet (the system of
+record) and, optionally, as an Excel workbook that is streamed row by row instead of
+being built in memory through DataFrame.to_excel.
+
+ARCHITECTURE:
+- The workbook is written with openpyxl in write-only mode: rows are appended to
+  per-sheet temporary files and zipped on save, so memory stays flat regardless of
+  sheet size
+- Each frame is converted to Python cell values a chunk of rows at a time; an
+  optional transform (e.g. Excel-specific NaN handling) is applied per chunk
+- CSV and Parquet files are written from the same frames on a thread pool while the
+  workbook streams in the calling thread (an XLSX file is a single zip stream, so its
+  sheets are written one after another)
+- Every file is written to a temporary name and moved into place when complete
+- verify_workbook checks a written workbook's zip CRCs and sheet names without
+  parsing the sheet rows again
+
+Key Features:
+- write_workbook: streaming XLSX writer, returns the rows/columns written per sheet
+- export_frames: CSV / Parquet export of every frame
+- write_outputs: workbook + CSV + Parquet in one call, with the exports in parallel
+- verify_workbook: cheap structural check of a created workbook
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+import logging
+import os
+import zipfile
+
+import pandas as pd
+
+from .typed_loader import PARQUET_AVAILABLE
+from .workbook_cache import parquet_safe_columns
+
+logger = logging.getLogger(__name__)
+
+# Rows converted to cell values at a time when streaming a sheet
+CHUNK_ROWS = 5_000
+
+# Excel's hard limit of rows per sheet (including the header)
+EXCEL_MAX_ROWS = 1_048_576
+
+Transform = Callable[[pd.DataFrame], pd.DataFrame]
+
+
+def _cell_values(series: pd.Series) -> list:
+    """Column values as Python objects openpyxl can write; missing values become None."""
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def _sheet_rows(df: pd.DataFrame, transform: Optional[Transform], chunk_rows: int):
+    """Yield the data rows of a frame, converting chunk_rows rows at a time."""
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        if transform is not None:
+            chunk = transform(chunk)
+        yield from zip(*(_cell_values(chunk[column]) for column in chunk.columns))
+
+
+def write_workbook(path: Path, sheets: Mapping[str, pd.DataFrame], transform: Optional[Transform] = None,
+                   chunk_rows: int = CHUNK_ROWS) -> Dict[str, Tuple[int, int]]:
+    """
+    Stream frames into an XLSX workbook, one sheet per frame.
+
+    Args:
+        path: Workbook to write (replaced atomically)
+        sheets: Sheet name -> frame, in sheet order
+        transform: Optional per-chunk transform applied before writing (must be row-wise)
+        chunk_rows: Rows converted to cell values at a time
+
+    Returns:
+        Sheet name -> (data rows, columns) written
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    path = Path(path)
+    workbook = Workbook(write_only=True)
+    written = {}
+    for name, df in sheets.items():
+        if len(df) + 1 > EXCEL_MAX_ROWS:
+            raise ValueError(f"Sheet '{name}' has {len(df):,} rows; Excel allows {EXCEL_MAX_ROWS - 1:,}")
+        worksheet = workbook.create_sheet(title=name)
+        header = []
+        for column in df.columns:
+            cell = WriteOnlyCell(worksheet, value=str(column))
+            cell.font = Font(bold=True)
+            header.append(cell)
+        worksheet.append(header)
+        for row in _sheet_rows(df, transform, chunk_rows):
+            worksheet.append(row)
+        written[name] = (len(df), df.shape[1])
+        logger.info(f"  {name}: {len(df):,} rows streamed")
+
+    tmp_path = path.with_name(f"{path.stem}.tmp{os.getpid()}{path.suffix}")
+    try:
+        workbook.save(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return written
+
+
+def _write_csv(df: pd.DataFrame, path: Path) -> Path:
+    tmp_path = path.with_name(f"{path.name}.tmp{os.getpid()}")
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _write_parquet(df: pd.DataFrame, path: Path) -> Path:
+    tmp_path = path.with_name(f"{path.name}.tmp{os.getpid()}")
+    try:
+        df.to_parquet(tmp_path, index=False)
+    except (TypeError, ValueError):
+        # Mixed-type object columns (e.g. ids that are numbers in some rows, text in others)
+        df = df.copy()
+        df.columns = [str(column) for column in df.columns]
+        stringified = parquet_safe_columns(df)
+        logger.info(f"  {path.name}: stored mixed-type columns {stringified} as text")
+        df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _export_jobs(sheets: Mapping[str, pd.DataFrame], csv_dir: Optional[Path], parquet_dir: Optional[Path],
+                 csv_suffix: str, file_names: Optional[Mapping[str, str]] = None) -> List[tuple]:
+    """(writer, frame, path) for every requested export."""
+    file_names = file_names or {}
+    stems = {name: file_names.get(name, name) for name in sheets}
+    jobs = []
+    if csv_dir is not None:
+        Path(csv_dir).mkdir(parents=True, exist_ok=True)
+        jobs += [(_write_csv, df, Path(csv_dir) / f"{stems[name]}{csv_suffix}.csv") for name, df in sheets.items()]
+    if parquet_dir is not None:
+        if PARQUET_AVAILABLE:
+            Path(parquet_dir).mkdir(parents=True, exist_ok=True)
+            jobs += [(_write_parquet, df, Path(parquet_dir) / f"{stems[name]}.parquet") for name, df in sheets.items()]
+        else:
+            logger.warning("pyarrow not installed - Parquet outputs skipped")
+    return jobs
+
+
+def export_frames(sheets: Mapping[str, pd.DataFrame], csv_dir: Optional[Path] = None,
+                  parquet_dir: Optional[Path] = None, csv_suffix: str = "",
+                  file_names: Optional[Mapping[str, str]] = None,
+                  max_workers: Optional[int] = None) -> List[Path]:
+    """
+    Write every frame as CSV and/or Parquet.
+
+    Args:
+        sheets: Name -> frame; files are named <stem><csv_suffix>.csv and <stem>.parquet
+        csv_dir: Directory for the CSV files (None = no CSV)
+        parquet_dir: Directory for the Parquet files (None = no Parquet; requires pyarrow)
+        csv_suffix: Appended to the CSV file names (e.g. '_Complete')
+        file_names: Name -> file stem where it differs from the name (default: the name)
+        max_workers: Writer threads (None = ThreadPoolExecutor default)
+
+    Returns:
+        Paths written
+    """
+    jobs = _export_jobs(sheets, csv_dir, parquet_dir, csv_suffix, file_names)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(lambda job: job[0](job[1], job[2]), jobs))
+
+
+def write_outputs(sheets: Mapping[str, pd.DataFrame], xlsx_path: Optional[Path] = None,
+                  csv_dir: Optional[Path] = None, parquet_dir: Optional[Path] = None,
+                  workbook_sheets: Optional[Mapping[str, pd.DataFrame]] = None,
+                  transform: Optional[Transform] = None, csv_suffix: str = "",
+                  file_names: Optional[Mapping[str, str]] = None,
+                  max_workers: Optional[int] = None) -> Dict[str, object]:
+    """
+    Write the same frames as CSV, Parquet and (optionally) a streamed workbook.
+
+    The CSV and Parquet files are written on a thread pool while the workbook streams.
+
+    Args:
+        sheets: Name -> frame for the CSV / Parquet outputs
+        xlsx_path: Workbook to write (None = no workbook)
+        csv_dir / parquet_dir / csv_suffix / file_names: See export_frames
+        workbook_sheets: Frames for the workbook if they differ from sheets (e.g. a
+            sample of a large sheet); default: sheets
+        transform: Per-chunk transform for the workbook only
+        max_workers: Export threads
+
+    Returns:
+        {'files': paths written, 'workbook': sheet name -> (rows, columns) or None}
+    """
+    jobs = _export_jobs(sheets, csv_dir, parquet_dir, csv_suffix, file_names)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(writer, df, path) for writer, df, path in jobs]
+        workbook = None
+        if xlsx_path is not None:
+            workbook = write_workbook(xlsx_path, workbook_sheets if workbook_sheets is not None else sheets,
+                                      transform=transform)
+        files = [future.result() for future in futures]
+    if xlsx_path is not None:
+        files.append(Path(xlsx_path))
+    return {'files': files, 'workbook': workbook}
+
+
+def verify_workbook(path: Path, sheet_names: Optional[List[str]] = None) -> List[str]:
+    """
+    Check that a written workbook is an intact archive with the expected sheets.
+
+    Only the zip CRCs and the workbook part are read, not the sheet rows.
+
+    Args:
+        path: Workbook to check
+        sheet_names: Expected sheet names, in order (None = any)
+
+    Returns:
+        The workbook's sheet names
+
+    Raises:
+        ValueError: The archive is corrupt or the sheets differ
+    """
+    from openpyxl import load_workbook
+
+    try:
+        with zipfile.ZipFile(path) as archive:
+            bad_member = archive.testzip()
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"{path} is not a valid XLSX archive: {e}") from e
+    if bad_member is not None:
+        raise ValueError(f"{path}: corrupt archive member {bad_member}")
+
+    workbook = load_workbook(path, read_only=True)
+    try:
+        names = workbook.sheetnames
+    finally:
+        workbook.close()
+    if sheet_names is not None and names != list(sheet_names):
+        raise ValueError(f"{path}: expected sheets {list(sheet_names)}, found {names}")
+    return names
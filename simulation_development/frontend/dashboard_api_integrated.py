@@ -31,15 +31,16 @@ antology = None
 frontend_generator = None
 data_integrator = None
 
-def initialize_antology(use_validation_subset: bool = True):
-    """Initialize the AntologyGenerator with real data."""
+def initialize_antology(use_validation_subset: bool = True, data_dir=None):
+    """Initialize the AntologyGenerator with real data (or the inputs in data_dir)."""
     global antology, frontend_generator, data_integrator
     
     logger.info("Initializing AntologyGenerator with real data...")
     
     try:
         # Create integrated antology with real data
-        antology, data_integrator = create_integrated_antology(use_validation_subset=use_validation_subset)
+        antology, data_integrator = create_integrated_antology(use_validation_subset=use_validation_subset,
+                                                               data_dir=data_dir)
         
         # Create frontend generator
         frontend_generator = FrontendDataGenerator(antology)
@@ -299,7 +300,9 @@ def export_data():
 if __name__ == '__main__':
     # Initialize with validation subset by default (faster for testing)
     # Set to False to use full 5,941 SKU dataset
-    initialize_antology(use_validation_subset=True)
+    # CEDARSIM_DATA_DIR points at another input directory, e.g. a synthetic hospital
+    # from scripts/generate_synthetic_hospital.py
+    initialize_antology(use_validation_subset=True, data_dir=os.environ.get('CEDARSIM_DATA_DIR'))
     
     # Run the Flask app
     app.run(debug=True, host='0.0.0.0', port=5000)
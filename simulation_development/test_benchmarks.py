@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test script for the CedarSim Benchmark Suite
+
+This script benchmarks a tiny synthetic hospital (every stage once, a few requests
+per API endpoint), checks that result files round-trip, and that the baseline
+comparison flags real slowdowns but not noise or new entries.
+"""
+
+import sys
+import os
+import tempfile
+from pathlib import Path
+
+# Add the simulation_development directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from benchmarks.api_load import ENDPOINTS
+from benchmarks.results import compare_results, format_comparison, load_results, save_results
+from benchmarks.suite import SKU_INVENTORY_FILE, STAGES, run_dataset
+from data.input_data.synthetic_data import fit_hospital_profile, write_synthetic_dataset
+from data.input_data.typed_loader import load_sku_inventory
+
+TRACKED_FRONTEND_DATA = Path(__file__).parent / "frontend_data.json"
+
+def _result(**medians):
+    """Result record with one dataset whose stages have the given medians."""
+    stages = {name: {'median': seconds} for name, seconds in medians.items()}
+    return {'datasets': {'scale_1': {'stages': stages, 'api': None}}}
+
+def test_run_dataset():
+    """Test benchmarking every stage and endpoint on a small dataset."""
+    print("=" * 60)
+    print("TESTING BENCHMARK SUITE ON A SMALL SYNTHETIC DATASET")
+    print("=" * 60)
+
+    profile = fit_hospital_profile(load_sku_inventory(SKU_INVENTORY_FILE, use_cache=False))
+    cwd_before = sorted(os.listdir(os.getcwd()))
+    generator_imported = 'frontend_generator' in sys.modules
+    tracked_before = TRACKED_FRONTEND_DATA.stat().st_mtime_ns if TRACKED_FRONTEND_DATA.exists() else None
+    with tempfile.TemporaryDirectory() as tmp:
+        summary = write_synthetic_dataset(Path(tmp), profile, scale=0.05, weeks=10, seed=2)
+        result = run_dataset(Path(tmp), repeat=1, api_options={'requests_per_endpoint': 4, 'concurrency': 2})
+        assert sorted(os.listdir(os.getcwd())) == cwd_before, "benchmark wrote to the working directory"
+        if tracked_before is not None:
+            assert TRACKED_FRONTEND_DATA.stat().st_mtime_ns == tracked_before, "frontend_data.json rewritten"
+        # Later structure builds in this process must not find the top-level frontend_generator
+        assert generator_imported or 'frontend_generator' not in sys.modules
+        print("   ✅ No files written outside the dataset directory")
+
+        assert result['sku_rows'] == summary['sku_rows'] and result['weeks'] == 10
+        assert list(result['stages']) == STAGES
+        assert all(timing['runs'] == 1 and timing['median'] > 0 for timing in result['stages'].values())
+        print(f"   ✅ {len(STAGES)} stages timed on {result['sku_rows']:,} slots")
+
+        assert list(result['api']) == ENDPOINTS
+        assert all(sum(load['status_counts'].values()) == 4 for load in result['api'].values())
+        assert result['api']['/api/status']['errors'] == 0
+        print(f"   ✅ {len(ENDPOINTS)} API endpoints loaded over HTTP")
+
+        path = save_results({'config': {'repeat': 1}, 'datasets': {'tiny': result}}, Path(tmp) / "results.json")
+        record = load_results(path)
+        assert record['datasets']['tiny']['stages'] == result['stages']
+        assert record['machine']['cpu_count'] and record['machine']['pandas']
+        print("   ✅ Results saved with machine metadata and loaded back")
+
+def test_compare_results():
+    """Test flagging slowdowns against a baseline."""
+    print("\n" + "=" * 60)
+    print("TESTING BASELINE COMPARISON")
+    print("=" * 60)
+
+    baseline = _result(build_demand_matrix=0.2, simulate_week=0.001)
+    current = _result(build_demand_matrix=0.4, simulate_week=0.002, finalize_network=0.5)
+    comparisons = {c.name: c for c in compare_results(current, baseline)}
+
+    assert comparisons['build_demand_matrix'].regression and comparisons['build_demand_matrix'].ratio == 2
+    assert not comparisons['simulate_week'].regression  # 2x, but only 1 ms slower
+    assert comparisons['finalize_network'].baseline is None and not comparisons['finalize_network'].regression
+    assert "SLOWER" in format_comparison(list(comparisons.values()))
+    assert not any(c.regression for c in compare_results(baseline, baseline))
+    print("   ✅ Slowdown flagged; noise-sized and new entries reported, not flagged")
+
+if __name__ == "__main__":
+    test_run_dataset()
+    test_compare_results()
+    print("\n✅ ALL BENCHMARK TESTS COMPLETED")
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Test script for CedarSim Core Models
+
+This script checks the SKU and Location business logic in core_models.py on a small
+hand-built network (one Perpetual location and one PAR).
+"""
+
+import sys
+import os
+
+# Add the simulation_development directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from core.core_models import AntologyGenerator, ResourceFactory, DemandData, DeliveryData
+from core.id_registry import canonical_sku_id, canonicalize_sku_ids, get_location_id_registry, get_sku_id_registry
+
+def _build_network():
+    """Build a two-location network with two SKU types."""
+    antology = AntologyGenerator()
+    perpetual = ResourceFactory.create_location("PERPETUAL", "Perpetual")
+    ed = ResourceFactory.create_location("ED", "PAR")
+    antology.add_location(perpetual)
+    antology.add_location(ed)
+
+    skus = {}
+    for sku_id, location, target, rate in [("SKU_001", perpetual, 100, 0.0),
+                                           ("SKU_001", ed, 50, 10.0),
+                                           ("SKU_002", ed, 30, 4.0)]:
+        sku = ResourceFactory.create_sku(sku_id, location.resource_id, target_level=target,
+                                         lead_time_days=7, demand_rate=rate)
+        antology.add_sku(sku)
+        location.add_sku(sku)
+        skus[(sku_id, location.resource_id)] = sku
+
+    antology.generate_network_connections()
+    return antology, perpetual, ed, skus
+
+def _recomputed(location):
+    """Compute location aggregates from scratch for comparison."""
+    skus = list(location.skus.values())
+    rates = [sku.demand_rate for sku in skus]
+    mean = sum(rates) / len(rates)
+    return {
+        'total': sum(sku.get_current_level() for sku in skus),
+        'stockout_rate': 100.0 * sum(sku.get_stockout_amount() > 0 for sku in skus) / len(skus),
+        'transfers': sum(sku._total_emergency_transfers for sku in skus),
+        'demand_std': (sum((r - mean) ** 2 for r in rates) / len(rates)) ** 0.5,
+    }
+
+def test_location_aggregates_track_deltas():
+    """Test that running location totals match a full recomputation."""
+    print("=" * 60)
+    print("TESTING INCREMENTAL LOCATION AGGREGATES")
+    print("=" * 60)
+
+    antology, perpetual, ed, skus = _build_network()
+    ed_sku = skus[("SKU_001", "ED")]
+    skus[("SKU_002", "ED")].set_inventory_level(20)
+    ed_sku.set_inventory_level(5)
+    skus[("SKU_001", "PERPETUAL")].set_inventory_level(3)
+
+    # Stockout in ED pulls emergency supply from Perpetual (which goes negative)
+    ed_sku.process_demand_data(DemandData("SKU_001", 12, 0, "ED"))
+    ed_sku.record_stockout(2)
+    ed_sku.demand_rate = 16.0
+
+    for location in (perpetual, ed):
+        expected = _recomputed(location)
+        assert abs(location.get_total_inventory() - expected['total']) < 1e-9
+        assert abs(location.get_stockout_rate() - expected['stockout_rate']) < 1e-9
+        assert abs(location.get_emergency_transfer_count() - expected['transfers']) < 1e-9
+        assert abs(location.get_demand_variance() - expected['demand_std']) < 1e-9
+        print(f"   ✅ {location.resource_id}: total={location.get_total_inventory()}, "
+              f"stockout_rate={location.get_stockout_rate():.1f}%, "
+              f"transfers={location.get_emergency_transfer_count()}")
+
+    # Direct writes to the state store are picked up by an explicit resync
+    antology.state_store.current_level[ed_sku.slot] = 40
+    ed.recompute_aggregates()
+    assert ed.get_total_inventory() == _recomputed(ed)['total']
+    print(f"   ✅ recompute_aggregates resynced ED total to {ed.get_total_inventory()}")
+
+def test_pending_shipment_queue():
+    """Test time-ordered pending shipments and the cached in-transit total."""
+    print("\n" + "=" * 60)
+    print("TESTING PENDING SHIPMENT QUEUE")
+    print("=" * 60)
+
+    sku = ResourceFactory.create_sku("SKU_001", "ED", target_level=100, lead_time_days=21)
+    first_twin = DeliveryData("SKU_001", 10, 3)
+    second_twin = DeliveryData("SKU_001", 10, 3)
+    for delivery in [DeliveryData("SKU_001", 25, 5), first_twin, second_twin,
+                     DeliveryData("SKU_001", 5, 1)]:
+        sku.add_pending_shipment(delivery)
+
+    assert sku.get_quantity_in_transit() == 50
+    assert sku.get_pending_shipments(3) == 25
+    assert sku.calculate_inventory_gap(0) == 50
+    print(f"   ✅ In transit: {sku.get_quantity_in_transit()}, due by week 3: {sku.get_pending_shipments(3)}")
+
+    # Processing one twin removes exactly that object
+    sku.process_delivery_data(second_twin)
+    remaining = list(sku._pending_shipments)
+    assert any(d is first_twin for d in remaining)
+    assert not any(d is second_twin for d in remaining)
+    assert sku.get_current_level() == 10
+
+    # Already-processed deliveries are ignored
+    sku.process_delivery_data(second_twin)
+    assert sku.get_current_level() == 10
+
+    received = sku.process_due_deliveries(4)
+    assert received == 15
+    assert [d.time for d in sku._pending_shipments] == [5]
+    assert sku.get_quantity_in_transit() == 25
+    print(f"   ✅ Landed {received} units by week 4, {len(sku._pending_shipments)} shipment left in transit")
+
+def test_emergency_network_index():
+    """Test the CSR emergency network index against the SKU connections."""
+    print("\n" + "=" * 60)
+    print("TESTING EMERGENCY NETWORK INDEX")
+    print("=" * 60)
+
+    antology, perpetual, ed, skus = _build_network()
+    icu = ResourceFactory.create_location("ICU", "PAR")
+    antology.add_location(icu)
+    icu_sku = ResourceFactory.create_sku("SKU_001", "ICU", target_level=20, lead_time_days=7)
+    antology.add_sku(icu_sku)
+    icu.add_sku(icu_sku)
+    antology.generate_network_connections()
+
+    index = antology.get_network_index()
+    perpetual_slot = skus[("SKU_001", "PERPETUAL")].slot
+    assert index.num_connections == 2
+    assert antology.get_connection_count("SKU_001") == 2
+    assert antology.get_connection_count("SKU_002") == 0
+    assert sorted(index.get_par_slots(perpetual_slot)) == sorted([skus[("SKU_001", "ED")].slot, icu_sku.slot])
+    assert index.perpetual_of[skus[("SKU_002", "ED")].slot] == -1
+
+    transfers = index.scatter_to_perpetual(antology.state_store.column('target_level'))
+    assert transfers[perpetual_slot] == 70
+    print(f"   ✅ {index.num_connections} connections, scattered {transfers[perpetual_slot]} onto Perpetual")
+
+def test_interned_ids():
+    """Test canonical SKU ids and the int codes recorded for every SKU."""
+    print("\n" + "=" * 60)
+    print("TESTING INTERNED SKU AND LOCATION IDS")
+    print("=" * 60)
+
+    assert [canonical_sku_id(v) for v in (5, "5", " 5.0", "000005")] == ["000005"] * 4
+    assert list(canonicalize_sku_ids([5, "12.0", "1234567"])) == ["000005", "000012", "1234567"]
+    canonical = canonicalize_sku_ids([5, float('nan'), None])
+    assert canonical[0] == "000005" and canonical[1:].isna().all()  # Missing ids are not "000nan"
+    assert list(get_sku_id_registry().intern_many(canonical)[1:]) == [-1, -1]
+
+    antology, perpetual, ed, skus = _build_network()
+    sku_ids, locations = get_sku_id_registry(), get_location_id_registry()
+    ed_sku = skus[("SKU_001", "ED")]
+    assert sku_ids.name(ed_sku.sku_code) == "SKU_001"
+    assert locations.name(ed_sku.location_code) == "ED" and ed.location_code == ed_sku.location_code
+    assert list(sku_ids.lookup(["SKU_002", "NOT_A_SKU"])) == [sku_ids.code("SKU_002"), -1]
+    codes = antology.state_store.column('sku_code')
+    assert codes.dtype.name == 'int32' and list(sku_ids.names(codes)) == ["SKU_001", "SKU_001", "SKU_002"]
+    print(f"   ✅ {len(sku_ids)} SKU ids and {len(locations)} locations interned")
+
+if __name__ == "__main__":
+    test_location_aggregates_track_deltas()
+    test_pending_shipment_queue()
+    test_emergency_network_index()
+    test_interned_ids()
+    print("\n✅ ALL CORE MODEL TESTS COMPLETED")
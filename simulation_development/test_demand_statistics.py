@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test script for the CedarSim Demand Statistics Cube
+
+This script checks the rolling statistics against pandas rolling/expanding windows,
+the Parquet round trip, and the cube built and cached by DataIntegrator.
+"""
+
+import sys
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add the simulation_development directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from core.demand_statistics import (build_demand_statistics, load_demand_statistics,
+                                    save_demand_statistics, trailing_statistics)
+from data.input_data.data_integration import DataIntegrator, DEMAND_DATA_FILE
+from data.input_data.safety_stock import target_levels_from_statistics
+from data.input_data.topology_cache import SKU_DATA_FILE
+from data.input_data.typed_loader import PARQUET_AVAILABLE
+
+def test_rolling_statistics():
+    """Test every statistic and window against pandas on intermittent demand."""
+    print("=" * 60)
+    print("TESTING ROLLING DEMAND STATISTICS")
+    print("=" * 60)
+
+    rng = np.random.default_rng(3)
+    history = rng.poisson(4, (60, 7)) * (rng.random((60, 7)) < 0.5)
+    history[:, 6] = 0  # A slot that never sees demand
+    cube = build_demand_statistics(history, [f"{i:06d}" for i in range(7)], ["Level 1 ED"] * 7)
+    assert len(cube) == 60 * 7 and list(cube['slot'][:7]) == list(range(7))
+
+    frame = pd.DataFrame(history.astype(float))
+    for window, label in [(4, '4w'), (13, '13w'), (52, '52w'), (None, 'full')]:
+        rolling = frame.expanding() if window is None else frame.rolling(window)
+        zero_rolling = (frame == 0).astype(float)
+        zero_rolling = zero_rolling.expanding() if window is None else zero_rolling.rolling(window)
+        expected = {'mean': rolling.mean(), 'std': rolling.std(ddof=0), 'p50': rolling.quantile(0.5),
+                    'p95': rolling.quantile(0.95), 'zero_fraction': zero_rolling.mean()}
+        for name, values in expected.items():
+            got = cube[f"{name}_{label}"].to_numpy().reshape(60, 7)
+            assert np.allclose(got, values.to_numpy(), equal_nan=True, atol=1e-5), (name, label)
+    assert np.isnan(cube['mean_52w'].iloc[:51 * 7]).all()
+
+    trailing = trailing_statistics(cube)
+    assert len(trailing) == 7 and trailing['zero_fraction_full'].iloc[6] == 1.0
+    assert np.isnan(trailing['cv_full'].iloc[6])
+    print(f"   ✅ {cube.shape[1] - 4} statistic columns match pandas rolling windows")
+
+    if not PARQUET_AVAILABLE:
+        print("   ⚠️  pyarrow not installed - Parquet storage not tested")
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "stats.parquet"
+        save_demand_statistics(cube, path)
+        pd.testing.assert_frame_equal(load_demand_statistics(path), cube)
+        last = load_demand_statistics(path, columns=['std_13w'], weeks=[59])
+        assert list(last.columns) == ['week', 'slot', 'sku_id', 'location', 'std_13w'] and len(last) == 7
+    print("   ✅ Parquet round trip and week/column pushdown")
+
+def test_constant_tail_after_large_demand():
+    """Test that a constant window after large early demand has a std of 0."""
+    print("\n" + "=" * 60)
+    print("TESTING ROLLING STD AFTER LARGE EARLY DEMAND")
+    print("=" * 60)
+
+    rng = np.random.default_rng(5)
+    history = np.vstack([rng.normal(7000, 300, (60, 3)), np.full((20, 3), 3.3)])
+    cube = build_demand_statistics(history, ["000001", "000002", "000003"], ["Level 1 ED"] * 3)
+    tail = cube[cube['week'] >= 72]  # Windows fully inside the constant tail
+    for label in ('4w', '13w'):
+        assert np.allclose(tail[f"mean_{label}"], 3.3)
+        assert (tail[f"std_{label}"] < 1e-9).all() and (tail[f"cv_{label}"] < 1e-9).all(), label
+    print("   ✅ Constant 3.3/week tail after ~7,000/week history has std and cv of 0")
+
+def test_integrator_statistics():
+    """Test the cube built from DataIntegrator's demand matrix and the target levels read from it."""
+    print("\n" + "=" * 60)
+    print("TESTING DATA INTEGRATOR DEMAND STATISTICS")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+        pd.DataFrame({
+            'oid': ['000005', '000005', '000012'],
+            'Item Description': ['Pitcher', 'Pitcher', 'Gloves'],
+            'unit_of_measure': ['Each', 'Each', 'Box'],
+            'lo': ['Perpetual', 'Level 1 ED', 'Level 1 ED'],
+            'lead_time': [4.0, 1.0, 9.0],
+            'burn_rate': [10.0, 2.0, 1.0],
+            'Stock Units Analytical': [50.0, 20.0, 7.0],
+        }).to_csv(data_dir / SKU_DATA_FILE, index=False)
+        weeks = pd.date_range('2024-01-06', periods=20, freq='7D').strftime('%Y-%m-%d')
+        pd.DataFrame({
+            'oid': [5] * 20 + [12] * 20,
+            'uniform_location': ['MDRER'] * 20 + ['Level 1 ED'] * 20,
+            'PO Week Ending Date': list(weeks) * 2,
+            'Total Qty Issues': [7 * (i % 3) for i in range(20)] + [14] * 20,
+        }).to_csv(data_dir / DEMAND_DATA_FILE, index=False)
+
+        integrator = DataIntegrator(data_dir=data_dir)
+        cube = integrator.build_demand_statistics()
+        trailing = trailing_statistics(cube)
+        ed = trailing[(trailing['sku_id'] == '000005') & (trailing['location'] == 'Level 1 ED')].iloc[0]
+        assert np.isclose(ed['std_13w'], np.std([7 * (i % 3) for i in range(7, 20)]))
+        print(f"   ✅ {len(trailing)} slots x {cube['week'].nunique()} weeks, "
+              f"{len([c for c in cube.columns if c.endswith('_full')])} statistics per window")
+
+        targets = target_levels_from_statistics(cube, integrator.sku_data, window='13w', z_score=2.0)
+        ed_target = targets[(targets['oid'] == '000005') & (targets['lo'] == 'Level 1 ED')].iloc[0]
+        assert np.isclose(ed_target['target_level'], 2.0 * np.sqrt(1.0) * ed['std_13w'] / 7)
+        assert targets[targets['oid'] == '000012']['target_level'].iloc[0] == 0  # Constant demand
+        print(f"   ✅ Target levels for {len(targets)} SKU-locations read from the cube")
+
+        if PARQUET_AVAILABLE:
+            assert len(list((data_dir / ".demand_statistics_cache").glob("*.parquet"))) == 1
+            pd.testing.assert_frame_equal(DataIntegrator(data_dir=data_dir).build_demand_statistics(), cube)
+            print("   ✅ Cube reloaded from the Parquet cache")
+
+if __name__ == "__main__":
+    test_rolling_statistics()
+    test_constant_tail_after_large_demand()
+    test_integrator_statistics()
+    print("\n✅ ALL DEMAND STATISTICS TESTS COMPLETED")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for the CedarSim New Excel Data Converter
+
+This script checks the indexed merge of new item data into the existing inventory
+(canonical item numbers, several rows per item, rows without an item number) and the
+templated rows created for new items.
+"""
+
+import sys
+import os
+import importlib.util
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add the simulation_development directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+CONVERTER_SCRIPT = Path(__file__).parent.parent / "scripts" / "new_excel_converter.py"
+
+def _load_converter_module():
+    spec = importlib.util.spec_from_file_location("new_excel_converter", CONVERTER_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def _existing_data():
+    """Item 5 stocked in two departments, items 12 and 77, and a row without an item number."""
+    return pd.DataFrame({
+        'Oracle Item Number': [5, 5, 12, 77, np.nan],
+        'Item Description': ['Pitcher', 'Pitcher', 'Gloves', 'Gauze', 'Unlabelled'],
+        'Department Name': ['ED', 'ICU', 'ED', 'OR', 'ED'],
+        'Department Number': [7470009, 6172010, 7470009, 6170001, 7470009],
+        'Supplier Name': ['Medline'] * 5,
+        'On-PAR or Special Request': ['On-PAR', 'On-PAR', 'Special Request', 'On-PAR', 'On-PAR'],
+        'Medline item? Y/N': ['Y'] * 5,
+        'Avg Daily Burn Rate': [1.0, 2.0, 3.0, 4.0, 5.0],
+        'Avg_Lead Time': [1.0, 1.0, 2.0, 3.0, 4.0],
+        'UOM': ['Each', 'Each', 'Box', 'Pack', 'Each'],
+        'Level 1 ED': ['ED-1', 'ED-1', 'ED-2', None, 'ED-3'],
+        'Level 2 Unit': ['A', 'B', 'C', 'D', 'E'],
+    })
+
+def test_merge_and_new_items():
+    """Test the indexed update, canonical item matching, item counts and new-item templating."""
+    print("=" * 60)
+    print("TESTING EXCEL CONVERTER MERGE")
+    print("=" * 60)
+
+    module = _load_converter_module()
+    with tempfile.TemporaryDirectory() as tmp:
+        existing_path = Path(tmp) / "existing.csv"
+        _existing_data().to_csv(existing_path, index=False)  # Item numbers read back as 5.0, 12.0, NaN
+        converter = module.CedarSimDataConverter(existing_path, output_dir=Path(tmp) / "converted")
+        existing = converter.existing_data
+
+        new_data = pd.DataFrame({
+            'Oracle Item Number': pd.Series(['00005', 5, '12', 900, np.nan], dtype=object),
+            'Item Description': ['Pitcher', 'Pitcher (dup)', 'Gloves', 'Mask', 'Blank'],
+            'unit_of_measure': ['Case', 'Ignored', 'Box', 'Each', 'Each'],
+            'lead_time': [7.0, 99.0, 8.0, 9.0, 99.0],
+            'burn_rate': [10.0, 99.0, 30.0, 90.0, 99.0],
+        })
+        converted = converter._convert_columns(new_data, converter._create_column_mapping())
+        assert list(converted['Item Description']) == ['Pitcher', 'Gloves', 'Mask', 'Blank']
+        print("   ✅ 5 and '00005' deduplicated as one item")
+
+        merged, counts = converter._merge_data(converted, handle_new_items=True, exclude_new_items=False)
+        assert counts == {'overlapping_items': 2, 'new_items_only': 1, 'existing_items_only': 1}
+
+        assert list(merged['Avg Daily Burn Rate'][:5]) == [10.0, 10.0, 30.0, 4.0, 5.0]
+        assert list(merged['Avg_Lead Time'][:5]) == [7.0, 7.0, 8.0, 3.0, 4.0]
+        assert list(merged['UOM'][:5]) == ['Case', 'Case', 'Box', 'Pack', 'Each']
+        pd.testing.assert_frame_equal(merged.drop(columns=module.UPDATE_COLUMNS).iloc[:5],
+                                      existing.drop(columns=module.UPDATE_COLUMNS), check_dtype=False)
+        print(f"   ✅ Both rows of item 5 updated; {counts}")
+
+        assert len(merged) == len(existing) + 1
+        new_row = merged.iloc[-1]
+        assert new_row['Oracle Item Number'] == 900 and new_row['Item Description'] == 'Mask'
+        assert new_row['Avg Daily Burn Rate'] == 90.0 and new_row['UOM'] == 'Each'
+        assert new_row['Department Name'] == 'Unknown' and new_row['Supplier Name'] == 'Unknown'
+        assert new_row['Department Number'] == 0 and new_row['On-PAR or Special Request'] == 'On-PAR'
+        assert new_row['Medline item? Y/N'] == 'N'
+        assert new_row[['Level 1 ED', 'Level 2 Unit']].isna().all()
+        print("   ✅ New item appended from the template row with defaults and no level mapping")
+
+        _, counts = converter._merge_data(converted)
+        assert counts['new_items_only'] == 1
+        assert (converter.output_dir / 'excluded_new_items.csv').exists()
+        print("   ✅ New items excluded by default and logged")
+
+if __name__ == "__main__":
+    test_merge_and_new_items()
+    print("\n✅ ALL EXCEL CONVERTER TESTS COMPLETED")
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test script for the CedarSim Formula Variant Engine
+
+This script checks the per-pair, per-window demand moments against a direct pandas
+calculation and that broadcast scoring (in-process and on a process pool) matches
+the per-pair predictions.
+"""
+
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+# Add the simulation_development directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from data.input_data.formula_variants import (STANDARD_WINDOWS, FormulaVariant, evaluate_variants,
+                                              kings_variants, pair_moments, pair_results, variant_grid)
+
+KEYS = ['Oracle Item Number', 'Department Number']
+
+def _validation_like_data(seed=11):
+    """Weekly demand from 2023 to 2025 for 4 SKUs x 3 departments, plus reference rows."""
+    rng = np.random.default_rng(seed)
+    weeks = pd.date_range('2023-01-07', '2025-06-28', freq='7D')
+    rows = []
+    for sku in [136, 340, 508, 5]:
+        for dept in [0, 7470009, 6172010]:
+            sample = rng.choice(len(weeks), size=rng.integers(1, 40), replace=False)
+            for week in weeks[sample]:
+                rows.append((week, sku, dept, float(rng.integers(0, 200)), 0.5 + sku % 3, 10.0 + dept % 7))
+    demand = pd.DataFrame(rows, columns=['PO Week Ending Date', 'Oracle Item Number', 'Department Number',
+                                         'Total Qty Issues', 'Avg_Lead Time', 'Avg Daily Burn Rate'])
+    reference = demand[KEYS].drop_duplicates().reset_index(drop=True)
+    reference['Department Name'] = reference['Department Number'].astype(str)
+    reference['Z-score'] = 2.05
+    reference['Safety stock_units'] = rng.integers(0, 300, size=len(reference)).astype(float)
+    missing = pd.DataFrame({'Oracle Item Number': [999], 'Department Number': [0], 'Department Name': ['0'],
+                            'Z-score': [2.05], 'Safety stock_units': [50.0]})
+    return demand, pd.concat([reference, missing], ignore_index=True)
+
+def test_pair_moments():
+    """Test bincount moments against a per-pair, per-window pandas calculation."""
+    print("=" * 60)
+    print("TESTING PAIR MOMENTS")
+    print("=" * 60)
+
+    demand, reference = _validation_like_data()
+    moments = pair_moments(reference, demand, KEYS)
+    max_date = demand['PO Week Ending Date'].max()
+
+    for p, pair in reference.iterrows():
+        rows = demand[(demand['Oracle Item Number'] == pair['Oracle Item Number']) &
+                      (demand['Department Number'] == pair['Department Number'])]
+        for w, window in enumerate(STANDARD_WINDOWS.values()):
+            daily = rows[window(rows['PO Week Ending Date'], max_date)]['Total Qty Issues'] / 7
+            assert moments.count[p, w] == len(daily)
+            if len(daily):
+                assert np.isclose(moments.mean[p, w], np.mean(daily))
+                assert np.isclose(moments.std[p, w], np.std(daily))
+    assert moments.count[-1].sum() == 0  # SKU 999 has no demand
+    print(f"   ✅ {moments.num_pairs} pairs x {len(moments.windows)} windows match pandas")
+
+def test_missing_keys():
+    """Test that demand rows with a missing key are left out of every pair."""
+    print("\n" + "=" * 60)
+    print("TESTING PAIR MOMENTS WITH MISSING KEYS")
+    print("=" * 60)
+
+    demand, reference = _validation_like_data()
+    blank = demand.iloc[[0]].assign(**{'Department Number': np.nan, 'Total Qty Issues': 1e6})
+    moments = pair_moments(reference, pd.concat([demand, blank], ignore_index=True), KEYS)
+    expected = pair_moments(reference, demand, KEYS)
+    assert np.array_equal(moments.count, expected.count)
+    assert np.allclose(moments.mean, expected.mean) and np.allclose(moments.var, expected.var)
+    print("   ✅ Demand row without a Department Number ignored")
+
+def test_variant_scoring():
+    """Test broadcast scoring against the per-pair long table, in-process and on a pool."""
+    print("\n" + "=" * 60)
+    print("TESTING VARIANT SCORING")
+    print("=" * 60)
+
+    demand, reference = _validation_like_data()
+    moments = pair_moments(reference, demand, KEYS)
+
+    variants = kings_variants()
+    assert [variant.formula_name('all_data') for variant in variants] == [
+        'basic_kings_all_data', 'modified_kings_all_data_t1_1', 'modified_kings_all_data_t1_7',
+        'modified_kings_all_data_t1_30', 'kings_with_lt_var_all_data']
+
+    scores = evaluate_variants(moments, variants).set_index('formula')
+    expected = pair_results(moments, variants).groupby('formula').agg(
+        MAE=('error', 'mean'), MAPE=('error_pct', 'mean'), MAPE_std=('error_pct', 'std'),
+        count=('error', 'size'))
+    assert set(scores.index) == set(expected.index)
+    for column in expected.columns:
+        assert np.allclose(scores.loc[expected.index, column], expected[column], equal_nan=True), column
+    row = pair_results(moments, [FormulaVariant('basic_kings', 'kings')]).iloc[0]
+    assert np.isclose(row['predicted_ss'], row['z_score'] * np.sqrt(row['lead_time']) * row['demand_std'])
+    print(f"   ✅ {len(scores)} formula x window scores match the per-pair results")
+
+    grid = variant_grid('power', t1=[1, 7], exponent=np.linspace(0.25, 1.5, 26), scale=np.linspace(0.5, 2, 16))
+    assert len(grid) == 832 and grid[0].name == 'power_t1_1_exponent_0.25_scale_0.5'
+    serial = evaluate_variants(moments, grid, chunk_size=100)
+    parallel = evaluate_variants(moments, grid, chunk_size=100, max_workers=2)
+    pd.testing.assert_frame_equal(serial, parallel)
+    assert serial['MAPE'].is_monotonic_increasing
+    print(f"   ✅ {len(grid)} variants scored identically in-process and on 2 workers")
+
+if __name__ == "__main__":
+    test_pair_moments()
+    test_missing_keys()
+    test_variant_scoring()
+    print("\n✅ ALL FORMULA VARIANT TESTS COMPLETED")
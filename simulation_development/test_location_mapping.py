@@ -13,6 +13,8 @@ from pathlib import Path
 # Add the simulation_development directory to the path
 sys.path.append(os.path.join(os.path.dirname(__file__)))
 
+import pandas as pd
+
 from data.input_data.location_mapper import LocationMapper
 from data.input_data.data_integration import DataIntegrator
 
@@ -52,6 +54,32 @@ def test_location_mapper():
     # Print mapping summary
     mapper.print_mapping_summary()
 
+def test_rule_engine_and_series_mapping():
+    """Test prefix/pattern rules and bulk Series mapping."""
+    print("\n" + "=" * 60)
+    print("TESTING LOCATION RULE ENGINE")
+    print("=" * 60)
+    
+    mapper = LocationMapper()
+    
+    # Exact entries win over rules; prefixes are stripped; pattern families catch the rest
+    assert mapper.map_demand_to_sku_locations("TORDC\\MDR7420OR") == ["Level 2 Surgery/Procedures/PACU"]
+    assert mapper.map_demand_to_sku_locations("TORDC\\MDRLAB") == ["Level 3 Central Lab"]
+    assert mapper.map_demand_to_sku_locations("MDR7010NEW") == ["Level 3 Medical"]
+    assert mapper.map_demand_to_sku_locations("TORDC\\MDR6200X") == ["Level 6 Surgical"]
+    assert mapper.map_demand_to_sku_locations("UnknownDemand") == []
+    print("   ✅ Exact, prefix and pattern rules resolved")
+    
+    demand = pd.Series(["MDRER", "MDR7010NEW", None, "UnknownDemand", "MDRER"] * 1000)
+    mapped = mapper.map_demand_series(demand)
+    assert list(mapped[:5].astype(object).fillna("-")) == ["Level 1 ED", "Level 3 Medical", "-", "-", "Level 1 ED"]
+    assert isinstance(mapped.dtype, pd.CategoricalDtype)
+    
+    sku = mapper.map_sku_series(pd.Series(["Level 1 ED", "Nowhere", "Nowhere", "Perpetual"]))
+    assert list(sku.astype(object).fillna("-")) == ["MDRER", "-", "-", "MDRCS"]
+    assert mapper.get_unmapped_locations() == {"Nowhere"}
+    print(f"   ✅ Mapped {len(demand):,} demand rows from {demand.nunique()} distinct codes")
+
 def test_data_integration():
     """Test the data integration with location mapping."""
     print("\n" + "=" * 60)
@@ -62,9 +90,9 @@ def test_data_integration():
         # Create data integrator
         integrator = DataIntegrator()
         
-        # Load production data (this will trigger location mapping validation)
+        # Load production data with the location mapping validation report
         print("\n📊 Loading production data...")
-        data = integrator.load_production_data()
+        data = integrator.load_production_data(validate_mappings=True)
         
         print(f"\n✅ Data loaded successfully:")
         print(f"   SKU Records: {len(data['sku_data']):,}")
@@ -93,6 +121,7 @@ def main():
     
     # Test location mapper
     test_location_mapper()
+    test_rule_engine_and_series_mapping()
     
     # Test data integration
     success = test_data_integration()
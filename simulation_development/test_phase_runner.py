@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test script for the CedarSim Phase Runner
+
+This script checks that phases run in dependency order, that only phases downstream
+of a changed input run again, and that failed phases and missing side-effect files
+are not served from the cache.
+"""
+
+import sys
+import os
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+# Add the simulation_development directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from data.input_data.phase_runner import Phase, PhaseError, PhaseRunner
+
+def _pipeline(tmp, calls):
+    """Load -> clean -> report, with the validation sample loaded independently."""
+    report_file = Path(tmp) / "report.txt"
+
+    def load_demand(demand_file):
+        calls.append('load_demand')
+        return {'demand': pd.read_csv(demand_file)}
+
+    def load_validation(validation_file):
+        calls.append('load_validation')
+        return {'validation': pd.read_csv(validation_file)}
+
+    def clean(demand):
+        calls.append('clean')
+        if demand['qty'].isna().all():
+            raise PhaseError("no demand left")
+        return {'clean_demand': demand.dropna(), 'removed': int(demand['qty'].isna().sum())}
+
+    def report(clean_demand, validation, removed):
+        calls.append('report')
+        covered = clean_demand['sku'].isin(validation['sku']).sum()
+        report_file.write_text(f"{len(clean_demand)} rows, {removed} removed, {covered} validated")
+        return {}
+
+    # Declared out of order; the runner sorts them by their inputs
+    return [
+        Phase('report', report, inputs=['clean_demand', 'validation', 'removed'], files=[report_file]),
+        Phase('clean', clean, inputs=['demand'], outputs=['clean_demand', 'removed']),
+        Phase('load_demand', load_demand, inputs=['demand_file'], outputs=['demand']),
+        Phase('load_validation', load_validation, inputs=['validation_file'], outputs=['validation']),
+    ], report_file
+
+def test_incremental_runs():
+    """Test that a changed validation sample reruns only the phases that depend on it."""
+    print("=" * 60)
+    print("TESTING INCREMENTAL PHASE CACHING")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        demand_file, validation_file = Path(tmp) / "demand.csv", Path(tmp) / "validation.csv"
+        pd.DataFrame({'sku': [1, 2, 3, 4], 'qty': [5.0, None, 7.0, 1.0]}).to_csv(demand_file, index=False)
+        pd.DataFrame({'sku': [1, 3]}).to_csv(validation_file, index=False)
+        initial = {'demand_file': demand_file, 'validation_file': validation_file}
+
+        calls = []
+        phases, report_file = _pipeline(tmp, calls)
+        runner = PhaseRunner(phases, Path(tmp) / "cache")
+        artifacts = runner.run(initial)
+        assert calls == ['load_demand', 'clean', 'load_validation', 'report']
+        assert artifacts['removed'] == 1 and report_file.read_text() == "3 rows, 1 removed, 2 validated"
+        print(f"   ✅ First run executed {len(calls)} phases in dependency order")
+
+        calls.clear()
+        artifacts = runner.run(initial)
+        assert calls == [] and [t.status for t in runner.timings] == ['cached'] * 4
+        assert len(artifacts['clean_demand']) == 3
+        print("   ✅ Unchanged inputs: every phase reused from the cache")
+
+        pd.DataFrame({'sku': [1]}).to_csv(validation_file, index=False)
+        runner.run(initial)
+        assert calls == ['load_validation', 'report'] and report_file.read_text().endswith("1 validated")
+        calls.clear()
+        report_file.unlink()
+        runner.run(initial)
+        assert calls == ['report'] and report_file.exists()
+        print("   ✅ New validation sample / deleted report rerun only the affected phases")
+        print(runner.format_timings())
+
+def test_failure_and_code_changes():
+    """Test that failed phases are not cached and code changes invalidate a phase."""
+    print("\n" + "=" * 60)
+    print("TESTING PHASE FAILURES AND CODE VERSIONS")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        demand_file, validation_file = Path(tmp) / "demand.csv", Path(tmp) / "validation.csv"
+        pd.DataFrame({'sku': [1, 2], 'qty': [None, None]}).to_csv(demand_file, index=False)
+        pd.DataFrame({'sku': [1]}).to_csv(validation_file, index=False)
+        initial = {'demand_file': demand_file, 'validation_file': validation_file}
+
+        calls = []
+        phases, _ = _pipeline(tmp, calls)
+        runner = PhaseRunner(phases, Path(tmp) / "cache")
+        for _ in range(2):
+            try:
+                runner.run(initial)
+                assert False, "Expected PhaseError"
+            except PhaseError:
+                pass
+        assert calls == ['load_demand', 'clean', 'clean']
+        print("   ✅ A failing phase stops the run and is retried next time")
+
+        pd.DataFrame({'sku': [1, 2], 'qty': [2.0, None]}).to_csv(demand_file, index=False)
+        runner.run(initial)
+        calls.clear()
+        phases[1].version = 2
+        runner.run(initial)
+        assert calls == ['clean']  # Same outputs, so the report phase is still reused
+        print("   ✅ Bumping a phase version reruns it; unchanged outputs keep downstream cached")
+
+        try:
+            PhaseRunner(phases + [Phase('other', lambda demand: {}, inputs=['demand'], outputs=['removed'])],
+                        Path(tmp) / "cache").run(initial)
+            assert False, "Expected ValueError"
+        except ValueError:
+            pass
+        print("   ✅ Artifacts with two producers are rejected")
+
+if __name__ == "__main__":
+    test_incremental_runs()
+    test_failure_and_code_changes()
+    print("\n✅ ALL PHASE RUNNER TESTS COMPLETED")
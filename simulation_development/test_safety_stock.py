@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test script for the CedarSim Safety Stock Module
+
+This script checks the grouped demand statistics against a per-pair reference
+calculation and that computed target levels flow into DataIntegrator's SKUs.
+"""
+
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+# Add the simulation_development directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from data.input_data.data_integration import DataIntegrator
+from data.input_data.location_mapper import LocationMapper
+from data.input_data.safety_stock import (apply_target_levels, compare_safety_stock,
+                                          demand_statistics, target_levels)
+
+def _demand(seed=7):
+    """Weekly demand for 3 SKUs x 2 departments, one pair with a single record."""
+    rng = np.random.default_rng(seed)
+    rows = [(sku, dept, lead_time, qty)
+            for sku, lead_time in [(136, 0.5), (340, 2.0), (5, 1.0)]
+            for dept in [0, 7470009]
+            for qty in rng.integers(0, 60, size=12)]
+    rows.append((999, 0, 1.0, 10))
+    return pd.DataFrame(rows, columns=['Oracle Item Number', 'Department Number', 'Avg_Lead Time',
+                                       'Total Qty Issues'])
+
+def test_grouped_statistics_match_reference():
+    """Test that one groupby reproduces the per-pair filter-and-loop calculation."""
+    print("=" * 60)
+    print("TESTING GROUPED SAFETY STOCK")
+    print("=" * 60)
+
+    demand = _demand()
+    reference = pd.DataFrame({
+        'Oracle Item Number': [136, 340, 5, 999, 136],
+        'Department Number': [0, 7470009, 0, 0, 12345],
+        'Z-score': [2.05, 1.65, 2.05, 2.05, 2.05],
+        'Safety stock_units': [20.0, 15.0, 0.0, 5.0, 8.0],
+    })
+
+    results = compare_safety_stock(reference, demand, keys=['Oracle Item Number', 'Department Number'])
+    # 999 has one demand record and department 12345 has none
+    assert list(results['Oracle Item Number']) == [136, 340, 5]
+
+    for _, row in results.iterrows():
+        pair = demand[(demand['Oracle Item Number'] == row['Oracle Item Number']) &
+                      (demand['Department Number'] == row['Department Number'])]
+        daily = pair['Total Qty Issues'] / 7
+        expected = row['Z-score'] * np.sqrt(pair['Avg_Lead Time'].iloc[0]) * np.std(daily)
+        assert np.isclose(row['demand_std'], np.std(daily))
+        assert np.isclose(row['demand_mean'], np.mean(daily))
+        assert np.isclose(row['calculated_ss'], expected)
+        assert row['data_points'] == len(pair)
+    assert results['error_pct'].iloc[2] == 100  # Reference of 0 safety stock
+    print(f"   ✅ {len(results)} pairs match the per-pair calculation")
+
+    stats = demand_statistics(demand, ['Oracle Item Number', 'Department Number'])
+    assert len(stats) == 7 and 'lead_time' not in stats.columns
+    print(f"   ✅ {len(stats)} groups from {len(demand)} demand records")
+
+def test_target_levels_into_integrator():
+    """Test that target levels replace the analytical safety stock used as SKU targets."""
+    print("\n" + "=" * 60)
+    print("TESTING TARGET LEVELS IN DATA INTEGRATOR")
+    print("=" * 60)
+
+    sku_data = pd.DataFrame({
+        'oid': ['000005', '000005', '000012'],
+        'Item Description': ['Pitcher', 'Pitcher', 'Gloves'],
+        'unit_of_measure': ['Each', 'Each', 'Box'],
+        'lo': ['Perpetual', 'Level 1 ED', 'Level 1 ED'],
+        'lead_time': [4.0, 1.0, 9.0],
+        'burn_rate': [10.0, 2.0, 1.0],
+        'Stock Units Analytical': [50.0, np.nan, 7.0],
+    })
+    demand = pd.DataFrame({
+        'oid': [5, 5, 5, 5, 12],
+        'uniform_location': ['MDRER', 'Level 1 ED', 'MDRER', 'Perpetual', 'Level 1 ED'],
+        'Total Qty Issues': [7.0, 21.0, 14.0, 70.0, 3.0],
+    })
+
+    targets = target_levels(demand, sku_data, z_score=2.0, location_mapper=LocationMapper())
+    # MDRER maps to Level 1 ED; Perpetual and SKU 000012 have one record each
+    assert list(zip(targets['oid'], targets['lo'])) == [('000005', 'Level 1 ED')]
+    expected = 2.0 * np.sqrt(1.0) * np.std([1.0, 3.0, 2.0])
+    assert np.isclose(targets['target_level'].iloc[0], expected)
+
+    integrator = DataIntegrator()
+    integrator.sku_data = apply_target_levels(sku_data, targets)
+    antology = integrator.create_antology_structure(use_cache=False, export_frontend=False)
+    levels = {(sku.resource_id, sku.location_id): sku.target_level
+              for sku_list in antology.sku_registry.values() for sku in sku_list}
+    assert np.isclose(levels[('000005', 'Level 1 ED')], expected)
+    assert levels[('000005', 'Perpetual')] == 50.0
+    assert levels[('000012', 'Level 1 ED')] == 7.0
+    print(f"   ✅ Target level {expected:.2f} applied; other SKUs keep their analytical values")
+
+if __name__ == "__main__":
+    test_grouped_statistics_match_reference()
+    test_target_levels_into_integrator()
+    print("\n✅ ALL SAFETY STOCK TESTS COMPLETED")
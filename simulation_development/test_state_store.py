@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test script for the CedarSim Inventory State Store
+
+This script checks that SKU objects act as views over InventoryStateStore slots and
+prints the memory/throughput comparison against the plain object layout.
+"""
+
+import sys
+import os
+
+# Add the simulation_development directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from core.core_models import AntologyGenerator, ResourceFactory
+from core.state_store import InventoryStateStore, compare_with_object_layout
+
+def test_sku_is_view_over_slot():
+    """Test that SKU attributes read and write the store arrays."""
+    print("=" * 60)
+    print("TESTING SKU STATE STORE VIEWS")
+    print("=" * 60)
+
+    store = InventoryStateStore(initial_capacity=2)
+    sku = ResourceFactory.create_sku("SKU_001", "ED", target_level=50, lead_time_days=14,
+                                     demand_rate=10.0, state_store=store)
+
+    assert store.target_level[sku.slot] == 50
+    assert store.lead_time_weeks[sku.slot] == 2.0
+
+    sku.set_inventory_level(25)
+    assert store.current_level[sku.slot] == 25
+
+    store.current_level[sku.slot] = 5
+    assert sku.get_current_level() == 5
+    print(f"   ✅ SKU {sku.resource_id} backed by slot {sku.slot}")
+
+    # Growth keeps existing views valid
+    others = [ResourceFactory.create_sku(f"SKU_{i:03d}", "ED", target_level=i, state_store=store)
+              for i in range(2, 10)]
+    assert store.capacity >= 9
+    assert sku.get_current_level() == 5
+    assert others[-1].target_level == 9
+    print(f"   ✅ Store grew to {store.capacity} slots without breaking views")
+
+def test_antology_binds_skus():
+    """Test that AntologyGenerator moves SKU state into its own store."""
+    print("\n" + "=" * 60)
+    print("TESTING ANTOLOGY STATE STORE BINDING")
+    print("=" * 60)
+
+    antology = AntologyGenerator()
+    perpetual = ResourceFactory.create_location("PERPETUAL", "Perpetual")
+    antology.add_location(perpetual)
+
+    sku = ResourceFactory.create_sku("SKU_001", "PERPETUAL", target_level=100, demand_rate=3.0)
+    sku.set_inventory_level(-4)
+    old_store, old_slot = sku.state_store, sku.slot
+
+    antology.add_sku(sku)
+    perpetual.add_sku(sku)
+
+    assert sku.state_store is antology.state_store
+    assert not old_store.active[old_slot]
+    assert sku.get_current_level() == -4
+    assert sku.target_level == 100
+    assert antology.state_store.is_perpetual[sku.slot]
+    assert len(antology.state_store) == 1
+    print(f"   ✅ SKU moved into antology store slot {sku.slot} with state intact")
+
+def test_layout_comparison():
+    """Print the memory and throughput comparison against the object layout."""
+    print("\n" + "=" * 60)
+    print("COMPARING STATE STORE WITH OBJECT LAYOUT")
+    print("=" * 60)
+
+    results = compare_with_object_layout(num_slots=20000, weeks=3)
+    print(f"   Memory per slot: object {results['object_bytes_per_slot']:.1f} B, "
+          f"store {results['store_bytes_per_slot']:.1f} B")
+    print(f"   Weekly update: {results['speedup']:.0f}x faster with the store")
+    assert results['store_bytes_per_slot'] < results['object_bytes_per_slot']
+
+if __name__ == "__main__":
+    test_sku_is_view_over_slot()
+    test_antology_binds_skus()
+    test_layout_comparison()
+    print("\n✅ ALL STATE STORE TESTS COMPLETED")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test script for the CedarSim Synthetic Data generator
+
+This script fits a profile from the shipped SKU inventory CSV, checks that generated
+inputs follow the fitted distributions at scale, that demand is intermittent and
+matches the burn rates, and that a generated multi-facility directory loads through
+the DataIntegrator with all demand mapped.
+"""
+
+import sys
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add the simulation_development directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from data.input_data.data_integration import DataIntegrator
+from data.input_data.synthetic_data import (fit_hospital_profile, generate_demand, generate_sku_inventory,
+                                            write_synthetic_dataset)
+from data.input_data.typed_loader import load_sku_inventory
+
+SKU_FILE = Path(__file__).parent / "data" / "prod-input-data" / "SIMULATION_READY_SKU_INVENTORY_DATA.csv"
+
+def _weekly_demand(every=4, weeks=41):
+    """Demand extract where every series orders every few weeks."""
+    dates = pd.date_range('2024-01-07', periods=weeks, freq='7D')
+    rows = [(date, sku, 'MDRCS', 10.0 + (week % 3) * 5)
+            for sku in (136, 340) for week, date in enumerate(dates) if week % every == 0]
+    return pd.DataFrame(rows, columns=['PO Week Ending Date', 'Oracle Item Number', 'Deliver to Location',
+                                       'Total Quantity'])
+
+def test_fitted_sku_generation():
+    """Test generated SKU inventory against the fitted distributions."""
+    print("=" * 60)
+    print("TESTING SYNTHETIC SKU INVENTORY GENERATION")
+    print("=" * 60)
+
+    sku_data = load_sku_inventory(SKU_FILE, use_cache=False)
+    profile = fit_hospital_profile(sku_data, _weekly_demand(), sku_column='Oracle Item Number',
+                                   location_column='Deliver to Location', quantity_column='Total Quantity')
+    assert profile.num_skus == sku_data['oid'].nunique() and profile.weeks == 41
+    assert abs(profile.order_probability_mean - 11 / 41) < 1e-9 and profile.order_size_cv > 0
+    print(f"   ✅ Fitted {profile.num_skus:,} SKUs over {len(profile.locations)} locations")
+
+    generated = generate_sku_inventory(profile, scale=3, seed=7)
+    assert generated['oid'].nunique() == 3 * profile.num_skus
+    assert generated['oid'].str.len().eq(6).all() and not generated.duplicated(['oid', 'lo']).any()
+    assert set(generated['lo']) <= set(profile.locations)
+    assert set(generated['lead_time']) <= set(profile.lead_times)
+    assert (generated.groupby('oid')['lead_time'].nunique() == 1).all()
+    assert abs((generated['burn_rate'] == 0).mean() - profile.zero_burn_fraction) < 0.03
+    assert abs(np.log(generated.loc[generated['burn_rate'] > 0, 'burn_rate']).median()
+               - np.log(sku_data.loc[sku_data['burn_rate'] > 0, 'burn_rate']).median()) < 0.5
+    assert generated['Stock Units Analytical'].max() <= profile.max_analytical
+    pd.testing.assert_frame_equal(generated, generate_sku_inventory(profile, scale=3, seed=7))
+    print(f"   ✅ 3x catalog: {len(generated):,} rows, fitted lead times / burn rates, reproducible by seed")
+
+def test_demand_and_integration():
+    """Test intermittent demand and loading a multi-facility dataset."""
+    print("\n" + "=" * 60)
+    print("TESTING SYNTHETIC DEMAND AND MULTI-FACILITY INTEGRATION")
+    print("=" * 60)
+
+    profile = fit_hospital_profile(load_sku_inventory(SKU_FILE, use_cache=False))
+    sku_data = generate_sku_inventory(profile, scale=0.5, seed=3)
+    demand = pd.concat(generate_demand(sku_data, profile, weeks=100, seed=3, chunk_slots=500), ignore_index=True)
+    ordering = sku_data['burn_rate'] > 0
+    weeks_with_orders = demand.groupby(['oid', 'lo']).size() / 100
+    assert weeks_with_orders.mean() < 0.5 and (demand['Total Qty Issues'] >= 1).all()
+    expected = (sku_data[ordering].set_index(['oid', 'lo'])['burn_rate'] * 7)
+    realized = demand.groupby(['oid', 'lo'])['Total Qty Issues'].sum().reindex(expected.index, fill_value=0) / 100
+    assert 0.9 < (realized / expected).median() < 1.1
+    print(f"   ✅ Orders in {weeks_with_orders.mean():.0%} of weeks; weekly demand matches 7 x burn rate")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        summary = write_synthetic_dataset(Path(tmp), profile, scale=0.2, facilities=2, weeks=30, seed=1)
+        assert summary['facilities'] == 2 and summary['locations'] == 2 * len(profile.locations)
+        integrator = DataIntegrator(data_dir=Path(tmp))
+        antology = integrator.create_antology_structure(use_cache=False, export_frontend=False)
+        assert "F02 Perpetual" in antology.locations
+        matrix = integrator.build_demand_matrix(use_cache=False)
+        assert matrix.shape == (30, summary['sku_rows']) and matrix.unmapped_quantity == 0
+        assert abs(float(matrix.slot_totals().sum()) - summary['total_demand']) < 1e-3 * summary['total_demand']
+        print(f"   ✅ 2 facilities: {summary['sku_rows']:,} slots loaded, all {summary['demand_rows']:,} demand rows mapped")
+
+if __name__ == "__main__":
+    test_fitted_sku_generation()
+    test_demand_and_integration()
+    print("\n✅ ALL SYNTHETIC DATA TESTS COMPLETED")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test script for the CedarSim Topology Cache
+
+This script builds an antology from a sample of the production SKU data, checks that
+the snapshot restores the same structure, and that changed inputs miss the cache.
+"""
+
+import sys
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add the simulation_development directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from data.input_data.data_integration import DataIntegrator
+from data.input_data.topology_cache import SKU_DATA_FILE, compute_input_hash
+
+PROD_SKU_FILE = Path(__file__).parent / "data" / "prod-input-data" / SKU_DATA_FILE
+
+def _build_from_csv(data_dir):
+    """Build (and snapshot) an antology from the SKU file in data_dir."""
+    integrator = DataIntegrator(data_dir=data_dir)
+    integrator.sku_data = pd.read_csv(data_dir / SKU_DATA_FILE)
+    integrator.input_hash = compute_input_hash(data_dir / SKU_DATA_FILE, integrator.location_mapper)
+    return integrator.create_antology_structure()
+
+def test_snapshot_round_trip():
+    """Test that a cached antology matches a fresh build and is invalidated by new data."""
+    print("=" * 60)
+    print("TESTING TOPOLOGY SNAPSHOT CACHE")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+        pd.read_csv(PROD_SKU_FILE).head(300).to_csv(data_dir / SKU_DATA_FILE, index=False)
+        # Work inside the temp directory so the build's frontend export stays out of the tree
+        previous_cwd = os.getcwd()
+        os.chdir(data_dir)
+        try:
+            start = time.perf_counter()
+            built = _build_from_csv(data_dir)
+            build_seconds = time.perf_counter() - start
+
+            files_before = sorted(data_dir.rglob('*'))
+            start = time.perf_counter()
+            restored = DataIntegrator(data_dir=data_dir).load_cached_antology()
+            restore_seconds = time.perf_counter() - start
+            files_after = sorted(data_dir.rglob('*'))
+        finally:
+            os.chdir(previous_cwd)
+        assert restored is not None
+        assert files_after == files_before, "snapshot restore wrote files"
+        print(f"   ✅ Restore wrote no files ({restore_seconds * 1000:.1f} ms vs "
+              f"{build_seconds * 1000:.1f} ms for the CSV build)")
+        assert set(restored.locations) == set(built.locations)
+        assert {k: len(v) for k, v in restored.sku_registry.items()} == \
+            {k: len(v) for k, v in built.sku_registry.items()}
+        for field in ('target_level', 'lead_time_days', 'demand_rate', 'current_level'):
+            assert np.array_equal(restored.state_store.column(field), built.state_store.column(field)), field
+        for location_id, location in built.locations.items():
+            assert restored.locations[location_id].get_total_inventory() == location.get_total_inventory()
+        sku = restored.sku_registry[next(iter(restored.sku_registry))][0]
+        assert sku.name and sku.unit_of_measure
+        print(f"   ✅ Restored {sum(len(v) for v in restored.sku_registry.values())} SKUs "
+              f"across {len(restored.locations)} locations")
+
+        pd.read_csv(PROD_SKU_FILE).head(301).to_csv(data_dir / SKU_DATA_FILE, index=False)
+        assert DataIntegrator(data_dir=data_dir).load_cached_antology() is None
+        assert DataIntegrator(data_dir=data_dir).load_cached_antology(use_validation_subset=True) is None
+        print("   ✅ Changed SKU data missed the cache")
+
+if __name__ == "__main__":
+    test_snapshot_round_trip()
+    print("\n✅ ALL TOPOLOGY CACHE TESTS COMPLETED")
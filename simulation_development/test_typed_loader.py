@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test script for the CedarSim Typed Loader
+
+This script checks the schema applied to the SKU inventory and demand files and, when
+pyarrow is installed, that the Parquet cache is reused and invalidated correctly.
+"""
+
+import sys
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+# Add the simulation_development directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from data.input_data.data_integration import DataIntegrator, DEMAND_DATA_FILE
+from data.input_data.typed_loader import (PARQUET_AVAILABLE, CACHE_DIR_NAME,
+                                          load_demand, load_sku_inventory)
+
+PROD_SKU_FILE = Path(__file__).parent / "data" / "prod-input-data" / "SIMULATION_READY_SKU_INVENTORY_DATA.csv"
+
+def test_sku_inventory_schema():
+    """Test that the SKU file loads with padded string oids and categorical locations."""
+    print("=" * 60)
+    print("TESTING TYPED SKU INVENTORY LOAD")
+    print("=" * 60)
+
+    sku_data = load_sku_inventory(PROD_SKU_FILE, use_cache=False)
+    raw = pd.read_csv(PROD_SKU_FILE)
+    assert isinstance(sku_data['lo'].dtype, pd.CategoricalDtype)
+    assert (sku_data['oid'].str.len() >= 6).all()
+    assert (sku_data['oid'] == raw['oid'].astype(str).str.zfill(6)).all()
+    assert (sku_data['burn_rate'] == raw['burn_rate']).all()
+    print(f"   ✅ {len(sku_data):,} rows, {sku_data.memory_usage(deep=True).sum() / 1e6:.2f} MB "
+          f"(untyped {raw.memory_usage(deep=True).sum() / 1e6:.2f} MB)")
+
+def test_demand_cache():
+    """Test demand dtypes and Parquet cache reuse/invalidation."""
+    print("\n" + "=" * 60)
+    print("TESTING TYPED DEMAND LOAD")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        demand_file = Path(tmp) / "demand.csv"
+        pd.DataFrame({
+            'oid': [5, 12, 5, 340],
+            'uniform_location': ['Level 1 ED', 'Perpetual', 'Level 1 ED', 'Level 7 ICU'],
+            'PO Week Ending Date': ['2023-01-07', '2023-01-07', '2023-01-14', '2023-01-14'],
+            'Total Qty Issues': [3, 10, 4, 1],
+        }).to_csv(demand_file, index=False)
+
+        demand = load_demand(demand_file)
+        assert list(demand['oid']) == ['000005', '000012', '000005', '000340']
+        assert isinstance(demand['uniform_location'].dtype, pd.CategoricalDtype)
+        assert demand['Total Qty Issues'].dtype == 'float32'
+        assert pd.api.types.is_datetime64_any_dtype(demand['PO Week Ending Date'])
+        print(f"   ✅ Demand dtypes: {dict(demand.dtypes.astype(str))}")
+
+        if not PARQUET_AVAILABLE:
+            print("   ⚠️  pyarrow not installed - Parquet cache not tested")
+            return
+        assert (Path(tmp) / CACHE_DIR_NAME / "demand.parquet").exists()
+        assert load_demand(demand_file).equals(demand)
+
+        time.sleep(0.01)
+        with open(demand_file, 'a') as f:
+            f.write("777,Level 1 ED,2023-01-21,2\n")
+        assert len(load_demand(demand_file)) == 5
+        print("   ✅ Parquet cache reused while unchanged and rebuilt after an edit")
+
+def test_lazy_integrator_loading():
+    """Test that DataIntegrator reads demand only on request, with SKU/location pushdown."""
+    print("\n" + "=" * 60)
+    print("TESTING LAZY DATA INTEGRATOR LOADING")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+        pd.read_csv(PROD_SKU_FILE).head(200).to_csv(data_dir / PROD_SKU_FILE.name, index=False)
+        pd.DataFrame({
+            'oid': [5, 5, 12, 340] * 50,
+            'uniform_location': ['Level 1 ED', 'Perpetual', 'Level 1 ED', 'Level 7 ICU'] * 50,
+            'PO Week Ending Date': ['2023-01-07'] * 200,
+            'Total Qty Issues': range(200),
+        }).to_csv(data_dir / DEMAND_DATA_FILE, index=False)
+
+        integrator = DataIntegrator(data_dir=data_dir)
+        antology = integrator.create_antology_structure(use_validation_subset=True, use_cache=False,
+                                                        export_frontend=False)
+        assert antology.sku_registry
+        assert integrator._demand_data is None
+        print(f"   ✅ Built {len(antology.sku_registry)} SKU types without reading demand data")
+
+        for use_cache in (False, True):
+            subset = load_demand(data_dir / DEMAND_DATA_FILE, use_cache=use_cache,
+                                 sku_ids=[5], locations=['Level 1 ED'])
+            assert len(subset) == 50 and set(subset['oid']) == {'000005'}
+        assert len(integrator.load_demand_data(locations=['Level 7 ICU'])) == 50
+        assert integrator._demand_data is None
+        assert len(integrator.demand_data) == 200
+        print("   ✅ Filtered demand reads returned only the requested SKU/location rows")
+
+if __name__ == "__main__":
+    test_sku_inventory_schema()
+    test_demand_cache()
+    test_lazy_integrator_loading()
+    print("\n✅ ALL TYPED LOADER TESTS COMPLETED")
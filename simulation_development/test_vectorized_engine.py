@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test script for the CedarSim Vectorized Weekly Engine
+
+This script runs the order-up-to-level weekly engine on a small hand-built network
+and checks the stockout, emergency supply and replenishment bookkeeping.
+"""
+
+import sys
+import os
+
+import numpy as np
+
+# Add the simulation_development directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from core.core_models import AntologyGenerator, ResourceFactory
+from core.vectorized_engine import VectorizedWeeklyEngine, benchmark_full_history
+
+def _build_network():
+    """Build one SKU stocked in Perpetual and two PARs."""
+    antology = AntologyGenerator()
+    skus = {}
+    for location_id, location_type, target, lead_days in [("PERPETUAL", "Perpetual", 20, 14),
+                                                         ("ED", "PAR", 10, 7),
+                                                         ("ICU", "PAR", 5, 7)]:
+        location = ResourceFactory.create_location(location_id, location_type)
+        antology.add_location(location)
+        sku = ResourceFactory.create_sku("SKU_001", location_id, target_level=target,
+                                         lead_time_days=lead_days, demand_rate=1.0)
+        antology.add_sku(sku)
+        location.add_sku(sku)
+        sku.set_inventory_level(target)
+        skus[location_id] = sku
+    antology.generate_network_connections()
+    return antology, skus
+
+def test_weekly_step_bookkeeping():
+    """Test demand, emergency supply and ordering for one week."""
+    print("=" * 60)
+    print("TESTING VECTORIZED WEEKLY STEP")
+    print("=" * 60)
+
+    antology, skus = _build_network()
+    engine = VectorizedWeeklyEngine.from_antology(antology)
+    perpetual, ed, icu = skus["PERPETUAL"], skus["ED"], skus["ICU"]
+
+    demand = np.zeros(antology.state_store.size)
+    demand[ed.slot] = 16   # 6 short -> emergency from perpetual
+    demand[icu.slot] = 3
+    demand[perpetual.slot] = 18  # perpetual has 20, draw 18 + 6 -> 4 hospital stockout
+    kpis = engine.step(demand)
+
+    assert ed.get_current_level() == 0
+    assert icu.get_current_level() == 2
+    assert perpetual.get_current_level() == -4
+    assert kpis['par_stockouts'] == 6
+    assert kpis['emergency_transfers'] == 6
+    assert kpis['hospital_stockouts'] == 4
+    assert perpetual._total_emergency_transfers == 6
+    print(f"   ✅ Week 0 KPIs: {kpis}")
+
+    # Orders land after ceil(lead_time_weeks): one week for PARs, two for perpetual
+    engine.step(np.zeros_like(demand))
+    assert ed.get_current_level() == 10
+    assert icu.get_current_level() == 5
+    assert perpetual.get_current_level() == -4
+    engine.step(np.zeros_like(demand))
+    assert perpetual.get_current_level() == 20
+    print("   ✅ Replenishment restored all slots to target by week 2")
+
+    engine.sync_objects(antology)
+    assert antology.locations["ED"].get_total_inventory() == 10
+
+def test_full_history_benchmark():
+    """Print the production-size full-history replay time."""
+    print("\n" + "=" * 60)
+    print("TESTING FULL-HISTORY REPLAY SPEED")
+    print("=" * 60)
+
+    results = benchmark_full_history()
+    print(f"   ✅ {results['num_slots']:,} slots x {results['weeks']} weeks "
+          f"in {results['seconds'] * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    test_weekly_step_bookkeeping()
+    test_full_history_benchmark()
+    print("\n✅ ALL VECTORIZED ENGINE TESTS COMPLETED")
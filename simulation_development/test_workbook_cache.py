@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test script for the CedarSim Workbook Cache
+
+This script checks that streamed sheets match pd.read_excel, that the Parquet sheets
+are reused while the workbook is unchanged, and that structural problems are reported.
+"""
+
+import sys
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add the simulation_development directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from data.input_data.typed_loader import PARQUET_AVAILABLE
+from data.input_data.workbook_cache import CACHE_DIR_NAME, WorkbookValidationError, open_workbook, read_sheet
+
+def _write_workbook(path, demand_rows=6):
+    """Two-sheet workbook with gaps, a mixed-type column and a date column."""
+    sku = pd.DataFrame({
+        'Oracle Item Number': [136, 340, 508],
+        'Item Description': ['Pitcher', None, 'Gloves'],
+        'Department Number': [0, 'ED-7470009', 6172010],  # Mixed int / text cells
+        'Avg_Lead Time': [0.5, np.nan, 3.0],
+    })
+    demand = pd.DataFrame({
+        'PO Week Ending Date': pd.date_range('2024-01-06', periods=demand_rows, freq='7D'),
+        'Oracle Item Number': [136, 340] * (demand_rows // 2),
+        'Total Qty Issues': np.arange(demand_rows, dtype=float) * 1.5,
+    })
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        sku.to_excel(writer, sheet_name='01_SKU_Inventory_Final', index=False)
+        demand.to_excel(writer, sheet_name='02_Demand_Data_Clean', index=False)
+
+def test_single_pass_matches_read_excel():
+    """Test streamed sheets against pd.read_excel, in memory and through Parquet."""
+    print("=" * 60)
+    print("TESTING SINGLE-PASS WORKBOOK INGESTION")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "workbook.xlsx"
+        _write_workbook(path)
+
+        workbook = open_workbook(path, use_cache=False)
+        assert workbook.sheet_names == ['01_SKU_Inventory_Final', '02_Demand_Data_Clean']
+        assert workbook.sheet_info('02_Demand_Data_Clean')['rows'] == 6
+        for name in workbook.sheet_names:
+            pd.testing.assert_frame_equal(workbook.read(name), pd.read_excel(path, sheet_name=name))
+        print("   ✅ In-memory sheets match pd.read_excel")
+
+        if not PARQUET_AVAILABLE:
+            print("   ⚠️  pyarrow not installed - Parquet cache not tested")
+            return
+        cached = open_workbook(path)
+        sku = cached.read('01_SKU_Inventory_Final')
+        assert list(sku['Department Number']) == ['0', 'ED-7470009', '6172010']
+        assert cached.sheet_info(0)['stringified_columns'] == ['Department Number']
+        expected = pd.read_excel(path, sheet_name='02_Demand_Data_Clean')
+        pd.testing.assert_frame_equal(read_sheet(path, '02_Demand_Data_Clean'), expected)
+        pd.testing.assert_frame_equal(cached.read(1, columns=['Total Qty Issues']), expected[['Total Qty Issues']])
+        print("   ✅ Parquet sheets match (mixed-type column stored as text)")
+
+def test_cache_reuse_and_validation():
+    """Test cache keying by workbook hash and structural validation errors."""
+    print("\n" + "=" * 60)
+    print("TESTING WORKBOOK CACHE REUSE AND VALIDATION")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "workbook.xlsx"
+        _write_workbook(path)
+        required = {'01_SKU_Inventory_Final': ['Oracle Item Number', 'Avg_Lead Time']}
+        first = open_workbook(path, required_sheets=['02_Demand_Data_Clean'], required_columns=required)
+
+        if PARQUET_AVAILABLE:
+            cache_root = Path(tmp) / CACHE_DIR_NAME
+            assert [d.name for d in cache_root.iterdir()] == [first.sha256[:16]]
+            # An unchanged workbook (even with a new mtime) is served from the manifest
+            os.utime(path, (0, 0))
+            assert open_workbook(path, required_columns=required).sheets == first.sheets
+            _write_workbook(path, demand_rows=8)
+            second = open_workbook(path)
+            assert second.sha256 != first.sha256 and second.sheet_info(1)['rows'] == 8
+            assert len(list(cache_root.iterdir())) == 2
+            print("   ✅ Cache reused while unchanged, new entry after the workbook changed")
+
+        for kwargs in ({'required_sheets': ['03_Validation_Sample']},
+                       {'required_columns': {'02_Demand_Data_Clean': ['Department Number']}}):
+            for use_cache in (True, False):
+                try:
+                    open_workbook(path, use_cache=use_cache, **kwargs)
+                    assert False, "Expected WorkbookValidationError"
+                except WorkbookValidationError:
+                    pass
+        corrupt = Path(tmp) / "corrupt.xlsx"
+        corrupt.write_bytes(path.read_bytes()[:2000])
+        try:
+            open_workbook(corrupt)
+            assert False, "Expected WorkbookValidationError"
+        except WorkbookValidationError:
+            pass
+        print("   ✅ Missing sheets, missing columns and truncated files are rejected")
+
+if __name__ == "__main__":
+    test_single_pass_matches_read_excel()
+    test_cache_reuse_and_validation()
+    print("\n✅ ALL WORKBOOK CACHE TESTS COMPLETED")
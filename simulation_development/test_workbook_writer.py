@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Test script for the CedarSim Workbook Writer
+
+This script checks that streamed workbooks read back like DataFrame.to_excel output,
+that the CSV / Parquet outputs hold the complete frames, and that damaged workbooks
+are caught by verify_workbook.
+"""
+
+import sys
+import os
+import importlib.util
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add the simulation_development directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from data.input_data.typed_loader import PARQUET_AVAILABLE
+from data.input_data.workbook_writer import verify_workbook, write_outputs, write_workbook
+
+PIPELINE_SCRIPT = Path(__file__).parent.parent / "scripts" / "cedarsim_complete_pipeline.py"
+COMMITTED_CSV_DIR = Path(__file__).parent.parent / "data" / "final" / "csv_complete"
+
+def _frames():
+    """SKU sheet with gaps and a mixed-type column, plus a larger demand sheet."""
+    sku = pd.DataFrame({
+        'Oracle Item Number': [136, 340, 508],
+        'Item Description': ['Pitcher', None, 'Gloves'],
+        'Department Number': [0, 'ED-7470009', 6172010],  # Mixed int / text values
+        'Avg_Lead Time': [0.5, np.nan, 3.0],
+    })
+    demand = pd.DataFrame({
+        'PO Week Ending Date': pd.Timestamp('2024-01-06') + pd.to_timedelta(np.arange(25) * 7, unit='D'),
+        'Oracle Item Number': np.arange(25) % 3 + 100,
+        'Total Qty Issues': np.arange(25, dtype=float) * 1.5,
+    })
+    return {'01_SKU_Inventory_Final': sku, '02_Demand_Data_Clean': demand}
+
+def test_streamed_workbook_matches_to_excel():
+    """Test a streamed workbook (written in small chunks) against DataFrame.to_excel."""
+    print("=" * 60)
+    print("TESTING STREAMING WORKBOOK WRITER")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        frames = _frames()
+        expected_path, path = Path(tmp) / "expected.xlsx", Path(tmp) / "streamed.xlsx"
+        with pd.ExcelWriter(expected_path, engine='openpyxl') as writer:
+            for name, df in frames.items():
+                df.to_excel(writer, sheet_name=name, index=False)
+
+        written = write_workbook(path, frames, chunk_rows=4)
+        assert written == {'01_SKU_Inventory_Final': (3, 4), '02_Demand_Data_Clean': (25, 3)}
+        expected, streamed = (pd.read_excel(p, sheet_name=None) for p in (expected_path, path))
+        assert list(streamed) == list(frames)
+        for name in frames:
+            pd.testing.assert_frame_equal(streamed[name], expected[name])
+        print("   ✅ Streamed sheets read back like to_excel output")
+
+        fill = lambda chunk: chunk.fillna({'Avg_Lead Time': 0})
+        write_workbook(path, {'01_SKU_Inventory_Final': frames['01_SKU_Inventory_Final']}, transform=fill, chunk_rows=2)
+        assert list(pd.read_excel(path)['Avg_Lead Time']) == [0.5, 0.0, 3.0]
+        print("   ✅ Per-chunk transform applied to the workbook")
+
+def test_outputs_and_verification():
+    """Test CSV / Parquet outputs next to a sampled workbook, and workbook verification."""
+    print("\n" + "=" * 60)
+    print("TESTING CSV / PARQUET OUTPUTS AND WORKBOOK VERIFICATION")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        frames = _frames()
+        xlsx_path = Path(tmp) / "final.xlsx"
+        workbook_sheets = dict(frames, **{'02_Demand_Data_Clean': frames['02_Demand_Data_Clean'].head(10)})
+        result = write_outputs(frames, xlsx_path=xlsx_path, csv_dir=Path(tmp) / "csv",
+                               parquet_dir=Path(tmp) / "parquet", workbook_sheets=workbook_sheets,
+                               csv_suffix='_Complete')
+        assert result['workbook']['02_Demand_Data_Clean'] == (10, 3)
+        demand_csv = pd.read_csv(Path(tmp) / "csv" / "02_Demand_Data_Clean_Complete.csv",
+                                 parse_dates=['PO Week Ending Date'])
+        pd.testing.assert_frame_equal(demand_csv, frames['02_Demand_Data_Clean'], check_dtype=False)
+        if PARQUET_AVAILABLE:
+            sku = pd.read_parquet(Path(tmp) / "parquet" / "01_SKU_Inventory_Final.parquet")
+            assert list(sku['Department Number']) == ['0', 'ED-7470009', '6172010']
+        assert len(result['files']) == (5 if PARQUET_AVAILABLE else 3)
+        print(f"   ✅ {len(result['files'])} files written; CSV / Parquet hold every row")
+
+        assert verify_workbook(xlsx_path, list(frames)) == list(frames)
+        for check in (lambda: verify_workbook(xlsx_path, ['01_SKU_Inventory_Final']),
+                      lambda: (xlsx_path.write_bytes(xlsx_path.read_bytes()[:2000]), verify_workbook(xlsx_path))):
+            try:
+                check()
+                assert False, "Expected ValueError"
+            except ValueError:
+                pass
+        print("   ✅ Unexpected sheets and truncated workbooks are rejected")
+
+def test_pipeline_output_names():
+    """Test that the pipeline writes each table to its committed csv_complete/ file name."""
+    print("\n" + "=" * 60)
+    print("TESTING PIPELINE OUTPUT FILE NAMES")
+    print("=" * 60)
+
+    previous_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # The pipeline creates its log and backup directory in the working directory
+        try:
+            spec = importlib.util.spec_from_file_location("cedarsim_complete_pipeline", PIPELINE_SCRIPT)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+
+            pipeline = module.CedarSimPipeline(output_dir=Path(tmp) / "final", export_excel=False)
+            frames = _frames()
+            pipeline.clean_sku_data = frames['01_SKU_Inventory_Final']
+            pipeline.clean_demand_data = frames['02_Demand_Data_Clean']
+            pipeline.phase1_removal_record = pd.DataFrame({'Oracle Item Number': [900], 'Reason': ['lead time']})
+            pipeline.phase2_removal_record = pd.DataFrame({'Oracle Item Number': [901, 902], 'Reason': ['PAR'] * 2})
+            pipeline.validation_data = pd.DataFrame({'Oracle Item Number': [136, 508, 999]})
+            assert pipeline.create_final_excel_file()
+        finally:
+            os.chdir(previous_cwd)
+
+        csv_dir = Path(tmp) / "final" / "csv_complete"
+        written = sorted(path.name for path in csv_dir.iterdir())
+        assert written == ['01_SKU_Inventory_Final_Complete.csv', '02_Demand_Data_Clean_Complete.csv',
+                           '03_Validation_Sample_Complete.csv', '04_Phase1_Removal_Record_Complete.csv',
+                           '05_Phase2_Removal_Record_Complete.csv']
+        committed = {path.name for path in COMMITTED_CSV_DIR.glob("0*_Complete.csv")}
+        assert committed <= set(written), committed - set(written)
+        assert all(path.exists() for path in pipeline.output_files())
+        assert len(pd.read_csv(csv_dir / "03_Validation_Sample_Complete.csv")) == 2
+        assert len(pd.read_csv(csv_dir / "05_Phase2_Removal_Record_Complete.csv")) == 2
+        print(f"   ✅ {len(written)} CSV files named as in csv_complete/")
+
+if __name__ == "__main__":
+    test_streamed_workbook_matches_to_excel()
+    test_outputs_and_verification()
+    test_pipeline_output_names()
+    print("\n✅ ALL WORKBOOK WRITER TESTS COMPLETED")